@@ -1,7 +1,26 @@
 """History integration constants."""
 
+from homeassistant.components.recorder.downsample import (
+    FIFTEEN_MINUTE_PERIOD,
+    MINUTE_PERIOD,
+)
+
 DOMAIN = "history"
 
 EVENT_COALESCE_TIME = 0.35
 
 MAX_PENDING_HISTORY_STATES = 2048
+
+# Max number of states of an entity sent in one message
+# when streaming the historical states in chunks
+HISTORY_STREAM_CHUNK_SIZE = 1000
+# Max number of chunks read ahead of the chunks sent by the event loop
+HISTORY_STREAM_PENDING_CHUNKS = 4
+
+RESOLUTION_AUTO = "auto"
+RESOLUTION_RAW = "raw"
+RESOLUTION_PERIODS: dict[str, int | None] = {
+    RESOLUTION_RAW: None,
+    "minute": MINUTE_PERIOD,
+    "15minute": FIFTEEN_MINUTE_PERIOD,
+}
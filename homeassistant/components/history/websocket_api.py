@@ -7,12 +7,14 @@ from collections.abc import Callable, Iterable
 from dataclasses import dataclass
 from datetime import datetime as dt, timedelta
 import logging
+import threading
 from typing import Any, cast
 
 import voluptuous as vol
 
 from homeassistant.components import websocket_api
 from homeassistant.components.recorder import get_instance, history
+from homeassistant.components.recorder.downsample import period_for_range
 from homeassistant.components.websocket_api import ActiveConnection, messages
 from homeassistant.const import (
     COMPRESSED_STATE_ATTRIBUTES,
@@ -34,11 +36,18 @@ from homeassistant.helpers.event import (
     async_track_point_in_utc_time,
     async_track_state_change_event,
 )
-from homeassistant.helpers.json import json_bytes
 from homeassistant.util.async_ import create_eager_task
 import homeassistant.util.dt as dt_util
 
-from .const import EVENT_COALESCE_TIME, MAX_PENDING_HISTORY_STATES
+from .const import (
+    EVENT_COALESCE_TIME,
+    HISTORY_STREAM_CHUNK_SIZE,
+    HISTORY_STREAM_PENDING_CHUNKS,
+    MAX_PENDING_HISTORY_STATES,
+    RESOLUTION_AUTO,
+    RESOLUTION_PERIODS,
+    RESOLUTION_RAW,
+)
 from .helpers import entities_may_have_state_changes_after, has_recorder_run_after
 
 _LOGGER = logging.getLogger(__name__)
@@ -64,6 +73,7 @@ def async_setup(hass: HomeAssistant) -> None:
 
 def _ws_get_significant_states(
     hass: HomeAssistant,
+    message_to_bytes: Callable[[dict[str, Any]], bytes],
     msg_id: int,
     start_time: dt,
     end_time: dt | None,
@@ -72,9 +82,26 @@ def _ws_get_significant_states(
     significant_changes_only: bool,
     minimal_response: bool,
     no_attributes: bool,
+    period: int | None = None,
+    numeric_only: bool = False,
 ) -> bytes:
-    """Fetch history significant_states and convert them to json in the executor."""
-    return json_bytes(
+    """Fetch history significant_states and serialize them in the executor."""
+    if period is not None and entity_ids:
+        states = history.get_downsampled_states(
+            hass,
+            start_time,
+            end_time,
+            entity_ids,
+            period,
+            include_start_time_state,
+            significant_changes_only,
+            minimal_response,
+            no_attributes,
+            numeric_only,
+        )
+        if states is not None:
+            return message_to_bytes(messages.result_message(msg_id, states))
+    return message_to_bytes(
         messages.result_message(
             msg_id,
             history.get_significant_states(
@@ -93,6 +120,15 @@ def _ws_get_significant_states(
     )
 
 
+def _resolution_period(
+    resolution: str, start_time: dt, end_time: dt | None
+) -> int | None:
+    """Return the downsampled period for a resolution, None for raw states."""
+    if resolution == RESOLUTION_AUTO:
+        return period_for_range(start_time, end_time or dt_util.utcnow())
+    return RESOLUTION_PERIODS[resolution]
+
+
 @websocket_api.websocket_command(
     {
         vol.Required("type"): "history/history_during_period",
@@ -103,6 +139,9 @@ def _ws_get_significant_states(
         vol.Optional("significant_changes_only", default=True): bool,
         vol.Optional("minimal_response", default=False): bool,
         vol.Optional("no_attributes", default=False): bool,
+        vol.Optional("resolution", default=RESOLUTION_RAW): vol.In(
+            [RESOLUTION_AUTO, *RESOLUTION_PERIODS]
+        ),
     }
 )
 @websocket_api.async_response
@@ -156,9 +195,10 @@ async def ws_get_history_during_period(
     minimal_response = msg["minimal_response"]
 
     connection.send_message(
-        await get_instance(hass).async_add_executor_job(
+        await get_instance(hass).async_add_read_executor_job(
             _ws_get_significant_states,
             hass,
+            connection.message_to_bytes,
             msg["id"],
             start_time,
             end_time,
@@ -167,6 +207,10 @@ async def ws_get_history_during_period(
             significant_changes_only,
             minimal_response,
             no_attributes,
+            _resolution_period(msg["resolution"], start_time, end_time),
+            # The last state of a period is not enough for states which
+            # are not numeric unless asked for explicitly
+            msg["resolution"] == RESOLUTION_AUTO,
         )
     )
 
@@ -192,18 +236,21 @@ def _async_send_empty_response(
     connection.send_result(msg_id)
     stream_end_time = end_time or dt_util.utcnow()
     connection.send_message(
-        _generate_websocket_response(msg_id, start_time, stream_end_time, {})
+        _generate_websocket_response(
+            connection.message_to_bytes, msg_id, start_time, stream_end_time, {}
+        )
     )
 
 
 def _generate_websocket_response(
+    message_to_bytes: Callable[[dict[str, Any]], bytes],
     msg_id: int,
     start_time: dt,
     end_time: dt,
     states: dict[str, list[dict[str, Any]]],
 ) -> bytes:
     """Generate a websocket response."""
-    return json_bytes(
+    return message_to_bytes(
         messages.event_message(
             msg_id, _generate_stream_message(states, start_time, end_time)
         )
@@ -212,6 +259,7 @@ def _generate_websocket_response(
 
 def _generate_historical_response(
     hass: HomeAssistant,
+    message_to_bytes: Callable[[dict[str, Any]], bytes],
     msg_id: int,
     start_time: dt,
     end_time: dt,
@@ -260,7 +308,9 @@ def _generate_historical_response(
     return (
         last_time_ts,
         last_time_dt,
-        _generate_websocket_response(msg_id, start_time, last_time_dt, states),
+        _generate_websocket_response(
+            message_to_bytes, msg_id, start_time, last_time_dt, states
+        ),
     )
 
 
@@ -270,18 +320,36 @@ async def _async_send_historical_states(
     msg_id: int,
     start_time: dt,
     end_time: dt,
-    entity_ids: list[str] | None,
+    entity_ids: list[str],
     include_start_time_state: bool,
     significant_changes_only: bool,
     minimal_response: bool,
     no_attributes: bool,
     send_empty: bool,
+    chunked: bool = False,
 ) -> dt | None:
     """Fetch history significant_states and send them to the client."""
     instance = get_instance(hass)
-    last_time_ts, last_time_dt, payload = await instance.async_add_executor_job(
+    if chunked:
+        last_time_ts = await instance.async_add_read_executor_job(
+            _send_historical_chunks,
+            hass,
+            connection,
+            msg_id,
+            start_time,
+            end_time,
+            entity_ids,
+            include_start_time_state,
+            significant_changes_only,
+            minimal_response,
+            no_attributes,
+            send_empty,
+        )
+        return dt_util.utc_from_timestamp(last_time_ts) if last_time_ts else None
+    last_time_ts, last_time_dt, payload = await instance.async_add_read_executor_job(
         _generate_historical_response,
         hass,
+        connection.message_to_bytes,
         msg_id,
         start_time,
         end_time,
@@ -297,6 +365,77 @@ async def _async_send_historical_states(
     return last_time_dt if last_time_ts != 0 else None
 
 
+def _send_historical_chunks(
+    hass: HomeAssistant,
+    connection: ActiveConnection,
+    msg_id: int,
+    start_time: dt,
+    end_time: dt,
+    entity_ids: list[str],
+    include_start_time_state: bool,
+    significant_changes_only: bool,
+    minimal_response: bool,
+    no_attributes: bool,
+    send_empty: bool,
+) -> float:
+    """Stream history significant_states to the client in chunks.
+
+    Each chunk is handed to the event loop to be sent as soon as it
+    has been read from the database. Reading waits only when
+    HISTORY_STREAM_PENDING_CHUNKS chunks are waiting for the event
+    loop, so the memory used does not depend on the time range. Once
+    all chunks are sent, a message with the time range is sent to tell
+    the client the historical states are complete.
+    """
+    pending_chunks = threading.BoundedSemaphore(HISTORY_STREAM_PENDING_CHUNKS)
+
+    @callback
+    def _async_send_chunk(payload: bytes) -> None:
+        """Send a chunk and let the next one be read."""
+        pending_chunks.release()
+        connection.send_message(payload)
+
+    last_time_ts = 0.0
+    for states in history.get_significant_states_chunks(
+        hass,
+        start_time,
+        end_time,
+        entity_ids,
+        HISTORY_STREAM_CHUNK_SIZE,
+        include_start_time_state,
+        significant_changes_only,
+        minimal_response,
+        no_attributes,
+    ):
+        if msg_id not in connection.subscriptions:
+            # Unsubscribe happened while sending historical states
+            return last_time_ts
+        for state_list in states.values():
+            last_time_ts = max(
+                last_time_ts, state_list[-1][COMPRESSED_STATE_LAST_UPDATED]
+            )
+        payload = connection.message_to_bytes(
+            messages.event_message(msg_id, {"states": states})
+        )
+        pending_chunks.acquire()
+        hass.loop.call_soon_threadsafe(_async_send_chunk, payload)
+
+    if last_time_ts == 0 and not send_empty:
+        return last_time_ts
+    # Sent after the chunks and before the result of the job is handled
+    hass.loop.call_soon_threadsafe(
+        connection.send_message,
+        _generate_websocket_response(
+            connection.message_to_bytes,
+            msg_id,
+            start_time,
+            dt_util.utc_from_timestamp(last_time_ts) if last_time_ts else end_time,
+            {},
+        ),
+    )
+    return last_time_ts
+
+
 def _history_compressed_state(state: State, no_attributes: bool) -> dict[str, Any]:
     """Convert a state to a compressed state."""
     comp_state: dict[str, Any] = {COMPRESSED_STATE_STATE: state.state}
@@ -349,7 +488,7 @@ async def _async_events_consumer(
 
         if history_states := _events_to_compressed_states(events, no_attributes):
             connection.send_message(
-                json_bytes(
+                connection.message_to_bytes(
                     messages.event_message(
                         msg_id,
                         {"states": history_states},
@@ -404,6 +543,7 @@ def _async_subscribe_events(
         vol.Optional("significant_changes_only", default=True): bool,
         vol.Optional("minimal_response", default=False): bool,
         vol.Optional("no_attributes", default=False): bool,
+        vol.Optional("chunked", default=False): bool,
     }
 )
 @websocket_api.async_response
@@ -443,6 +583,7 @@ async def ws_stream(
     significant_changes_only = msg["significant_changes_only"]
     no_attributes = msg["no_attributes"]
     minimal_response = msg["minimal_response"]
+    chunked = msg["chunked"]
 
     if end_time and end_time <= utc_now:
         if (
@@ -469,6 +610,7 @@ async def ws_stream(
             minimal_response,
             no_attributes,
             True,
+            chunked,
         )
         return
 
@@ -533,6 +675,7 @@ async def ws_stream(
         minimal_response,
         no_attributes,
         True,
+        chunked,
     )
 
     if msg_id not in connection.subscriptions:
@@ -577,4 +720,5 @@ async def ws_stream(
         minimal_response,
         no_attributes,
         send_empty=not last_event_time,
+        chunked=chunked,
     )
@@ -2,11 +2,14 @@
 
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
 from dataclasses import dataclass
 import datetime
 
-from homeassistant.components.recorder import get_instance, history
-from homeassistant.core import Event, EventStateChangedData, HomeAssistant, State
+from homeassistant.components.recorder.history.loader import async_get_history_loader
+from homeassistant.core import Event, EventStateChangedData, HomeAssistant
+from homeassistant.helpers.recorder import get_instance
 from homeassistant.helpers.template import Template
 import homeassistant.util.dt as dt_util
 
@@ -24,12 +27,103 @@ class HistoryStatsState:
     period: tuple[datetime.datetime, datetime.datetime]
 
 
-@dataclass
-class HistoryState:
-    """A minimal state to avoid holding on to State objects."""
+class StateTimeline:
+    """The changes of an entity between matching and not matching states.
+
+    The changes are kept sorted by time together with running totals of
+    the seconds matched and the matches started before each change, so
+    the stats of any period within the loaded history are read with two
+    bisections instead of a pass over the states.
+    """
+
+    def __init__(self, entity_states: set[str]) -> None:
+        """Initialize the timeline."""
+        self._entity_states = entity_states
+        self.timestamps: list[float] = []
+        self._matches: list[bool] = []
+        self._seconds: list[float] = []
+        self._starts: list[int] = []
 
-    state: str
-    last_changed: float
+    def __len__(self) -> int:
+        """Return the number of changes."""
+        return len(self.timestamps)
+
+    def _append(self, timestamp: float, matches: bool) -> None:
+        """Add a change after the last change."""
+        if self.timestamps:
+            previous_matches = self._matches[-1]
+            self._seconds.append(
+                self._seconds[-1]
+                + (timestamp - self.timestamps[-1] if previous_matches else 0)
+            )
+            self._starts.append(
+                self._starts[-1] + (1 if matches and not previous_matches else 0)
+            )
+        else:
+            self._seconds.append(0.0)
+            self._starts.append(0)
+        self.timestamps.append(timestamp)
+        self._matches.append(matches)
+
+    def append(self, timestamp: float, state: str) -> None:
+        """Add a state which changed after the last change."""
+        if self.timestamps and timestamp < self.timestamps[-1]:
+            return
+        self._append(timestamp, state in self._entity_states)
+
+    def merge(self, rows: Iterable[tuple[float, str]]) -> None:
+        """Add states loaded from the database, which may be anywhere in time."""
+        changes = set(zip(self.timestamps, self._matches, strict=True))
+        changes.update(
+            (timestamp, state in self._entity_states) for timestamp, state in rows
+        )
+        self.timestamps, self._matches, self._seconds, self._starts = [], [], [], []
+        for timestamp, matches in sorted(changes):
+            self._append(timestamp, matches)
+
+    def remove_before(self, timestamp: float) -> None:
+        """Remove the changes before a time, except the state at that time."""
+        if (index := bisect_right(self.timestamps, timestamp) - 1) > 0:
+            # The running totals are only compared with each other
+            for values in (self.timestamps, self._matches, self._seconds, self._starts):
+                del values[:index]
+
+    def seconds_and_count(
+        self, start_timestamp: float, end_timestamp: float, now_timestamp: float
+    ) -> tuple[float, int]:
+        """Return the seconds matched and the matches started in a period."""
+        timestamps = self.timestamps
+        matches = self._matches
+        first = bisect_left(timestamps, start_timestamp)
+        # Changes after now are only known once the period has ended
+        if end_timestamp < now_timestamp:
+            last = bisect_left(timestamps, end_timestamp) - 1
+        else:
+            last = len(timestamps) - 1
+        if first:
+            # The state at the start of the period
+            previous_matches = matches[first - 1]
+        elif last < first:
+            return 0.0, 0
+        else:
+            # Without an earlier state, the first state is taken as
+            # the state at the start of the period
+            previous_matches = matches[first]
+        measure_end = min(end_timestamp, now_timestamp)
+        if last < first:
+            if previous_matches:
+                return measure_end - start_timestamp, 1
+            return 0.0, 0
+
+        elapsed = self._seconds[last] - self._seconds[first]
+        if previous_matches:
+            elapsed += timestamps[first] - start_timestamp
+        if matches[last]:
+            elapsed += measure_end - timestamps[last]
+        match_count = self._starts[last] - self._starts[first]
+        if previous_matches or matches[first]:
+            match_count += 1
+        return elapsed, match_count
 
 
 class HistoryStats:
@@ -49,9 +143,13 @@ class HistoryStats:
         self.entity_id = entity_id
         self._period = (MIN_TIME_UTC, MIN_TIME_UTC)
         self._state: HistoryStatsState = HistoryStatsState(None, None, self._period)
-        self._history_current_period: list[HistoryState] = []
         self._previous_run_before_start = False
         self._entity_states = set(entity_states)
+        self._timeline = StateTimeline(self._entity_states)
+        # The history from the database covers this range, the states
+        # after it are added from state changed events
+        self._loaded_start: float | None = None
+        self._loaded_until: float | None = None
         self._duration = duration
         self._start = start
         self._end = end
@@ -81,14 +179,25 @@ class HistoryStats:
         utc_now = dt_util.utcnow()
         now_timestamp = floored_timestamp(utc_now)
 
+        new_data = False
+        if event and (new_state := event.data["new_state"]) is not None:
+            if self._loaded_start is not None:
+                self._timeline.append(
+                    new_state.last_changed.timestamp(), new_state.state
+                )
+            new_data = (
+                current_period_start_timestamp
+                <= floored_timestamp(new_state.last_changed)
+                <= current_period_end_timestamp
+            )
+
         if current_period_start_timestamp > now_timestamp:
             # History cannot tell the future
-            self._history_current_period = []
             self._previous_run_before_start = True
             self._state = HistoryStatsState(None, None, self._period)
             return self._state
         #
-        # We avoid querying the database if the below did NOT happen:
+        # We avoid loading history if the below did NOT happen:
         #
         # - The previous run happened before the start time
         # - The start time changed
@@ -106,102 +215,72 @@ class HistoryStats:
                 )
             )
         ):
-            new_data = False
-            if event and (new_state := event.data["new_state"]) is not None:
-                if (
-                    current_period_start_timestamp
-                    <= floored_timestamp(new_state.last_changed)
-                    <= current_period_end_timestamp
-                ):
-                    self._history_current_period.append(
-                        HistoryState(
-                            new_state.state, new_state.last_changed.timestamp()
-                        )
-                    )
-                    new_data = True
             if not new_data and current_period_end_timestamp < now_timestamp:
                 # If period has not changed and current time after the period end...
                 # Don't compute anything as the value cannot have changed
                 return self._state
         else:
-            await self._async_history_from_db(
-                current_period_start_timestamp, current_period_end_timestamp
+            await self._async_load_history(
+                current_period_start_timestamp,
+                current_period_end_timestamp,
+                now_timestamp,
             )
             self._previous_run_before_start = False
 
-        seconds_matched, match_count = self._async_compute_seconds_and_changes(
-            now_timestamp,
+        seconds_matched, match_count = self._timeline.seconds_and_count(
             current_period_start_timestamp,
             current_period_end_timestamp,
+            now_timestamp,
         )
         self._state = HistoryStatsState(seconds_matched, match_count, self._period)
         return self._state
 
-    async def _async_history_from_db(
-        self,
-        current_period_start_timestamp: float,
-        current_period_end_timestamp: float,
+    async def _async_load_history(
+        self, start_timestamp: float, end_timestamp: float, now_timestamp: float
     ) -> None:
-        """Update history data for the current period from the database."""
-        instance = get_instance(self.hass)
-        states = await instance.async_add_executor_job(
-            self._state_changes_during_period,
-            current_period_start_timestamp,
-            current_period_end_timestamp,
+        """Load the history of the period which has not been loaded before."""
+        # States of the last commit interval may not be in the database yet
+        loaded_until = min(
+            end_timestamp, now_timestamp - get_instance(self.hass).commit_interval
         )
-        self._history_current_period = [
-            HistoryState(state.state, state.last_changed.timestamp())
-            for state in states
-        ]
-
-    def _state_changes_during_period(
-        self, start_ts: float, end_ts: float
-    ) -> list[State]:
-        """Return state changes during a period."""
-        start = dt_util.utc_from_timestamp(start_ts)
-        end = dt_util.utc_from_timestamp(end_ts)
-        return history.state_changes_during_period(
-            self.hass,
-            start,
-            end,
+        if self._loaded_start is None or self._loaded_until is None:
+            self._timeline.merge(
+                await self._async_history_from_db(start_timestamp, end_timestamp)
+            )
+            self._loaded_start = start_timestamp
+            self._loaded_until = loaded_until
+            return
+
+        if start_timestamp < (loaded_start := self._loaded_start):
+            rows = await self._async_history_from_db(start_timestamp, loaded_start)
+            self._timeline.merge(row for row in rows if row[0] < loaded_start)
+            self._loaded_start = min(self._loaded_start, start_timestamp)
+        if end_timestamp > (previous_until := self._loaded_until):
+            # Changes after the history loaded before were added from
+            # events, refresh them in case events were missed
+            rows = await self._async_history_from_db(
+                previous_until, end_timestamp, include_start_time_state=False
+            )
+            self._timeline.merge(row for row in rows if row[0] > previous_until)
+            self._loaded_until = max(self._loaded_until, loaded_until)
+        if start_timestamp > self._loaded_start:
+            self._timeline.remove_before(start_timestamp)
+            self._loaded_start = start_timestamp
+
+    async def _async_history_from_db(
+        self,
+        start_timestamp: float,
+        end_timestamp: float,
+        include_start_time_state: bool = True,
+    ) -> list[tuple[float, str]]:
+        """Return the time and state of the changes in a period from the database."""
+        states = await async_get_history_loader(
+            self.hass
+        ).async_state_changes_during_period(
             self.entity_id,
-            include_start_time_state=True,
+            dt_util.utc_from_timestamp(start_timestamp),
+            dt_util.utc_from_timestamp(end_timestamp),
             no_attributes=True,
-        ).get(self.entity_id, [])
-
-    def _async_compute_seconds_and_changes(
-        self, now_timestamp: float, start_timestamp: float, end_timestamp: float
-    ) -> tuple[float, int]:
-        """Compute the seconds matched and changes from the history list and first state."""
-        # state_changes_during_period is called with include_start_time_state=True
-        # which is the default and always provides the state at the start
-        # of the period
-        previous_state_matches = (
-            self._history_current_period
-            and self._history_current_period[0].state in self._entity_states
+            include_start_time_state=include_start_time_state,
         )
-        last_state_change_timestamp = start_timestamp
-        elapsed = 0.0
-        match_count = 1 if previous_state_matches else 0
-
-        # Make calculations
-        for history_state in self._history_current_period:
-            current_state_matches = history_state.state in self._entity_states
-            state_change_timestamp = history_state.last_changed
-
-            if previous_state_matches:
-                elapsed += state_change_timestamp - last_state_change_timestamp
-            elif current_state_matches:
-                match_count += 1
-
-            previous_state_matches = current_state_matches
-            last_state_change_timestamp = state_change_timestamp
-
-        # Count time elapsed between last history state and end of measure
-        if previous_state_matches:
-            measure_end = min(end_timestamp, now_timestamp)
-            elapsed += measure_end - last_state_change_timestamp
-
-        # Save value in seconds
-        seconds_matched = elapsed
-        return seconds_matched, match_count
+        return [(state.last_changed.timestamp(), state.state) for state in states]
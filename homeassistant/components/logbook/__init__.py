@@ -160,5 +160,7 @@ def _process_logbook_platform(hass: HomeAssistant, domain: str, platform: Any) -
     ) -> None:
         """Teach logbook how to describe a new event."""
         external_events[event_name] = (domain, describe_callback)
+        # Contexts of the event may have been indexed without a description
+        logbook_config.context_index.clear()
 
     platform.async_describe_events(hass, _async_describe_event)
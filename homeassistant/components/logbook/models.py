@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
+import base64
 from collections.abc import Callable, Mapping
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+import math
+import threading
+import time
 from typing import TYPE_CHECKING, Any, Final, NamedTuple, cast
 
 from propcache import cached_property
@@ -22,6 +26,119 @@ from homeassistant.util.event_type import EventType
 from homeassistant.util.json import json_loads
 from homeassistant.util.ulid import ulid_to_bytes
 
+# Context data is reused by logbook runs for this many seconds
+CONTEXT_INDEX_TTL: Final = 600
+CONTEXT_INDEX_MAX_SIZE: Final = 16384
+
+# The timestamp of a cursor must be before 9999-01-01
+CURSOR_MAX_TIMESTAMP: Final = 253370764800
+
+
+class ContextOrigin(NamedTuple):
+    """The row a context was augmented from and the augmented data."""
+
+    expires: float
+    row_id: int
+    time_fired_ts: float
+    entity_id: str | None
+    data: dict[str, Any]
+
+
+class ContextIndex:
+    """Index the data augmented from context rows across logbook runs.
+
+    The data of a context only depends on the row it is augmented from,
+    so it is computed once for the earliest row of the context and reused
+    by later rows and runs until the entry expires. Entity names are not
+    part of the data as they can change.
+    """
+
+    def __init__(self) -> None:
+        """Init the index."""
+        # Guards adding and evicting entries from the recorder executor
+        self._lock = threading.Lock()
+        # Entries are ordered by expiry
+        self._origins: dict[bytes, ContextOrigin] = {}
+
+    def get(self, context_row: Row) -> dict[str, Any] | None:
+        """Return the data augmented from a context row."""
+        if (
+            (origin := self._origins.get(context_row[CONTEXT_ID_BIN_POS])) is None
+            or origin.row_id != context_row[ROW_ID_POS]
+            or origin.time_fired_ts != context_row[TIME_FIRED_TS_POS]
+            or origin.entity_id != context_row[ENTITY_ID_POS]
+            or origin.expires < time.monotonic()
+        ):
+            return None
+        return origin.data
+
+    def add(self, context_row: Row, data: dict[str, Any]) -> None:
+        """Add the data augmented from a context row."""
+        context_id_bin: bytes = context_row[CONTEXT_ID_BIN_POS]
+        time_fired_ts: float = context_row[TIME_FIRED_TS_POS]
+        now = time.monotonic()
+        with self._lock:
+            origins = self._origins
+            if (
+                (origin := origins.get(context_id_bin)) is not None
+                and origin.expires >= now
+                and origin.time_fired_ts <= time_fired_ts
+            ):
+                # Only the origin of the context is kept
+                return
+            origins.pop(context_id_bin, None)
+            origins[context_id_bin] = ContextOrigin(
+                now + CONTEXT_INDEX_TTL,
+                context_row[ROW_ID_POS],
+                time_fired_ts,
+                context_row[ENTITY_ID_POS],
+                data,
+            )
+            while len(origins) > CONTEXT_INDEX_MAX_SIZE or (
+                next(iter(origins.values())).expires < now
+            ):
+                del origins[next(iter(origins))]
+
+    def clear(self) -> None:
+        """Clear the index."""
+        with self._lock:
+            self._origins.clear()
+
+
+class LogbookCursor(NamedTuple):
+    """The position of the last row of a page of events.
+
+    The row id is the state_id of rows from the states table
+    and the event_id of rows from the events table.
+    """
+
+    time_fired_ts: float
+    is_state: bool
+    row_id: int
+
+    def to_token(self) -> str:
+        """Return the cursor as an opaque token."""
+        return base64.urlsafe_b64encode(
+            f"{self.time_fired_ts!r}:{self.is_state:d}:{self.row_id}".encode()
+        ).decode()
+
+    @classmethod
+    def from_token(cls, token: str) -> LogbookCursor:
+        """Return the cursor of a token, raises ValueError if it is invalid."""
+        time_fired_ts_str, is_state, row_id_str = (
+            base64.urlsafe_b64decode(token.encode()).decode().split(":")
+        )
+        time_fired_ts = float(time_fired_ts_str)
+        row_id = int(row_id_str)
+        if (
+            not math.isfinite(time_fired_ts)
+            or not 0 <= time_fired_ts < CURSOR_MAX_TIMESTAMP
+            or is_state not in ("0", "1")
+            or row_id < 0
+        ):
+            raise ValueError(f"Invalid cursor: {token}")
+        return cls(time_fired_ts, is_state == "1", row_id)
+
 
 @dataclass(slots=True)
 class LogbookConfig:
@@ -33,6 +150,7 @@ class LogbookConfig:
     ]
     sqlalchemy_filter: Filters | None = None
     entity_filter: Callable[[str], bool] | None = None
+    context_index: ContextIndex = field(default_factory=ContextIndex)
 
 
 class LazyEventPartialState:
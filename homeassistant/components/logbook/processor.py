@@ -4,13 +4,15 @@ from __future__ import annotations
 
 from collections.abc import Callable, Generator, Sequence
 from dataclasses import dataclass
-from datetime import datetime as dt
+from datetime import datetime as dt, timedelta
+from itertools import groupby
 import logging
 import time
 from typing import TYPE_CHECKING, Any
 
 from sqlalchemy.engine import Result
 from sqlalchemy.engine.row import Row
+from sqlalchemy.orm import Session
 
 from homeassistant.components.recorder import get_instance
 from homeassistant.components.recorder.filters import Filters
@@ -74,9 +76,11 @@ from .models import (
     ROW_ID_POS,
     STATE_POS,
     TIME_FIRED_TS_POS,
+    ContextIndex,
     EventAsRow,
     LazyEventPartialState,
     LogbookConfig,
+    LogbookCursor,
     async_event_to_row,
 )
 from .queries import statement_for_request
@@ -84,6 +88,14 @@ from .queries.common import PSEUDO_EVENT_STATE_CHANGED
 
 _LOGGER = logging.getLogger(__name__)
 
+# The first window queried for a page of events
+PAGE_WINDOW = timedelta(hours=1)
+# Rows fetched in addition to the rows of a page, which
+# provide the contexts of the oldest rows of the page
+PAGE_CONTEXT_ROWS = 100
+# The resolution of the timestamps in the database
+_TIMESTAMP_STEP = timedelta(microseconds=1)
+
 
 @dataclass(slots=True)
 class LogbookRun:
@@ -99,6 +111,7 @@ class LogbookRun:
     include_entity_name: bool
     timestamp: bool
     memoize_new_contexts: bool = True
+    context_index: ContextIndex | None = None
 
 
 class EventProcessor:
@@ -133,6 +146,7 @@ class EventProcessor:
             entity_name_cache=EntityNameCache(self.hass),
             include_entity_name=include_entity_name,
             timestamp=timestamp,
+            context_index=logbook_config.context_index,
         )
         self.context_augmenter = ContextAugmenter(self.logbook_run)
 
@@ -157,19 +171,7 @@ class EventProcessor:
     ) -> list[dict[str, Any]]:
         """Get events for a period of time."""
         with session_scope(hass=self.hass, read_only=True) as session:
-            metadata_ids: list[int] | None = None
-            instance = get_instance(self.hass)
-            if self.entity_ids:
-                metadata_ids = extract_metadata_ids(
-                    instance.states_meta_manager.get_many(
-                        self.entity_ids, session, False
-                    )
-                )
-            event_type_ids = tuple(
-                extract_event_type_ids(
-                    instance.event_type_manager.get_many(self.event_types, session)
-                )
-            )
+            metadata_ids, event_type_ids = self._get_ids(session)
             stmt = statement_for_request(
                 start_day,
                 end_day,
@@ -184,6 +186,127 @@ class EventProcessor:
                 execute_stmt_lambda_element(session, stmt, orm_rows=False)
             )
 
+    def get_events_page(
+        self,
+        start_day: dt,
+        end_day: dt,
+        limit: int,
+        cursor: LogbookCursor | None = None,
+    ) -> tuple[list[dict[str, Any]], LogbookCursor | None]:
+        """Get a page of the newest events before the cursor.
+
+        The period is queried backwards in windows that double in size
+        until the page is full, so the cost of a page depends on how
+        many rows it holds and not on how far back it is. Each window
+        fetches at most the rows missing from the page and
+        PAGE_CONTEXT_ROWS more rows, and goes on after the oldest row
+        if it holds more. Returns the events in time order and the
+        cursor of the next page, or None if the start of the period
+        was reached.
+        """
+        # Windows exclude their start and end like a request for a period
+        window_end = end_day
+        # Rows at or after the last key were scanned before, windows
+        # overlap as timestamps are more precise than the window bounds
+        last_key: tuple[float, bool, int] | None = None
+        if cursor is not None:
+            last_key = cursor
+            window_end = min(
+                window_end,
+                dt_util.utc_from_timestamp(cursor.time_fired_ts) + _TIMESTAMP_STEP,
+            )
+        window = PAGE_WINDOW
+        rows: list[Row] = []
+        page_rows = 0
+        next_cursor: LogbookCursor | None = None
+        context_rows = PAGE_CONTEXT_ROWS
+        with session_scope(hass=self.hass, read_only=True) as session:
+            metadata_ids, event_type_ids = self._get_ids(session)
+            while next_cursor is None and window_end > start_day:
+                window_start = max(start_day, window_end - window)
+                fetch_limit = limit - page_rows + context_rows
+                stmt = statement_for_request(
+                    window_start,
+                    window_end,
+                    event_type_ids,
+                    self.entity_ids,
+                    metadata_ids,
+                    self.device_ids,
+                    self.filters,
+                    self.context_id,
+                    descending=True,
+                    limit=fetch_limit,
+                )
+                window_rows = list(
+                    execute_stmt_lambda_element(session, stmt, orm_rows=False)
+                )
+                next_window_end: dt | None = None
+                if len(window_rows) == fetch_limit:
+                    # The rows of the oldest timestamp may go on after the
+                    # limit so they are fetched with the rest of the window
+                    oldest_ts = window_rows[-1][TIME_FIRED_TS_POS]
+                    window_rows = [
+                        row
+                        for row in window_rows
+                        if row[TIME_FIRED_TS_POS] != oldest_ts
+                    ]
+                    if not window_rows:
+                        # All rows fetched share the same timestamp
+                        context_rows += fetch_limit
+                        continue
+                    # Go on after the rows fetched in the same window
+                    next_window_end = (
+                        dt_util.utc_from_timestamp(oldest_ts) + _TIMESTAMP_STEP
+                    )
+                # Rows with the same timestamp are ordered by their
+                # key as state and event row ids overlap
+                for _, same_ts_rows in groupby(
+                    window_rows, key=lambda row: row[TIME_FIRED_TS_POS]
+                ):
+                    for row in sorted(same_ts_rows, key=_row_page_key, reverse=True):
+                        if (
+                            row[CONTEXT_ONLY_POS]
+                            or row[EVENT_TYPE_POS] == EVENT_CALL_SERVICE
+                        ):
+                            # Context rows of the window link the rows of the page
+                            rows.append(row)
+                            continue
+                        if next_cursor is not None:
+                            continue
+                        key = _row_page_key(row)
+                        if last_key is not None and key >= last_key:
+                            continue
+                        last_key = key
+                        rows.append(row)
+                        page_rows += 1
+                        if page_rows == limit:
+                            next_cursor = LogbookCursor(*key)
+                if next_window_end is not None:
+                    window_end = next_window_end
+                    continue
+                if window_start == start_day:
+                    break
+                # The start of the window is in the next window
+                window_end = window_start + _TIMESTAMP_STEP
+                window *= 2
+            rows.sort(key=_row_sort_key)
+            return self.humanify(rows), next_cursor
+
+    def _get_ids(self, session: Session) -> tuple[list[int] | None, tuple[int, ...]]:
+        """Return the metadata ids of the entities and ids of the event types."""
+        metadata_ids: list[int] | None = None
+        instance = get_instance(self.hass)
+        if self.entity_ids:
+            metadata_ids = extract_metadata_ids(
+                instance.states_meta_manager.get_many(self.entity_ids, session, False)
+            )
+        event_type_ids = tuple(
+            extract_event_type_ids(
+                instance.event_type_manager.get_many(self.event_types, session)
+            )
+        )
+        return metadata_ids, event_type_ids
+
     def humanify(
         self, rows: Generator[EventAsRow] | Sequence[Row] | Result
     ) -> list[dict[str, str]]:
@@ -320,6 +443,7 @@ class ContextAugmenter:
         self.external_events = logbook_run.external_events
         self.event_cache = logbook_run.event_cache
         self.include_entity_name = logbook_run.include_entity_name
+        self.context_index = logbook_run.context_index
 
     def get_context(
         self, context_id_bin: bytes | None, row: Row | EventAsRow | None
@@ -339,38 +463,51 @@ class ContextAugmenter:
 
     def augment(self, data: dict[str, Any], context_row: Row | EventAsRow) -> None:
         """Augment data from the row and cache."""
+        if type(context_row) is EventAsRow or self.context_index is None:
+            context_data = self._context_data(context_row)
+        elif (context_data := self.context_index.get(context_row)) is None:
+            context_data = self._context_data(context_row)
+            self.context_index.add(context_row, context_data)
+        data.update(context_data)
+        if self.include_entity_name and (
+            context_entity_id := context_data.get(CONTEXT_ENTITY_ID)
+        ):
+            data[CONTEXT_ENTITY_ID_NAME] = self.entity_name_cache.get(context_entity_id)
+
+    def _context_data(self, context_row: Row | EventAsRow) -> dict[str, Any]:
+        """Return the data of a context row without entity names."""
         event_type = context_row[EVENT_TYPE_POS]
         # State change
         if context_entity_id := context_row[ENTITY_ID_POS]:
-            data[CONTEXT_STATE] = context_row[STATE_POS]
-            data[CONTEXT_ENTITY_ID] = context_entity_id
-            if self.include_entity_name:
-                data[CONTEXT_ENTITY_ID_NAME] = self.entity_name_cache.get(
-                    context_entity_id
-                )
-            return
+            return {
+                CONTEXT_STATE: context_row[STATE_POS],
+                CONTEXT_ENTITY_ID: context_entity_id,
+            }
 
         # Call service
         if event_type == EVENT_CALL_SERVICE:
             event = self.event_cache.get(context_row)
             event_data = event.data
-            data[CONTEXT_DOMAIN] = event_data.get(ATTR_DOMAIN)
-            data[CONTEXT_SERVICE] = event_data.get(ATTR_SERVICE)
-            data[CONTEXT_EVENT_TYPE] = event_type
-            return
+            return {
+                CONTEXT_DOMAIN: event_data.get(ATTR_DOMAIN),
+                CONTEXT_SERVICE: event_data.get(ATTR_SERVICE),
+                CONTEXT_EVENT_TYPE: event_type,
+            }
 
         if event_type not in self.external_events:
-            return
+            return {}
 
         domain, describe_event = self.external_events[event_type]
-        data[CONTEXT_EVENT_TYPE] = event_type
-        data[CONTEXT_DOMAIN] = domain
+        data: dict[str, Any] = {
+            CONTEXT_EVENT_TYPE: event_type,
+            CONTEXT_DOMAIN: domain,
+        }
         event = self.event_cache.get(context_row)
         try:
             described = describe_event(event)
         except Exception:
             _LOGGER.exception("Error with %s describe event for %s", domain, event_type)
-            return
+            return data
         if name := described.get(LOGBOOK_ENTRY_NAME):
             data[CONTEXT_NAME] = name
         if message := described.get(LOGBOOK_ENTRY_MESSAGE):
@@ -378,11 +515,23 @@ class ContextAugmenter:
         # In 2022.12 and later drop `CONTEXT_MESSAGE` if `CONTEXT_SOURCE` is available
         if source := described.get(LOGBOOK_ENTRY_SOURCE):
             data[CONTEXT_SOURCE] = source
-        if not (attr_entity_id := described.get(LOGBOOK_ENTRY_ENTITY_ID)):
-            return
-        data[CONTEXT_ENTITY_ID] = attr_entity_id
-        if self.include_entity_name:
-            data[CONTEXT_ENTITY_ID_NAME] = self.entity_name_cache.get(attr_entity_id)
+        if attr_entity_id := described.get(LOGBOOK_ENTRY_ENTITY_ID):
+            data[CONTEXT_ENTITY_ID] = attr_entity_id
+        return data
+
+
+def _row_sort_key(row: Row) -> tuple[float, int]:
+    """Return the key to sort rows in time order."""
+    return (row[TIME_FIRED_TS_POS] or 0, row[ROW_ID_POS] or 0)
+
+
+def _row_page_key(row: Row) -> tuple[float, bool, int]:
+    """Return the key of a row in the order of the pages of events."""
+    return (
+        row[TIME_FIRED_TS_POS],
+        row[EVENT_TYPE_POS] is PSEUDO_EVENT_STATE_CHANGED,
+        row[ROW_ID_POS],
+    )
 
 
 def _rows_ids_match(row: Row | EventAsRow, other_row: Row | EventAsRow) -> bool:
@@ -5,6 +5,7 @@ from __future__ import annotations
 from collections.abc import Collection
 from datetime import datetime as dt
 
+from sqlalchemy import literal_column
 from sqlalchemy.sql.lambdas import StatementLambdaElement
 
 from homeassistant.components.recorder.filters import Filters
@@ -26,8 +27,41 @@ def statement_for_request(
     device_ids: list[str] | None = None,
     filters: Filters | None = None,
     context_id: str | None = None,
+    descending: bool = False,
+    limit: int | None = None,
 ) -> StatementLambdaElement:
     """Generate the logbook statement for a logbook request."""
+    stmt = _statement_for_request(
+        start_day_dt,
+        end_day_dt,
+        event_type_ids,
+        entity_ids,
+        states_metadata_ids,
+        device_ids,
+        filters,
+        context_id,
+    )
+    if descending:
+        # Newest first, in the order of the keys of a page cursor
+        stmt += lambda s: s.order_by(None).order_by(
+            literal_column("time_fired_ts").desc(), literal_column("row_id").desc()
+        )
+    if limit is not None:
+        stmt += lambda s: s.limit(limit)
+    return stmt
+
+
+def _statement_for_request(
+    start_day_dt: dt,
+    end_day_dt: dt,
+    event_type_ids: tuple[int, ...],
+    entity_ids: list[str] | None,
+    states_metadata_ids: Collection[int] | None,
+    device_ids: list[str] | None,
+    filters: Filters | None,
+    context_id: str | None,
+) -> StatementLambdaElement:
+    """Generate the logbook statement in time order."""
     start_day = start_day_dt.timestamp()
     end_day = end_day_dt.timestamp()
     # No entities: logbook sends everything for the timeframe
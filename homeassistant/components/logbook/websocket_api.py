@@ -16,7 +16,6 @@ from homeassistant.components.recorder import get_instance
 from homeassistant.components.websocket_api import ActiveConnection, messages
 from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
 from homeassistant.helpers.event import async_track_point_in_utc_time
-from homeassistant.helpers.json import json_bytes
 from homeassistant.util.async_ import create_eager_task
 import homeassistant.util.dt as dt_util
 
@@ -26,7 +25,7 @@ from .helpers import (
     async_filter_entities,
     async_subscribe_events,
 )
-from .models import LogbookConfig, async_event_to_row
+from .models import LogbookConfig, LogbookCursor, async_event_to_row
 from .processor import EventProcessor
 
 MAX_PENDING_LOGBOOK_EVENTS = 2048
@@ -71,7 +70,7 @@ def _async_send_empty_response(
     stream_end_time = end_time or dt_util.utcnow()
     empty_stream_message = _generate_stream_message([], start_time, stream_end_time)
     empty_response = messages.event_message(msg_id, empty_stream_message)
-    connection.send_message(json_bytes(empty_response))
+    connection.send_message(connection.message_to_bytes(empty_response))
 
 
 async def _async_send_historical_events(
@@ -104,6 +103,7 @@ async def _async_send_historical_events(
     if not is_big_query:
         message, last_event_time = await _async_get_ws_stream_events(
             hass,
+            connection,
             msg_id,
             start_time,
             end_time,
@@ -125,6 +125,7 @@ async def _async_send_historical_events(
     recent_query_start = end_time - timedelta(hours=BIG_QUERY_RECENT_HOURS)
     recent_message, recent_query_last_event_time = await _async_get_ws_stream_events(
         hass,
+        connection,
         msg_id,
         recent_query_start,
         end_time,
@@ -136,6 +137,7 @@ async def _async_send_historical_events(
 
     older_message, older_query_last_event_time = await _async_get_ws_stream_events(
         hass,
+        connection,
         msg_id,
         start_time,
         recent_query_start,
@@ -156,6 +158,7 @@ async def _async_send_historical_events(
 
 async def _async_get_ws_stream_events(
     hass: HomeAssistant,
+    connection: ActiveConnection,
     msg_id: int,
     start_time: dt,
     end_time: dt,
@@ -163,8 +166,9 @@ async def _async_get_ws_stream_events(
     partial: bool,
 ) -> tuple[bytes, dt | None]:
     """Async wrapper around _ws_formatted_get_events."""
-    return await get_instance(hass).async_add_executor_job(
+    return await get_instance(hass).async_add_read_executor_job(
         _ws_stream_get_events,
+        connection.message_to_bytes,
         msg_id,
         start_time,
         end_time,
@@ -185,13 +189,14 @@ def _generate_stream_message(
 
 
 def _ws_stream_get_events(
+    message_to_bytes: Callable[[dict[str, Any]], bytes],
     msg_id: int,
     start_day: dt,
     end_day: dt,
     event_processor: EventProcessor,
     partial: bool,
 ) -> tuple[bytes, dt | None]:
-    """Fetch events and convert them to json in the executor."""
+    """Fetch events and serialize them in the executor."""
     events = event_processor.get_events(start_day, end_day)
     last_time = None
     if events:
@@ -203,7 +208,7 @@ def _ws_stream_get_events(
         # data in case the UI needs to show that historical
         # data is still loading in the future
         message["partial"] = True
-    return json_bytes(messages.event_message(msg_id, message)), last_time
+    return message_to_bytes(messages.event_message(msg_id, message)), last_time
 
 
 async def _async_events_consumer(
@@ -235,7 +240,7 @@ async def _async_events_consumer(
             async_event_to_row(e) for e in events
         ):
             connection.send_message(
-                json_bytes(
+                connection.message_to_bytes(
                     messages.event_message(
                         msg_id,
                         {"events": logbook_events},
@@ -428,19 +433,48 @@ async def ws_event_stream(
 
 
 def _ws_formatted_get_events(
+    message_to_bytes: Callable[[dict[str, Any]], bytes],
     msg_id: int,
     start_time: dt,
     end_time: dt,
     event_processor: EventProcessor,
 ) -> bytes:
-    """Fetch events and convert them to json in the executor."""
-    return json_bytes(
+    """Fetch events and serialize them in the executor."""
+    return message_to_bytes(
         messages.result_message(
             msg_id, event_processor.get_events(start_time, end_time)
         )
     )
 
 
+def _ws_formatted_get_events_page(
+    message_to_bytes: Callable[[dict[str, Any]], bytes],
+    msg_id: int,
+    start_time: dt,
+    end_time: dt,
+    limit: int,
+    cursor: LogbookCursor | None,
+    event_processor: EventProcessor,
+) -> bytes:
+    """Fetch a page of events and serialize them in the executor."""
+    events, next_cursor = event_processor.get_events_page(
+        start_time, end_time, limit, cursor
+    )
+    return message_to_bytes(
+        messages.result_message(msg_id, _page_result(events, next_cursor))
+    )
+
+
+def _page_result(
+    events: list[dict[str, Any]], next_cursor: LogbookCursor | None
+) -> dict[str, Any]:
+    """Return the result of a page of events."""
+    return {
+        "events": events,
+        "next_cursor": next_cursor.to_token() if next_cursor else None,
+    }
+
+
 @websocket_api.websocket_command(
     {
         vol.Required("type"): "logbook/get_events",
@@ -449,6 +483,8 @@ def _ws_formatted_get_events(
         vol.Optional("entity_ids"): [str],
         vol.Optional("device_ids"): [str],
         vol.Optional("context_id"): str,
+        vol.Optional("limit"): vol.All(int, vol.Range(min=1)),
+        vol.Optional("cursor"): str,
     }
 )
 @websocket_api.async_response
@@ -458,6 +494,7 @@ async def ws_get_events(
     """Handle logbook get events websocket command."""
     start_time_str = msg["start_time"]
     end_time_str = msg.get("end_time")
+    limit: int | None = msg.get("limit")
     utc_now = dt_util.utcnow()
 
     if start_time := dt_util.parse_datetime(start_time_str):
@@ -474,8 +511,19 @@ async def ws_get_events(
         connection.send_error(msg["id"], "invalid_end_time", "Invalid end_time")
         return
 
+    cursor: LogbookCursor | None = None
+    if cursor_token := msg.get("cursor"):
+        try:
+            cursor = LogbookCursor.from_token(cursor_token)
+        except ValueError:
+            cursor = None
+        if cursor is None or limit is None:
+            connection.send_error(msg["id"], "invalid_cursor", "Invalid cursor")
+            return
+
+    empty_result = [] if limit is None else _page_result([], None)
     if start_time > utc_now:
-        connection.send_result(msg["id"], [])
+        connection.send_result(msg["id"], empty_result)
         return
 
     device_ids = msg.get("device_ids")
@@ -485,7 +533,7 @@ async def ws_get_events(
         entity_ids = async_filter_entities(hass, entity_ids)
         if not entity_ids and not device_ids:
             # Everything has been filtered away
-            connection.send_result(msg["id"], [])
+            connection.send_result(msg["id"], empty_result)
             return
 
     event_types = async_determine_event_types(hass, entity_ids, device_ids)
@@ -500,9 +548,25 @@ async def ws_get_events(
         include_entity_name=False,
     )
 
+    if limit is not None:
+        connection.send_message(
+            await get_instance(hass).async_add_read_executor_job(
+                _ws_formatted_get_events_page,
+                connection.message_to_bytes,
+                msg["id"],
+                start_time,
+                end_time,
+                limit,
+                cursor,
+                event_processor,
+            )
+        )
+        return
+
     connection.send_message(
-        await get_instance(hass).async_add_executor_job(
+        await get_instance(hass).async_add_read_executor_job(
             _ws_formatted_get_events,
+            connection.message_to_bytes,
             msg["id"],
             start_time,
             end_time,
@@ -40,6 +40,8 @@ SERVICE_LOG_THREAD_FRAMES = "log_thread_frames"
 SERVICE_LOG_EVENT_LOOP_SCHEDULED = "log_event_loop_scheduled"
 SERVICE_SET_ASYNCIO_DEBUG = "set_asyncio_debug"
 SERVICE_LOG_CURRENT_TASKS = "log_current_tasks"
+SERVICE_SET_EVENT_BUS_STATS = "set_event_bus_stats"
+SERVICE_LOG_EVENT_BUS_STATS = "log_event_bus_stats"
 
 _LRU_CACHE_WRAPPER_OBJECT = _lru_cache_wrapper.__name__
 _SQLALCHEMY_LRU_OBJECT = "LRUCache"
@@ -63,12 +65,16 @@ SERVICES = (
     SERVICE_LOG_EVENT_LOOP_SCHEDULED,
     SERVICE_SET_ASYNCIO_DEBUG,
     SERVICE_LOG_CURRENT_TASKS,
+    SERVICE_SET_EVENT_BUS_STATS,
+    SERVICE_LOG_EVENT_BUS_STATS,
 )
 
 DEFAULT_SCAN_INTERVAL = timedelta(seconds=30)
 
 DEFAULT_MAX_OBJECTS = 5
 
+MAX_LISTENERS_PER_EVENT_TYPE = 10
+
 CONF_ENABLED = "enabled"
 CONF_SECONDS = "seconds"
 CONF_MAX_OBJECTS = "max_objects"
@@ -273,6 +279,48 @@ async def async_setup_entry(  # noqa: C901
             base_logger.setLevel(logging.INFO)
         hass.loop.set_debug(enabled)
 
+    @callback
+    def _async_set_event_bus_stats(call: ServiceCall) -> None:
+        """Enable or disable event bus dispatch statistics."""
+        enabled = call.data[CONF_ENABLED]
+        _LOGGER.critical("Setting event bus dispatch statistics to %s", enabled)
+        hass.bus.async_set_dispatch_stats(enabled)
+
+    @callback
+    def _async_log_event_bus_stats(call: ServiceCall) -> None:
+        """Log the listener counts and dispatch statistics of the event bus."""
+        listener_counts = hass.bus.async_listeners()
+        dispatch_stats = hass.bus.async_dispatch_stats()
+        for event_type, count in sorted(
+            listener_counts.items(), key=lambda item: item[1], reverse=True
+        ):
+            if (stats := dispatch_stats.get(event_type)) is None:
+                _LOGGER.critical("Event %s: %s listeners", event_type, count)
+                continue
+            _LOGGER.critical(
+                "Event %s: %s listeners, fired %s times, %.6fs dispatch time",
+                event_type,
+                count,
+                stats.fired,
+                stats.dispatch_time,
+            )
+            for name, listener_time in sorted(
+                stats.listener_time.items(), key=lambda item: item[1], reverse=True
+            )[:MAX_LISTENERS_PER_EVENT_TYPE]:
+                _LOGGER.critical(
+                    "Event %s: listener %s: %.6fs", event_type, name, listener_time
+                )
+
+        persistent_notification.async_create(
+            hass,
+            (
+                "Event bus stats have been dumped to the log. See [the"
+                " logs](/config/logs) to review the stats."
+            ),
+            title="Event bus stats completed",
+            notification_id="profile_event_bus_stats",
+        )
+
     async_register_admin_service(
         hass,
         DOMAIN,
@@ -382,6 +430,21 @@ async def async_setup_entry(  # noqa: C901
         _async_dump_current_tasks,
     )
 
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_SET_EVENT_BUS_STATS,
+        _async_set_event_bus_stats,
+        schema=vol.Schema({vol.Optional(CONF_ENABLED, default=True): cv.boolean}),
+    )
+
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_LOG_EVENT_BUS_STATS,
+        _async_log_event_bus_stats,
+    )
+
     return True
 
 
@@ -389,6 +452,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     for service in SERVICES:
         hass.services.async_remove(domain=DOMAIN, service=service)
+    hass.bus.async_set_dispatch_stats(False)
     if LOG_INTERVAL_SUB in hass.data[DOMAIN]:
         hass.data[DOMAIN][LOG_INTERVAL_SUB]()
     hass.data.pop(DOMAIN)
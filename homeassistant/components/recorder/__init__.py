@@ -61,6 +61,14 @@ CONF_PURGE_KEEP_DAYS = "purge_keep_days"
 CONF_PURGE_INTERVAL = "purge_interval"
 CONF_EVENT_TYPES = "event_types"
 CONF_COMMIT_INTERVAL = "commit_interval"
+CONF_PARTITION_BY_DAY = "partition_by_day"
+CONF_COMPILE_STATISTICS_IN_EXECUTOR = "compile_statistics_in_executor"
+CONF_AGGREGATE_STATISTICS_IN_DATABASE = "aggregate_statistics_in_database"
+CONF_DB_READ_POOL_SIZE = "db_read_pool_size"
+CONF_COMPRESS_ATTRIBUTES = "compress_attributes"
+CONF_PURGE_TIME_BUDGET = "purge_time_budget"
+CONF_PURGE_ROW_BUDGET = "purge_row_budget"
+CONF_DOWNSAMPLE_STATES = "downsample_states"
 
 
 EXCLUDE_SCHEMA = INCLUDE_EXCLUDE_FILTER_SCHEMA_INNER.extend(
@@ -113,6 +121,22 @@ CONFIG_SCHEMA = vol.Schema(
                     vol.Optional(
                         CONF_DB_INTEGRITY_CHECK, default=DEFAULT_DB_INTEGRITY_CHECK
                     ): cv.boolean,
+                    vol.Optional(CONF_PARTITION_BY_DAY, default=False): cv.boolean,
+                    vol.Optional(
+                        CONF_COMPILE_STATISTICS_IN_EXECUTOR, default=False
+                    ): cv.boolean,
+                    vol.Optional(
+                        CONF_AGGREGATE_STATISTICS_IN_DATABASE, default=False
+                    ): cv.boolean,
+                    vol.Optional(CONF_DB_READ_POOL_SIZE, default=0): vol.All(
+                        vol.Coerce(int), vol.Range(min=0, max=32)
+                    ),
+                    vol.Optional(CONF_COMPRESS_ATTRIBUTES, default=False): cv.boolean,
+                    vol.Optional(CONF_PURGE_TIME_BUDGET, default=5): vol.All(
+                        vol.Coerce(float), vol.Range(min=0.1)
+                    ),
+                    vol.Optional(CONF_PURGE_ROW_BUDGET, default=0): cv.positive_int,
+                    vol.Optional(CONF_DOWNSAMPLE_STATES, default=False): cv.boolean,
                 }
             ),
         )
@@ -163,8 +187,17 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         db_retry_wait=db_retry_wait,
         entity_filter=entity_filter,
         exclude_event_types=exclude_event_types,
+        partition_by_day=conf[CONF_PARTITION_BY_DAY],
+        compile_statistics_in_executor=conf[CONF_COMPILE_STATISTICS_IN_EXECUTOR],
+        aggregate_statistics_in_database=conf[CONF_AGGREGATE_STATISTICS_IN_DATABASE],
+        db_read_pool_size=conf[CONF_DB_READ_POOL_SIZE],
+        compress_attributes=conf[CONF_COMPRESS_ATTRIBUTES],
+        purge_time_budget=conf[CONF_PURGE_TIME_BUDGET],
+        purge_row_budget=conf[CONF_PURGE_ROW_BUDGET],
+        downsample_states=conf[CONF_DOWNSAMPLE_STATES],
     )
     get_instance.cache_clear()
+    await instance.purge_progress.async_load()
     instance.async_initialize()
     instance.async_register()
     instance.start()
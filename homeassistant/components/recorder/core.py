@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import asyncio
 from collections.abc import Callable, Iterable
-from concurrent.futures import CancelledError
+from concurrent.futures import CancelledError, Future
 import contextlib
 from datetime import datetime, timedelta
 import logging
@@ -37,6 +37,7 @@ from homeassistant.core import (
     EventStateChangedData,
     HomeAssistant,
     callback,
+    split_entity_id,
 )
 from homeassistant.helpers.event import (
     async_track_time_change,
@@ -51,6 +52,7 @@ from homeassistant.util.event_type import EventType
 
 from . import migration, statistics
 from .const import (
+    DB_READ_WORKER_PREFIX,
     DB_WORKER_PREFIX,
     DOMAIN,
     KEEPALIVE_TIME,
@@ -77,9 +79,23 @@ from .db_schema import (
     Statistics,
     StatisticsShortTerm,
 )
-from .executor import DBInterruptibleThreadPoolExecutor
-from .models import DatabaseEngine, StatisticData, StatisticMetaData, UnsupportedDialect
-from .pool import POOL_SIZE, MutexPool, RecorderPool
+from .executor import DBInterruptibleThreadPoolExecutor, DBReadThreadPoolExecutor
+from .models import (
+    DatabaseEngine,
+    StatisticData,
+    StatisticMetaData,
+    UnsupportedDialect,
+    compress_shared_attrs,
+)
+from .pool import (
+    POOL_SIZE,
+    READ_POOL_CACHED_STATEMENTS,
+    READ_POOL_MMAP_SIZE,
+    MutexPool,
+    RecorderPool,
+)
+from .purge import PurgeBudget
+from .purge_progress import PurgeProgress
 from .table_managers.event_data import EventDataManager
 from .table_managers.event_types import EventTypeManager
 from .table_managers.recorder_runs import RecorderRunsManager
@@ -96,6 +112,7 @@ from .tasks import (
     CompileMissingStatisticsTask,
     DatabaseLockTask,
     ImportStatisticsTask,
+    IncrementalVacuumTask,
     KeepAliveTask,
     PerodicCleanupTask,
     PurgeTask,
@@ -112,6 +129,7 @@ from .util import (
     build_mysqldb_conv,
     dburl_to_path,
     end_incomplete_runs,
+    execute_on_connection,
     is_second_sunday,
     move_away_broken_database,
     session_scope,
@@ -134,6 +152,7 @@ COMMIT_TASK = CommitTask()
 KEEP_ALIVE_TASK = KeepAliveTask()
 WAIT_TASK = WaitTask()
 ADJUST_LRU_SIZE_TASK = AdjustLRUSizeTask()
+INCREMENTAL_VACUUM_TASK = IncrementalVacuumTask()
 
 DB_LOCK_TIMEOUT = 30
 DB_LOCK_QUEUE_CHECK_TIMEOUT = 10  # check every 10 seconds
@@ -164,6 +183,14 @@ class Recorder(threading.Thread):
         db_retry_wait: int,
         entity_filter: Callable[[str], bool] | None,
         exclude_event_types: set[EventType[Any] | str],
+        partition_by_day: bool,
+        compile_statistics_in_executor: bool,
+        aggregate_statistics_in_database: bool,
+        db_read_pool_size: int,
+        compress_attributes: bool,
+        purge_time_budget: float,
+        purge_row_budget: int,
+        downsample_states: bool,
     ) -> None:
         """Initialize the recorder."""
         threading.Thread.__init__(self, name="Recorder")
@@ -191,6 +218,10 @@ class Recorder(threading.Thread):
         self.async_recorder_ready = asyncio.Event()
         self._queue_watch = threading.Event()
         self.engine: Engine | None = None
+        # Read only connections for SQLite, used by the read executor
+        self.db_read_pool_size = db_read_pool_size
+        self.read_engine: Engine | None = None
+        self.read_worker_thread_ids: set[int] = set()
         self.max_backlog: int = MAX_QUEUE_BACKLOG_MIN_VALUE
         self._psutil: ha_psutil.PsutilWrapper | None = None
 
@@ -199,10 +230,30 @@ class Recorder(threading.Thread):
         # by is_entity_recorder and the sensor recorder.
         self.entity_filter = entity_filter
         self.exclude_event_types = exclude_event_types
+        self.partition_by_day = partition_by_day
+        # Tables that are partitioned by day, only supported on PostgreSQL
+        self.partitioned_tables: set[str] = set()
+        # Collect statistics from the platforms in the database executor
+        self.compile_statistics_in_executor = compile_statistics_in_executor
+        # Calculate the mean, min and max of sensor states in the database
+        self.aggregate_statistics_in_database = aggregate_statistics_in_database
+        # Store large state attributes compressed
+        self.compress_attributes = compress_attributes
+        # Purges run in cycles bounded by the budget and resume after a restart
+        self.purge_budget = PurgeBudget(purge_time_budget, purge_row_budget)
+        self.purge_progress = PurgeProgress(hass)
+        # Summarize the states in one and fifteen minute periods
+        self.downsample_states = downsample_states
+        # Set while a period of statistics is collected in the database
+        # executor, done once its statistics are inserted
+        self.statistics_compile: Future[None] | None = None
 
         self.schema_version = 0
         self._commits_without_expire = 0
         self._event_session_has_pending_writes = False
+        self._last_event_timestamp: float | None = None
+        # The events fired until this time are committed to the database
+        self.committed_until_timestamp: float | None = None
 
         self.recorder_runs_manager = RecorderRunsManager()
         self.states_manager = StatesManager()
@@ -214,12 +265,14 @@ class Recorder(threading.Thread):
 
         self.event_session: Session | None = None
         self._get_session: Callable[[], Session] | None = None
+        self._get_read_session: Callable[[], Session] | None = None
         self._completed_first_database_setup: bool | None = None
         self.migration_in_progress = False
         self.migration_is_live = False
         self.use_legacy_events_index = False
         self._database_lock_task: DatabaseLockTask | None = None
         self._db_executor: DBInterruptibleThreadPoolExecutor | None = None
+        self._db_read_executor: DBReadThreadPoolExecutor | None = None
 
         self._event_listener: CALLBACK_TYPE | None = None
         self._queue_watcher: CALLBACK_TYPE | None = None
@@ -265,6 +318,19 @@ class Recorder(threading.Thread):
             raise RuntimeError("The database connection has not been established")
         return self._get_session()
 
+    def get_read_session(self) -> Session:
+        """Get a new sqlalchemy session for reading.
+
+        Sessions created in the read executor use the read only
+        connections, all others are the same as get_session.
+        """
+        if (
+            self._get_read_session is not None
+            and threading.get_ident() in self.read_worker_thread_ids
+        ):
+            return self._get_read_session()
+        return self.get_session()
+
     def queue_task(self, task: RecorderTask | Event) -> None:
         """Add a task to the recorder queue."""
         self._queue.put(task)
@@ -282,12 +348,24 @@ class Recorder(threading.Thread):
             max_workers=MAX_DB_EXECUTOR_WORKERS,
             shutdown_hook=self._shutdown_pool,
         )
+        if self.db_read_pool_size and self._using_file_sqlite:
+            self._db_read_executor = DBReadThreadPoolExecutor(
+                self.read_worker_thread_ids,
+                thread_name_prefix=DB_READ_WORKER_PREFIX,
+                max_workers=self.db_read_pool_size,
+                shutdown_hook=self._shutdown_read_pool,
+            )
 
     def _shutdown_pool(self) -> None:
         """Close the dbpool connections in the current thread."""
         if self.engine and hasattr(self.engine.pool, "shutdown"):
             self.engine.pool.shutdown()
 
+    def _shutdown_read_pool(self) -> None:
+        """Close the read pool connection in the current thread."""
+        if self.read_engine and hasattr(self.read_engine.pool, "shutdown"):
+            self.read_engine.pool.shutdown()
+
     @callback
     def async_initialize(self) -> None:
         """Initialize the recorder."""
@@ -356,6 +434,24 @@ class Recorder(threading.Thread):
         """Add an executor job from within the event loop."""
         return self.hass.loop.run_in_executor(self._db_executor, target, *args)
 
+    def add_executor_job[_T](self, target: Callable[[], _T]) -> Future[_T]:
+        """Add an executor job from within the recorder thread."""
+        assert self._db_executor is not None
+        return self._db_executor.submit(target)
+
+    @callback
+    def async_add_read_executor_job[_T](
+        self, target: Callable[..., _T], *args: Any
+    ) -> asyncio.Future[_T]:
+        """Add a read only executor job from within the event loop.
+
+        The job runs in the read executor if the read pool is enabled
+        and must only use read only sessions.
+        """
+        if self._db_read_executor is None:
+            return self.async_add_executor_job(target, *args)
+        return self.hass.loop.run_in_executor(self._db_read_executor, target, *args)
+
     @callback
     def _async_check_queue(self, *_: Any) -> None:
         """Periodic check of the queue size to ensure we do not exhaust memory.
@@ -504,6 +600,11 @@ class Recorder(threading.Thread):
         Called after all migration steps are finished.
         """
         self._async_setup_periodic_tasks()
+        if (pending_purge := self.purge_progress.pending) is not None:
+            _LOGGER.debug(
+                "Resuming purge of data before %s", pending_purge.purge_before
+            )
+            self.queue_task(PurgeTask(*pending_purge))
         self.async_recorder_ready.set()
 
     @callback
@@ -524,6 +625,9 @@ class Recorder(threading.Thread):
         """Run tasks every five minutes."""
         self.queue_task(ADJUST_LRU_SIZE_TASK)
         self.async_periodic_statistics()
+        # Unused pages are freed while the recorder is idle
+        if self.dialect_name == SupportedDialect.SQLITE and not self.backlog:
+            self.queue_task(INCREMENTAL_VACUUM_TASK)
 
     def _adjust_lru_size(self) -> None:
         """Trigger the LRU adjustment.
@@ -851,6 +955,7 @@ class Recorder(threading.Thread):
         self.event_data_manager.load(non_state_change_events, session)
         self.event_type_manager.load(non_state_change_events, session)
         self.states_meta_manager.load(state_change_events, session)
+        self.state_attributes_manager.prefetch(session)
         self.state_attributes_manager.load(state_change_events, session)
 
     def _guarded_process_one_task_or_event_or_recover(
@@ -1007,6 +1112,7 @@ class Recorder(threading.Thread):
         )
 
     def _process_one_event(self, event: Event[Any]) -> None:
+        self._last_event_timestamp = event.time_fired_timestamp
         if not self.enabled:
             return
         if event.event_type == EVENT_STATE_CHANGED:
@@ -1140,11 +1246,22 @@ class Recorder(threading.Thread):
         else:
             # No matching attributes found, save them in the DB
             dbstate_attributes = StateAttributes(shared_attrs=shared_attrs, hash=hash_)
-            state_attributes_manager.add_pending(dbstate_attributes)
+            if self.compress_attributes and (
+                compressed := compress_shared_attrs(
+                    shared_attrs_bytes, split_entity_id(entity_id)[0]
+                )
+            ):
+                (
+                    dbstate_attributes.shared_attrs,
+                    dbstate_attributes.shared_attrs_bin,
+                ) = compressed
+            state_attributes_manager.add_pending(dbstate_attributes, shared_attrs)
             self._add_to_session(session, dbstate_attributes)
             dbstate.state_attributes = dbstate_attributes
 
-        self._add_to_session(session, dbstate)
+        # States are written in bulk when the session is committed
+        states_manager.queue_insert(dbstate)
+        self._event_session_has_pending_writes = True
 
     def _handle_database_error(self, err: Exception, *, setup_run: bool) -> bool:
         """Handle a database error that may result in moving away the corrupt db."""
@@ -1192,6 +1309,13 @@ class Recorder(threading.Thread):
         session = self.event_session
         self._commits_without_expire += 1
 
+        # Flush the pending states_meta and state_attributes rows first
+        # so the queued states can reference their ids. The unit of work
+        # inserts the new rows of each table with a single INSERT ...
+        # RETURNING on the dialects which are also used for the states
+        session.flush()
+        self.states_manager.insert_queued(session)
+
         if (
             pending_last_reported
             := self.states_manager.get_pending_last_reported_timestamp()
@@ -1210,6 +1334,7 @@ class Recorder(threading.Thread):
         session.commit()
 
         self._event_session_has_pending_writes = False
+        self.committed_until_timestamp = self._last_event_timestamp
         # We just committed the state attributes to the database
         # and we now know the attributes_ids.  We can save
         # many selects for matching attributes by loading them
@@ -1361,6 +1486,43 @@ class Recorder(threading.Thread):
             self.max_bind_vars = database_engine.max_bind_vars
         self._completed_first_database_setup = True
 
+    def _setup_read_connection(
+        self, dbapi_connection: DBAPIConnection, connection_record: Any
+    ) -> None:
+        """Set up a read only connection of the read pool."""
+        execute_on_connection(dbapi_connection, "PRAGMA query_only=ON")
+        execute_on_connection(
+            dbapi_connection, f"PRAGMA mmap_size={READ_POOL_MMAP_SIZE}"
+        )
+        # The upper bound on the cache size is approximately 16MiB of memory
+        execute_on_connection(dbapi_connection, "PRAGMA cache_size = -16384")
+
+    def _setup_read_pool(self) -> None:
+        """Set up the read only connections for the read executor.
+
+        SQLite in WAL mode allows reading while the recorder writes, each
+        read worker gets its own connection.
+        """
+        assert not self.read_engine
+        self.read_engine = create_engine(
+            self.db_url,
+            poolclass=RecorderPool,
+            pool_size=self.db_read_pool_size + 1,
+            recorder_and_worker_thread_ids=self.read_worker_thread_ids,
+            connect_args={"cached_statements": READ_POOL_CACHED_STATEMENTS},
+            future=True,
+        )
+        sqlalchemy_event.listen(
+            self.read_engine, "connect", self._setup_read_connection
+        )
+        self._get_read_session = scoped_session(
+            sessionmaker(bind=self.read_engine, future=True)
+        )
+        _LOGGER.debug(
+            "Set up %s read only connections to the recorder database",
+            self.db_read_pool_size,
+        )
+
     def _setup_connection(self) -> None:
         """Ensure database is ready to fly."""
         kwargs: dict[str, Any] = {}
@@ -1410,10 +1572,16 @@ class Recorder(threading.Thread):
         migration.pre_migrate_schema(self.engine)
         Base.metadata.create_all(self.engine)
         self._get_session = scoped_session(sessionmaker(bind=self.engine, future=True))
+        if self._db_read_executor:
+            self._setup_read_pool()
         _LOGGER.debug("Connected to recorder database")
 
     def _close_connection(self) -> None:
         """Close the connection."""
+        if self.read_engine:
+            self.read_engine.dispose()
+            self.read_engine = None
+        self._get_read_session = None
         if self.engine:
             self.engine.dispose()
             self.engine = None
@@ -1468,8 +1636,12 @@ class Recorder(threading.Thread):
                 # joining the threads until after we have tried
                 # to cleanly close the connection.
                 self._db_executor.shutdown(join_threads_or_timeout=False)
+            if self._db_read_executor:
+                self._db_read_executor.shutdown(join_threads_or_timeout=False)
             self._close_connection()
             if self._db_executor:
                 # After the connection is closed, we can join the threads
                 # or forcefully shutdown the threads if they take too long.
                 self._db_executor.join_threads_or_timeout()
+            if self._db_read_executor:
+                self._db_read_executor.join_threads_or_timeout()
@@ -62,6 +62,7 @@ from .models import (
     bytes_to_ulid_or_none,
     bytes_to_uuid_hex_or_none,
     datetime_to_timestamp_or_none,
+    decompress_shared_attrs,
     process_timestamp,
     ulid_to_bytes_or_none,
     uuid_hex_to_bytes_or_none,
@@ -77,7 +78,7 @@ class LegacyBase(DeclarativeBase):
     """Base class for tables, used for schema migration."""
 
 
-SCHEMA_VERSION = 47
+SCHEMA_VERSION = 49
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -87,6 +88,7 @@ TABLE_EVENT_TYPES = "event_types"
 TABLE_STATES = "states"
 TABLE_STATE_ATTRIBUTES = "state_attributes"
 TABLE_STATES_META = "states_meta"
+TABLE_STATES_DOWNSAMPLED = "states_downsampled"
 TABLE_RECORDER_RUNS = "recorder_runs"
 TABLE_SCHEMA_CHANGES = "schema_changes"
 TABLE_STATISTICS = "statistics"
@@ -112,12 +114,21 @@ ALL_TABLES = [
     TABLE_SCHEMA_CHANGES,
     TABLE_MIGRATION_CHANGES,
     TABLE_STATES_META,
+    TABLE_STATES_DOWNSAMPLED,
     TABLE_STATISTICS,
     TABLE_STATISTICS_META,
     TABLE_STATISTICS_RUNS,
     TABLE_STATISTICS_SHORT_TERM,
 ]
 
+# Tables that can be partitioned by day on PostgreSQL and the
+# timestamp column they are partitioned on
+PARTITIONED_TABLE_COLUMNS = {
+    TABLE_STATES: "last_updated_ts",
+    TABLE_EVENTS: "time_fired_ts",
+    TABLE_STATISTICS_SHORT_TERM: "start_ts",
+}
+
 TABLES_TO_CHECK = [
     TABLE_STATES,
     TABLE_EVENTS,
@@ -586,6 +597,11 @@ class StateAttributes(Base):
     shared_attrs: Mapped[str | None] = mapped_column(
         Text().with_variant(mysql.LONGTEXT, "mysql", "mariadb")
     )
+    # When the attributes are compressed shared_attrs only holds
+    # the attributes the database queries filter on
+    shared_attrs_bin: Mapped[bytes | None] = mapped_column(
+        LargeBinary().with_variant(mysql.LONGBLOB, "mysql", "mariadb")
+    )
 
     def __repr__(self) -> str:
         """Return string representation of instance for debugging."""
@@ -639,6 +655,8 @@ class StateAttributes(Base):
     def to_native(self) -> dict[str, Any]:
         """Convert to a state attributes dictionary."""
         shared_attrs = self.shared_attrs
+        if self.shared_attrs_bin is not None:
+            shared_attrs = decompress_shared_attrs(self.shared_attrs_bin)
         if shared_attrs is None:
             return {}
         try:
@@ -668,6 +686,43 @@ class StatesMeta(Base):
         )
 
 
+class StatesDownsampled(Base):
+    """Summary of the states of an entity during a period.
+
+    Holds the min and max of the numeric states and the last state
+    seen in each one minute and fifteen minute period.
+    """
+
+    __table_args__ = (
+        Index(
+            "ix_states_downsampled_metadata_id_period_start_ts",
+            "metadata_id",
+            "period",
+            "start_ts",
+            unique=True,
+        ),
+        _DEFAULT_TABLE_ARGS,
+    )
+    __tablename__ = TABLE_STATES_DOWNSAMPLED
+    id: Mapped[int] = mapped_column(ID_TYPE, Identity(), primary_key=True)
+    metadata_id: Mapped[int | None] = mapped_column(ID_TYPE)
+    period: Mapped[int | None] = mapped_column(Integer)
+    start_ts: Mapped[float | None] = mapped_column(TIMESTAMP_TYPE, index=True)
+    min: Mapped[float | None] = mapped_column(DOUBLE_TYPE)
+    max: Mapped[float | None] = mapped_column(DOUBLE_TYPE)
+    state: Mapped[str | None] = mapped_column(String(MAX_LENGTH_STATE_STATE))
+    last_updated_ts: Mapped[float | None] = mapped_column(TIMESTAMP_TYPE)
+
+    def __repr__(self) -> str:
+        """Return string representation of instance for debugging."""
+        return (
+            "<recorder.StatesDownsampled("
+            f"id={self.id}, metadata_id={self.metadata_id}, period={self.period}, "
+            f"start_ts={self.start_ts}, state='{self.state}'"
+            ")>"
+        )
+
+
 class StatisticsBase:
     """Statistics base class."""
 
@@ -926,6 +981,7 @@ SHARED_ATTR_OR_LEGACY_ATTRIBUTES = case(
     (StateAttributes.shared_attrs.is_(None), States.attributes),
     else_=StateAttributes.shared_attrs,
 ).label("attributes")
+SHARED_ATTRS_BIN = StateAttributes.shared_attrs_bin.label("attributes_bin")
 SHARED_DATA_OR_LEGACY_EVENT_DATA = case(
     (EventData.shared_data.is_(None), Events.event_data), else_=EventData.shared_data
 ).label("event_data")
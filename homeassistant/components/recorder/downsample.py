@@ -0,0 +1,253 @@
+"""Downsampled states for long range history."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from itertools import chain
+import logging
+import math
+from typing import Any
+
+from sqlalchemy import insert, lambda_stmt, select
+from sqlalchemy.engine.row import Row
+from sqlalchemy.orm.session import Session
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+
+from .db_schema import States, StatesDownsampled
+from .util import execute_stmt_lambda_element
+
+_LOGGER = logging.getLogger(__name__)
+
+MINUTE_PERIOD = 60
+FIFTEEN_MINUTE_PERIOD = 900
+PERIODS = (MINUTE_PERIOD, FIFTEEN_MINUTE_PERIOD)
+# A row without a metadata_id marks each compiled statistics period, the
+# downsampled states are only used for the periods that were compiled
+COMPILED_PERIOD = 300
+
+
+def _compile_minute_stmt(start_ts: float, end_ts: float) -> StatementLambdaElement:
+    """Return a statement that selects the states to summarize."""
+    return lambda_stmt(
+        lambda: select(States.metadata_id, States.state, States.last_updated_ts)
+        .filter(States.last_updated_ts >= start_ts)
+        .filter(States.last_updated_ts < end_ts)
+        .filter(States.metadata_id.is_not(None))
+        .filter(States.state.is_not(None))
+        .order_by(States.metadata_id, States.last_updated_ts)
+    )
+
+
+def _compiled_periods_stmt(start_ts: float, end_ts: float) -> StatementLambdaElement:
+    """Return a statement that selects the compiled periods in a time range."""
+    return lambda_stmt(
+        lambda: select(StatesDownsampled.start_ts)
+        .filter(StatesDownsampled.period == COMPILED_PERIOD)
+        .filter(StatesDownsampled.metadata_id.is_(None))
+        .filter(StatesDownsampled.start_ts >= start_ts)
+        .filter(StatesDownsampled.start_ts < end_ts)
+        .order_by(StatesDownsampled.start_ts)
+    )
+
+
+def _compile_fifteen_minute_stmt(
+    start_ts: float, end_ts: float
+) -> StatementLambdaElement:
+    """Return a statement that selects the minute buckets to summarize."""
+    return lambda_stmt(
+        lambda: select(
+            StatesDownsampled.metadata_id,
+            StatesDownsampled.min,
+            StatesDownsampled.max,
+            StatesDownsampled.state,
+            StatesDownsampled.last_updated_ts,
+        )
+        .filter(StatesDownsampled.period == MINUTE_PERIOD)
+        .filter(StatesDownsampled.start_ts >= start_ts)
+        .filter(StatesDownsampled.start_ts < end_ts)
+        .order_by(StatesDownsampled.metadata_id, StatesDownsampled.start_ts)
+    )
+
+
+def _float_or_none(state: str) -> float | None:
+    """Return the state as a float if it is numeric."""
+    try:
+        value = float(state)
+    except ValueError:
+        return None
+    return value if math.isfinite(value) else None
+
+
+def _merge(
+    buckets: dict[tuple[int, float], dict[str, Any]],
+    key: tuple[int, float],
+    minimum: float | None,
+    maximum: float | None,
+    state: str,
+    last_updated_ts: float,
+) -> None:
+    """Merge a value into a bucket, rows must be sorted by time."""
+    if (bucket := buckets.get(key)) is None:
+        buckets[key] = {
+            "metadata_id": key[0],
+            "start_ts": key[1],
+            "min": minimum,
+            "max": maximum,
+            "state": state,
+            "last_updated_ts": last_updated_ts,
+        }
+        return
+    if minimum is not None and (bucket["min"] is None or minimum < bucket["min"]):
+        bucket["min"] = minimum
+    if maximum is not None and (bucket["max"] is None or maximum > bucket["max"]):
+        bucket["max"] = maximum
+    bucket["state"] = state
+    bucket["last_updated_ts"] = last_updated_ts
+
+
+def _summarize_states(rows: Iterable[Row], start_ts: float) -> list[dict[str, Any]]:
+    """Summarize states into one minute buckets."""
+    buckets: dict[tuple[int, float], dict[str, Any]] = {}
+    for metadata_id, state, last_updated_ts in rows:
+        bucket_start_ts = (
+            start_ts + (last_updated_ts - start_ts) // MINUTE_PERIOD * MINUTE_PERIOD
+        )
+        value = _float_or_none(state)
+        _merge(
+            buckets,
+            (metadata_id, bucket_start_ts),
+            value,
+            value,
+            state,
+            last_updated_ts,
+        )
+    return list(buckets.values())
+
+
+def _summarize_buckets(
+    rows: Iterable[Row | tuple[Any, ...]], start_ts: float
+) -> list[dict[str, Any]]:
+    """Summarize one minute buckets into a fifteen minute bucket."""
+    buckets: dict[tuple[int, float], dict[str, Any]] = {}
+    for metadata_id, minimum, maximum, state, last_updated_ts in rows:
+        _merge(
+            buckets,
+            (metadata_id, start_ts),
+            minimum,
+            maximum,
+            state,
+            last_updated_ts,
+        )
+    return list(buckets.values())
+
+
+def _with_period(period: int, buckets: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Set the period of downsampled buckets."""
+    for bucket in buckets:
+        bucket["period"] = period
+    return buckets
+
+
+def summarize_downsampled_states(
+    session: Session, start: datetime, end: datetime
+) -> list[dict[str, Any]]:
+    """Summarize the states recorded during a statistics period.
+
+    One minute buckets are built from the states, fifteen minute
+    buckets are rolled up from the one minute buckets once a fifteen
+    minute period is complete. The earlier one minute buckets of the
+    fifteen minute period must already be inserted.
+
+    The buckets are inserted by insert_downsampled_states, so this can
+    run in the database executor.
+    """
+    start_ts = start.timestamp()
+    end_ts = end.timestamp()
+    minute_buckets = _summarize_states(
+        execute_stmt_lambda_element(session, _compile_minute_stmt(start_ts, end_ts)),
+        start_ts,
+    )
+    _LOGGER.debug(
+        "Downsampled %s minute buckets for %s-%s", len(minute_buckets), start, end
+    )
+    buckets = [
+        {"metadata_id": None, "period": COMPILED_PERIOD, "start_ts": start_ts},
+        *_with_period(MINUTE_PERIOD, minute_buckets),
+    ]
+    if end_ts % FIFTEEN_MINUTE_PERIOD:
+        return buckets
+    fifteen_start_ts = end_ts - FIFTEEN_MINUTE_PERIOD
+    fifteen_minute_rows = chain(
+        execute_stmt_lambda_element(
+            session, _compile_fifteen_minute_stmt(fifteen_start_ts, start_ts)
+        ),
+        (
+            (
+                bucket["metadata_id"],
+                bucket["min"],
+                bucket["max"],
+                bucket["state"],
+                bucket["last_updated_ts"],
+            )
+            for bucket in minute_buckets
+        ),
+    )
+    buckets.extend(
+        _with_period(
+            FIFTEEN_MINUTE_PERIOD,
+            _summarize_buckets(fifteen_minute_rows, fifteen_start_ts),
+        )
+    )
+    return buckets
+
+
+def insert_downsampled_states(session: Session, buckets: list[dict[str, Any]]) -> None:
+    """Insert the buckets summarized by summarize_downsampled_states."""
+    session.execute(insert(StatesDownsampled), buckets)
+
+
+def compile_downsampled_states(
+    session: Session, start: datetime, end: datetime
+) -> None:
+    """Downsample the states recorded during a statistics period."""
+    insert_downsampled_states(
+        session, summarize_downsampled_states(session, start, end)
+    )
+
+
+def covered_range(
+    session: Session, start_ts: float, end_ts: float
+) -> tuple[float, float] | None:
+    """Return the latest range of consecutive compiled periods in a time range.
+
+    Returns None if no period in the time range was compiled.
+    """
+    if not (
+        compiled_starts := [
+            compiled_start_ts
+            for (compiled_start_ts,) in execute_stmt_lambda_element(
+                session, _compiled_periods_stmt(start_ts, end_ts)
+            )
+        ]
+    ):
+        return None
+    covered_end_ts = covered_start_ts = compiled_starts[-1] + COMPILED_PERIOD
+    for compiled_start_ts in reversed(compiled_starts):
+        if compiled_start_ts != covered_start_ts - COMPILED_PERIOD:
+            break
+        covered_start_ts = compiled_start_ts
+    return covered_start_ts, covered_end_ts
+
+
+def period_for_range(start_time: datetime, end_time: datetime) -> int | None:
+    """Return the downsampled period to use for a time range.
+
+    Returns None if the range is narrow enough to use the raw states.
+    """
+    duration = end_time - start_time
+    if duration <= timedelta(days=1):
+        return None
+    if duration <= timedelta(days=7):
+        return MINUTE_PERIOD
+    return FIFTEEN_MINUTE_PERIOD
@@ -3,13 +3,21 @@
 from __future__ import annotations
 
 from collections.abc import Callable
+from concurrent.futures import Future
 from concurrent.futures.thread import _threads_queues, _worker
+import logging
 import threading
+import time
 from typing import Any
 import weakref
 
 from homeassistant.util.executor import InterruptibleThreadPoolExecutor
 
+_LOGGER = logging.getLogger(__name__)
+
+# Jobs waiting longer than this in the read executor queue are logged
+SLOW_READ_QUEUE_TIME = 1.0
+
 
 def _worker_with_shutdown_hook(
     shutdown_hook: Callable[[], None],
@@ -71,3 +79,38 @@ class DBInterruptibleThreadPoolExecutor(InterruptibleThreadPoolExecutor):
             executor_thread.start()
             self._threads.add(executor_thread)  # type: ignore[attr-defined]
             _threads_queues[executor_thread] = self._work_queue  # type: ignore[index]
+
+
+class DBReadThreadPoolExecutor(DBInterruptibleThreadPoolExecutor):
+    """A database executor for read only jobs which tracks the queue time."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Init the executor."""
+        super().__init__(*args, **kwargs)
+        self._queue_time_lock = threading.Lock()
+        self.jobs = 0
+        self.total_queue_time = 0.0
+        self.max_queue_time = 0.0
+
+    def submit(  # type: ignore[override]
+        self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any
+    ) -> Future[Any]:
+        """Submit a job and record how long it waits for a worker."""
+        return super().submit(self._run_timed, time.monotonic(), fn, *args, **kwargs)
+
+    def _run_timed(
+        self, queued_at: float, fn: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Any:
+        """Record the queue time of a job and run it."""
+        queue_time = time.monotonic() - queued_at
+        with self._queue_time_lock:
+            self.jobs += 1
+            self.total_queue_time += queue_time
+            self.max_queue_time = max(self.max_queue_time, queue_time)
+        if queue_time > SLOW_READ_QUEUE_TIME:
+            _LOGGER.debug(
+                "Database read job %s waited %.3f seconds for a worker",
+                fn,
+                queue_time,
+            )
+        return fn(*args, **kwargs)
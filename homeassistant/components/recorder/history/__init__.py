@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterator
 from datetime import datetime
 from typing import Any
 
@@ -13,25 +14,68 @@ from homeassistant.helpers.recorder import get_instance
 from ..filters import Filters
 from .const import NEED_ATTRIBUTE_DOMAINS, SIGNIFICANT_DOMAINS
 from .modern import (
+    get_downsampled_states as _modern_get_downsampled_states,
     get_full_significant_states_with_session as _modern_get_full_significant_states_with_session,
     get_last_state_changes as _modern_get_last_state_changes,
     get_significant_states as _modern_get_significant_states,
+    get_significant_states_chunks as _modern_get_significant_states_chunks,
     get_significant_states_with_session as _modern_get_significant_states_with_session,
     state_changes_during_period as _modern_state_changes_during_period,
+    state_changes_during_period_for_entities as _modern_state_changes_during_period_for_entities,
 )
 
 # These are the APIs of this package
 __all__ = [
     "NEED_ATTRIBUTE_DOMAINS",
     "SIGNIFICANT_DOMAINS",
+    "get_downsampled_states",
     "get_full_significant_states_with_session",
     "get_last_state_changes",
     "get_significant_states",
+    "get_significant_states_chunks",
     "get_significant_states_with_session",
     "state_changes_during_period",
+    "state_changes_during_period_for_entities",
 ]
 
 
+def get_downsampled_states(
+    hass: HomeAssistant,
+    start_time: datetime,
+    end_time: datetime | None,
+    entity_ids: list[str],
+    period: int,
+    include_start_time_state: bool = True,
+    significant_changes_only: bool = True,
+    minimal_response: bool = False,
+    no_attributes: bool = False,
+    numeric_only: bool = False,
+) -> dict[str, list[State | dict[str, Any]]] | None:
+    """Return a dict of downsampled states during a time period.
+
+    Returns None if the downsampled states can't be used.
+    """
+    if (
+        not (instance := get_instance(hass)).downsample_states
+        or not instance.states_meta_manager.active
+    ):
+        # States are only downsampled when enabled and once the entity_ids
+        # are migrated
+        return None
+    return _modern_get_downsampled_states(
+        hass,
+        start_time,
+        end_time,
+        entity_ids,
+        period,
+        include_start_time_state,
+        significant_changes_only,
+        minimal_response,
+        no_attributes,
+        numeric_only,
+    )
+
+
 def get_full_significant_states_with_session(
     hass: HomeAssistant,
     session: Session,
@@ -115,6 +159,49 @@ def get_significant_states(
     )
 
 
+def get_significant_states_chunks(
+    hass: HomeAssistant,
+    start_time: datetime,
+    end_time: datetime | None,
+    entity_ids: list[str],
+    chunk_size: int,
+    include_start_time_state: bool = True,
+    significant_changes_only: bool = True,
+    minimal_response: bool = False,
+    no_attributes: bool = False,
+) -> Iterator[dict[str, list[dict[str, Any]]]]:
+    """Yield significant states during a time period in chunks of one entity."""
+    if not get_instance(hass).states_meta_manager.active:
+        # The legacy schema is not streamed, the states of each
+        # entity are yielded once they are all loaded
+        for entity_id, states in get_significant_states(
+            hass,
+            start_time,
+            end_time,
+            entity_ids,
+            None,
+            include_start_time_state,
+            significant_changes_only,
+            minimal_response,
+            no_attributes,
+            True,
+        ).items():
+            for idx in range(0, len(states), chunk_size):
+                yield {entity_id: states[idx : idx + chunk_size]}  # type: ignore[dict-item]
+        return
+    yield from _modern_get_significant_states_chunks(
+        hass,
+        start_time,
+        end_time,
+        entity_ids,
+        chunk_size,
+        include_start_time_state,
+        significant_changes_only,
+        minimal_response,
+        no_attributes,
+    )
+
+
 def get_significant_states_with_session(
     hass: HomeAssistant,
     session: Session,
@@ -181,3 +268,37 @@ def state_changes_during_period(
         limit,
         include_start_time_state,
     )
+
+
+def state_changes_during_period_for_entities(
+    hass: HomeAssistant,
+    start_time: datetime,
+    end_time: datetime | None,
+    entity_ids: list[str],
+    no_attributes: bool = False,
+    include_start_time_state: bool = True,
+) -> dict[str, list[State]]:
+    """Return a list of states that changed during a time period for each entity."""
+    if len(entity_ids) > 1 and get_instance(hass).states_meta_manager.active:
+        return _modern_state_changes_during_period_for_entities(
+            hass,
+            start_time,
+            end_time,
+            entity_ids,
+            no_attributes,
+            include_start_time_state,
+        )
+    # A single entity has a faster query for the state at the start time
+    result: dict[str, list[State]] = {}
+    for entity_id in entity_ids:
+        result.update(
+            state_changes_during_period(
+                hass,
+                start_time,
+                end_time,
+                entity_id,
+                no_attributes,
+                include_start_time_state=include_start_time_state,
+            )
+        )
+    return result
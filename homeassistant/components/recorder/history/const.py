@@ -2,6 +2,8 @@
 
 STATE_KEY = "state"
 LAST_CHANGED_KEY = "last_changed"
+DOWNSAMPLED_MIN_KEY = "min"
+DOWNSAMPLED_MAX_KEY = "max"
 
 SIGNIFICANT_DOMAINS = {
     "climate",
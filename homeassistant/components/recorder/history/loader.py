@@ -0,0 +1,269 @@
+"""Share history queries between entities loading the same period."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+import threading
+from typing import NamedTuple
+
+from homeassistant.core import HomeAssistant, State, callback
+from homeassistant.helpers.recorder import get_instance
+from homeassistant.helpers.singleton import singleton
+import homeassistant.util.dt as dt_util
+from homeassistant.util.hass_dict import HassKey
+
+from .. import history
+
+DATA_HISTORY_LOADER: HassKey[HistoryLoader] = HassKey("recorder_history_loader")
+
+# Loaded history is reused for this long
+CACHE_TTL = timedelta(seconds=5)
+# The most windows kept loaded, the oldest are dropped first
+MAX_CACHED_WINDOWS = 16
+
+
+class _Window(NamedTuple):
+    """The period and options of a history request."""
+
+    start_time: datetime
+    end_time: datetime | None
+    no_attributes: bool
+    include_start_time_state: bool
+
+
+class _Loaded(NamedTuple):
+    """The states loaded for a window."""
+
+    expires: datetime
+    # States recorded after this time may be missing
+    covered_until: datetime
+    states: dict[str, list[State]]
+
+
+class _Result(NamedTuple):
+    """The states of a batch and the time they are complete until."""
+
+    states: dict[str, list[State]]
+    # None if the states recorded until the end of the window may be missing
+    complete_until: datetime | None
+
+
+@dataclass(slots=True)
+class _Batch:
+    """The entities waiting for the history of a window."""
+
+    future: asyncio.Future[dict[str, list[State]]]
+    entity_ids: set[str] = field(default_factory=set)
+
+
+def _states_in_window(states: list[State], window: _Window) -> list[State]:
+    """Return the states of a window from the states loaded for a wider window."""
+    start_ts = window.start_time.timestamp()
+    end_ts = window.end_time.timestamp() if window.end_time else None
+    start_state: State | None = None
+    result: list[State] = []
+    for state in states:
+        if state.last_updated_timestamp <= start_ts:
+            start_state = state
+        elif end_ts is None or state.last_updated_timestamp < end_ts:
+            result.append(state)
+    if start_state is None or not window.include_start_time_state:
+        return result
+    if start_state.last_updated_timestamp < start_ts:
+        # The state at the start of the window is reported at the start time
+        start_state = State(
+            start_state.entity_id,
+            start_state.state,
+            {} if window.no_attributes else start_state.attributes,
+            last_changed=window.start_time,
+            last_reported=window.start_time,
+            last_updated=window.start_time,
+            validate_entity_id=False,
+        )
+    return [start_state, *result]
+
+
+class HistoryLoader:
+    """Load the history of many entities with shared queries.
+
+    Requests for the same period are coalesced until the recorder
+    executor picks up the query, so entities starting up together are
+    loaded with a single multi entity query. The result is kept for a
+    few seconds to serve requests for a period it covers. For a period
+    reaching into the present, it covers the states which were committed
+    by the recorder when the query started. Requests for a longer period
+    only query the states after that.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the history loader."""
+        self.hass = hass
+        # Guards the pending batches which are sealed in the executor
+        self._lock = threading.Lock()
+        self._pending: dict[_Window, _Batch] = {}
+        self._cache: dict[_Window, _Loaded] = {}
+
+    async def async_state_changes_during_period(
+        self,
+        entity_id: str,
+        start_time: datetime,
+        end_time: datetime | None = None,
+        no_attributes: bool = False,
+        include_start_time_state: bool = True,
+    ) -> list[State]:
+        """Return the states of an entity that changed during a time period."""
+        entity_id = entity_id.lower()
+        window = _Window(
+            dt_util.as_utc(start_time),
+            dt_util.as_utc(end_time) if end_time else None,
+            no_attributes,
+            include_start_time_state,
+        )
+        if (cached := self._async_get_cached(entity_id, window)) is not None:
+            states, covered_until = cached
+            if covered_until is None:
+                return states
+            # Only query the states after the cached states
+            return [
+                *states,
+                *await self.async_state_changes_during_period(
+                    entity_id,
+                    covered_until,
+                    window.end_time,
+                    window.no_attributes,
+                    include_start_time_state=False,
+                ),
+            ]
+        with self._lock:
+            if (batch := self._pending.get(window)) is None:
+                batch = self._pending[window] = _Batch(self.hass.loop.create_future())
+                # Not started eagerly so requests made while the event
+                # loop is busy join the batch
+                self.hass.async_create_task(
+                    self._async_load(window, batch), eager_start=False
+                )
+            batch.entity_ids.add(entity_id)
+        result = await asyncio.shield(batch.future)
+        return list(result.get(entity_id, ()))
+
+    @callback
+    def _async_get_cached(
+        self, entity_id: str, window: _Window
+    ) -> tuple[list[State], datetime | None] | None:
+        """Return the states from a cached window which covers the window start.
+
+        If the cached states end before the window, the time they end at
+        is returned with them.
+        """
+        self._async_expire()
+        prefix: _Loaded | None = None
+        for cached_window, loaded in self._cache.items():
+            if (
+                (states := loaded.states.get(entity_id)) is None
+                or cached_window.no_attributes != window.no_attributes
+                or cached_window.include_start_time_state
+                != window.include_start_time_state
+                # The states after the cached states are queried from the
+                # time they end at, so they must cover part of the window
+                or not cached_window.start_time
+                <= window.start_time
+                < loaded.covered_until
+            ):
+                continue
+            if window.end_time is not None and window.end_time <= loaded.covered_until:
+                return _states_in_window(states, window), None
+            if prefix is None or loaded.covered_until > prefix.covered_until:
+                prefix = loaded
+        if prefix is None:
+            return None
+        covered_until_ts = prefix.covered_until.timestamp()
+        return (
+            _states_in_window(
+                [
+                    state
+                    for state in prefix.states[entity_id]
+                    if state.last_updated_timestamp <= covered_until_ts
+                ],
+                window._replace(end_time=None),
+            ),
+            prefix.covered_until,
+        )
+
+    @callback
+    def _async_expire(self) -> None:
+        """Drop the cached windows which expired."""
+        now = dt_util.utcnow()
+        for cached_window, loaded in list(self._cache.items()):
+            if loaded.expires < now:
+                del self._cache[cached_window]
+
+    async def _async_load(self, window: _Window, batch: _Batch) -> None:
+        """Load the history of the entities of a batch."""
+        loaded_at = dt_util.utcnow()
+        try:
+            result = await get_instance(self.hass).async_add_executor_job(
+                self._load, window, batch
+            )
+        except asyncio.CancelledError:
+            self._seal(window, batch)
+            batch.future.cancel()
+            raise
+        except Exception as err:  # noqa: BLE001
+            batch.future.set_exception(err)
+            return
+        if (
+            complete_until := result.complete_until
+        ) is not None and complete_until > window.start_time:
+            self._async_expire()
+            self._cache.pop(window, None)
+            self._cache[window] = _Loaded(
+                loaded_at + CACHE_TTL, complete_until, result.states
+            )
+            if len(self._cache) > MAX_CACHED_WINDOWS:
+                del self._cache[next(iter(self._cache))]
+        batch.future.set_result(result.states)
+
+    def _seal(self, window: _Window, batch: _Batch) -> list[str]:
+        """Stop adding entities to a batch and return its entities."""
+        with self._lock:
+            if self._pending.get(window) is batch:
+                del self._pending[window]
+            return sorted(batch.entity_ids)
+
+    def _load(self, window: _Window, batch: _Batch) -> _Result:
+        """Seal the batch and query the history of its entities."""
+        entity_ids = self._seal(window, batch)
+        complete_until = window.end_time
+        if complete_until is None or complete_until > dt_util.utcnow():
+            # States recorded since the last commit are not in the database yet
+            if (
+                committed_until_ts := get_instance(self.hass).committed_until_timestamp
+            ) is None:
+                complete_until = None
+            else:
+                committed_until = dt_util.utc_from_timestamp(committed_until_ts)
+                complete_until = (
+                    min(complete_until, committed_until)
+                    if complete_until
+                    else committed_until
+                )
+        return _Result(
+            history.state_changes_during_period_for_entities(
+                self.hass,
+                window.start_time,
+                window.end_time,
+                entity_ids,
+                no_attributes=window.no_attributes,
+                include_start_time_state=window.include_start_time_state,
+            ),
+            complete_until,
+        )
+
+
+@callback
+@singleton(DATA_HISTORY_LOADER)
+def async_get_history_loader(hass: HomeAssistant) -> HistoryLoader:
+    """Return the history loader."""
+    return HistoryLoader(hass)
@@ -4,7 +4,8 @@ from __future__ import annotations
 
 from collections.abc import Callable, Iterable, Iterator
 from datetime import datetime
-from itertools import groupby
+from itertools import groupby, islice
+import math
 from operator import itemgetter
 from typing import Any, cast
 
@@ -21,6 +22,7 @@ from sqlalchemy import (
 )
 from sqlalchemy.engine.row import Row
 from sqlalchemy.orm.session import Session
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 
 from homeassistant.const import COMPRESSED_STATE_LAST_UPDATED, COMPRESSED_STATE_STATE
 from homeassistant.core import HomeAssistant, State, split_entity_id
@@ -28,7 +30,14 @@ from homeassistant.helpers.recorder import get_instance
 import homeassistant.util.dt as dt_util
 
 from ..const import LAST_REPORTED_SCHEMA_VERSION
-from ..db_schema import SHARED_ATTR_OR_LEGACY_ATTRIBUTES, StateAttributes, States
+from ..db_schema import (
+    SHARED_ATTR_OR_LEGACY_ATTRIBUTES,
+    SHARED_ATTRS_BIN,
+    StateAttributes,
+    States,
+    StatesDownsampled,
+)
+from ..downsample import covered_range
 from ..filters import Filters
 from ..models import (
     LazyState,
@@ -37,8 +46,14 @@ from ..models import (
     process_timestamp,
     row_to_compressed_state,
 )
-from ..util import execute_stmt_lambda_element, session_scope
+from ..util import (
+    execute_stmt_lambda_element,
+    session_scope,
+    stream_stmt_lambda_element,
+)
 from .const import (
+    DOWNSAMPLED_MAX_KEY,
+    DOWNSAMPLED_MIN_KEY,
     LAST_CHANGED_KEY,
     NEED_ATTRIBUTE_DOMAINS,
     SIGNIFICANT_DOMAINS,
@@ -64,7 +79,9 @@ def _stmt_and_join_attributes(
     if include_last_reported:
         _select = _select.add_columns(States.last_reported_ts)
     if not no_attributes:
-        _select = _select.add_columns(SHARED_ATTR_OR_LEGACY_ATTRIBUTES)
+        _select = _select.add_columns(
+            SHARED_ATTR_OR_LEGACY_ATTRIBUTES, SHARED_ATTRS_BIN
+        )
     return _select
 
 
@@ -81,7 +98,9 @@ def _stmt_and_join_attributes_for_start_state(
     if include_last_reported:
         _select = _select.add_columns(literal(value=0).label("last_reported_ts"))
     if not no_attributes:
-        _select = _select.add_columns(SHARED_ATTR_OR_LEGACY_ATTRIBUTES)
+        _select = _select.add_columns(
+            SHARED_ATTR_OR_LEGACY_ATTRIBUTES, SHARED_ATTRS_BIN
+        )
     return _select
 
 
@@ -103,7 +122,7 @@ def _select_from_subquery(
         base_select = base_select.add_columns(subquery.c.last_reported_ts)
     if no_attributes:
         return base_select
-    return base_select.add_columns(subquery.c.attributes)
+    return base_select.add_columns(subquery.c.attributes, subquery.c.attributes_bin)
 
 
 def get_significant_states(
@@ -229,7 +248,47 @@ def get_significant_states_with_session(
         raise NotImplementedError("Filters are no longer supported")
     if not entity_ids:
         raise ValueError("entity_ids must be provided")
-    entity_id_to_metadata_id: dict[str, int | None] | None = None
+    if (
+        prepared := _significant_states_lambda_stmt(
+            hass,
+            session,
+            start_time,
+            end_time,
+            entity_ids,
+            include_start_time_state,
+            significant_changes_only,
+            no_attributes,
+        )
+    ) is None:
+        return {}
+    stmt, start_time_ts, entity_id_to_metadata_id = prepared
+    return _sorted_states_to_dict(
+        execute_stmt_lambda_element(session, stmt, None, end_time, orm_rows=False),
+        start_time_ts,
+        entity_ids,
+        entity_id_to_metadata_id,
+        minimal_response,
+        compressed_state_format,
+        no_attributes=no_attributes,
+    )
+
+
+def _significant_states_lambda_stmt(
+    hass: HomeAssistant,
+    session: Session,
+    start_time: datetime,
+    end_time: datetime | None,
+    entity_ids: list[str],
+    include_start_time_state: bool,
+    significant_changes_only: bool,
+    no_attributes: bool,
+) -> tuple[StatementLambdaElement, float | None, dict[str, int | None]] | None:
+    """Return the statement to select significant states.
+
+    Returns the statement, the start time to use for the start time
+    states and the metadata_ids of the entity_ids, or None if none of the
+    entity_ids have been recorded.
+    """
     metadata_ids_in_significant_domains: list[int] = []
     instance = get_instance(hass)
     if not (
@@ -237,7 +296,7 @@ def get_significant_states_with_session(
             entity_ids, session, False
         )
     ) or not (possible_metadata_ids := extract_metadata_ids(entity_id_to_metadata_id)):
-        return {}
+        return None
     metadata_ids = possible_metadata_ids
     if significant_changes_only:
         metadata_ids_in_significant_domains = [
@@ -275,17 +334,114 @@ def get_significant_states_with_session(
             include_start_time_state,
         ],
     )
-    return _sorted_states_to_dict(
-        execute_stmt_lambda_element(session, stmt, None, end_time, orm_rows=False),
+    return (
+        stmt,
         start_time_ts if include_start_time_state else None,
-        entity_ids,
         entity_id_to_metadata_id,
-        minimal_response,
-        compressed_state_format,
-        no_attributes=no_attributes,
     )
 
 
+def get_significant_states_chunks(
+    hass: HomeAssistant,
+    start_time: datetime,
+    end_time: datetime | None,
+    entity_ids: list[str],
+    chunk_size: int,
+    include_start_time_state: bool = True,
+    significant_changes_only: bool = True,
+    minimal_response: bool = False,
+    no_attributes: bool = False,
+) -> Iterator[dict[str, list[dict[str, Any]]]]:
+    """Yield significant states during UTC period start_time - end_time in chunks.
+
+    The rows are streamed from the database and converted to the
+    compressed state format as they are read. Each chunk holds at most
+    chunk_size states of a single entity so the memory used does not
+    depend on the length of the time range.
+    """
+    with session_scope(hass=hass, read_only=True) as session:
+        if (
+            prepared := _significant_states_lambda_stmt(
+                hass,
+                session,
+                start_time,
+                end_time,
+                entity_ids,
+                include_start_time_state,
+                significant_changes_only,
+                no_attributes,
+            )
+        ) is None:
+            return
+        stmt, start_time_ts, entity_id_to_metadata_id = prepared
+        metadata_id_to_entity_id = {
+            metadata_id: entity_id
+            for entity_id, metadata_id in entity_id_to_metadata_id.items()
+            if metadata_id is not None
+        }
+        rows = stream_stmt_lambda_element(session, stmt, yield_per=chunk_size)
+        for metadata_id, group in groupby(rows, itemgetter(_FIELD_MAP["metadata_id"])):
+            entity_id = metadata_id_to_entity_id[metadata_id]
+            states = _compressed_states(
+                group,
+                entity_id,
+                start_time_ts,
+                minimal_response
+                and split_entity_id(entity_id)[0] not in NEED_ATTRIBUTE_DOMAINS,
+                no_attributes,
+            )
+            while chunk := list(islice(states, chunk_size)):
+                yield {entity_id: chunk}
+
+
+def _compressed_states(
+    rows: Iterator[Row],
+    entity_id: str,
+    start_time_ts: float | None,
+    minimal_response: bool,
+    no_attributes: bool,
+) -> Iterator[dict[str, Any]]:
+    """Convert the rows of an entity to the compressed state format.
+
+    With minimal response only the first state is a full state and
+    duplicate states are filtered out of the states that follow.
+    """
+    state_idx = _FIELD_MAP["state"]
+    last_updated_ts_idx = _FIELD_MAP["last_updated_ts"]
+    attr_cache: dict[str, dict[str, Any]] = {}
+    if not minimal_response:
+        for row in rows:
+            yield row_to_compressed_state(
+                row,
+                attr_cache,
+                start_time_ts,
+                entity_id,
+                row[state_idx],
+                row[last_updated_ts_idx],
+                False,
+            )
+        return
+    if (first_row := next(rows, None)) is None:
+        return
+    prev_state = first_row[state_idx]
+    yield row_to_compressed_state(
+        first_row,
+        attr_cache,
+        start_time_ts,
+        entity_id,
+        prev_state,
+        first_row[last_updated_ts_idx],
+        no_attributes,
+    )
+    for row in rows:
+        if (state := row[state_idx]) != prev_state:
+            prev_state = state
+            yield {
+                COMPRESSED_STATE_STATE: state,
+                COMPRESSED_STATE_LAST_UPDATED: row[last_updated_ts_idx],
+            }
+
+
 def get_full_significant_states_with_session(
     hass: HomeAssistant,
     session: Session,
@@ -319,6 +475,170 @@ def get_full_significant_states_with_session(
     )
 
 
+def _downsampled_states_stmt(
+    period: int, start_ts: float, end_ts: float, metadata_ids: list[int]
+) -> StatementLambdaElement:
+    """Return a statement that selects the downsampled states of entities."""
+    return lambda_stmt(
+        lambda: select(
+            StatesDownsampled.metadata_id,
+            StatesDownsampled.state,
+            StatesDownsampled.last_updated_ts,
+            StatesDownsampled.min,
+            StatesDownsampled.max,
+        )
+        .filter(StatesDownsampled.metadata_id.in_(metadata_ids))
+        .filter(StatesDownsampled.period == period)
+        .filter(StatesDownsampled.start_ts >= start_ts)
+        .filter(StatesDownsampled.start_ts < end_ts)
+        .order_by(StatesDownsampled.metadata_id, StatesDownsampled.start_ts)
+    )
+
+
+def get_downsampled_states(
+    hass: HomeAssistant,
+    start_time: datetime,
+    end_time: datetime | None,
+    entity_ids: list[str],
+    period: int,
+    include_start_time_state: bool = True,
+    significant_changes_only: bool = True,
+    minimal_response: bool = False,
+    no_attributes: bool = False,
+    numeric_only: bool = False,
+) -> dict[str, list[State | dict[str, Any]]] | None:
+    """Return downsampled states during UTC period start_time - end_time.
+
+    The states are returned in the compressed state format, each period
+    of the downsampled states is summarized by its last state and the
+    min and max of its numeric states. The parts of the time range that
+    are not covered by whole downsampled periods are filled in with the
+    significant states.
+
+    The downsampled periods have no attributes, so they are only used
+    with minimal_response or no_attributes and not for the entities
+    which always need their attributes. Only the last state of a period
+    is kept for states which are not numeric; with numeric_only, the
+    entities with such states get their significant states instead.
+
+    Returns None if the downsampled states do not cover the time range.
+    """
+    if not minimal_response and not no_attributes:
+        return None
+    instance = get_instance(hass)
+    with session_scope(hass=hass, read_only=True) as session:
+        # Only whole periods are served from the downsampled states,
+        # and only where every statistics period was downsampled
+        if (
+            covered := covered_range(
+                session,
+                math.ceil(start_time.timestamp() / period) * period,
+                math.floor((end_time or dt_util.utcnow()).timestamp() / period)
+                * period,
+            )
+        ) is None:
+            return None
+        tier_start_ts = math.ceil(covered[0] / period) * period
+        tier_end_ts = math.floor(covered[1] / period) * period
+        if tier_end_ts <= tier_start_ts:
+            return None
+        if not (
+            entity_id_to_metadata_id := instance.states_meta_manager.get_many(
+                entity_ids, session, False
+            )
+        ) or not (metadata_ids := extract_metadata_ids(entity_id_to_metadata_id)):
+            return {}
+        # Entities which get their significant states for the whole range
+        raw_entity_ids: set[str] = (
+            set()
+            if no_attributes
+            else {
+                entity_id
+                for entity_id in entity_ids
+                if split_entity_id(entity_id)[0] in NEED_ATTRIBUTE_DOMAINS
+            }
+        )
+        tier_start = dt_util.utc_from_timestamp(tier_start_ts)
+        tier_end = dt_util.utc_from_timestamp(tier_end_ts)
+        result = get_significant_states_with_session(
+            hass,
+            session,
+            start_time,
+            tier_start,
+            entity_ids,
+            None,
+            include_start_time_state,
+            significant_changes_only,
+            minimal_response,
+            no_attributes,
+            True,
+        )
+        metadata_id_to_entity_id = {
+            metadata_id: entity_id
+            for entity_id, metadata_id in entity_id_to_metadata_id.items()
+            if metadata_id is not None
+        }
+        for metadata_id, group in groupby(
+            execute_stmt_lambda_element(
+                session,
+                _downsampled_states_stmt(
+                    period, tier_start_ts, tier_end_ts, metadata_ids
+                ),
+            ),
+            itemgetter(0),
+        ):
+            if (entity_id := metadata_id_to_entity_id[metadata_id]) in raw_entity_ids:
+                continue
+            entity_states: list[dict[str, Any]] = []
+            for _, state, last_updated_ts, minimum, maximum in group:
+                compressed_state: dict[str, Any] = {
+                    COMPRESSED_STATE_STATE: state,
+                    COMPRESSED_STATE_LAST_UPDATED: last_updated_ts,
+                }
+                if minimum is not None:
+                    compressed_state[DOWNSAMPLED_MIN_KEY] = minimum
+                    compressed_state[DOWNSAMPLED_MAX_KEY] = maximum
+                elif numeric_only:
+                    raw_entity_ids.add(entity_id)
+                    break
+                entity_states.append(compressed_state)
+            else:
+                result.setdefault(entity_id, []).extend(entity_states)
+        for entity_id, states in get_significant_states_with_session(
+            hass,
+            session,
+            tier_end,
+            end_time,
+            entity_ids,
+            None,
+            False,
+            significant_changes_only,
+            minimal_response,
+            no_attributes,
+            True,
+        ).items():
+            result.setdefault(entity_id, []).extend(states)
+        if raw_entity_ids:
+            for entity_id in raw_entity_ids:
+                result.pop(entity_id, None)
+            result.update(
+                get_significant_states_with_session(
+                    hass,
+                    session,
+                    start_time,
+                    end_time,
+                    list(raw_entity_ids),
+                    None,
+                    include_start_time_state,
+                    significant_changes_only,
+                    minimal_response,
+                    no_attributes,
+                    True,
+                )
+            )
+        return result
+
+
 def _state_changed_during_period_stmt(
     start_time_ts: float,
     end_time_ts: float | None,
@@ -452,6 +772,118 @@ def state_changes_during_period(
         )
 
 
+def _state_changes_during_period_for_entities_stmt(
+    start_time_ts: float,
+    end_time_ts: float | None,
+    metadata_ids: list[int],
+    no_attributes: bool,
+    include_start_time_state: bool,
+    run_start_ts: float | None,
+    include_last_reported: bool,
+) -> Select | CompoundSelect:
+    stmt = _stmt_and_join_attributes(
+        no_attributes, False, include_last_reported
+    ).filter(
+        (
+            (States.last_changed_ts == States.last_updated_ts)
+            | States.last_changed_ts.is_(None)
+        )
+        & (States.last_updated_ts > start_time_ts)
+        & States.metadata_id.in_(metadata_ids)
+    )
+    if end_time_ts:
+        stmt = stmt.filter(States.last_updated_ts < end_time_ts)
+    if not no_attributes:
+        stmt = stmt.outerjoin(
+            StateAttributes, States.attributes_id == StateAttributes.attributes_id
+        )
+    if not include_start_time_state or not run_start_ts:
+        return stmt.order_by(States.metadata_id, States.last_updated_ts)
+    unioned_subquery = union_all(
+        _select_from_subquery(
+            _get_start_time_state_for_entities_stmt(
+                run_start_ts,
+                start_time_ts,
+                metadata_ids,
+                no_attributes,
+                False,
+                include_last_reported,
+            ).subquery(),
+            no_attributes,
+            False,
+            include_last_reported,
+        ),
+        _select_from_subquery(
+            stmt.subquery(), no_attributes, False, include_last_reported
+        ),
+    ).subquery()
+    return _select_from_subquery(
+        unioned_subquery, no_attributes, False, include_last_reported
+    ).order_by(unioned_subquery.c.metadata_id, unioned_subquery.c.last_updated_ts)
+
+
+def state_changes_during_period_for_entities(
+    hass: HomeAssistant,
+    start_time: datetime,
+    end_time: datetime | None,
+    entity_ids: list[str],
+    no_attributes: bool = False,
+    include_start_time_state: bool = True,
+) -> dict[str, list[State]]:
+    """Return states changes of several entities during UTC period start_time - end_time."""
+    has_last_reported = (
+        get_instance(hass).schema_version >= LAST_REPORTED_SCHEMA_VERSION
+    )
+    entity_ids = [entity_id.lower() for entity_id in entity_ids]
+    with session_scope(hass=hass, read_only=True) as session:
+        instance = get_instance(hass)
+        if not (
+            entity_id_to_metadata_id := instance.states_meta_manager.get_many(
+                entity_ids, session, False
+            )
+        ) or not (
+            possible_metadata_ids := extract_metadata_ids(entity_id_to_metadata_id)
+        ):
+            return {}
+        metadata_ids = possible_metadata_ids
+        run_start_ts: float | None = None
+        if include_start_time_state and not (
+            run_start_ts := _get_run_start_ts_for_utc_point_in_time(hass, start_time)
+        ):
+            include_start_time_state = False
+        start_time_ts = dt_util.utc_to_timestamp(start_time)
+        end_time_ts = datetime_to_timestamp_or_none(end_time)
+        stmt = lambda_stmt(
+            lambda: _state_changes_during_period_for_entities_stmt(
+                start_time_ts,
+                end_time_ts,
+                metadata_ids,
+                no_attributes,
+                include_start_time_state,
+                run_start_ts,
+                has_last_reported,
+            ),
+            track_on=[
+                bool(end_time_ts),
+                no_attributes,
+                include_start_time_state,
+                has_last_reported,
+            ],
+        )
+        return cast(
+            dict[str, list[State]],
+            _sorted_states_to_dict(
+                execute_stmt_lambda_element(
+                    session, stmt, None, end_time, orm_rows=False
+                ),
+                start_time_ts if include_start_time_state else None,
+                entity_ids,
+                entity_id_to_metadata_id,
+                no_attributes=no_attributes,
+            ),
+        )
+
+
 def _get_last_state_changes_single_stmt(metadata_id: int) -> Select:
     return (
         _stmt_and_join_attributes(False, False, False)
@@ -556,13 +988,14 @@ def _get_start_time_state_for_entities_stmt(
     metadata_ids: list[int],
     no_attributes: bool,
     include_last_changed: bool,
+    include_last_reported: bool,
 ) -> Select:
     """Baked query to get states for specific entities."""
     # We got an include-list of entities, accelerate the query by filtering already
     # in the inner and the outer query.
     stmt = (
         _stmt_and_join_attributes_for_start_state(
-            no_attributes, include_last_changed, False
+            no_attributes, include_last_changed, include_last_reported
         )
         .join(
             (
@@ -641,6 +1074,7 @@ def _get_start_time_state_stmt(
         metadata_ids,
         no_attributes,
         include_last_changed,
+        False,
     )
 
 
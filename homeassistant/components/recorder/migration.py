@@ -4,9 +4,11 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from collections.abc import Callable, Iterable
+from concurrent.futures import Future
 import contextlib
 from dataclasses import dataclass, replace as dataclass_replace
 from datetime import timedelta
+from functools import partial
 import logging
 from time import time
 from typing import TYPE_CHECKING, Any, cast, final
@@ -63,8 +65,10 @@ from .db_schema import (
     LEGACY_STATES_EVENT_ID_INDEX,
     MYSQL_COLLATE,
     MYSQL_DEFAULT_CHARSET,
+    PARTITIONED_TABLE_COLUMNS,
     SCHEMA_VERSION,
     STATISTICS_TABLES,
+    TABLE_EVENTS,
     TABLE_STATES,
     Base,
     Events,
@@ -73,6 +77,7 @@ from .db_schema import (
     MigrationChanges,
     SchemaChanges,
     States,
+    StatesDownsampled,
     StatesMeta,
     Statistics,
     StatisticsMeta,
@@ -81,6 +86,12 @@ from .db_schema import (
 )
 from .models import process_timestamp
 from .models.time import datetime_to_timestamp_or_none
+from .partition import (
+    get_partitioned_tables,
+    partition_cutoff,
+    partition_table,
+    prepare_table,
+)
 from .queries import (
     batch_cleanup_entity_ids,
     delete_duplicate_short_term_statistics_row,
@@ -142,24 +153,28 @@ class _ColumnTypesForDialect:
     big_int_type: str
     timestamp_type: str
     context_bin_type: str
+    large_binary_type: str
 
 
 _MYSQL_COLUMN_TYPES = _ColumnTypesForDialect(
     big_int_type="INTEGER(20)",
     timestamp_type=DOUBLE_PRECISION_TYPE_SQL,
     context_bin_type=f"BLOB({CONTEXT_ID_BIN_MAX_LENGTH})",
+    large_binary_type="LONGBLOB",
 )
 
 _POSTGRESQL_COLUMN_TYPES = _ColumnTypesForDialect(
     big_int_type="INTEGER",
     timestamp_type=DOUBLE_PRECISION_TYPE_SQL,
     context_bin_type="BYTEA",
+    large_binary_type="BYTEA",
 )
 
 _SQLITE_COLUMN_TYPES = _ColumnTypesForDialect(
     big_int_type="INTEGER",
     timestamp_type="FLOAT",
     context_bin_type="BLOB",
+    large_binary_type="BLOB",
 )
 
 _COLUMN_TYPES_FOR_DIALECT: dict[SupportedDialect | None, _ColumnTypesForDialect] = {
@@ -1835,6 +1850,24 @@ class _SchemaVersion47Migrator(_SchemaVersionMigrator, target_version=47):
         )
 
 
+class _SchemaVersion48Migrator(_SchemaVersionMigrator, target_version=48):
+    def _apply_update(self) -> None:
+        """Version specific update method."""
+        _add_columns(
+            self.session_maker,
+            "state_attributes",
+            [f"shared_attrs_bin {self.column_types.large_binary_type}"],
+        )
+
+
+class _SchemaVersion49Migrator(_SchemaVersionMigrator, target_version=49):
+    def _apply_update(self) -> None:
+        """Version specific update method."""
+        # New tables are normally created by create_all when the recorder
+        # connects, the states_downsampled table must exist from this version
+        cast(Table, StatesDownsampled.__table__).create(self.engine, checkfirst=True)
+
+
 def _migrate_statistics_columns_to_timestamp_removing_duplicates(
     hass: HomeAssistant,
     instance: Recorder,
@@ -2758,6 +2791,94 @@ class EntityIDPostMigration(BaseMigrationWithQuery, BaseRunTimeMigration):
         return has_used_states_entity_ids()
 
 
+class PartitionTablesMigration(BaseRunTimeMigration):
+    """Migration to partition the states, events and short term statistics by day.
+
+    Only runs on PostgreSQL when partition_by_day is enabled. The tables
+    are prepared in the background and then swapped one at a time. The
+    migration is queued again when the table being prepared is ready,
+    so the recorder keeps processing its queue in the meantime.
+    """
+
+    migration_id = "partition_tables_by_day"
+    task = CommitBeforeMigrationTask
+
+    def __init__(self, schema_version: int, migration_changes: dict[str, int]) -> None:
+        """Initialize a new PartitionTablesMigration."""
+        super().__init__(schema_version, migration_changes)
+        self._prepared: Future[None] | None = None
+        self._cutoff = 0
+
+    def migrate_data_impl(self, instance: Recorder) -> DataMigrationStatus:
+        """Partition the next table, returns True if completed."""
+        with session_scope(session=instance.get_session()) as session:
+            instance.partitioned_tables = get_partitioned_tables(session.connection())
+        if not (tables := self._tables_to_partition(instance)):
+            return DataMigrationStatus(
+                needs_migrate=False,
+                migration_done=len(instance.partitioned_tables)
+                == len(PARTITIONED_TABLE_COLUMNS),
+            )
+        table = tables[0]
+        if (prepared := self._prepared) is None:
+            assert instance.engine is not None
+            self._cutoff = partition_cutoff(time())
+            # Preparing the table can take a long time on large databases
+            # so it runs in the background and the migration task, which
+            # commits before swapping the table, is queued when it is done
+            self._prepared = instance.add_executor_job(
+                partial(prepare_table, instance.engine, table, self._cutoff)
+            )
+            self._prepared.add_done_callback(
+                lambda _: instance.queue_task(self.task(self))
+            )
+            return DataMigrationStatus(needs_migrate=False, migration_done=False)
+        if not prepared.done():
+            # Already queued again by the done callback
+            return DataMigrationStatus(needs_migrate=False, migration_done=False)
+        self._prepared = None
+        prepared.result()
+        with session_scope(session=instance.get_session()) as session:
+            partition_table(session.connection(), table, self._cutoff, time())
+        instance.partitioned_tables.add(table)
+        return DataMigrationStatus(needs_migrate=True, migration_done=False)
+
+    @staticmethod
+    def _tables_to_partition(instance: Recorder) -> list[str]:
+        """Return the tables that still need to be partitioned."""
+        return [
+            table
+            for table in PARTITIONED_TABLE_COLUMNS
+            if table not in instance.partitioned_tables
+            # The legacy foreign key from the states to the
+            # events table must be removed first
+            and not (table == TABLE_EVENTS and instance.use_legacy_events_index)
+        ]
+
+    def migration_done(self, instance: Recorder, session: Session) -> None:
+        """Load the partitioned tables."""
+        if instance.dialect_name == SupportedDialect.POSTGRESQL:
+            instance.partitioned_tables = get_partitioned_tables(session.connection())
+
+    def needs_migrate_impl(
+        self, instance: Recorder, session: Session
+    ) -> DataMigrationStatus:
+        """Return if the migration needs to run."""
+        if not instance.partition_by_day:
+            return DataMigrationStatus(needs_migrate=False, migration_done=False)
+        if instance.dialect_name != SupportedDialect.POSTGRESQL:
+            _LOGGER.warning(
+                "Partitioning tables by day is only supported with PostgreSQL"
+            )
+            return DataMigrationStatus(needs_migrate=False, migration_done=False)
+        needs_migrate = len(get_partitioned_tables(session.connection())) < len(
+            PARTITIONED_TABLE_COLUMNS
+        )
+        return DataMigrationStatus(
+            needs_migrate=needs_migrate, migration_done=not needs_migrate
+        )
+
+
 NON_LIVE_DATA_MIGRATORS = (
     StatesContextIDMigration,  # Introduced in HA Core 2023.4
     EventsContextIDMigration,  # Introduced in HA Core 2023.4
@@ -2767,6 +2888,7 @@ LIVE_DATA_MIGRATORS = (
     EventTypeIDMigration,
     EntityIDMigration,
     EventIDPostMigration,
+    PartitionTablesMigration,
 )
 
 
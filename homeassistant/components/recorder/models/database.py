@@ -21,6 +21,8 @@ class DatabaseEngine:
     optimizer: DatabaseOptimizer
     max_bind_vars: int
     version: AwesomeVersion | None
+    # MySQL before 8.0.17 and MariaDB before 10.4.5 can't CAST to a float
+    supports_float_cast: bool = True
 
 
 @dataclass
@@ -18,7 +18,7 @@ from homeassistant.const import (
 from homeassistant.core import Context, State
 import homeassistant.util.dt as dt_util
 
-from .state_attributes import decode_attributes_from_source
+from .state_attributes import decode_attributes_from_row
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -61,9 +61,7 @@ class LazyState(State):
     @cached_property  # type: ignore[override]
     def attributes(self) -> dict[str, Any]:
         """State attributes."""
-        return decode_attributes_from_source(
-            getattr(self._row, "attributes", None), self.attr_cache
-        )
+        return decode_attributes_from_row(self._row, self.attr_cache)
 
     @cached_property
     def _last_changed_ts(self) -> float | None:
@@ -96,6 +94,13 @@ class LazyState(State):
             assert self._last_updated_ts is not None
         return dt_util.utc_from_timestamp(self._last_updated_ts)
 
+    @property  # type: ignore[override]
+    def last_updated_timestamp(self) -> float:
+        """Last updated timestamp."""
+        if TYPE_CHECKING:
+            assert self._last_updated_ts is not None
+        return self._last_updated_ts
+
     def as_dict(self) -> dict[str, Any]:  # type: ignore[override]
         """Return a dict representation of the LazyState.
 
@@ -129,8 +134,8 @@ def row_to_compressed_state(
     """Convert a database row to a compressed state schema 41 and later."""
     comp_state: dict[str, Any] = {COMPRESSED_STATE_STATE: state}
     if not no_attributes:
-        comp_state[COMPRESSED_STATE_ATTRIBUTES] = decode_attributes_from_source(
-            getattr(row, "attributes", None), attr_cache
+        comp_state[COMPRESSED_STATE_ATTRIBUTES] = decode_attributes_from_row(
+            row, attr_cache
         )
     row_last_updated_ts: float = last_updated_ts or start_time_ts  # type: ignore[assignment]
     comp_state[COMPRESSED_STATE_LAST_UPDATED] = row_last_updated_ts
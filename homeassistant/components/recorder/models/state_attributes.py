@@ -4,12 +4,110 @@ from __future__ import annotations
 
 import logging
 from typing import Any
+import zlib
 
+from homeassistant.const import ATTR_ICON, ATTR_UNIT_OF_MEASUREMENT
+from homeassistant.helpers.json import json_bytes
 from homeassistant.util.json import json_loads_object
 
 EMPTY_JSON_OBJECT = "{}"
 _LOGGER = logging.getLogger(__name__)
 
+# Attributes smaller than this are not worth compressing
+COMPRESS_MIN_BYTES = 1024
+COMPRESS_LEVEL = 6
+# Attributes which the database queries filter on are also
+# stored uncompressed in shared_attrs
+INDEXED_ATTRIBUTES = (ATTR_ICON, ATTR_UNIT_OF_MEASUREMENT)
+
+# The first byte of the compressed attributes is the id of
+# the preset dictionary they were compressed with. Dictionaries
+# must never be changed once released, add a new id instead.
+GENERIC_DICTIONARY_ID = 1
+WEATHER_DICTIONARY_ID = 2
+MEDIA_PLAYER_DICTIONARY_ID = 3
+
+_GENERIC_DICTIONARY = (
+    b'"attribution":"Data provided by ","supported_color_modes":["'
+    b'"effect_list":["","options":["","source_list":["","entity_id":["'
+    b'"restored":true,"editable":true,"supported_features":'
+    b'"state_class":"measurement","device_class":"'
+    b'"entity_picture":"/api/","icon":"mdi:","friendly_name":"'
+)
+_WEATHER_DICTIONARY = _GENERIC_DICTIONARY + (
+    b'"temperature_unit":"\xc2\xb0C","pressure_unit":"hPa",'
+    b'"wind_speed_unit":"km/h","visibility_unit":"km","precipitation_unit":"mm",'
+    b'"dew_point":,"cloud_coverage":,"uv_index":,"wind_gust_speed":,'
+    b'"ozone":,"visibility":,"apparent_temperature":,"is_daytime":true},'
+    b'"condition":"clear-night","condition":"partlycloudy",'
+    b'"condition":"cloudy","condition":"rainy","condition":"sunny",'
+    b'"native_temperature":,"native_templow":,"wind_bearing":,'
+    b'"precipitation_probability":,"precipitation":,"humidity":,'
+    b'"pressure":,"wind_speed":,"templow":,"temperature":,'
+    b'"forecast":[{"datetime":"T00:00:00+00:00",{"datetime":"'
+)
+_MEDIA_PLAYER_DICTIONARY = _GENERIC_DICTIONARY + (
+    b'"sound_mode_list":["","group_members":["media_player.'
+    b'"repeat":"off","shuffle":false,"is_volume_muted":false,'
+    b'"app_id":"","app_name":"","media_channel":"","media_playlist":"'
+    b'"media_content_type":"music","media_content_id":"'
+    b'"media_duration":,"media_position":,'
+    b'"media_position_updated_at":"T00:00:00.000000+00:00",'
+    b'"media_album_name":"","media_artist":"","media_title":"'
+    b'"volume_level":,"source":"'
+    b'"entity_picture":"/api/media_player_proxy/media_player.?token=&cache='
+)
+_DICTIONARIES = {
+    GENERIC_DICTIONARY_ID: _GENERIC_DICTIONARY,
+    WEATHER_DICTIONARY_ID: _WEATHER_DICTIONARY,
+    MEDIA_PLAYER_DICTIONARY_ID: _MEDIA_PLAYER_DICTIONARY,
+}
+_DOMAIN_DICTIONARY_IDS = {
+    "weather": WEATHER_DICTIONARY_ID,
+    "media_player": MEDIA_PLAYER_DICTIONARY_ID,
+}
+
+
+def compress_shared_attrs(
+    shared_attrs_bytes: bytes, domain: str
+) -> tuple[str, bytes] | None:
+    """Compress json encoded shared attributes.
+
+    Returns the indexed attributes, which are kept uncompressed, and the
+    compressed attributes or None if the attributes are not worth compressing.
+    """
+    if len(shared_attrs_bytes) < COMPRESS_MIN_BYTES:
+        return None
+    dictionary_id = _DOMAIN_DICTIONARY_IDS.get(domain, GENERIC_DICTIONARY_ID)
+    compressor = zlib.compressobj(
+        COMPRESS_LEVEL,
+        zlib.DEFLATED,
+        -zlib.MAX_WBITS,
+        zdict=_DICTIONARIES[dictionary_id],
+    )
+    compressed = b"".join(
+        (
+            dictionary_id.to_bytes(),
+            compressor.compress(shared_attrs_bytes),
+            compressor.flush(),
+        )
+    )
+    if len(compressed) >= len(shared_attrs_bytes):
+        return None
+    attributes = json_loads_object(shared_attrs_bytes)
+    indexed = {key: attributes[key] for key in INDEXED_ATTRIBUTES if key in attributes}
+    return json_bytes(indexed).decode("utf-8"), compressed
+
+
+def decompress_shared_attrs(shared_attrs_bin: bytes) -> str:
+    """Decompress shared attributes compressed with compress_shared_attrs."""
+    decompressor = zlib.decompressobj(
+        -zlib.MAX_WBITS, zdict=_DICTIONARIES[shared_attrs_bin[0]]
+    )
+    return (
+        decompressor.decompress(shared_attrs_bin[1:]) + decompressor.flush()
+    ).decode("utf-8")
+
 
 def decode_attributes_from_source(
     source: Any, attr_cache: dict[str, dict[str, Any]]
@@ -25,3 +123,19 @@ def decode_attributes_from_source(
         _LOGGER.exception("Error converting row to state attributes: %s", source)
         attr_cache[source] = attributes = {}
     return attributes
+
+
+def decode_attributes_from_row(
+    row: Any, attr_cache: dict[str, dict[str, Any]]
+) -> dict[str, Any]:
+    """Decode attributes from a row, decompressing them if needed."""
+    if (shared_attrs_bin := getattr(row, "attributes_bin", None)) is None:
+        return decode_attributes_from_source(
+            getattr(row, "attributes", None), attr_cache
+        )
+    try:
+        source = decompress_shared_attrs(shared_attrs_bin)
+    except (KeyError, UnicodeDecodeError, zlib.error):
+        _LOGGER.exception("Error decompressing row state attributes")
+        return {}
+    return decode_attributes_from_source(source, attr_cache)
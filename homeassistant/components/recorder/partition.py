@@ -0,0 +1,408 @@
+"""Partition tables by day on PostgreSQL.
+
+The states, events and short term statistics tables can be converted to
+tables partitioned by range on their timestamp column with one partition
+per day. Purging old rows is then done by dropping whole partitions
+instead of deleting them row by row.
+
+Existing tables are converted online: the existing table is renamed and
+attached as the first partition of the new table, and is dropped as a
+whole once all of its rows are older than the purge cutoff. The expensive
+steps of the conversion (validating the partition bounds and building the
+index for the new primary key) do not block writers.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import logging
+import re
+
+from sqlalchemy import (
+    and_,
+    column as sql_column,
+    delete,
+    distinct,
+    func,
+    insert,
+    literal,
+    select,
+    table as sql_table,
+    text,
+    update,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import AddConstraint, CreateIndex
+from sqlalchemy.sql import ColumnElement, TableClause
+
+import homeassistant.util.dt as dt_util
+
+from .db_schema import PARTITIONED_TABLE_COLUMNS, TABLE_STATES, Base
+
+_LOGGER = logging.getLogger(__name__)
+
+DAY_SECONDS = 86400
+# Number of daily partitions to keep created ahead of the current day
+PARTITION_DAYS_AHEAD = 7
+# The conversion moves the rows of the next days into daily partitions
+# so rows written while the conversion runs stay in the legacy partition
+LEGACY_PARTITION_DAYS_AHEAD = 2
+
+LEGACY_PARTITION_SUFFIX = "_legacy"
+DEFAULT_PARTITION_SUFFIX = "_default"
+PARTITION_KEY_INDEX_SUFFIX = "_partition_key"
+PARTITION_CHECK_SUFFIX = "_partition_check"
+
+MAX_IDENTIFIER_LENGTH = 63
+
+_BOUND_RE = re.compile(r"FROM \((?P<start>[^)]+)\) TO \((?P<end>[^)]+)\)")
+# Names of the tables, partitions, indexes and constraints
+# which are used as identifiers in DDL statements
+_IDENTIFIER_RE = re.compile(r"[a-z][a-z0-9_]*")
+
+
+@dataclass(slots=True, frozen=True)
+class Partition:
+    """A partition of a table partitioned by day.
+
+    The legacy partition has no start and the default
+    partition has neither a start nor an end.
+    """
+
+    name: str
+    start: int | None
+    end: int | None
+
+
+def _parse_bound(bound: str) -> int | None:
+    """Parse a range partition bound."""
+    if bound == "MINVALUE":
+        return None
+    return int(float(bound.strip("'")))
+
+
+def _day_start(timestamp: float) -> int:
+    """Return the start of the UTC day of a timestamp."""
+    return int(timestamp - timestamp % DAY_SECONDS)
+
+
+def _id_column(table: str) -> str:
+    """Return the name of the id column of a table."""
+    return next(iter(Base.metadata.tables[table].primary_key.columns)).name
+
+
+def _identifier(name: str) -> str:
+    """Return a name after checking it is safe to use as an identifier."""
+    assert len(name) <= MAX_IDENTIFIER_LENGTH and _IDENTIFIER_RE.fullmatch(
+        name
+    ), f"Invalid identifier {name!r}"
+    return name
+
+
+def _table_clause(table: str, name: str | None = None) -> TableClause:
+    """Return a table clause with the columns of a partitioned table.
+
+    The name defaults to the table and can be the name of one of its
+    partitions, which have the same columns.
+    """
+    assert table in PARTITIONED_TABLE_COLUMNS, f"Table {table!r} is not partitioned"
+    return sql_table(
+        _identifier(name or table),
+        *(
+            sql_column(table_column.name)
+            for table_column in Base.metadata.tables[table].columns
+        ),
+    )
+
+
+def _in_day(table_clause: TableClause, column: str, start: int) -> ColumnElement[bool]:
+    """Return a clause matching the rows of the day starting at start."""
+    return and_(
+        table_clause.c[column] >= start,
+        table_clause.c[column] < start + DAY_SECONDS,
+    )
+
+
+def _partition_name(table: str, start: int) -> str:
+    """Return the name of the daily partition starting at start."""
+    return f"{table}_p{dt_util.utc_from_timestamp(start):%Y%m%d}"
+
+
+def partition_cutoff(now: float) -> int:
+    """Return the end of the legacy partition for a conversion started at now."""
+    return _day_start(now) + LEGACY_PARTITION_DAYS_AHEAD * DAY_SECONDS
+
+
+def get_partitioned_tables(connection: Connection) -> set[str]:
+    """Return the tables that are partitioned."""
+    return {
+        table
+        for table in connection.execute(
+            text(
+                "SELECT c.relname FROM pg_partitioned_table p"
+                " JOIN pg_class c ON c.oid = p.partrelid"
+                " JOIN pg_namespace n ON n.oid = c.relnamespace"
+                " WHERE n.nspname = current_schema()"
+            )
+        ).scalars()
+        if table in PARTITIONED_TABLE_COLUMNS
+    }
+
+
+def get_partitions(connection: Connection, table: str) -> list[Partition]:
+    """Return the partitions of a table ordered by their start."""
+    partitions: list[Partition] = []
+    for name, bound in connection.execute(
+        text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i"
+            " JOIN pg_class c ON c.oid = i.inhrelid"
+            " WHERE i.inhparent = CAST(:table AS regclass)"
+        ),
+        {"table": table},
+    ):
+        if match := _BOUND_RE.search(bound):
+            partitions.append(
+                Partition(
+                    name, _parse_bound(match["start"]), _parse_bound(match["end"])
+                )
+            )
+        else:
+            partitions.append(Partition(name, None, None))
+    partitions.sort(key=lambda partition: partition.start or 0)
+    return partitions
+
+
+def prepare_table(engine: Engine, table: str, cutoff: int) -> None:
+    """Prepare a table to be attached as the legacy partition.
+
+    Adds a validated constraint that proves all rows are older than the
+    cutoff and an index for the primary key of the partitioned table.
+    This can take a long time for large tables but does not block writers.
+    """
+    table_clause = _table_clause(table)
+    column = PARTITIONED_TABLE_COLUMNS[table]
+    id_column = _id_column(table)
+    check = _identifier(f"{table}{PARTITION_CHECK_SUFFIX}")
+    partition_key_index = _identifier(f"{table}{PARTITION_KEY_INDEX_SUFFIX}")
+    _LOGGER.warning(
+        "Preparing the %s table to be partitioned by day; This may take a while",
+        table,
+    )
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        # Rows without a timestamp cannot be placed in a partition
+        # and are purged with the legacy partition
+        connection.execute(
+            update(table_clause)
+            .where(table_clause.c[column].is_(None))
+            .values({column: 0})
+        )
+        # A previous attempt may have been interrupted
+        connection.execute(
+            text(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {check}")
+        )
+        connection.execute(
+            text(
+                f"ALTER TABLE {table} ADD CONSTRAINT {check}"
+                f" CHECK ({column} IS NOT NULL AND {column} < {cutoff}) NOT VALID"
+            )
+        )
+        connection.execute(text(f"ALTER TABLE {table} VALIDATE CONSTRAINT {check}"))
+        connection.execute(
+            text(f"DROP INDEX CONCURRENTLY IF EXISTS {partition_key_index}")
+        )
+        connection.execute(
+            text(
+                f"CREATE UNIQUE INDEX CONCURRENTLY {partition_key_index}"
+                f" ON {table} ({id_column}, {column})"
+            )
+        )
+
+
+def partition_table(
+    connection: Connection, table: str, cutoff: int, now: float
+) -> None:
+    """Replace a prepared table with a table partitioned by day.
+
+    The prepared table is attached as the legacy partition holding
+    all rows older than the cutoff. The connection must be in a
+    transaction that is committed by the caller.
+    """
+    table_clause = _table_clause(table)
+    column = PARTITIONED_TABLE_COLUMNS[table]
+    id_column = _id_column(table)
+    legacy = _identifier(f"{table}{LEGACY_PARTITION_SUFFIX}")
+    sequence = _identifier(f"{table}_{id_column}_partitioned_seq")
+    connection.execute(text(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE"))
+    next_id = connection.execute(
+        select(func.coalesce(func.max(table_clause.c[id_column]), 0) + 1)
+    ).scalar()
+    # The validated check constraint lets PostgreSQL skip the table scans
+    # when setting NOT NULL and attaching the partition
+    connection.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL"))
+    # Ids are generated by a sequence owned by the partitioned table
+    connection.execute(
+        text(f"ALTER TABLE {table} ALTER COLUMN {id_column} DROP IDENTITY IF EXISTS")
+    )
+    connection.execute(
+        text(f"ALTER TABLE {table} ALTER COLUMN {id_column} DROP DEFAULT")
+    )
+    # Free the index names for the indexes of the partitioned table
+    for index_name in connection.execute(
+        text("SELECT indexname FROM pg_indexes WHERE tablename = :table"),
+        {"table": table},
+    ).scalars():
+        legacy_index_name = f"{index_name}{LEGACY_PARTITION_SUFFIX}"
+        connection.execute(
+            text(
+                f"ALTER INDEX {_identifier(index_name)} RENAME TO"
+                f" {_identifier(legacy_index_name[:MAX_IDENTIFIER_LENGTH])}"
+            )
+        )
+    connection.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+
+    connection.execute(
+        text(
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING STORAGE)"
+            f" PARTITION BY RANGE ({column})"
+        )
+    )
+    connection.execute(
+        text(
+            f"CREATE SEQUENCE {sequence} START WITH {next_id}"
+            f" OWNED BY {table}.{id_column}"
+        )
+    )
+    connection.execute(
+        text(
+            f"ALTER TABLE {table} ALTER COLUMN {id_column}"
+            f" SET DEFAULT nextval('{sequence}')"
+        )
+    )
+    # The primary key of a partitioned table must include the partition key
+    connection.execute(
+        text(f"ALTER TABLE {table} ADD PRIMARY KEY ({id_column}, {column})")
+    )
+    schema_table = Base.metadata.tables[table]
+    for index in schema_table.indexes:
+        connection.execute(CreateIndex(index))
+    for constraint in schema_table.foreign_key_constraints:
+        # A partitioned table cannot be referenced by a foreign key that
+        # does not include the partition key, which rules out the link
+        # from a state to its old state
+        if constraint.referred_table.name not in PARTITIONED_TABLE_COLUMNS:
+            connection.execute(AddConstraint(constraint))  # type: ignore[no-untyped-call]
+
+    # The existing indexes and foreign keys of the legacy table
+    # match the ones of the partitioned table and are reused
+    connection.execute(
+        text(
+            f"ALTER TABLE {table} ATTACH PARTITION {legacy}"
+            f" FOR VALUES FROM (MINVALUE) TO ({cutoff})"
+        )
+    )
+    default = _identifier(f"{table}{DEFAULT_PARTITION_SUFFIX}")
+    connection.execute(text(f"CREATE TABLE {default} PARTITION OF {table} DEFAULT"))
+    create_daily_partitions(connection, table, now)
+    _LOGGER.warning("The %s table is now partitioned by day", table)
+
+
+def create_daily_partitions(connection: Connection, table: str, now: float) -> None:
+    """Create the missing daily partitions up to PARTITION_DAYS_AHEAD days ahead.
+
+    Rows that were written to the default partition because their
+    daily partition did not exist yet are moved to the new partition.
+    """
+    column = PARTITIONED_TABLE_COLUMNS[table]
+    default = _table_clause(table, f"{table}{DEFAULT_PARTITION_SUFFIX}")
+    if not (
+        ends := [
+            partition.end
+            for partition in get_partitions(connection, table)
+            if partition.end is not None
+        ]
+    ):
+        return
+    start = max(ends)
+    last_start = _day_start(now) + PARTITION_DAYS_AHEAD * DAY_SECONDS
+    while start <= last_start:
+        name = _identifier(_partition_name(table, start))
+        end = start + DAY_SECONDS
+        in_day = _in_day(default, column, start)
+        if connection.execute(
+            select(literal(1)).select_from(default).where(in_day).limit(1)
+        ).first():
+            connection.execute(
+                text(
+                    f"CREATE TABLE {name}"
+                    f" (LIKE {table} INCLUDING DEFAULTS INCLUDING STORAGE)"
+                )
+            )
+            connection.execute(
+                insert(_table_clause(table, name)).from_select(
+                    list(default.c.keys()), select(*default.c).where(in_day)
+                )
+            )
+            connection.execute(delete(default).where(in_day))
+            connection.execute(
+                text(
+                    f"ALTER TABLE {table} ATTACH PARTITION {name}"
+                    f" FOR VALUES FROM ({start}) TO ({end})"
+                )
+            )
+        else:
+            connection.execute(
+                text(
+                    f"CREATE TABLE {name} PARTITION OF {table}"
+                    f" FOR VALUES FROM ({start}) TO ({end})"
+                )
+            )
+        _LOGGER.debug("Created partition %s", name)
+        start = end
+
+
+def select_partition_ids(
+    connection: Connection, table: str, partition: Partition, column: str
+) -> set[int]:
+    """Return the distinct non-null values of an id column of a partition."""
+    partition_clause = _table_clause(table, partition.name)
+    return set(
+        connection.execute(
+            select(distinct(partition_clause.c[column])).where(
+                partition_clause.c[column].is_not(None)
+            )
+        ).scalars()
+    )
+
+
+def select_partition_state_ids(
+    connection: Connection, partition: Partition, state_ids: list[int]
+) -> set[int]:
+    """Return the state_ids that are stored in a partition of the states table."""
+    partition_clause = _table_clause(TABLE_STATES, partition.name)
+    return set(
+        connection.execute(
+            select(partition_clause.c.state_id).where(
+                partition_clause.c.state_id.in_(state_ids)
+            )
+        ).scalars()
+    )
+
+
+def disconnect_partition_states(connection: Connection, partition: Partition) -> int:
+    """Unlink newer states from the states in a partition of the states table."""
+    assert partition.end is not None
+    states = _table_clause(TABLE_STATES)
+    partition_clause = _table_clause(TABLE_STATES, partition.name)
+    return connection.execute(
+        update(states)
+        .where(
+            states.c.old_state_id.in_(select(partition_clause.c.state_id)),
+            states.c.last_updated_ts >= partition.end,
+        )
+        .values(old_state_id=None)
+    ).rowcount
+
+
+def drop_partition(connection: Connection, partition: Partition) -> None:
+    """Drop a partition."""
+    connection.execute(text(f"DROP TABLE {_identifier(partition.name)}"))
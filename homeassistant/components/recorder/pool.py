@@ -27,6 +27,10 @@ DEBUG_MUTEX_POOL_TRACE = False
 
 POOL_SIZE = 5
 
+# Settings of the read only connections of the SQLite read pool
+READ_POOL_CACHED_STATEMENTS = 512
+READ_POOL_MMAP_SIZE = 256 * 1024 * 1024
+
 ADVISE_MSG = (
     "Use homeassistant.components.recorder.get_instance(hass).async_add_executor_job()"
 )
@@ -46,7 +50,7 @@ class RecorderPool(SingletonThreadPool, NullPool):
         **kw: Any,
     ) -> None:
         """Create the pool."""
-        kw["pool_size"] = POOL_SIZE
+        kw.setdefault("pool_size", POOL_SIZE)
         assert (
             recorder_and_worker_thread_ids is not None
         ), "recorder_and_worker_thread_ids is required"
@@ -12,9 +12,25 @@ from typing import TYPE_CHECKING
 from sqlalchemy.orm.session import Session
 
 from homeassistant.util.collection import chunked_or_all
-
-from .db_schema import Events, States, StatesMeta
+import homeassistant.util.dt as dt_util
+
+from .db_schema import (
+    TABLE_EVENTS,
+    TABLE_STATES,
+    TABLE_STATISTICS_SHORT_TERM,
+    Events,
+    States,
+    StatesMeta,
+)
 from .models import DatabaseEngine
+from .partition import (
+    Partition,
+    disconnect_partition_states,
+    drop_partition,
+    get_partitions,
+    select_partition_ids,
+    select_partition_state_ids,
+)
 from .queries import (
     attributes_ids_exist_in_states,
     attributes_ids_exist_in_states_with_fast_in_distinct,
@@ -25,6 +41,8 @@ from .queries import (
     delete_event_types_rows,
     delete_recorder_runs_rows,
     delete_states_attributes_rows,
+    delete_states_downsampled_metadata_ids_rows,
+    delete_states_downsampled_rows,
     delete_states_meta_rows,
     delete_states_rows,
     delete_statistics_runs_rows,
@@ -38,6 +56,7 @@ from .queries import (
     find_legacy_event_state_and_attributes_and_data_ids_to_purge,
     find_legacy_row,
     find_short_term_statistics_to_purge,
+    find_states_downsampled_to_purge,
     find_states_to_purge,
     find_statistics_runs_to_purge,
 )
@@ -53,6 +72,67 @@ _LOGGER = logging.getLogger(__name__)
 DEFAULT_STATES_BATCHES_PER_PURGE = 20  # We expect ~95% de-dupe rate
 DEFAULT_EVENTS_BATCHES_PER_PURGE = 15  # We expect ~92% de-dupe rate
 
+# A purge cycle yields to the recorder when more events are waiting
+PURGE_MAX_BACKLOG = 1000
+# Batches taking longer than this are halved, the batch size
+# is doubled when full batches take less than a quarter of it
+TARGET_BATCH_SECONDS = 0.5
+MIN_BATCH_SIZE = 100
+
+
+class PurgeBudget:
+    """The time and rows a purge cycle may use before it yields to the recorder.
+
+    The write lock is held until the purge cycle commits so the cycle also
+    yields as soon as the recorder backlog grows beyond PURGE_MAX_BACKLOG.
+    At least one batch of each table is purged per cycle so the purge
+    always makes progress.
+
+    The number of rows selected per batch adapts to the measured latency
+    of the previous batches, capped by max_bind_vars.
+    """
+
+    def __init__(self, max_duration: float, max_rows: int) -> None:
+        """Initialize the purge budget."""
+        self.max_duration = max_duration
+        self.max_rows = max_rows
+        self._batch_size: int | None = None
+        self._deadline = 0.0
+        self._rows = 0
+
+    def start_cycle(self) -> None:
+        """Start a new purge cycle."""
+        self._deadline = time.monotonic() + self.max_duration
+        self._rows = 0
+
+    def batch_size(self, max_bind_vars: int) -> int:
+        """Return the number of rows to select in the next batch."""
+        if self._batch_size is None:
+            return max_bind_vars
+        return min(self._batch_size, max_bind_vars)
+
+    def record_batch(self, batch_size: int, rows: int, elapsed: float) -> None:
+        """Record the rows purged by a batch and how long it took."""
+        self._rows += rows
+        if elapsed > TARGET_BATCH_SECONDS:
+            self._batch_size = max(MIN_BATCH_SIZE, batch_size // 2)
+            _LOGGER.debug(
+                "Purge batch of %s rows took %.3fs, reducing the batch size to %s",
+                rows,
+                elapsed,
+                self._batch_size,
+            )
+        elif rows == batch_size and elapsed < TARGET_BATCH_SECONDS / 4:
+            self._batch_size = batch_size * 2
+
+    def exhausted(self, backlog: int) -> bool:
+        """Return if the purge cycle should yield to the recorder."""
+        return (
+            time.monotonic() > self._deadline
+            or (self.max_rows != 0 and self._rows >= self.max_rows)
+            or backlog > PURGE_MAX_BACKLOG
+        )
+
 
 @retryable_database_job("purge")
 def purge_old_data(
@@ -71,6 +151,9 @@ def purge_old_data(
         "Purging states and events before target %s",
         purge_before.isoformat(sep=" ", timespec="seconds"),
     )
+    instance.purge_budget.start_cycle()
+    # Rows in partitions that are dropped as a whole are not purged row by row
+    rows_purge_before = _purge_expired_partitions(instance, purge_before)
     with session_scope(session=instance.get_session()) as session:
         # Purge a max of max_bind_vars, based on the oldest states or events record
         has_more_to_purge = False
@@ -87,16 +170,27 @@ def purge_old_data(
             )
             # Once we are done purging legacy rows, we use the new method
             has_more_to_purge |= _purge_states_and_attributes_ids(
-                instance, session, states_batch_size, purge_before
+                instance,
+                session,
+                states_batch_size,
+                rows_purge_before.get(TABLE_STATES, purge_before),
             )
             has_more_to_purge |= _purge_events_and_data_ids(
-                instance, session, events_batch_size, purge_before
+                instance,
+                session,
+                events_batch_size,
+                rows_purge_before.get(TABLE_EVENTS, purge_before),
             )
 
         statistics_runs = _select_statistics_runs_to_purge(
             session, purge_before, instance.max_bind_vars
         )
         short_term_statistics = _select_short_term_statistics_to_purge(
+            session,
+            rows_purge_before.get(TABLE_STATISTICS_SHORT_TERM, purge_before),
+            instance.max_bind_vars,
+        )
+        states_downsampled = _select_states_downsampled_to_purge(
             session, purge_before, instance.max_bind_vars
         )
         if statistics_runs:
@@ -105,7 +199,15 @@ def purge_old_data(
         if short_term_statistics:
             _purge_short_term_statistics(session, short_term_statistics)
 
-        if has_more_to_purge or statistics_runs or short_term_statistics:
+        if states_downsampled:
+            _purge_states_downsampled(session, states_downsampled)
+
+        if (
+            has_more_to_purge
+            or statistics_runs
+            or short_term_statistics
+            or states_downsampled
+        ):
             # Return false, as we might not be done yet.
             _LOGGER.debug("Purging hasn't fully completed yet")
             return False
@@ -128,6 +230,62 @@ def purge_old_data(
     return True
 
 
+def _purge_expired_partitions(
+    instance: Recorder, purge_before: datetime
+) -> dict[str, datetime]:
+    """Drop the partitions that only hold rows older than purge_before.
+
+    Returns the cutoff to purge the remaining rows of each partitioned
+    table by. Rows in daily partitions are kept until the whole partition
+    has expired, only rows in the legacy and default partitions that are
+    older than the oldest daily partition are purged row by row.
+    """
+    purge_before_ts = purge_before.timestamp()
+    rows_purge_before: dict[str, datetime] = {}
+    for table in instance.partitioned_tables:
+        with session_scope(session=instance.get_session()) as session:
+            partitions = get_partitions(session.connection(), table)
+        oldest_start = purge_before_ts
+        for partition in partitions:
+            if partition.end is not None and partition.end <= purge_before_ts:
+                _drop_expired_partition(instance, table, partition)
+            elif partition.start is not None:
+                oldest_start = min(oldest_start, partition.start)
+        rows_purge_before[table] = dt_util.utc_from_timestamp(oldest_start)
+    return rows_purge_before
+
+
+def _drop_expired_partition(
+    instance: Recorder, table: str, partition: Partition
+) -> None:
+    """Drop an expired partition and purge the shared data only it used."""
+    with session_scope(session=instance.get_session()) as session:
+        connection = session.connection()
+        attributes_ids: set[int] = set()
+        data_ids: set[int] = set()
+        if table == TABLE_STATES:
+            attributes_ids = select_partition_ids(
+                connection, table, partition, "attributes_id"
+            )
+            purged_state_ids: set[int] = set()
+            for state_ids_chunk in chunked_or_all(
+                instance.states_manager.committed_state_ids(), instance.max_bind_vars
+            ):
+                purged_state_ids |= select_partition_state_ids(
+                    connection, partition, list(state_ids_chunk)
+                )
+            disconnected_rows = disconnect_partition_states(connection, partition)
+            _LOGGER.debug("Updated %s states to remove old_state_id", disconnected_rows)
+            # Evict eny entries in the old_states cache referring to a purged state
+            instance.states_manager.evict_purged_state_ids(purged_state_ids)
+        elif table == TABLE_EVENTS:
+            data_ids = select_partition_ids(connection, table, partition, "data_id")
+        drop_partition(connection, partition)
+        _LOGGER.debug("Dropped partition %s", partition.name)
+        _purge_unused_attributes_ids(instance, session, attributes_ids)
+        _purge_unused_data_ids(instance, session, data_ids)
+
+
 def _purging_legacy_format(session: Session) -> bool:
     """Check if there are any legacy event_id linked states rows remaining."""
     return bool(session.execute(find_legacy_row()).scalar())
@@ -191,16 +349,22 @@ def _purge_states_and_attributes_ids(
     # size batch of attributes_ids that will be around the size
     # max_bind_vars
     attributes_ids_batch: set[int] = set()
-    max_bind_vars = instance.max_bind_vars
+    budget = instance.purge_budget
     for _ in range(states_batch_size):
+        batch_size = budget.batch_size(instance.max_bind_vars)
+        start = time.monotonic()
         state_ids, attributes_ids = _select_state_attributes_ids_to_purge(
-            session, purge_before, max_bind_vars
+            session, purge_before, batch_size
         )
         if not state_ids:
             has_remaining_state_ids_to_purge = False
             break
         _purge_state_ids(instance, session, state_ids)
         attributes_ids_batch = attributes_ids_batch | attributes_ids
+        budget.record_batch(batch_size, len(state_ids), time.monotonic() - start)
+        if budget.exhausted(instance.backlog):
+            _LOGGER.debug("Purge budget exhausted while purging states")
+            break
 
     _purge_unused_attributes_ids(instance, session, attributes_ids_batch)
     _LOGGER.debug(
@@ -226,16 +390,22 @@ def _purge_events_and_data_ids(
     # size batch of data_ids that will be around the size
     # max_bind_vars
     data_ids_batch: set[int] = set()
-    max_bind_vars = instance.max_bind_vars
+    budget = instance.purge_budget
     for _ in range(events_batch_size):
+        batch_size = budget.batch_size(instance.max_bind_vars)
+        start = time.monotonic()
         event_ids, data_ids = _select_event_data_ids_to_purge(
-            session, purge_before, max_bind_vars
+            session, purge_before, batch_size
         )
         if not event_ids:
             has_remaining_event_ids_to_purge = False
             break
         _purge_event_ids(session, event_ids)
         data_ids_batch = data_ids_batch | data_ids
+        budget.record_batch(batch_size, len(event_ids), time.monotonic() - start)
+        if budget.exhausted(instance.backlog):
+            _LOGGER.debug("Purge budget exhausted while purging events")
+            break
 
     _purge_unused_data_ids(instance, session, data_ids_batch)
     _LOGGER.debug(
@@ -454,6 +624,17 @@ def _select_short_term_statistics_to_purge(
     return [statistic_id for (statistic_id,) in statistics]
 
 
+def _select_states_downsampled_to_purge(
+    session: Session, purge_before: datetime, max_bind_vars: int
+) -> list[int]:
+    """Return a list of downsampled states to purge."""
+    states_downsampled = session.execute(
+        find_states_downsampled_to_purge(purge_before, max_bind_vars)
+    ).all()
+    _LOGGER.debug("Selected %s downsampled states to remove", len(states_downsampled))
+    return [state_downsampled_id for (state_downsampled_id,) in states_downsampled]
+
+
 def _select_legacy_detached_state_and_attributes_and_data_ids_to_purge(
     session: Session, purge_before: datetime, max_bind_vars: int
 ) -> tuple[set[int], set[int]]:
@@ -570,6 +751,12 @@ def _purge_short_term_statistics(
     _LOGGER.debug("Deleted %s short term statistics", deleted_rows)
 
 
+def _purge_states_downsampled(session: Session, states_downsampled: list[int]) -> None:
+    """Delete by id."""
+    deleted_rows = session.execute(delete_states_downsampled_rows(states_downsampled))
+    _LOGGER.debug("Deleted %s downsampled states", deleted_rows)
+
+
 def _purge_event_ids(session: Session, event_ids: set[int]) -> None:
     """Delete by event id."""
     if not event_ids:
@@ -624,6 +811,10 @@ def _purge_old_entity_ids(instance: Recorder, session: Session) -> None:
 
     deleted_rows = session.execute(delete_states_meta_rows(states_metadata_ids))
     _LOGGER.debug("Deleted %s states meta", deleted_rows)
+    deleted_rows = session.execute(
+        delete_states_downsampled_metadata_ids_rows(states_metadata_ids)
+    )
+    _LOGGER.debug("Deleted %s downsampled states", deleted_rows)
 
     # Evict any entries in the event_type cache referring to a purged state
     instance.states_meta_manager.evict_purged(purge_entity_ids)
@@ -0,0 +1,84 @@
+"""Persist the purge in progress so it resumes after a restart."""
+
+from __future__ import annotations
+
+from datetime import datetime
+import logging
+from typing import Any, NamedTuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+import homeassistant.util.dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = "recorder.purge"
+STORAGE_VERSION = 1
+
+
+class PurgeTarget(NamedTuple):
+    """The target of a purge."""
+
+    purge_before: datetime
+    repack: bool
+    apply_filter: bool
+
+
+class PurgeProgress:
+    """Track the purge in progress.
+
+    The target of a purge is persisted when its first cycle starts and
+    removed once the purge has finished, so a purge that is interrupted
+    by a restart is queued again when the recorder is ready.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the purge progress."""
+        self.hass = hass
+        self.pending: PurgeTarget | None = None
+        self._store = Store[dict[str, Any]](hass, STORAGE_VERSION, STORAGE_KEY)
+
+    async def async_load(self) -> None:
+        """Load the purge in progress."""
+        if not (data := await self._store.async_load()) or not data.get("purge_before"):
+            return
+        if (purge_before := dt_util.parse_datetime(data["purge_before"])) is None:
+            _LOGGER.warning("Ignoring invalid purge in progress: %s", data)
+            return
+        self.pending = PurgeTarget(
+            purge_before, data.get("repack", False), data.get("apply_filter", False)
+        )
+
+    def start(self, target: PurgeTarget) -> None:
+        """Persist the target of a purge cycle.
+
+        This call is not thread-safe and must be called from the
+        recorder thread.
+        """
+        if target == self.pending:
+            return
+        self.pending = target
+        self.hass.add_job(
+            self._async_save,
+            {
+                "purge_before": target.purge_before.isoformat(),
+                "repack": target.repack,
+                "apply_filter": target.apply_filter,
+            },
+        )
+
+    def finish(self) -> None:
+        """Forget the purge once it has finished.
+
+        This call is not thread-safe and must be called from the
+        recorder thread.
+        """
+        if self.pending is None:
+            return
+        self.pending = None
+        self.hass.add_job(self._async_save, {"purge_before": None})
+
+    @callback
+    def _async_save(self, data: dict[str, Any]) -> None:
+        """Save the purge in progress."""
+        self._store.async_delay_save(lambda: data)
@@ -17,6 +17,7 @@ from .db_schema import (
     RecorderRuns,
     StateAttributes,
     States,
+    StatesDownsampled,
     StatesMeta,
     Statistics,
     StatisticsRuns,
@@ -39,11 +40,52 @@ def get_shared_attributes(hashes: list[int]) -> StatementLambdaElement:
     """Load shared attributes from the database."""
     return lambda_stmt(
         lambda: select(
-            StateAttributes.attributes_id, StateAttributes.shared_attrs
+            StateAttributes.attributes_id,
+            StateAttributes.shared_attrs,
+            StateAttributes.shared_attrs_bin,
         ).where(StateAttributes.hash.in_(hashes))
     )
 
 
+def get_recent_shared_attributes(limit: int) -> StatementLambdaElement:
+    """Load the shared attributes of the most recent states from the database."""
+    return lambda_stmt(
+        lambda: select(
+            StateAttributes.attributes_id,
+            StateAttributes.shared_attrs,
+            StateAttributes.shared_attrs_bin,
+        ).where(
+            StateAttributes.attributes_id.in_(
+                select(
+                    (
+                        select(States.attributes_id)
+                        .where(States.attributes_id.is_not(None))
+                        .order_by(States.state_id.desc())
+                        .limit(limit)
+                        .subquery()
+                    ).c.attributes_id
+                )
+            )
+        )
+    )
+
+
+def count_state_attributes_hashes() -> StatementLambdaElement:
+    """Count the shared attributes with a hash."""
+    return lambda_stmt(
+        lambda: select(func.count(StateAttributes.attributes_id)).where(
+            StateAttributes.hash.is_not(None)
+        )
+    )
+
+
+def get_state_attributes_hashes() -> StatementLambdaElement:
+    """Load the hashes of the shared attributes from the database."""
+    return lambda_stmt(
+        lambda: select(StateAttributes.hash).where(StateAttributes.hash.is_not(None))
+    )
+
+
 def get_shared_event_datas(hashes: list[int]) -> StatementLambdaElement:
     """Load shared event data from the database."""
     return lambda_stmt(
@@ -591,6 +633,28 @@ def delete_statistics_short_term_rows(
     )
 
 
+def delete_states_downsampled_rows(
+    states_downsampled: Iterable[int],
+) -> StatementLambdaElement:
+    """Delete states_downsampled rows."""
+    return lambda_stmt(
+        lambda: delete(StatesDownsampled)
+        .where(StatesDownsampled.id.in_(states_downsampled))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def delete_states_downsampled_metadata_ids_rows(
+    metadata_ids: Iterable[int],
+) -> StatementLambdaElement:
+    """Delete states_downsampled rows of the metadata_ids."""
+    return lambda_stmt(
+        lambda: delete(StatesDownsampled)
+        .where(StatesDownsampled.metadata_id.in_(metadata_ids))
+        .execution_options(synchronize_session=False)
+    )
+
+
 def delete_event_rows(
     event_ids: Iterable[int],
 ) -> StatementLambdaElement:
@@ -648,6 +712,18 @@ def find_short_term_statistics_to_purge(
     )
 
 
+def find_states_downsampled_to_purge(
+    purge_before: datetime, max_bind_vars: int
+) -> StatementLambdaElement:
+    """Find downsampled states to purge."""
+    purge_before_ts = purge_before.timestamp()
+    return lambda_stmt(
+        lambda: select(StatesDownsampled.id)
+        .filter(StatesDownsampled.start_ts < purge_before_ts)
+        .limit(max_bind_vars)
+    )
+
+
 def find_statistics_runs_to_purge(
     purge_before: datetime, max_bind_vars: int
 ) -> StatementLambdaElement:
@@ -664,6 +740,11 @@ def find_latest_statistics_runs_run_id() -> StatementLambdaElement:
     return lambda_stmt(lambda: select(func.max(StatisticsRuns.run_id)))
 
 
+def find_latest_statistics_runs_start() -> StatementLambdaElement:
+    """Find the start of the latest statistics_runs."""
+    return lambda_stmt(lambda: select(func.max(StatisticsRuns.start)))
+
+
 def find_legacy_event_state_and_attributes_and_data_ids_to_purge(
     purge_before: float, max_bind_vars: int
 ) -> StatementLambdaElement:
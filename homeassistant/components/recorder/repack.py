@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import logging
+import time
 from typing import TYPE_CHECKING
 
 from sqlalchemy import text
@@ -15,6 +16,11 @@ if TYPE_CHECKING:
 
 _LOGGER = logging.getLogger(__name__)
 
+SQLITE_AUTO_VACUUM_INCREMENTAL = 2
+# Pages freed per slice, 4 MiB with the default page size
+INCREMENTAL_VACUUM_PAGES = 1024
+INCREMENTAL_VACUUM_MAX_SECONDS = 1
+
 
 def repack_database(instance: Recorder) -> None:
     """Repack based on engine type."""
@@ -25,6 +31,9 @@ def repack_database(instance: Recorder) -> None:
     if dialect_name == SupportedDialect.SQLITE:
         _LOGGER.debug("Vacuuming SQL DB to free space")
         with instance.engine.connect() as conn:
+            # Databases created before incremental auto vacuum was
+            # enabled are converted when they are rebuilt by the VACUUM
+            conn.execute(text("PRAGMA auto_vacuum=INCREMENTAL"))
             conn.execute(text("VACUUM"))
             conn.commit()
         return
@@ -46,3 +55,38 @@ def repack_database(instance: Recorder) -> None:
             conn.execute(text(f"OPTIMIZE TABLE {','.join(ALL_TABLES)}"))
             conn.commit()
         return
+
+
+def incremental_vacuum(instance: Recorder) -> None:
+    """Free the unused pages of an SQLite database in small slices.
+
+    Only databases with auto_vacuum=INCREMENTAL are vacuumed. Each slice
+    only holds the write lock briefly, and the vacuum stops when the
+    recorder has work queued or the time budget is spent.
+    """
+    assert instance.engine is not None
+    if instance.engine.dialect.name != SupportedDialect.SQLITE:
+        return
+    deadline = time.monotonic() + INCREMENTAL_VACUUM_MAX_SECONDS
+    with instance.engine.connect() as conn:
+        if (
+            conn.execute(text("PRAGMA auto_vacuum")).scalar()
+            != SQLITE_AUTO_VACUUM_INCREMENTAL
+        ):
+            return
+        dbapi_connection = conn.connection.dbapi_connection
+        assert dbapi_connection is not None
+        while free_pages := conn.execute(text("PRAGMA freelist_count")).scalar():
+            _LOGGER.debug(
+                "Freeing up to %s of %s unused pages",
+                INCREMENTAL_VACUUM_PAGES,
+                free_pages,
+            )
+            # Executing the pragma as a statement only frees one page
+            # per step, executescript runs it to completion
+            dbapi_connection.executescript(  # type: ignore[attr-defined]
+                f"PRAGMA incremental_vacuum({INCREMENTAL_VACUUM_PAGES})"
+            )
+            if instance.backlog or time.monotonic() > deadline:
+                break
+        conn.commit()
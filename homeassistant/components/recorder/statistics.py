@@ -9,11 +9,25 @@ from datetime import datetime, timedelta
 from functools import lru_cache, partial
 from itertools import chain, groupby
 import logging
+import math
 from operator import itemgetter
 import re
-from typing import TYPE_CHECKING, Any, Literal, TypedDict, cast
-
-from sqlalchemy import Select, and_, bindparam, func, lambda_stmt, select, text
+from typing import TYPE_CHECKING, Any, Literal, NamedTuple, TypedDict, cast
+
+from sqlalchemy import (
+    CompoundSelect,
+    Select,
+    and_,
+    bindparam,
+    case,
+    cast as sql_cast,
+    func,
+    lambda_stmt,
+    literal,
+    select,
+    text,
+    union_all,
+)
 from sqlalchemy.engine.row import Row
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm.session import Session
@@ -26,6 +40,7 @@ from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.singleton import singleton
 from homeassistant.helpers.typing import UNDEFINED, UndefinedType
 from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads_object
 from homeassistant.util.unit_conversion import (
     BaseUnitConverter,
     BloodGlucoseConcentrationConverter,
@@ -58,12 +73,16 @@ from .const import (
     SupportedDialect,
 )
 from .db_schema import (
+    DOUBLE_TYPE,
     STATISTICS_TABLES,
+    StateAttributes,
+    States,
     Statistics,
     StatisticsBase,
     StatisticsRuns,
     StatisticsShortTerm,
 )
+from .downsample import insert_downsampled_states, summarize_downsampled_states
 from .models import (
     StatisticData,
     StatisticDataTimestamp,
@@ -160,6 +179,14 @@ UNIT_CLASSES = {
     for unit, converter in STATISTIC_UNIT_TO_UNIT_CONVERTER.items()
 }
 
+# Matches the states which are aggregated by the database, this is
+# a subset of what float() accepts which excludes nan and inf. The
+# digits are bounded so the cast can't overflow or underflow a double,
+# which some databases return as inf and others fail the query for
+NUMERIC_STATE_PATTERN = (
+    r"^[-+]?([0-9]{1,100}\.?[0-9]{0,100}|\.[0-9]{1,100})([eE][-+]?[0-9]{1,2})?$"
+)
+
 DATA_SHORT_TERM_STATISTICS_RUN_CACHE = "recorder_short_term_statistics_run_cache"
 
 
@@ -318,6 +345,14 @@ class PlatformCompiledStatistics:
     current_metadata: dict[str, tuple[int, StatisticMetaData]]
 
 
+@dataclasses.dataclass(slots=True)
+class CompiledStatistics:
+    """Statistics and downsampled states collected in the database executor."""
+
+    platform_compiled: PlatformCompiledStatistics
+    downsampled_states: list[dict[str, Any]] | None
+
+
 def split_statistic_id(entity_id: str) -> list[str]:
     """Split a state entity ID into domain and object ID."""
     return entity_id.split(":", 1)
@@ -492,7 +527,12 @@ def compile_missing_statistics(instance: Recorder) -> bool:
 
 
 @retryable_database_job("compile statistics")
-def compile_statistics(instance: Recorder, start: datetime, fire_events: bool) -> bool:
+def compile_statistics(
+    instance: Recorder,
+    start: datetime,
+    fire_events: bool,
+    compiled: CompiledStatistics | None = None,
+) -> bool:
     """Compile 5-minute statistics for all integrations with a recorder platform.
 
     The actual calculation is delegated to the platforms.
@@ -511,7 +551,7 @@ def compile_statistics(instance: Recorder, start: datetime, fire_events: bool) -
         ),
     ) as session:
         modified_statistic_ids = _compile_statistics(
-            instance, session, start, fire_events
+            instance, session, start, fire_events, compiled
         )
 
     if modified_statistic_ids:
@@ -530,30 +570,12 @@ def _get_first_id_stmt(start: datetime) -> StatementLambdaElement:
     return lambda_stmt(lambda: select(StatisticsRuns.run_id).filter_by(start=start))
 
 
-def _compile_statistics(
-    instance: Recorder, session: Session, start: datetime, fire_events: bool
-) -> set[str]:
-    """Compile 5-minute statistics for all integrations with a recorder platform.
-
-    This is a helper function for compile_statistics and compile_missing_statistics
-    that does not retry on database errors since both callers already retry.
-
-    returns a set of modified statistic_ids if any were modified.
-    """
-    assert start.tzinfo == dt_util.UTC, "start must be in UTC"
-    end = start + StatisticsShortTerm.duration
-    statistics_meta_manager = instance.statistics_meta_manager
-    modified_statistic_ids: set[str] = set()
-
-    # Return if we already have 5-minute statistics for the requested period
-    if execute_stmt_lambda_element(session, _get_first_id_stmt(start)):
-        _LOGGER.debug("Statistics already compiled for %s-%s", start, end)
-        return modified_statistic_ids
-
-    _LOGGER.debug("Compiling statistics for %s-%s", start, end)
+def _compile_platform_statistics(
+    instance: Recorder, session: Session, start: datetime, end: datetime
+) -> PlatformCompiledStatistics:
+    """Collect 5-minute statistics from all platforms implementing support."""
     platform_stats: list[StatisticResult] = []
     current_metadata: dict[str, tuple[int, StatisticMetaData]] = {}
-    # Collect statistics from all platforms implementing support
     for domain, platform in instance.hass.data[DOMAIN].recorder_platforms.items():
         if not (
             platform_compile_statistics := getattr(
@@ -573,6 +595,65 @@ def _compile_statistics(
         )
         platform_stats.extend(compiled.platform_stats)
         current_metadata.update(compiled.current_metadata)
+    return PlatformCompiledStatistics(platform_stats, current_metadata)
+
+
+def compile_platform_statistics(
+    instance: Recorder, start: datetime
+) -> CompiledStatistics | None:
+    """Collect 5-minute statistics from the platforms in the database executor.
+
+    The states are downsampled as well if enabled. The results are
+    inserted by compile_statistics in the recorder thread.
+
+    Returns None if statistics are already compiled for the period.
+    """
+    end = start + StatisticsShortTerm.duration
+    with session_scope(session=instance.get_session(), read_only=True) as session:
+        if execute_stmt_lambda_element(session, _get_first_id_stmt(start)):
+            return None
+        return CompiledStatistics(
+            _compile_platform_statistics(instance, session, start, end),
+            summarize_downsampled_states(session, start, end)
+            if instance.downsample_states
+            else None,
+        )
+
+
+def _compile_statistics(
+    instance: Recorder,
+    session: Session,
+    start: datetime,
+    fire_events: bool,
+    compiled: CompiledStatistics | None = None,
+) -> set[str]:
+    """Compile 5-minute statistics for all integrations with a recorder platform.
+
+    This is a helper function for compile_statistics and compile_missing_statistics
+    that does not retry on database errors since both callers already retry.
+
+    If compiled is passed, the statistics and downsampled states collected
+    by compile_platform_statistics are inserted instead of collecting them.
+
+    returns a set of modified statistic_ids if any were modified.
+    """
+    assert start.tzinfo == dt_util.UTC, "start must be in UTC"
+    end = start + StatisticsShortTerm.duration
+    statistics_meta_manager = instance.statistics_meta_manager
+    modified_statistic_ids: set[str] = set()
+
+    # Return if we already have 5-minute statistics for the requested period
+    if execute_stmt_lambda_element(session, _get_first_id_stmt(start)):
+        _LOGGER.debug("Statistics already compiled for %s-%s", start, end)
+        return modified_statistic_ids
+
+    _LOGGER.debug("Compiling statistics for %s-%s", start, end)
+    if compiled is None:
+        compiled = CompiledStatistics(
+            _compile_platform_statistics(instance, session, start, end), None
+        )
+    platform_stats = compiled.platform_compiled.platform_stats
+    current_metadata = compiled.platform_compiled.current_metadata
 
     new_short_term_stats: list[StatisticsBase] = []
     updated_metadata_ids: set[int] = set()
@@ -607,6 +688,13 @@ def _compile_statistics(
         # A full hour is ready, summarize it
         _compile_hourly_statistics(session, start)
 
+    if (downsampled_states := compiled.downsampled_states) is None and (
+        instance.downsample_states
+    ):
+        downsampled_states = summarize_downsampled_states(session, start, end)
+    if downsampled_states is not None:
+        insert_downsampled_states(session, downsampled_states)
+
     session.add(StatisticsRuns(start=start))
 
     if fire_events:
@@ -2024,6 +2112,202 @@ def get_latest_short_term_statistics_with_session(
     )
 
 
+class TimeWeightedAggregates(NamedTuple):
+    """Aggregates of the numeric states of an entity during a period."""
+
+    mean: float
+    min: float
+    max: float
+    last: float
+    unit_of_measurement: str | None
+
+
+def _time_weighted_aggregates_stmt(
+    run_start_ts: float | None,
+    start_ts: float,
+    end_ts: float,
+    metadata_ids: list[int],
+) -> Select:
+    """Create the statement for the time weighted aggregates of states.
+
+    The numeric states are weighted by the time until the next numeric
+    state, or until the end of the period for the last one. The state at
+    the start of the period is weighted from the start of the period.
+    """
+    stmt: Select | CompoundSelect = (
+        select(
+            States.metadata_id,
+            States.state,
+            States.attributes_id,
+            States.last_updated_ts.label("start_ts"),
+            literal(1).label("idx"),
+        )
+        .filter(States.metadata_id.in_(metadata_ids))
+        .filter(States.last_updated_ts >= start_ts)
+        .filter(States.last_updated_ts < end_ts)
+        .filter(
+            (States.last_changed_ts == States.last_updated_ts)
+            | States.last_changed_ts.is_(None)
+        )
+    )
+    if run_start_ts is not None:
+        most_recent = (
+            select(
+                States.metadata_id.label("max_metadata_id"),
+                func.max(States.last_updated_ts).label("max_last_updated"),
+            )
+            .filter(States.last_updated_ts >= run_start_ts)
+            .filter(States.last_updated_ts < start_ts)
+            .filter(States.metadata_id.in_(metadata_ids))
+            .group_by(States.metadata_id)
+            .subquery()
+        )
+        stmt = union_all(
+            select(
+                States.metadata_id,
+                States.state,
+                States.attributes_id,
+                literal(start_ts).label("start_ts"),
+                literal(0).label("idx"),
+            ).join(
+                most_recent,
+                and_(
+                    States.metadata_id == most_recent.c.max_metadata_id,
+                    States.last_updated_ts == most_recent.c.max_last_updated,
+                ),
+            ),
+            stmt,
+        )
+    states = stmt.subquery()
+    numeric_states = (
+        select(
+            states.c.metadata_id,
+            sql_cast(states.c.state, DOUBLE_TYPE).label("value"),
+            states.c.attributes_id,
+            states.c.start_ts,
+            func.lead(states.c.start_ts)
+            .over(
+                partition_by=states.c.metadata_id,
+                order_by=(states.c.start_ts, states.c.idx),
+            )
+            .label("end_ts"),
+            func.row_number()
+            .over(
+                partition_by=states.c.metadata_id,
+                order_by=(states.c.start_ts.desc(), states.c.idx.desc()),
+            )
+            .label("reverse_idx"),
+        )
+        .filter(states.c.state.regexp_match(NUMERIC_STATE_PATTERN))
+        .subquery()
+    )
+    return select(
+        numeric_states.c.metadata_id,
+        func.sum(
+            numeric_states.c.value
+            * (
+                func.coalesce(numeric_states.c.end_ts, end_ts)
+                - numeric_states.c.start_ts
+            )
+        ),
+        func.min(numeric_states.c.start_ts),
+        func.min(numeric_states.c.value),
+        func.max(numeric_states.c.value),
+        func.max(
+            case(
+                (numeric_states.c.reverse_idx == 1, numeric_states.c.value),
+            )
+        ),
+        func.min(numeric_states.c.attributes_id),
+        func.max(numeric_states.c.attributes_id),
+    ).group_by(numeric_states.c.metadata_id)
+
+
+def get_time_weighted_aggregates_with_session(
+    hass: HomeAssistant,
+    session: Session,
+    entity_ids: list[str],
+    start: datetime,
+    end: datetime,
+) -> dict[str, TimeWeightedAggregates]:
+    """Return the time weighted aggregates of the numeric states during a period.
+
+    The aggregates are calculated by the database, only entities with
+    numeric states are returned. Entities whose attributes changed
+    during the period are left out since their unit may have changed,
+    nothing is returned if the database can't cast the states to floats.
+    """
+    instance = get_instance(hass)
+    if (
+        instance.database_engine is not None
+        and not instance.database_engine.supports_float_cast
+    ):
+        return {}
+    entity_id_to_metadata_id = instance.states_meta_manager.get_many(
+        entity_ids, session, False
+    )
+    metadata_id_to_entity_id = {
+        metadata_id: entity_id
+        for entity_id, metadata_id in entity_id_to_metadata_id.items()
+        if metadata_id is not None
+    }
+    if not metadata_id_to_entity_id:
+        return {}
+    run = instance.recorder_runs_manager.get(start)
+    run_start_ts: float | None = None
+    if run is not None and (run_start := process_timestamp(run.start)) < start:
+        run_start_ts = run_start.timestamp()
+    start_ts = start.timestamp()
+    end_ts = end.timestamp()
+    rows = execute(
+        session.execute(
+            _time_weighted_aggregates_stmt(
+                run_start_ts, start_ts, end_ts, list(metadata_id_to_entity_id)
+            )
+        )
+    )
+    if not rows:
+        return {}
+
+    stable_rows = [row for row in rows if row[6] is not None and row[6] == row[7]]
+    attributes_ids = {row[6] for row in stable_rows}
+    units: dict[int, str | None] = {
+        attributes_id: json_loads_object(shared_attrs).get(ATTR_UNIT_OF_MEASUREMENT)
+        for attributes_id, shared_attrs in session.execute(
+            select(StateAttributes.attributes_id, StateAttributes.shared_attrs).filter(
+                StateAttributes.attributes_id.in_(attributes_ids)
+            )
+        )
+        if shared_attrs
+    }
+    result: dict[str, TimeWeightedAggregates] = {}
+    for (
+        metadata_id,
+        weighted,
+        first_start_ts,
+        min_value,
+        max_value,
+        last_value,
+        attributes_id,
+        _,
+    ) in stable_rows:
+        if attributes_id not in units or not all(
+            math.isfinite(value) for value in (weighted, min_value, max_value)
+        ):
+            continue
+        period_seconds = end_ts - first_start_ts
+        result[metadata_id_to_entity_id[metadata_id]] = TimeWeightedAggregates(
+            # The same as the Python implementation, a period without duration
+            # has a mean of 0.0
+            weighted / period_seconds if period_seconds else 0.0,
+            min_value,
+            max_value,
+            last_value,
+            units[attributes_id],
+        )
+    return result
+
+
 def _generate_statistics_at_time_stmt(
     table: type[StatisticsBase],
     metadata_ids: set[int],
@@ -3,9 +3,13 @@
 from __future__ import annotations
 
 from collections.abc import Collection, Iterable
+from concurrent.futures import Future
+from dataclasses import dataclass
 import logging
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, Any, cast
+import zlib
 
+from lru import LRU
 from sqlalchemy.orm.session import Session
 
 from homeassistant.core import Event, EventStateChangedData
@@ -13,8 +17,19 @@ from homeassistant.util.collection import chunked_or_all
 from homeassistant.util.json import JSON_ENCODE_EXCEPTIONS
 
 from ..db_schema import StateAttributes
-from ..queries import get_shared_attributes
-from ..util import execute_stmt_lambda_element
+from ..models import decompress_shared_attrs
+from ..queries import (
+    count_state_attributes_hashes,
+    get_recent_shared_attributes,
+    get_shared_attributes,
+    get_state_attributes_hashes,
+)
+from ..tasks import StateAttributesHashFilterTask
+from ..util import (
+    execute_stmt_lambda_element,
+    session_scope,
+    stream_stmt_lambda_element,
+)
 from . import BaseLRUTableManager
 
 if TYPE_CHECKING:
@@ -28,15 +43,263 @@ if TYPE_CHECKING:
 # - How much memory our low end hardware has
 CACHE_SIZE = 2048
 
+# The cache is doubled, up to the max size, when attributes were
+# evicted and more than this share of the lookups missed the cache
+GROW_MISS_RATE = 0.1
+MAX_ADAPTIVE_CACHE_SIZE = 16384
+
+# Sizing of the filter of the hashes in the database, with 10 bits
+# per hash and 7 probes about 1% of the new attributes are looked up
+# in the database anyway
+FILTER_BITS_PER_HASH = 10
+FILTER_PROBES = 7
+MIN_FILTER_CAPACITY = 65536
+
 _LOGGER = logging.getLogger(__name__)
 
 
+def _decompress_shared_attrs(attributes_id: int, shared_attrs_bin: bytes) -> str | None:
+    """Decompress shared attributes, returns None if they are corrupt."""
+    try:
+        return decompress_shared_attrs(shared_attrs_bin)
+    except (LookupError, ValueError, zlib.error) as err:
+        _LOGGER.error(
+            "Skipping corrupt compressed state attributes %s: %s", attributes_id, err
+        )
+        return None
+
+
+def _mix(value: int) -> int:
+    """Mix the bits of a 32 bit value, the murmur3 finalizer."""
+    value ^= value >> 16
+    value = (value * 0x85EBCA6B) & 0xFFFFFFFF
+    value ^= value >> 13
+    value = (value * 0xC2B2AE35) & 0xFFFFFFFF
+    return value ^ (value >> 16)
+
+
+class HashFilter:
+    """A bloom filter of the hashes of the shared attributes in the database.
+
+    If a hash is not in the filter, the attributes are certainly not in
+    the database. False positives only cost a database lookup.
+    """
+
+    __slots__ = ("_bits", "_size", "capacity", "count")
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize the filter."""
+        self.capacity = capacity
+        self.count = 0
+        self._size = capacity * FILTER_BITS_PER_HASH
+        self._bits = bytearray((self._size + 7) // 8)
+
+    def _positions(self, data_hash: int) -> Iterable[int]:
+        """Return the bits of a hash with double hashing."""
+        size = self._size
+        start = _mix(data_hash)
+        step = _mix(start) | 1
+        return ((start + probe * step) % size for probe in range(FILTER_PROBES))
+
+    def add(self, data_hash: int) -> None:
+        """Add a hash to the filter."""
+        bits = self._bits
+        for position in self._positions(data_hash):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, data_hash: int) -> bool:
+        """Return if the hash may be in the filter."""
+        bits = self._bits
+        return all(
+            bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(data_hash)
+        )
+
+    @property
+    def saturated(self) -> bool:
+        """Return if more hashes were added than the filter was sized for."""
+        return self.count > self.capacity
+
+
+@dataclass(slots=True)
+class StateAttributesCacheStats:
+    """Statistics of the shared attributes cache."""
+
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+    skipped_lookups: int
+
+
 class StateAttributesManager(BaseLRUTableManager[StateAttributes]):
     """Manage the StateAttributes table."""
 
     def __init__(self, recorder: Recorder) -> None:
         """Initialize the event type manager."""
         super().__init__(recorder, CACHE_SIZE)
+        self._id_map = LRU(CACHE_SIZE, self._evicted)
+        self._hash_filter: HashFilter | None = None
+        # Incremented when a hash filter is built or dropped so a filter
+        # which was built before the database changed is not used
+        self._filter_generation = 0
+        # Hashes of the attributes added while the filter is built
+        self._hashes_added_while_building: list[int] | None = None
+        self._rebuild_filter = False
+        self._misses = 0
+        self._evictions = 0
+        self._skipped_lookups = 0
+        self._last_stats = self.cache_stats()
+
+    def _evicted(self, shared_attrs: str, attributes_id: Any) -> None:
+        """Count the attributes evicted from the cache."""
+        self._evictions += 1
+
+    def cache_stats(self) -> StateAttributesCacheStats:
+        """Return the statistics of the cache.
+
+        Misses are the attributes which were not in the cache, they are
+        either looked up in the database or skipped by the hash filter.
+        """
+        hits, _ = self._id_map.get_stats()
+        return StateAttributesCacheStats(
+            self._id_map.get_size(),
+            hits,
+            self._misses,
+            self._evictions,
+            self._skipped_lookups,
+        )
+
+    def adjust_lru_size(self, new_size: int) -> None:
+        """Adjust the LRU cache size.
+
+        Besides following the number of entities, the cache grows
+        when attributes were evicted and the miss rate since the
+        last adjustment is high. A hash filter which was dropped since
+        it was saturated is rebuilt with a size for the current number
+        of attributes in the database.
+
+        This call is not thread-safe and must be called from the
+        recorder thread.
+        """
+        stats = self.cache_stats()
+        last_stats = self._last_stats
+        self._last_stats = stats
+        hits = stats.hits - last_stats.hits
+        misses = stats.misses - last_stats.misses
+        if (
+            stats.evictions > last_stats.evictions
+            and misses > (hits + misses) * GROW_MISS_RATE
+            and stats.size < MAX_ADAPTIVE_CACHE_SIZE
+        ):
+            new_size = max(new_size, min(stats.size * 2, MAX_ADAPTIVE_CACHE_SIZE))
+        _LOGGER.debug("State attributes cache: %s, new size: %s", stats, new_size)
+        super().adjust_lru_size(new_size)
+        if self._rebuild_filter:
+            self._rebuild_filter = False
+            self._build_hash_filter_in_executor()
+
+    def prefetch(self, session: Session) -> None:
+        """Prime the cache and start building the hash filter.
+
+        The cache is loaded with the attributes of the most recent
+        states since they are likely to be used again.
+
+        This call is not thread-safe and must be called from the
+        recorder thread.
+        """
+        id_map = self._id_map
+        with session.no_autoflush:
+            for (
+                attributes_id,
+                shared_attrs,
+                shared_attrs_bin,
+            ) in execute_stmt_lambda_element(
+                session,
+                get_recent_shared_attributes(id_map.get_size()),
+                orm_rows=False,
+            ):
+                if shared_attrs_bin is not None and (
+                    (
+                        shared_attrs := _decompress_shared_attrs(
+                            attributes_id, shared_attrs_bin
+                        )
+                    )
+                    is None
+                ):
+                    continue
+                id_map[shared_attrs] = attributes_id
+        _LOGGER.debug("Prefetched %s shared attributes", len(id_map))
+        self._build_hash_filter_in_executor()
+
+    def _build_hash_filter_in_executor(self) -> None:
+        """Build the hash filter in the database executor.
+
+        Reading the hashes scans the whole table, so it does not block
+        the recorder thread. Until the filter is built, all attributes
+        missing from the cache are looked up in the database.
+
+        This call is not thread-safe and must be called from the
+        recorder thread.
+        """
+        self._hash_filter = None
+        self._filter_generation += 1
+        self._hashes_added_while_building = []
+        recorder = self.recorder
+        generation = self._filter_generation
+        hash_filter = recorder.add_executor_job(self._build_hash_filter)
+        hash_filter.add_done_callback(
+            lambda _: recorder.queue_task(
+                StateAttributesHashFilterTask(hash_filter, generation)
+            )
+        )
+
+    def _build_hash_filter(self) -> HashFilter:
+        """Return a filter of the hashes in the database.
+
+        This call runs in the database executor.
+        """
+        with session_scope(
+            session=self.recorder.get_session(), read_only=True
+        ) as session:
+            count = execute_stmt_lambda_element(
+                session, count_state_attributes_hashes(), orm_rows=False
+            )[0][0]
+            hash_filter = HashFilter(max(count * 2, MIN_FILTER_CAPACITY))
+            for (data_hash,) in stream_stmt_lambda_element(
+                session, get_state_attributes_hashes()
+            ):
+                hash_filter.add(data_hash)
+        _LOGGER.debug("Built the shared attributes hash filter of %s hashes", count)
+        return hash_filter
+
+    def set_hash_filter(self, hash_filter: Future[HashFilter], generation: int) -> None:
+        """Use a hash filter built in the database executor.
+
+        This call is not thread-safe and must be called from the
+        recorder thread.
+        """
+        if generation != self._filter_generation:
+            # The database changed or the filter was dropped while it was built
+            return
+        hashes_added = self._hashes_added_while_building
+        self._hashes_added_while_building = None
+        try:
+            built_filter = hash_filter.result()
+        except Exception:
+            _LOGGER.exception("Error building the shared attributes hash filter")
+            return
+        assert hashes_added is not None
+        for data_hash in hashes_added:
+            built_filter.add(data_hash)
+        self._hash_filter = built_filter
+
+    def _filter_hashes(self, hashes: Iterable[int]) -> set[int]:
+        """Return the hashes which may be in the database."""
+        if (hash_filter := self._hash_filter) is None:
+            return set(hashes)
+        return {data_hash for data_hash in hashes if data_hash in hash_filter}
 
     def serialize_from_event(self, event: Event[EventStateChangedData]) -> bytes | None:
         """Serialize event data."""
@@ -60,11 +323,13 @@ class StateAttributesManager(BaseLRUTableManager[StateAttributes]):
         This call is not thread-safe and must be called from the
         recorder thread.
         """
-        if hashes := {
-            StateAttributes.hash_shared_attrs_bytes(shared_attrs_bytes)
-            for event in events
-            if (shared_attrs_bytes := self.serialize_from_event(event))
-        }:
+        if hashes := self._filter_hashes(
+            {
+                StateAttributes.hash_shared_attrs_bytes(shared_attrs_bytes)
+                for event in events
+                if (shared_attrs_bytes := self.serialize_from_event(event))
+            }
+        ):
             self._load_from_hashes(hashes, session)
 
     def get(self, shared_attr: str, data_hash: int, session: Session) -> int | None:
@@ -94,7 +359,14 @@ class StateAttributesManager(BaseLRUTableManager[StateAttributes]):
         if not missing_hashes:
             return results
 
-        return results | self._load_from_hashes(missing_hashes, session)
+        self._misses += len(missing_hashes)
+        # Attributes which are certainly new don't need a database lookup
+        maybe_in_database = self._filter_hashes(missing_hashes)
+        self._skipped_lookups += len(missing_hashes) - len(maybe_in_database)
+        if not maybe_in_database:
+            return results
+
+        return results | self._load_from_hashes(maybe_in_database, session)
 
     def _load_from_hashes(
         self, hashes: Collection[int], session: Session
@@ -107,24 +379,65 @@ class StateAttributesManager(BaseLRUTableManager[StateAttributes]):
         results: dict[str, int | None] = {}
         with session.no_autoflush:
             for hashs_chunk in chunked_or_all(hashes, self.recorder.max_bind_vars):
-                for attributes_id, shared_attrs in execute_stmt_lambda_element(
+                for (
+                    attributes_id,
+                    shared_attrs,
+                    shared_attrs_bin,
+                ) in execute_stmt_lambda_element(
                     session, get_shared_attributes(hashs_chunk), orm_rows=False
                 ):
+                    if shared_attrs_bin is not None and (
+                        (
+                            shared_attrs := _decompress_shared_attrs(
+                                attributes_id, shared_attrs_bin
+                            )
+                        )
+                        is None
+                    ):
+                        continue
                     results[shared_attrs] = self._id_map[shared_attrs] = cast(
                         int, attributes_id
                     )
 
         return results
 
-    def add_pending(self, db_state_attributes: StateAttributes) -> None:
+    def add_pending(
+        self, db_state_attributes: StateAttributes, shared_attrs: str
+    ) -> None:
         """Add a pending StateAttributes that will be committed at the next interval.
 
+        The shared_attrs are passed separately since they are not
+        stored in the StateAttributes when they are compressed.
+
         This call is not thread-safe and must be called from the
         recorder thread.
         """
-        assert db_state_attributes.shared_attrs is not None
-        shared_attrs: str = db_state_attributes.shared_attrs
         self._pending[shared_attrs] = db_state_attributes
+        data_hash = db_state_attributes.hash
+        if (hashes_added := self._hashes_added_while_building) is not None:
+            if data_hash is None:
+                self._drop_hash_filter()
+            else:
+                hashes_added.append(data_hash)
+        elif (hash_filter := self._hash_filter) is not None:
+            if data_hash is None or hash_filter.saturated:
+                # The filter can no longer tell which attributes are new
+                _LOGGER.debug("The shared attributes hash filter is saturated")
+                self._drop_hash_filter()
+                # Rebuilt with a size for the attributes in the database
+                self._rebuild_filter = data_hash is not None
+            else:
+                hash_filter.add(data_hash)
+
+    def _drop_hash_filter(self) -> None:
+        """Stop using the hash filter, including one being built.
+
+        This call is not thread-safe and must be called from the
+        recorder thread.
+        """
+        self._hash_filter = None
+        self._hashes_added_while_building = None
+        self._filter_generation += 1
 
     def post_commit_pending(self) -> None:
         """Call after commit to load the attributes_ids of the new StateAttributes into the LRU.
@@ -152,3 +465,13 @@ class StateAttributesManager(BaseLRUTableManager[StateAttributes]):
             state_attributes_ids_reversed
         ):
             id_map.pop(state_attributes_ids_reversed[purged_attributes_id], None)
+
+    def reset(self) -> None:
+        """Reset after the database has been reset or changed.
+
+        This call is not thread-safe and must be called from the
+        recorder thread.
+        """
+        super().reset()
+        self._drop_hash_filter()
+        self._rebuild_filter = False
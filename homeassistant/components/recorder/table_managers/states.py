@@ -2,8 +2,19 @@
 
 from __future__ import annotations
 
+from typing import Any
+
+from sqlalchemy import insert, text, update
+from sqlalchemy.orm.session import Session
+
+from homeassistant.util.collection import chunked_or_all
+
+from ..const import SupportedDialect
 from ..db_schema import States
 
+# Max number of rows written with one multi-row INSERT on MySQL
+MYSQL_INSERT_ROWS = 1000
+
 
 class StatesManager:
     """Manage the states table."""
@@ -11,8 +22,10 @@ class StatesManager:
     def __init__(self) -> None:
         """Initialize the states manager for linking old_state_id."""
         self._pending: dict[str, States] = {}
+        self._queued: list[States] = []
         self._last_committed_id: dict[str, int] = {}
         self._last_reported: dict[int, float] = {}
+        self._auto_increment_increment: int | None = None
 
     def pop_pending(self, entity_id: str) -> States | None:
         """Pop a pending state.
@@ -45,6 +58,91 @@ class StatesManager:
         """
         self._pending[entity_id] = state
 
+    def queue_insert(self, state: States) -> None:
+        """Queue a state to be inserted by insert_queued.
+
+        Queued states are not added to the session. They are written
+        in bulk just before the session is committed.
+
+        This call is not thread-safe and must be called from the
+        recorder thread.
+        """
+        self._queued.append(state)
+
+    def insert_queued(self, session: Session) -> None:
+        """Insert the queued states with as few statements as possible.
+
+        When the dialect can return the generated state_ids in the order
+        the rows were sent, all queued states are written with a single
+        multi-row INSERT. On MySQL, which can not, the states are written
+        with multi-row INSERTs of MYSQL_INSERT_ROWS rows and the state_ids
+        are derived from LAST_INSERT_ID(), see _insert_mysql. Any
+        old_state_id that refers to a state in the same batch is filled in
+        with a single executemany UPDATE afterwards. On other dialects the
+        states are handed to the ORM, which inserts them one row at a time.
+
+        The session must be flushed before calling this so that the
+        metadata_id and attributes_id of pending rows are known, the
+        flush resolves them in batches where this inserts in batches.
+
+        This call is not thread-safe and must be called from the
+        recorder thread.
+        """
+        if not (queued := self._queued):
+            return
+        dialect = session.get_bind().dialect
+        insert_returning = dialect.insert_executemany_returning_sort_by_parameter_order
+        if not insert_returning and dialect.name != SupportedDialect.MYSQL:
+            session.add_all(queued)
+            session.flush()
+            queued.clear()
+            return
+        rows: list[dict[str, Any]] = []
+        for db_state in queued:
+            # Reset in case a previous attempt to insert failed
+            db_state.state_id = None  # type: ignore[assignment]
+            rows.append(_state_insert_row(db_state))
+        if insert_returning:
+            state_ids = session.execute(
+                insert(States).returning(States.state_id, sort_by_parameter_order=True),
+                rows,
+            ).scalars()
+        else:
+            state_ids = self._insert_mysql(session, rows)
+        for db_state, state_id in zip(queued, state_ids, strict=True):
+            db_state.state_id = state_id
+        if linked_old_states := [
+            {"state_id": db_state.state_id, "old_state_id": old_state.state_id}
+            for db_state in queued
+            if (old_state := db_state.old_state) is not None
+        ]:
+            with session.no_autoflush:
+                session.execute(update(States), linked_old_states)
+        queued.clear()
+
+    def _insert_mysql(self, session: Session, rows: list[dict[str, Any]]) -> list[int]:
+        """Insert the rows with multi-row INSERTs and return their state_ids.
+
+        InnoDB allocates the auto increment values of a multi-row INSERT
+        with a known number of rows at once, whatever the
+        innodb_autoinc_lock_mode, so the rows get consecutive state_ids
+        in the order they were sent, spaced by auto_increment_increment.
+        LAST_INSERT_ID() is the state_id of the first row.
+        """
+        if (increment := self._auto_increment_increment) is None:
+            increment = self._auto_increment_increment = session.execute(
+                text("SELECT @@auto_increment_increment")
+            ).scalar_one()
+        state_ids: list[int] = []
+        for rows_chunk in chunked_or_all(rows, MYSQL_INSERT_ROWS):
+            first_id: int = session.execute(
+                insert(States).values(list(rows_chunk))
+            ).lastrowid
+            state_ids.extend(
+                range(first_id, first_id + len(rows_chunk) * increment, increment)
+            )
+        return state_ids
+
     def update_pending_last_reported(
         self, state_id: int, last_reported_timestamp: float
     ) -> None:
@@ -74,6 +172,12 @@ class StatesManager:
         """
         self._last_committed_id.clear()
         self._pending.clear()
+        self._queued.clear()
+        self._auto_increment_increment = None
+
+    def committed_state_ids(self) -> list[int]:
+        """Return the state_ids of the last committed state of each entity."""
+        return list(self._last_committed_id.values())
 
     def evict_purged_state_ids(self, purged_state_ids: set[int]) -> None:
         """Evict purged states from the committed states.
@@ -102,3 +206,38 @@ class StatesManager:
         last_committed_ids = self._last_committed_id
         for entity_id in purged_entity_ids:
             last_committed_ids.pop(entity_id, None)
+
+
+def _state_insert_row(db_state: States) -> dict[str, Any]:
+    """Return the row to insert for a queued state."""
+    if (states_meta := db_state.states_meta_rel) is not None:
+        metadata_id = states_meta.metadata_id
+    else:
+        metadata_id = db_state.metadata_id
+    if (state_attributes := db_state.state_attributes) is not None:
+        attributes_id = state_attributes.attributes_id
+    else:
+        attributes_id = db_state.attributes_id
+    old_state = db_state.old_state
+    return {
+        "entity_id": db_state.entity_id,
+        "state": db_state.state,
+        "attributes": db_state.attributes,
+        "last_changed": db_state.last_changed,
+        "last_changed_ts": db_state.last_changed_ts,
+        "last_reported_ts": db_state.last_reported_ts,
+        "last_updated": db_state.last_updated,
+        "last_updated_ts": db_state.last_updated_ts,
+        # States linked to a state in the same batch get their
+        # old_state_id once the batch has been inserted
+        "old_state_id": None if old_state is not None else db_state.old_state_id,
+        "attributes_id": attributes_id,
+        "context_id": db_state.context_id,
+        "context_user_id": db_state.context_user_id,
+        "context_parent_id": db_state.context_parent_id,
+        "context_id_bin": db_state.context_id_bin,
+        "context_user_id_bin": db_state.context_user_id_bin,
+        "context_parent_id_bin": db_state.context_parent_id_bin,
+        "origin_idx": db_state.origin_idx,
+        "metadata_id": metadata_id,
+    }
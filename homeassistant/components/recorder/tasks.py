@@ -5,8 +5,10 @@ from __future__ import annotations
 import abc
 import asyncio
 from collections.abc import Callable, Iterable
+from concurrent.futures import Future
 from dataclasses import dataclass
 from datetime import datetime
+from functools import partial
 import logging
 import threading
 from typing import TYPE_CHECKING, Any
@@ -14,10 +16,11 @@ from typing import TYPE_CHECKING, Any
 from homeassistant.helpers.typing import UndefinedType
 from homeassistant.util.event_type import EventType
 
-from . import entity_registry, purge, statistics
+from . import entity_registry, purge, repack, statistics
 from .const import DOMAIN
 from .db_schema import Statistics, StatisticsShortTerm
 from .models import StatisticData, StatisticMetaData
+from .purge_progress import PurgeTarget
 from .util import periodic_db_cleanups, session_scope
 
 _LOGGER = logging.getLogger(__name__)
@@ -25,6 +28,7 @@ _LOGGER = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
     from .core import Recorder
+    from .table_managers.state_attributes import HashFilter
 
 
 @dataclass(slots=True)
@@ -117,9 +121,13 @@ class PurgeTask(RecorderTask):
 
     def run(self, instance: Recorder) -> None:
         """Purge the database."""
+        instance.purge_progress.start(
+            PurgeTarget(self.purge_before, self.repack, self.apply_filter)
+        )
         if purge.purge_old_data(
             instance, self.purge_before, self.repack, self.apply_filter
         ):
+            instance.purge_progress.finish()
             with instance.get_session() as session:
                 instance.recorder_runs_manager.load_from_db(session)
             # We always need to do the db cleanups after a purge
@@ -160,19 +168,77 @@ class PerodicCleanupTask(RecorderTask):
         periodic_db_cleanups(instance)
 
 
+@dataclass(slots=True)
+class IncrementalVacuumTask(RecorderTask):
+    """An object to insert into the recorder queue to free unused database pages."""
+
+    def run(self, instance: Recorder) -> None:
+        """Handle the task."""
+        repack.incremental_vacuum(instance)
+
+
 @dataclass(slots=True)
 class StatisticsTask(RecorderTask):
     """An object to insert into the recorder queue to run a statistics task."""
 
     start: datetime
     fire_events: bool
+    compiled: Future[statistics.CompiledStatistics | None] | None = None
 
     def run(self, instance: Recorder) -> None:
         """Run statistics task."""
-        if statistics.compile_statistics(instance, self.start, self.fire_events):
+        if instance.compile_statistics_in_executor and self.compiled is None:
+            if (pending := instance.statistics_compile) is not None:
+                # Periods are compiled in order since the sums of a period
+                # start from the sums of the previous one, run once the
+                # statistics of the pending period have been inserted
+                pending.add_done_callback(lambda _: instance.queue_task(self))
+                return
+            instance.statistics_compile = Future()
+            # Collect the statistics from the platforms in the database
+            # executor and only insert them in the recorder thread
+            compiled = instance.add_executor_job(
+                partial(statistics.compile_platform_statistics, instance, self.start)
+            )
+            compiled.add_done_callback(
+                lambda _: instance.queue_task(
+                    StatisticsTask(self.start, self.fire_events, compiled)
+                )
+            )
+            return
+
+        if self.compiled is None:
+            if statistics.compile_statistics(instance, self.start, self.fire_events):
+                return
+            # Schedule a new statistics task if this one didn't finish
+            instance.queue_task(StatisticsTask(self.start, self.fire_events))
             return
-        # Schedule a new statistics task if this one didn't finish
-        instance.queue_task(StatisticsTask(self.start, self.fire_events))
+
+        if not self._insert_compiled(instance):
+            # Retry with the collected statistics, the following periods
+            # keep waiting until this one is inserted
+            instance.queue_task(self)
+            return
+        if (inserted := instance.statistics_compile) is not None:
+            instance.statistics_compile = None
+            inserted.set_result(None)
+
+    def _insert_compiled(self, instance: Recorder) -> bool:
+        """Insert the statistics collected in the database executor."""
+        assert self.compiled is not None
+        collected: statistics.CompiledStatistics | None = None
+        try:
+            if (collected := self.compiled.result()) is None:
+                # Statistics are already compiled for the period
+                return True
+        except Exception:
+            _LOGGER.exception(
+                "Error compiling statistics in the executor, compiling"
+                " them in the recorder thread"
+            )
+        return statistics.compile_statistics(
+            instance, self.start, self.fire_events, collected
+        )
 
 
 @dataclass(slots=True)
@@ -339,6 +405,21 @@ class AdjustLRUSizeTask(RecorderTask):
         instance._adjust_lru_size()  # noqa: SLF001
 
 
+@dataclass(slots=True)
+class StateAttributesHashFilterTask(RecorderTask):
+    """An object to insert into the recorder queue to use a built hash filter."""
+
+    hash_filter: Future[HashFilter]
+    generation: int
+    commit_before = False
+
+    def run(self, instance: Recorder) -> None:
+        """Use the hash filter of the shared attributes."""
+        instance.state_attributes_manager.set_hash_filter(
+            self.hash_filter, self.generation
+        )
+
+
 @dataclass(slots=True)
 class RefreshEventTypesTask(RecorderTask):
     """An object to insert into the recorder queue to refresh event types."""
@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable, Generator, Sequence
+from collections.abc import Callable, Generator, Iterator, Sequence
 import contextlib
 from contextlib import contextmanager
 from datetime import date, datetime, timedelta
 import functools
+from itertools import islice
 import logging
 import os
 import time
@@ -57,6 +58,7 @@ from .models import (
     UnsupportedDialect,
     process_timestamp,
 )
+from .partition import create_daily_partitions
 
 if TYPE_CHECKING:
     from sqlite3.dbapi2 import Cursor as SQLiteCursor
@@ -93,7 +95,9 @@ MARIADB_WITH_FIXED_IN_QUERIES_107 = _simple_version("10.7.5")
 MARIA_DB_108 = _simple_version("10.8.0")
 RECOMMENDED_MIN_VERSION_MARIA_DB_108 = _simple_version("10.8.4")
 MARIADB_WITH_FIXED_IN_QUERIES_108 = _simple_version("10.8.4")
+MARIA_DB_WITH_FLOAT_CAST = _simple_version("10.4.5")
 MIN_VERSION_MYSQL = _simple_version("8.0.0")
+MYSQL_WITH_FLOAT_CAST = _simple_version("8.0.17")
 MIN_VERSION_PGSQL = _simple_version("12.0")
 MIN_VERSION_SQLITE = _simple_version("3.31.0")
 UPCOMING_MIN_VERSION_SQLITE = _simple_version("3.40.1")
@@ -208,6 +212,39 @@ def execute_stmt_lambda_element(
     raise RuntimeError  # pragma: no cover
 
 
+def stream_stmt_lambda_element(
+    session: Session,
+    stmt: StatementLambdaElement,
+    yield_per: int = DEFAULT_YIELD_STATES_ROWS,
+) -> Iterator[Row]:
+    """Execute a StatementLambdaElement and yield its rows as they are fetched.
+
+    The rows are fetched yield_per at a time with a server side cursor
+    where the database supports it, whatever the time window.
+
+    Since the rows are fetched while they are iterated, a failed fetch
+    is retried by executing the statement again and skipping the rows
+    which were already yielded.
+    """
+    rows_yielded = 0
+    for tryno in range(RETRIES):
+        try:
+            result = session.connection().execute(
+                stmt, execution_options={"yield_per": yield_per}
+            )
+            for row in islice(result, rows_yielded, None):
+                yield row
+                rows_yielded += 1
+        except SQLAlchemyError as err:
+            _LOGGER.error("Error executing query: %s", err)
+            if tryno == RETRIES - 1:
+                raise
+            session.rollback()
+            time.sleep(QUERY_RETRY_WAIT)
+        else:
+            return
+
+
 def validate_or_move_away_sqlite_database(dburl: str) -> bool:
     """Ensure that the database is valid or move it away."""
     dbpath = dburl_to_path(dburl)
@@ -502,11 +539,15 @@ def setup_connection_for_dialect(
     """Execute statements needed for dialect connection."""
     version: AwesomeVersion | None = None
     slow_range_in_select = False
+    supports_float_cast = True
     if dialect_name == SupportedDialect.SQLITE:
         max_bind_vars = SQLITE_MAX_BIND_VARS
         if first_connection:
             old_isolation = dbapi_connection.isolation_level  # type: ignore[attr-defined]
             dbapi_connection.isolation_level = None  # type: ignore[attr-defined]
+            # auto_vacuum must be set before WAL mode to apply to new databases,
+            # existing databases are converted the next time they are repacked
+            execute_on_connection(dbapi_connection, "PRAGMA auto_vacuum=INCREMENTAL")
             execute_on_connection(dbapi_connection, "PRAGMA journal_mode=WAL")
             dbapi_connection.isolation_level = old_isolation  # type: ignore[attr-defined]
             # WAL mode only needs to be setup once
@@ -593,6 +634,11 @@ def setup_connection_for_dialect(
                 or MARIA_DB_107 <= version < MARIADB_WITH_FIXED_IN_QUERIES_107
                 or MARIA_DB_108 <= version < MARIADB_WITH_FIXED_IN_QUERIES_108
             )
+            supports_float_cast = bool(
+                version
+                and version
+                >= (MARIA_DB_WITH_FLOAT_CAST if is_maria_db else MYSQL_WITH_FLOAT_CAST)
+            )
 
         # Ensure all times are using UTC to avoid issues with daylight savings
         execute_on_connection(dbapi_connection, "SET time_zone = '+00:00'")
@@ -619,6 +665,7 @@ def setup_connection_for_dialect(
         version=version,
         optimizer=DatabaseOptimizer(slow_range_in_select=slow_range_in_select),
         max_bind_vars=max_bind_vars,
+        supports_float_cast=supports_float_cast,
     )
 
 
@@ -786,6 +833,10 @@ def periodic_db_cleanups(instance: Recorder) -> None:
         with instance.engine.connect() as connection:
             connection.execute(text("PRAGMA wal_checkpoint(TRUNCATE);"))
             connection.execute(text("PRAGMA OPTIMIZE;"))
+    now = time.time()
+    for table in instance.partitioned_tables:
+        with session_scope(session=instance.get_session()) as session:
+            create_daily_partitions(session.connection(), table, now)
 
 
 @contextmanager
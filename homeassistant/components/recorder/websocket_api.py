@@ -138,7 +138,7 @@ async def ws_get_statistic_during_period(
     start_time, end_time = resolve_period(cast(StatisticPeriod, msg))
 
     connection.send_message(
-        await get_instance(hass).async_add_executor_job(
+        await get_instance(hass).async_add_read_executor_job(
             _ws_get_statistic_during_period,
             hass,
             msg["id"],
@@ -206,7 +206,7 @@ async def ws_handle_get_statistics_during_period(
     if (types := msg.get("types")) is None:
         types = {"change", "last_reset", "max", "mean", "min", "state", "sum"}
     connection.send_message(
-        await get_instance(hass).async_add_executor_job(
+        await get_instance(hass).async_add_read_executor_job(
             _ws_get_statistics_during_period,
             hass,
             msg["id"],
@@ -261,7 +261,7 @@ async def ws_handle_list_statistic_ids(
 ) -> None:
     """Fetch a list of available statistic_id."""
     connection.send_message(
-        await get_instance(hass).async_add_executor_job(
+        await get_instance(hass).async_add_read_executor_job(
             _ws_get_list_statistic_ids,
             hass,
             msg["id"],
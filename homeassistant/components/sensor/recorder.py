@@ -109,32 +109,33 @@ def _time_weighted_average(
     Note: there's no interpolation of values between state changes.
     """
     old_fstate: float | None = None
-    old_start_time: datetime.datetime | None = None
+    old_start_time_ts: float | None = None
     accumulated = 0.0
+    # Work with timestamps to avoid creating a datetime for every state
+    start_ts = start.timestamp()
+    end_ts = end.timestamp()
 
     for fstate, state in fstates:
         # The recorder will give us the last known state, which may be well
         # before the requested start time for the statistics
-        start_time = max(state.last_updated, start)
-        if old_start_time is None:
+        start_time_ts = max(state.last_updated_timestamp, start_ts)
+        if old_start_time_ts is None:
             # Adjust start time, if there was no last known state
-            start = start_time
+            start_ts = start_time_ts
         else:
-            duration = start_time - old_start_time
             # Accumulate the value, weighted by duration until next state change
             assert old_fstate is not None
-            accumulated += old_fstate * duration.total_seconds()
+            accumulated += old_fstate * (start_time_ts - old_start_time_ts)
 
         old_fstate = fstate
-        old_start_time = start_time
+        old_start_time_ts = start_time_ts
 
     if old_fstate is not None:
         # Accumulate the value, weighted by duration until end of the period
-        assert old_start_time is not None
-        duration = end - old_start_time
-        accumulated += old_fstate * duration.total_seconds()
+        assert old_start_time_ts is not None
+        accumulated += old_fstate * (end_ts - old_start_time_ts)
 
-    period_seconds = (end - start).total_seconds()
+    period_seconds = end_ts - start_ts
     if period_seconds == 0:
         # If the only state changed that happened was at the exact moment
         # at the end of the period, we can't calculate a meaningful average
@@ -402,6 +403,63 @@ def _timestamp_to_isoformat_or_none(timestamp: float | None) -> str | None:
     return dt_util.utc_from_timestamp(timestamp).isoformat()
 
 
+def _compile_statistics_in_database(
+    hass: HomeAssistant,
+    session: Session,
+    sensor_states: list[State],
+    wanted_statistics: dict[str, set[str]],
+    start: datetime.datetime,
+    end: datetime.datetime,
+) -> tuple[list[StatisticResult], dict[str, tuple[int, StatisticMetaData]]]:
+    """Compile mean, min and max statistics with aggregates from the database.
+
+    Only entities which have been compiled before with the same unit are
+    compiled by the database, the others are left to the Python implementation
+    which validates and converts the units.
+    """
+    entity_ids = [
+        i.entity_id
+        for i in sensor_states
+        if "sum" not in wanted_statistics[i.entity_id]
+    ]
+    if not entity_ids:
+        return [], {}
+    aggregates = statistics.get_time_weighted_aggregates_with_session(
+        hass, session, entity_ids, start, end
+    )
+    if not aggregates:
+        return [], {}
+    old_metadatas = statistics.get_metadata_with_session(
+        get_instance(hass), session, statistic_ids=set(aggregates)
+    )
+    result: list[StatisticResult] = []
+    compiled_metadatas: dict[str, tuple[int, StatisticMetaData]] = {}
+    for entity_id, aggregate in aggregates.items():
+        old_metadata = old_metadatas.get(entity_id)
+        if (
+            old_metadata is None
+            or old_metadata[1]["unit_of_measurement"] != aggregate.unit_of_measurement
+        ):
+            continue
+        compiled_metadatas[entity_id] = old_metadata
+        meta: StatisticMetaData = {
+            "has_mean": True,
+            "has_sum": False,
+            "name": None,
+            "source": RECORDER_DOMAIN,
+            "statistic_id": entity_id,
+            "unit_of_measurement": aggregate.unit_of_measurement,
+        }
+        stat: StatisticData = {
+            "start": start,
+            "mean": aggregate.mean,
+            "min": aggregate.min,
+            "max": aggregate.max,
+        }
+        result.append({"meta": meta, "stat": stat})
+    return result, compiled_metadatas
+
+
 def compile_statistics(  # noqa: C901
     hass: HomeAssistant,
     session: Session,
@@ -410,9 +468,17 @@ def compile_statistics(  # noqa: C901
 ) -> statistics.PlatformCompiledStatistics:
     """Compile statistics for all entities during start-end."""
     result: list[StatisticResult] = []
+    compiled_metadatas: dict[str, tuple[int, StatisticMetaData]] = {}
 
     sensor_states = _get_sensor_states(hass)
     wanted_statistics = _wanted_statistics(sensor_states)
+    if get_instance(hass).aggregate_statistics_in_database:
+        result, compiled_metadatas = _compile_statistics_in_database(
+            hass, session, sensor_states, wanted_statistics, start, end
+        )
+        sensor_states = [
+            i for i in sensor_states if i.entity_id not in compiled_metadatas
+        ]
     # Get history between start and end
     entities_full_history = [
         i.entity_id for i in sensor_states if "sum" in wanted_statistics[i.entity_id]
@@ -640,7 +706,9 @@ def compile_statistics(  # noqa: C901
 
         result.append({"meta": meta, "stat": stat})
 
-    return statistics.PlatformCompiledStatistics(result, old_metadatas)
+    return statistics.PlatformCompiledStatistics(
+        result, {**compiled_metadatas, **old_metadatas}
+    )
 
 
 def list_statistic_ids(
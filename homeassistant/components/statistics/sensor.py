@@ -8,13 +8,13 @@ import contextlib
 from datetime import datetime, timedelta
 import logging
 import math
-import statistics
 from typing import Any, cast
 
 import voluptuous as vol
 
 from homeassistant.components.binary_sensor import DOMAIN as BINARY_SENSOR_DOMAIN
 from homeassistant.components.recorder import get_instance, history
+from homeassistant.components.recorder.history.loader import async_get_history_loader
 from homeassistant.components.sensor import (
     DEVICE_CLASS_STATE_CLASSES,
     DEVICE_CLASS_UNITS,
@@ -58,6 +58,7 @@ from homeassistant.util import dt as dt_util
 from homeassistant.util.enum import try_parse_enum
 
 from . import DOMAIN, PLATFORMS
+from .window import SampleWindow
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -362,8 +363,10 @@ class StatisticsSensor(SensorEntity):
         self._percentile: int = percentile
         self._attr_available: bool = False
 
-        self.states: deque[float | bool] = deque(maxlen=self._samples_max_buffer_size)
-        self.ages: deque[datetime] = deque(maxlen=self._samples_max_buffer_size)
+        self._window = SampleWindow(self._samples_max_buffer_size)
+        # Samples are only added and removed through the window
+        self.states: deque[float | bool] = self._window.states
+        self.ages: deque[datetime] = self._window.ages
         self._attr_extra_state_attributes = {}
 
         self._state_characteristic_fn: Callable[[], float | int | datetime | None] = (
@@ -471,10 +474,10 @@ class StatisticsSensor(SensorEntity):
         try:
             if self.is_binary:
                 assert new_state.state in ("on", "off")
-                self.states.append(new_state.state == "on")
+                value: float | bool = new_state.state == "on"
             else:
-                self.states.append(float(new_state.state))
-            self.ages.append(new_state.last_reported)
+                value = float(new_state.state)
+            self._window.append(value, new_state.last_reported)
             self._attr_extra_state_attributes[STAT_SOURCE_VALUE_VALID] = True
         except ValueError:
             self._attr_extra_state_attributes[STAT_SOURCE_VALUE_VALID] = False
@@ -616,8 +619,7 @@ class StatisticsSensor(SensorEntity):
                 dt_util.as_local(self.ages[0]),
                 (now - self.ages[0]),
             )
-            self.ages.popleft()
-            self.states.popleft()
+            self._window.popleft()
 
     @callback
     def _async_next_to_purge_timestamp(self) -> datetime | None:
@@ -705,6 +707,25 @@ class StatisticsSensor(SensorEntity):
             include_start_time_state=False,
         ).get(lower_entity_id, [])
 
+    async def _async_load_states_in_max_age(self, max_age: timedelta) -> list[State]:
+        """Load the states not older than max_age with the shared history loader.
+
+        The start of the period is rounded down to the minute, so sensors
+        with the same max_age starting together share a query.
+        """
+        start_date = dt_util.utcnow() - max_age - timedelta(microseconds=1)
+        _LOGGER.debug(
+            "%s: retrieve records not older then %s", self.entity_id, start_date
+        )
+        states = await async_get_history_loader(
+            self.hass
+        ).async_state_changes_during_period(
+            self._source_entity_id,
+            start_date.replace(second=0, microsecond=0),
+            include_start_time_state=False,
+        )
+        return [state for state in states if state.last_updated > start_date]
+
     async def _initialize_from_database(self) -> None:
         """Initialize the list of states from the database.
 
@@ -715,12 +736,17 @@ class StatisticsSensor(SensorEntity):
         If MaxAge is provided then query will restrict to entries younger then
         current datetime - MaxAge.
         """
-        if states := await get_instance(self.hass).async_add_executor_job(
-            self._fetch_states_from_database
-        ):
-            for state in reversed(states):
-                self._add_state_to_queue(state)
-                self._calculate_state_attributes(state)
+        if self._samples_max_age is not None and self._samples_max_buffer_size is None:
+            # Without a buffer size all states are loaded, which can be shared
+            states = await self._async_load_states_in_max_age(self._samples_max_age)
+        else:
+            states = await get_instance(self.hass).async_add_executor_job(
+                self._fetch_states_from_database
+            )
+            states.reverse()
+        for state in states:
+            self._add_state_to_queue(state)
+            self._calculate_state_attributes(state)
         self._async_purge_update_and_schedule()
 
         # only write state to the state machine if we are not in preview mode
@@ -783,29 +809,16 @@ class StatisticsSensor(SensorEntity):
         if len(self.states) == 1:
             return self.states[0]
         if len(self.states) >= 2:
-            area: float = 0
-            for i in range(1, len(self.states)):
-                area += (
-                    0.5
-                    * (self.states[i] + self.states[i - 1])
-                    * (self.ages[i] - self.ages[i - 1]).total_seconds()
-                )
             age_range_seconds = (self.ages[-1] - self.ages[0]).total_seconds()
-            return area / age_range_seconds
+            return self._window.linear_area / age_range_seconds
         return None
 
     def _stat_average_step(self) -> StateType:
         if len(self.states) == 1:
             return self.states[0]
         if len(self.states) >= 2:
-            area: float = 0
-            for i in range(1, len(self.states)):
-                area += (
-                    self.states[i - 1]
-                    * (self.ages[i] - self.ages[i - 1]).total_seconds()
-                )
             age_range_seconds = (self.ages[-1] - self.ages[0]).total_seconds()
-            return area / age_range_seconds
+            return self._window.step_area / age_range_seconds
         return None
 
     def _stat_average_timeless(self) -> StateType:
@@ -843,12 +856,12 @@ class StatisticsSensor(SensorEntity):
 
     def _stat_datetime_value_max(self) -> datetime | None:
         if len(self.states) > 0:
-            return self.ages[self.states.index(max(self.states))]
+            return self.ages[self.states.index(self._window.value_max)]
         return None
 
     def _stat_datetime_value_min(self) -> datetime | None:
         if len(self.states) > 0:
-            return self.ages[self.states.index(min(self.states))]
+            return self.ages[self.states.index(self._window.value_min)]
         return None
 
     def _stat_distance_95_percent_of_values(self) -> StateType:
@@ -863,24 +876,22 @@ class StatisticsSensor(SensorEntity):
 
     def _stat_distance_absolute(self) -> StateType:
         if len(self.states) > 0:
-            return max(self.states) - min(self.states)
+            return self._window.value_max - self._window.value_min
         return None
 
     def _stat_mean(self) -> StateType:
         if len(self.states) > 0:
-            return statistics.mean(self.states)
+            return self._window.mean
         return None
 
     def _stat_mean_circular(self) -> StateType:
         if len(self.states) > 0:
-            sin_sum = sum(math.sin(math.radians(x)) for x in self.states)
-            cos_sum = sum(math.cos(math.radians(x)) for x in self.states)
-            return (math.degrees(math.atan2(sin_sum, cos_sum)) + 360) % 360
+            return self._window.mean_circular
         return None
 
     def _stat_median(self) -> StateType:
         if len(self.states) > 0:
-            return statistics.median(self.states)
+            return self._window.median
         return None
 
     def _stat_noisiness(self) -> StateType:
@@ -894,40 +905,33 @@ class StatisticsSensor(SensorEntity):
         if len(self.states) == 1:
             return self.states[0]
         if len(self.states) >= 2:
-            percentiles = statistics.quantiles(self.states, n=100, method="exclusive")
-            return percentiles[self._percentile - 1]
+            return self._window.percentile(self._percentile)
         return None
 
     def _stat_standard_deviation(self) -> StateType:
         if len(self.states) == 1:
             return 0.0
         if len(self.states) >= 2:
-            return statistics.stdev(self.states)
+            return math.sqrt(self._window.variance)
         return None
 
     def _stat_sum(self) -> StateType:
         if len(self.states) > 0:
-            return sum(self.states)
+            return self._window.sum
         return None
 
     def _stat_sum_differences(self) -> StateType:
         if len(self.states) == 1:
             return 0.0
         if len(self.states) >= 2:
-            return sum(
-                abs(j - i)
-                for i, j in zip(list(self.states), list(self.states)[1:], strict=False)
-            )
+            return self._window.sum_differences
         return None
 
     def _stat_sum_differences_nonnegative(self) -> StateType:
         if len(self.states) == 1:
             return 0.0
         if len(self.states) >= 2:
-            return sum(
-                (j - i if j >= i else j - 0)
-                for i, j in zip(list(self.states), list(self.states)[1:], strict=False)
-            )
+            return self._window.sum_differences_nonnegative
         return None
 
     def _stat_total(self) -> StateType:
@@ -935,19 +939,19 @@ class StatisticsSensor(SensorEntity):
 
     def _stat_value_max(self) -> StateType:
         if len(self.states) > 0:
-            return max(self.states)
+            return self._window.value_max
         return None
 
     def _stat_value_min(self) -> StateType:
         if len(self.states) > 0:
-            return min(self.states)
+            return self._window.value_min
         return None
 
     def _stat_variance(self) -> StateType:
         if len(self.states) == 1:
             return 0.0
         if len(self.states) >= 2:
-            return statistics.variance(self.states)
+            return self._window.variance
         return None
 
     # Statistics for binary sensor
@@ -956,12 +960,8 @@ class StatisticsSensor(SensorEntity):
         if len(self.states) == 1:
             return 100.0 * int(self.states[0] is True)
         if len(self.states) >= 2:
-            on_seconds: float = 0
-            for i in range(1, len(self.states)):
-                if self.states[i - 1] is True:
-                    on_seconds += (self.ages[i] - self.ages[i - 1]).total_seconds()
             age_range_seconds = (self.ages[-1] - self.ages[0]).total_seconds()
-            return 100 / age_range_seconds * on_seconds
+            return 100 / age_range_seconds * self._window.step_area
         return None
 
     def _stat_binary_average_timeless(self) -> StateType:
@@ -971,10 +971,10 @@ class StatisticsSensor(SensorEntity):
         return len(self.states)
 
     def _stat_binary_count_on(self) -> StateType:
-        return self.states.count(True)
+        return int(self._window.sum)
 
     def _stat_binary_count_off(self) -> StateType:
-        return self.states.count(False)
+        return len(self.states) - int(self._window.sum)
 
     def _stat_binary_datetime_newest(self) -> datetime | None:
         return self._stat_datetime_newest()
@@ -984,5 +984,5 @@ class StatisticsSensor(SensorEntity):
 
     def _stat_binary_mean(self) -> StateType:
         if len(self.states) > 0:
-            return 100.0 / len(self.states) * self.states.count(True)
+            return 100.0 / len(self.states) * self._window.sum
         return None
@@ -0,0 +1,209 @@
+"""Rolling window of samples with incrementally updated statistics."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections import deque
+from datetime import datetime
+import math
+import statistics
+
+
+class SampleWindow:
+    """A rolling window of samples.
+
+    The statistics are updated when a sample is added or removed, so
+    reading them does not need a pass over all samples. Sums are kept
+    as running totals with Welford's algorithm for the variance, and a
+    sorted copy of the values gives the median and percentiles.
+
+    Running totals drift when values are removed, so they are rebuilt
+    from the samples once as many samples have been removed as the
+    window holds, which keeps the cost per sample constant.
+    """
+
+    def __init__(self, maxlen: int | None = None) -> None:
+        """Initialize the window."""
+        self.maxlen = maxlen
+        self.states: deque[float | bool] = deque()
+        self.ages: deque[datetime] = deque()
+        self._sorted: list[float | bool] = []
+        # Values which are not a number can't be ordered
+        self._nan_count = 0
+        # Running totals can't remove infinite values
+        self._non_finite_count = 0
+        self._removed = 0
+        self._reset_totals()
+
+    def _reset_totals(self) -> None:
+        """Reset the running totals."""
+        self._sum: float = 0
+        self._mean: float = 0
+        self._m2: float = 0
+        self._sin_sum: float = 0
+        self._cos_sum: float = 0
+        self._sum_differences: float = 0
+        self._sum_differences_nonnegative: float = 0
+        self._step_area: float = 0
+        self._linear_area: float = 0
+
+    def _rebuild_totals(self) -> None:
+        """Rebuild the running totals from the samples."""
+        self._reset_totals()
+        self._removed = 0
+        for count, value in enumerate(self.states, 1):
+            self._add_value(value, count)
+        for i in range(1, len(self.states)):
+            self._add_interval(i - 1, i, 1)
+
+    def _add_value(self, value: float, count: int) -> None:
+        """Add a value to the running totals, count includes the value."""
+        self._sum += value
+        delta = value - self._mean
+        self._mean += delta / count
+        self._m2 += delta * (value - self._mean)
+        # The sine of an infinite value raises instead of returning NaN
+        radians = math.radians(value) if math.isfinite(value) else math.nan
+        self._sin_sum += math.sin(radians)
+        self._cos_sum += math.cos(radians)
+
+    def _add_interval(self, previous: int, current: int, sign: int) -> None:
+        """Add or remove the interval between two samples to the running totals."""
+        previous_value = self.states[previous]
+        value = self.states[current]
+        self._sum_differences += sign * abs(value - previous_value)
+        self._sum_differences_nonnegative += sign * (
+            value - previous_value if value >= previous_value else value
+        )
+        seconds = (self.ages[current] - self.ages[previous]).total_seconds()
+        self._step_area += sign * previous_value * seconds
+        self._linear_area += sign * 0.5 * (value + previous_value) * seconds
+
+    def append(self, value: float | bool, age: datetime) -> None:
+        """Add a sample, removing the oldest sample if the window is full."""
+        if self.maxlen is not None and len(self.states) >= self.maxlen:
+            self.popleft()
+        self.states.append(value)
+        self.ages.append(age)
+        if math.isnan(value):
+            self._nan_count += 1
+        else:
+            insort(self._sorted, value)
+        if not math.isfinite(value):
+            self._non_finite_count += 1
+        self._add_value(value, len(self.states))
+        if len(self.states) > 1:
+            self._add_interval(-2, -1, 1)
+
+    def popleft(self) -> None:
+        """Remove the oldest sample."""
+        value = self.states[0]
+        if len(self.states) > 1:
+            self._add_interval(0, 1, -1)
+        self.states.popleft()
+        self.ages.popleft()
+        if math.isnan(value):
+            self._nan_count -= 1
+        else:
+            del self._sorted[bisect_left(self._sorted, value)]
+        self._removed += 1
+        if not math.isfinite(value):
+            self._non_finite_count -= 1
+        elif not self._non_finite_count and self._removed < len(self.states):
+            self._remove_value(value)
+            return
+        self._rebuild_totals()
+
+    def _remove_value(self, value: float) -> None:
+        """Remove a value from the running totals, the sample is already removed."""
+        self._sum -= value
+        mean = self._mean
+        self._mean -= (value - mean) / len(self.states)
+        self._m2 = max(self._m2 - (value - mean) * (value - self._mean), 0)
+        radians = math.radians(value)
+        self._sin_sum -= math.sin(radians)
+        self._cos_sum -= math.cos(radians)
+
+    def __len__(self) -> int:
+        """Return the number of samples."""
+        return len(self.states)
+
+    @property
+    def sum(self) -> float:
+        """Return the sum of the values."""
+        return self._sum
+
+    @property
+    def mean(self) -> float:
+        """Return the mean of the values."""
+        return self._sum / len(self.states)
+
+    @property
+    def mean_circular(self) -> float:
+        """Return the circular mean of the values in degrees."""
+        return (math.degrees(math.atan2(self._sin_sum, self._cos_sum)) + 360) % 360
+
+    @property
+    def variance(self) -> float:
+        """Return the sample variance of the values, needs two samples."""
+        return self._m2 / (len(self.states) - 1)
+
+    @property
+    def sum_differences(self) -> float:
+        """Return the sum of the absolute differences of consecutive values."""
+        return self._sum_differences
+
+    @property
+    def sum_differences_nonnegative(self) -> float:
+        """Return the sum of the differences, counting a decrease as a reset."""
+        return self._sum_differences_nonnegative
+
+    @property
+    def step_area(self) -> float:
+        """Return the integral of the values over time as a step function."""
+        return self._step_area
+
+    @property
+    def linear_area(self) -> float:
+        """Return the integral of the values over time with linear interpolation."""
+        return self._linear_area
+
+    @property
+    def value_max(self) -> float | bool:
+        """Return the largest value."""
+        if self._nan_count:
+            return max(self.states)
+        return self._sorted[-1]
+
+    @property
+    def value_min(self) -> float | bool:
+        """Return the smallest value."""
+        if self._nan_count:
+            return min(self.states)
+        return self._sorted[0]
+
+    @property
+    def median(self) -> float:
+        """Return the median of the values."""
+        if self._nan_count:
+            return statistics.median(self.states)
+        middle, odd = divmod(len(self._sorted), 2)
+        if odd:
+            return self._sorted[middle]
+        return (self._sorted[middle - 1] + self._sorted[middle]) / 2
+
+    def percentile(self, percentile: int) -> float:
+        """Return a percentile of the values, needs two samples.
+
+        The percentile is interpolated the same way as statistics.quantiles
+        with the exclusive method.
+        """
+        if self._nan_count:
+            return statistics.quantiles(self.states, n=100, method="exclusive")[
+                percentile - 1
+            ]
+        data = self._sorted
+        m = len(data) + 1
+        j = min(max(percentile * m // 100, 1), len(data) - 1)
+        delta = percentile * m - j * 100
+        return (data[j - 1] * (100 - delta) + data[j] * delta) / 100
@@ -16,6 +16,7 @@ from homeassistant.helpers.json import json_bytes
 from homeassistant.util.json import JsonValueType
 
 from .connection import ActiveConnection
+from .const import ENCODING_JSON, ENCODING_MSGPACK
 from .error import Disconnect
 
 if TYPE_CHECKING:
@@ -32,10 +33,16 @@ AUTH_MESSAGE_SCHEMA: Final = vol.Schema(
         vol.Required("type"): TYPE_AUTH,
         vol.Exclusive("api_password", "auth"): str,
         vol.Exclusive("access_token", "auth"): str,
+        vol.Optional("encoding", default=ENCODING_JSON): vol.In(
+            [ENCODING_JSON, ENCODING_MSGPACK]
+        ),
     }
 )
 
 AUTH_OK_MESSAGE = json_bytes({"type": TYPE_AUTH_OK, "ha_version": __version__})
+AUTH_OK_MSGPACK_MESSAGE = json_bytes(
+    {"type": TYPE_AUTH_OK, "ha_version": __version__, "encoding": ENCODING_MSGPACK}
+)
 AUTH_REQUIRED_MESSAGE = json_bytes(
     {"type": TYPE_AUTH_REQUIRED, "ha_version": __version__}
 )
@@ -95,7 +102,13 @@ class AuthPhase:
                     refresh_token.id, self._cancel_ws
                 )
             )
-            await self._send_bytes_text(AUTH_OK_MESSAGE)
+            # The auth_ok message is always sent as JSON, the state diffs
+            # of subscribe_entities are sent in the requested encoding
+            if valid_msg["encoding"] == ENCODING_MSGPACK:
+                conn.use_msgpack = True
+                await self._send_bytes_text(AUTH_OK_MSGPACK_MESSAGE)
+            else:
+                await self._send_bytes_text(AUTH_OK_MESSAGE)
             self._logger.debug("Auth OK")
             process_success_login(self._request)
             return conn
@@ -67,6 +67,7 @@ from .connection import ActiveConnection
 from .messages import construct_result_message
 
 ALL_SERVICE_DESCRIPTIONS_JSON_CACHE = "websocket_api_all_service_descriptions_json"
+COMPRESSED_STATES_SNAPSHOT = "websocket_api_compressed_states_snapshot"
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -78,6 +79,7 @@ def async_register_commands(
 ) -> None:
     """Register commands."""
     async_reg(hass, handle_call_service)
+    async_reg(hass, handle_connection_stats)
     async_reg(hass, handle_entity_source)
     async_reg(hass, handle_execute_script)
     async_reg(hass, handle_fire_event)
@@ -369,7 +371,7 @@ def _send_handle_get_states_response(
 
 @callback
 def _forward_entity_changes(
-    send_message: Callable[[str | bytes | dict[str, Any]], None],
+    send_state_diff_message: Callable[[bytes, Event[EventStateChangedData]], None],
     entity_ids: set[str] | None,
     entity_filter: Callable[[str], bool] | None,
     user: User,
@@ -391,7 +393,122 @@ def _forward_entity_changes(
         and not permissions.check_entity(entity_id, POLICY_READ)
     ):
         return
-    send_message(messages.cached_state_diff_message(message_id_as_bytes, event))
+    send_state_diff_message(message_id_as_bytes, event)
+
+
+class _SerializedStates:
+    """Compressed states of all entities serialized in one encoding."""
+
+    __slots__ = ("dirty", "joined", "serialized")
+
+    def __init__(self, entity_ids: list[str]) -> None:
+        """Initialize with all states waiting to be serialized."""
+        self.serialized: dict[str, bytes] = {}
+        self.dirty: set[str] = set(entity_ids)
+        self.joined: bytes | None = None
+
+
+class _CompressedStatesSnapshot:
+    """Compressed JSON and MessagePack of all states, shared by subscribe_entities.
+
+    The serialized states are patched on every state change and
+    serialized lazily, so building the initial subscribe_entities
+    response only serializes states that changed since the last
+    subscription. The MessagePack states are only serialized once
+    a client that requested MessagePack subscribes.
+    """
+
+    __slots__ = ("_json", "_msgpack", "_states")
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the snapshot from the current states."""
+        self._states = hass.states
+        entity_ids = hass.states.async_entity_ids()
+        self._json = _SerializedStates(entity_ids)
+        self._msgpack = _SerializedStates(entity_ids)
+        # The snapshot lives as long as Home Assistant runs
+        hass.bus.async_listen(EVENT_STATE_CHANGED, self._async_state_changed)
+
+    @callback
+    def _async_state_changed(self, event: Event[EventStateChangedData]) -> None:
+        """Mark the state of an entity as changed."""
+        entity_id = event.data["entity_id"]
+        removed = event.data["new_state"] is None
+        for serialized_states in (self._json, self._msgpack):
+            serialized_states.joined = None
+            if removed:
+                serialized_states.serialized.pop(entity_id, None)
+                serialized_states.dirty.discard(entity_id)
+            else:
+                serialized_states.dirty.add(entity_id)
+
+    @callback
+    def _async_serialize_dirty(
+        self, serialized_states: _SerializedStates, use_msgpack: bool
+    ) -> dict[str, bytes]:
+        """Serialize the states that changed since the last call."""
+        serialized = serialized_states.serialized
+        if not serialized_states.dirty:
+            return serialized
+        states = self._states
+        for entity_id in serialized_states.dirty:
+            if (state := states.get(entity_id)) is None:
+                serialized.pop(entity_id, None)
+                continue
+            try:
+                serialized[entity_id] = (
+                    messages.compressed_state_msgpack_item(state)
+                    if use_msgpack
+                    else state.as_compressed_state_json
+                )
+            except (ValueError, TypeError):
+                serialized.pop(entity_id, None)
+                _LOGGER.error(
+                    "Unable to serialize to JSON. Bad data found at %s",
+                    format_unserializable_data(
+                        find_paths_unserializable_data(state, dump=JSON_DUMP)
+                    ),
+                )
+        serialized_states.dirty.clear()
+        return serialized
+
+    @callback
+    def async_joined(
+        self, entity_allowed: Callable[[str], bool] | None, use_msgpack: bool = False
+    ) -> bytes:
+        """Return the compressed states.
+
+        Only states of entities for which entity_allowed returns
+        True are included. The JSON states are comma separated,
+        the MessagePack states are a map of the entity ids to
+        their states.
+        """
+        serialized_states = self._msgpack if use_msgpack else self._json
+        serialized = self._async_serialize_dirty(serialized_states, use_msgpack)
+        join = messages.msgpack_map if use_msgpack else b",".join
+        if entity_allowed is not None:
+            return join(
+                [
+                    serialized_state
+                    for entity_id, serialized_state in serialized.items()
+                    if entity_allowed(entity_id)
+                ]
+            )
+        if serialized_states.joined is None:
+            serialized_states.joined = join(list(serialized.values()))
+        return serialized_states.joined
+
+
+@callback
+def _async_get_compressed_states_snapshot(
+    hass: HomeAssistant,
+) -> _CompressedStatesSnapshot:
+    """Return the shared compressed states snapshot."""
+    if (snapshot := hass.data.get(COMPRESSED_STATES_SNAPSHOT)) is None:
+        snapshot = hass.data[COMPRESSED_STATES_SNAPSHOT] = _CompressedStatesSnapshot(
+            hass
+        )
+    return cast(_CompressedStatesSnapshot, snapshot)
 
 
 @callback
@@ -412,14 +529,13 @@ def handle_subscribe_entities(
     # We must never await between sending the states and listening for
     # state changed events or we will introduce a race condition
     # where some states are missed
-    states = _async_get_allowed_states(hass, connection)
     msg_id = msg["id"]
     message_id_as_bytes = str(msg_id).encode()
     connection.subscriptions[msg_id] = hass.bus.async_listen(
         EVENT_STATE_CHANGED,
         partial(
             _forward_entity_changes,
-            connection.send_message,
+            connection.send_state_diff_message,
             entity_ids,
             entity_filter,
             connection.user,
@@ -428,49 +544,53 @@ def handle_subscribe_entities(
     )
     connection.send_result(msg_id)
 
-    # JSON serialize here so we can recover if it blows up due to the
-    # state machine containing unserializable data. This command is required
-    # to succeed for the UI to show.
-    try:
-        if entity_ids or entity_filter:
-            serialized_states = [
-                state.as_compressed_state_json
-                for state in states
-                if (not entity_ids or state.entity_id in entity_ids)
-                and (not entity_filter or entity_filter(state.entity_id))
-            ]
-        else:
-            # Fast path when not filtering
-            serialized_states = [state.as_compressed_state_json for state in states]
-    except (ValueError, TypeError):
-        pass
-    else:
-        _send_handle_entities_init_response(
-            connection, message_id_as_bytes, serialized_states
+    entity_allowed = _entities_allowed_filter(
+        connection.user, entity_ids, entity_filter
+    )
+    snapshot = _async_get_compressed_states_snapshot(hass)
+    if connection.use_msgpack:
+        # The cached states are framed without decoding them
+        connection.send_message(
+            messages.entities_init_msgpack_message(
+                message_id_as_bytes,
+                snapshot.async_joined(entity_allowed, use_msgpack=True),
+            )
         )
         return
-
-    serialized_states = []
-    for state in states:
-        try:
-            serialized_states.append(state.as_compressed_state_json)
-        except (ValueError, TypeError):
-            connection.logger.error(
-                "Unable to serialize to JSON. Bad data found at %s",
-                format_unserializable_data(
-                    find_paths_unserializable_data(state, dump=JSON_DUMP)
-                ),
-            )
-
     _send_handle_entities_init_response(
-        connection, message_id_as_bytes, serialized_states
+        connection, message_id_as_bytes, snapshot.async_joined(entity_allowed)
     )
 
 
+def _entities_allowed_filter(
+    user: User,
+    entity_ids: set[str] | None,
+    entity_filter: Callable[[str], bool] | None,
+) -> Callable[[str], bool] | None:
+    """Return a filter for the entities of a subscription.
+
+    Returns None if the subscription includes all entities.
+    """
+    entity_perm: Callable[[str, str], bool] | None = None
+    if not user.is_admin and not user.permissions.access_all_entities(POLICY_READ):
+        entity_perm = user.permissions.check_entity
+    if not entity_ids and not entity_filter and not entity_perm:
+        return None
+
+    def _entity_allowed(entity_id: str) -> bool:
+        return (
+            (not entity_ids or entity_id in entity_ids)
+            and (not entity_filter or entity_filter(entity_id))
+            and (not entity_perm or entity_perm(entity_id, POLICY_READ))
+        )
+
+    return _entity_allowed
+
+
 def _send_handle_entities_init_response(
     connection: ActiveConnection,
     message_id_as_bytes: bytes,
-    serialized_states: list[bytes],
+    joined_serialized_states: bytes,
 ) -> None:
     """Send handle entities init response."""
     connection.send_message(
@@ -479,7 +599,7 @@ def _send_handle_entities_init_response(
                 b'{"id":',
                 message_id_as_bytes,
                 b',"type":"event","event":{"a":{',
-                b",".join(serialized_states),
+                joined_serialized_states,
                 b"}}}",
             )
         )
@@ -765,6 +885,22 @@ async def handle_subscribe_trigger(
     connection.send_result(msg["id"])
 
 
+@callback
+@decorators.websocket_command({vol.Required("type"): "connection_stats"})
+@decorators.require_admin
+def handle_connection_stats(
+    hass: HomeAssistant, connection: ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Handle connection stats command."""
+    connection.send_result(
+        msg["id"],
+        [
+            {"description": handler.description, **handler.stats}
+            for handler in hass.data.get(const.DATA_HANDLERS, ())
+        ],
+    )
+
+
 @decorators.websocket_command(
     {
         vol.Required("type"): "test_condition",
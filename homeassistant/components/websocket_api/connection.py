@@ -4,13 +4,20 @@ from __future__ import annotations
 
 from collections.abc import Callable, Hashable
 from contextvars import ContextVar
+from functools import partial
 from typing import TYPE_CHECKING, Any, Literal
 
 from aiohttp import web
 import voluptuous as vol
 
 from homeassistant.auth.models import RefreshToken, User
-from homeassistant.core import Context, HomeAssistant, callback
+from homeassistant.core import (
+    Context,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    callback,
+)
 from homeassistant.exceptions import HomeAssistantError, Unauthorized
 from homeassistant.helpers.http import current_request
 from homeassistant.util.json import JsonValueType
@@ -20,6 +27,7 @@ from .messages import (
     error_message,
     event_message,
     message_to_json_bytes,
+    message_to_msgpack_bytes,
     result_message,
 )
 from .util import describe_request
@@ -36,6 +44,15 @@ type MessageHandler = Callable[[HomeAssistant, ActiveConnection, dict[str, Any]]
 type BinaryHandler = Callable[[HomeAssistant, ActiveConnection, bytes], None]
 
 
+def _send_cached_state_diff_message(
+    send_message: Callable[[bytes | str | dict[str, Any]], None],
+    message_id_as_bytes: bytes,
+    event: Event[EventStateChangedData],
+) -> None:
+    """Send a state changed event as a state diff message."""
+    send_message(messages.cached_state_diff_message(message_id_as_bytes, event))
+
+
 class ActiveConnection:
     """Handle an active websocket client connection."""
 
@@ -43,11 +60,13 @@ class ActiveConnection:
         "logger",
         "hass",
         "send_message",
+        "send_state_diff_message",
         "user",
         "refresh_token_id",
         "subscriptions",
         "last_id",
         "can_coalesce",
+        "use_msgpack",
         "supported_features",
         "handlers",
         "binary_handlers",
@@ -65,11 +84,17 @@ class ActiveConnection:
         self.logger = logger
         self.hass = hass
         self.send_message = send_message
+        # The websocket handler replaces this to merge state changes
+        # when the client is not keeping up with the messages
+        self.send_state_diff_message: Callable[
+            [bytes, Event[EventStateChangedData]], None
+        ] = partial(_send_cached_state_diff_message, send_message)
         self.user = user
         self.refresh_token_id = refresh_token.id
         self.subscriptions: dict[Hashable, Callable[[], Any]] = {}
         self.last_id = 0
         self.can_coalesce = False
+        self.use_msgpack = False
         self.supported_features: dict[str, float] = {}
         self.handlers: dict[str, tuple[MessageHandler, vol.Schema | Literal[False]]] = (
             self.hass.data[const.DOMAIN]
@@ -129,15 +154,24 @@ class ActiveConnection:
 
         return index + 1, unsub
 
+    def message_to_bytes(self, message: dict[str, Any]) -> bytes:
+        """Serialize a message in the encoding requested by the client.
+
+        Safe to call from an executor to serialize large messages.
+        """
+        if self.use_msgpack:
+            return message_to_msgpack_bytes(message)
+        return message_to_json_bytes(message)
+
     @callback
     def send_result(self, msg_id: int, result: Any | None = None) -> None:
         """Send a result message."""
-        self.send_message(message_to_json_bytes(result_message(msg_id, result)))
+        self.send_message(self.message_to_bytes(result_message(msg_id, result)))
 
     @callback
     def send_event(self, msg_id: int, event: Any | None = None) -> None:
         """Send a event message."""
-        self.send_message(message_to_json_bytes(event_message(msg_id, event)))
+        self.send_message(self.message_to_bytes(event_message(msg_id, event)))
 
     @callback
     def send_error(
@@ -151,7 +185,7 @@ class ActiveConnection:
     ) -> None:
         """Send an error message."""
         self.send_message(
-            message_to_json_bytes(
+            self.message_to_bytes(
                 error_message(
                     msg_id,
                     code,
@@ -34,6 +34,12 @@ MAX_PENDING_MSG: Final = 4096
 # resolve the ready future.
 PENDING_MSG_MAX_FORCE_READY: Final = 256
 
+# Number of pending messages after which state changes of an entity that
+# is already waiting to be sent are merged into the pending message instead
+# of being queued. Merged state changes do not count towards MAX_PENDING_MSG
+# or PENDING_MSG_PEAK since they are bounded by the number of entities.
+PENDING_MSG_MERGE_STATE_DIFFS: Final = 512
+
 ERR_ID_REUSE: Final = "id_reuse"
 ERR_INVALID_FORMAT: Final = "invalid_format"
 ERR_NOT_ALLOWED: Final = "not_allowed"
@@ -56,5 +62,12 @@ SIGNAL_WEBSOCKET_DISCONNECTED: Final = "websocket_disconnected"
 
 # Data used to store the current connection list
 DATA_CONNECTIONS: Final = f"{DOMAIN}.connections"
+# Data used to store the active websocket handlers
+DATA_HANDLERS: Final = f"{DOMAIN}.handlers"
 
 FEATURE_COALESCE_MESSAGES = "coalesce_messages"
+
+# Encodings of the state diffs of subscribe_entities that can be requested
+# in the auth message, all other messages are always sent as JSON
+ENCODING_JSON: Final = "json"
+ENCODING_MSGPACK: Final = "msgpack"
@@ -15,7 +15,13 @@ from aiohttp.http_websocket import WebSocketWriter
 
 from homeassistant.components.http import KEY_HASS, HomeAssistantView
 from homeassistant.const import EVENT_HOMEASSISTANT_STOP
-from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.core import (
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    State,
+    callback,
+)
 from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.event import async_call_later
 from homeassistant.util.async_ import create_eager_task
@@ -24,8 +30,10 @@ from homeassistant.util.json import json_loads
 from .auth import AUTH_REQUIRED_MESSAGE, AuthPhase
 from .const import (
     DATA_CONNECTIONS,
+    DATA_HANDLERS,
     MAX_PENDING_MSG,
     PENDING_MSG_MAX_FORCE_READY,
+    PENDING_MSG_MERGE_STATE_DIFFS,
     PENDING_MSG_PEAK,
     PENDING_MSG_PEAK_TIME,
     SIGNAL_WEBSOCKET_CONNECTED,
@@ -33,7 +41,17 @@ from .const import (
     URL,
 )
 from .error import Disconnect
-from .messages import message_to_json_bytes
+from .messages import (
+    MsgpackBytes,
+    cached_state_diff_message,
+    cached_state_diff_msgpack_message,
+    json_bytes_to_msgpack_bytes,
+    message_to_json_bytes,
+    message_to_msgpack_bytes,
+    msgpack_array,
+    state_diff_message,
+    state_diff_msgpack_message,
+)
 from .util import describe_request
 
 CLOSE_MSG_TYPES = {WSMsgType.CLOSE, WSMsgType.CLOSED, WSMsgType.CLOSING}
@@ -66,6 +84,50 @@ class WebSocketAdapter(logging.LoggerAdapter):
         return f'[{self.extra["connid"]}] {msg}', kwargs
 
 
+class _PendingStateDiff:
+    """State changes of an entity waiting to be sent as a single message."""
+
+    __slots__ = (
+        "entity_id",
+        "message_id_as_bytes",
+        "new_state",
+        "old_state",
+        "use_msgpack",
+    )
+
+    def __init__(
+        self,
+        message_id_as_bytes: bytes,
+        entity_id: str,
+        old_state: State | None,
+        new_state: State | None,
+        use_msgpack: bool,
+    ) -> None:
+        """Initialize the pending state diff."""
+        self.message_id_as_bytes = message_id_as_bytes
+        self.entity_id = entity_id
+        self.old_state = old_state
+        self.new_state = new_state
+        self.use_msgpack = use_msgpack
+
+    def __repr__(self) -> str:
+        """Return the representation."""
+        return f"<_PendingStateDiff {self.entity_id}>"
+
+    def as_bytes(self) -> bytes:
+        """Return the message with the diff of all the merged state changes."""
+        if self.use_msgpack:
+            return state_diff_msgpack_message(
+                self.message_id_as_bytes,
+                self.entity_id,
+                self.old_state,
+                self.new_state,
+            )
+        return state_diff_message(
+            self.message_id_as_bytes, self.entity_id, self.old_state, self.new_state
+        )
+
+
 class WebSocketHandler:
     """Handle an active websocket client connection."""
 
@@ -82,6 +144,9 @@ class WebSocketHandler:
         "_peak_checker_unsub",
         "_connection",
         "_message_queue",
+        "_pending_state_diffs",
+        "_merged_state_diffs",
+        "_use_msgpack",
         "_ready_future",
         "_release_ready_queue_size",
     )
@@ -104,7 +169,13 @@ class WebSocketHandler:
         # to where messages are queued. This allows the implementation
         # to use a deque and an asyncio.Future to avoid the overhead of
         # an asyncio.Queue.
-        self._message_queue: deque[bytes] = deque()
+        self._message_queue: deque[bytes | _PendingStateDiff] = deque()
+        # State diffs in the message queue that further state
+        # changes of the same entity are merged into
+        self._pending_state_diffs: dict[tuple[bytes, str], _PendingStateDiff] = {}
+        self._merged_state_diffs: int = 0
+        # Set after the auth phase if the client requested MessagePack
+        self._use_msgpack = False
         self._ready_future: asyncio.Future[int] | None = None
         self._release_ready_queue_size: int = 0
 
@@ -117,6 +188,15 @@ class WebSocketHandler:
             f"description={self.description}>"
         )
 
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return the message queue statistics of the connection."""
+        return {
+            "queue_depth": len(self._message_queue),
+            "pending_state_diffs": len(self._pending_state_diffs),
+            "merged_state_diffs": self._merged_state_diffs,
+        }
+
     @property
     def description(self) -> str:
         """Return a description of the connection."""
@@ -130,16 +210,19 @@ class WebSocketHandler:
         self,
         connection: ActiveConnection,
         send_bytes_text: Callable[[bytes], Coroutine[Any, Any, None]],
+        send_bytes_binary: Callable[[bytes], Coroutine[Any, Any, None]],
     ) -> None:
         """Write outgoing messages."""
         # Variables are set locally to avoid lookups in the loop
         message_queue = self._message_queue
+        pending_state_diffs = self._pending_state_diffs
         logger = self._logger
         wsock = self._wsock
         loop = self._loop
         is_debug_log_enabled = partial(logger.isEnabledFor, logging.DEBUG)
         debug = logger.debug
         can_coalesce = connection.can_coalesce
+        use_msgpack = connection.use_msgpack
         ready_message_count = len(message_queue)
         # Exceptions if Socket disconnected or cancelled by connection handler
         try:
@@ -157,16 +240,41 @@ class WebSocketHandler:
 
                 if not can_coalesce or ready_message_count == 1:
                     message = message_queue.popleft()
+                    if isinstance(message, _PendingStateDiff):
+                        del pending_state_diffs[
+                            (message.message_id_as_bytes, message.entity_id)
+                        ]
+                        message = message.as_bytes()
                     if is_debug_log_enabled():
                         debug("%s: Sending %s", self.description, message)
-                    await send_bytes_text(message)
+                    if use_msgpack:
+                        await send_bytes_binary(message)
+                    else:
+                        await send_bytes_text(message)
                     continue
 
-                coalesced_messages = b"".join((b"[", b",".join(message_queue), b"]"))
+                if pending_state_diffs:
+                    pending_state_diffs.clear()
+                    messages = [
+                        message.as_bytes()
+                        if isinstance(message, _PendingStateDiff)
+                        else message
+                        for message in message_queue
+                    ]
+                else:
+                    messages = message_queue  # type: ignore[assignment]
+                if use_msgpack:
+                    # The encoded messages are joined without decoding them
+                    coalesced_messages = msgpack_array(messages)
+                else:
+                    coalesced_messages = b"".join((b"[", b",".join(messages), b"]"))
                 message_queue.clear()
                 if is_debug_log_enabled():
                     debug("%s: Sending %s", self.description, coalesced_messages)
-                await send_bytes_text(coalesced_messages)
+                if use_msgpack:
+                    await send_bytes_binary(coalesced_messages)
+                else:
+                    await send_bytes_text(coalesced_messages)
         except asyncio.CancelledError:
             debug("%s: Writer cancelled", self.description)
             raise
@@ -184,6 +292,47 @@ class WebSocketHandler:
             self._peak_checker_unsub()
             self._peak_checker_unsub = None
 
+    @callback
+    def _send_state_diff_message(
+        self, message_id_as_bytes: bytes, event: Event[EventStateChangedData]
+    ) -> None:
+        """Queue sending a state changed event as a state diff message.
+
+        When the client is not keeping up with the messages, state changes
+        of an entity that is already waiting to be sent are merged into
+        the pending message, so the client receives the latest state
+        instead of every intermediate state.
+
+        Async friendly.
+        """
+        if self._closing:
+            return
+        data = event.data
+        key = (message_id_as_bytes, data["entity_id"])
+        if (pending := self._pending_state_diffs.get(key)) is not None:
+            pending.new_state = data["new_state"]
+            self._merged_state_diffs += 1
+            return
+        if len(self._message_queue) < PENDING_MSG_MERGE_STATE_DIFFS:
+            if self._use_msgpack:
+                self._queue_message(
+                    cached_state_diff_msgpack_message(message_id_as_bytes, event)
+                )
+            else:
+                self._queue_message(
+                    cached_state_diff_message(message_id_as_bytes, event)
+                )
+            return
+        pending = _PendingStateDiff(
+            message_id_as_bytes,
+            data["entity_id"],
+            data["old_state"],
+            data["new_state"],
+            self._use_msgpack,
+        )
+        self._pending_state_diffs[key] = pending
+        self._queue_message(pending)
+
     @callback
     def _send_message(self, message: str | bytes | dict[str, Any]) -> None:
         """Queue sending a message to the client.
@@ -197,15 +346,40 @@ class WebSocketHandler:
             # max pending messages.
             return
 
-        if type(message) is not bytes:  # noqa: E721
+        if self._use_msgpack:
+            if type(message) is not MsgpackBytes:
+                if isinstance(message, dict):
+                    message = message_to_msgpack_bytes(message)
+                else:
+                    # Handlers which serialize their messages to JSON
+                    # themselves are converted, so the client only
+                    # receives binary frames
+                    message = json_bytes_to_msgpack_bytes(message)
+        elif type(message) is not bytes:  # noqa: E721
             if isinstance(message, dict):
                 message = message_to_json_bytes(message)
             elif isinstance(message, str):
                 message = message.encode("utf-8")
 
+        self._queue_message(message)  # type: ignore[arg-type]
+
+    @callback
+    def _queue_message(self, message: bytes | _PendingStateDiff) -> None:
+        """Add a serialized message to the queue.
+
+        Closes connection if the client is not reading the messages.
+        """
+        if self._closing:
+            return
+
         message_queue = self._message_queue
         message_queue.append(message)
-        if (queue_size_after_add := len(message_queue)) >= MAX_PENDING_MSG:
+        queue_size_after_add = len(message_queue)
+        # Pending state diffs are bounded by the number of entities
+        # so they do not count towards the limits
+        if (
+            pending_size := queue_size_after_add - len(self._pending_state_diffs)
+        ) >= MAX_PENDING_MSG:
             self._logger.error(
                 (
                     "%s: Client unable to keep up with pending messages. Reached %s pending"
@@ -226,7 +400,7 @@ class WebSocketHandler:
 
         peak_checker_active = self._peak_checker_unsub is not None
 
-        if queue_size_after_add <= PENDING_MSG_PEAK:
+        if pending_size <= PENDING_MSG_PEAK:
             if peak_checker_active:
                 self._cancel_peak_checker()
             return
@@ -267,7 +441,7 @@ class WebSocketHandler:
         """Check that we are no longer above the write peak."""
         self._peak_checker_unsub = None
 
-        if len(self._message_queue) < PENDING_MSG_PEAK:
+        if len(self._message_queue) - len(self._pending_state_diffs) < PENDING_MSG_PEAK:
             return
 
         self._logger.error(
@@ -331,6 +505,7 @@ class WebSocketHandler:
             assert writer is not None
 
         send_bytes_text = partial(writer.send_frame, opcode=WSMsgType.TEXT)
+        send_bytes_binary = partial(writer.send_frame, opcode=WSMsgType.BINARY)
         auth = AuthPhase(
             logger, hass, self._send_message, self._cancel, request, send_bytes_text
         )
@@ -338,7 +513,9 @@ class WebSocketHandler:
         disconnect_warn: str | None = None
 
         try:
-            connection = await self._async_handle_auth_phase(auth, send_bytes_text)
+            connection = await self._async_handle_auth_phase(
+                auth, send_bytes_text, send_bytes_binary
+            )
             self._async_increase_writer_limit(writer)
             await self._async_websocket_command_phase(connection)
         except asyncio.CancelledError:
@@ -373,6 +550,7 @@ class WebSocketHandler:
         self,
         auth: AuthPhase,
         send_bytes_text: Callable[[bytes], Coroutine[Any, Any, None]],
+        send_bytes_binary: Callable[[bytes], Coroutine[Any, Any, None]],
     ) -> ActiveConnection:
         """Handle the auth phase of the websocket connection."""
         await send_bytes_text(AUTH_REQUIRED_MESSAGE)
@@ -403,8 +581,15 @@ class WebSocketHandler:
         # We only start the writer queue after the auth phase is completed
         # since there is no need to queue messages before the auth phase
         self._connection = connection
-        self._writer_task = create_eager_task(self._writer(connection, send_bytes_text))
+        connection.send_state_diff_message = self._send_state_diff_message
+        # All messages are sent as MessagePack binary frames
+        # if the client requested MessagePack
+        self._use_msgpack = connection.use_msgpack
+        self._writer_task = create_eager_task(
+            self._writer(connection, send_bytes_text, send_bytes_binary)
+        )
         self._hass.data[DATA_CONNECTIONS] = self._hass.data.get(DATA_CONNECTIONS, 0) + 1
+        self._hass.data.setdefault(DATA_HANDLERS, set()).add(self)
         async_dispatcher_send(self._hass, SIGNAL_WEBSOCKET_CONNECTED)
 
         self._authenticated = True
@@ -524,6 +709,7 @@ class WebSocketHandler:
 
                 if connection is not None:
                     hass.data[DATA_CONNECTIONS] -= 1
+                    hass.data[DATA_HANDLERS].discard(self)
                     self._connection = None
 
                 async_dispatcher_send(hass, SIGNAL_WEBSOCKET_DISCONNECTED)
@@ -534,6 +720,7 @@ class WebSocketHandler:
                 self._hass = None  # type: ignore[assignment]
                 self._logger = None  # type: ignore[assignment]
                 self._message_queue = None  # type: ignore[assignment]
+                self._pending_state_diffs = None  # type: ignore[assignment]
                 self._handle_task = None
                 self._writer_task = None
                 self._ready_future = None
@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
+from collections.abc import Collection
 from functools import lru_cache
 import logging
+import struct
 from typing import Any, Final
 
+import msgpack
 import voluptuous as vol
 
 from homeassistant.const import (
@@ -15,14 +18,14 @@ from homeassistant.const import (
     COMPRESSED_STATE_LAST_UPDATED,
     COMPRESSED_STATE_STATE,
 )
-from homeassistant.core import CompressedState, Event, EventStateChangedData
+from homeassistant.core import CompressedState, Event, EventStateChangedData, State
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.json import (
     JSON_DUMP,
     find_paths_unserializable_data,
     json_bytes,
 )
-from homeassistant.util.json import format_unserializable_data
+from homeassistant.util.json import format_unserializable_data, json_loads
 
 from . import const
 
@@ -60,6 +63,36 @@ INVALID_JSON_PARTIAL_MESSAGE = json_bytes(
 )
 
 
+class MsgpackBytes(bytes):
+    """A message encoded with MessagePack, sent as a binary frame.
+
+    Connections which requested MessagePack only receive binary frames.
+    Messages which were serialized to JSON by their handler are
+    converted when they are queued.
+    """
+
+    __slots__ = ()
+
+
+INVALID_MSGPACK_PARTIAL_MESSAGE = msgpack.packb(
+    {
+        **BASE_ERROR_MESSAGE,
+        "error": {
+            "code": const.ERR_UNKNOWN_ERROR,
+            "message": "Invalid JSON in response",
+        },
+    }
+)
+
+
+# The keys of an event message after the id, the event is appended
+_MSGPACK_EVENT_MESSAGE_PREFIX: Final = (
+    b"\x82" + msgpack.packb("type") + msgpack.packb("event") + msgpack.packb("event")
+)
+# The event of the initial subscribe_entities message, the states are appended
+_MSGPACK_ENTITY_EVENT_ADD_PREFIX: Final = b"\x81" + msgpack.packb(ENTITY_EVENT_ADD)
+
+
 def result_message(iden: int, result: Any = None) -> dict[str, Any]:
     """Return a success result message."""
     return {"id": iden, "type": const.TYPE_RESULT, "success": True, "result": result}
@@ -162,6 +195,35 @@ def cached_state_diff_message(
     )
 
 
+def cached_state_diff_msgpack_message(
+    message_id_as_bytes: bytes, event: Event[EventStateChangedData]
+) -> MsgpackBytes:
+    """Return an event message encoded with MessagePack.
+
+    Serialize once per message like cached_state_diff_message.
+    """
+    return _add_msgpack_message_id(
+        _partial_cached_state_diff_msgpack_message(event), message_id_as_bytes
+    )
+
+
+@lru_cache(maxsize=128)
+def _partial_cached_state_diff_msgpack_message(
+    event: Event[EventStateChangedData],
+) -> bytes:
+    """Cache and serialize the event to MessagePack.
+
+    The message is constructed without the id which
+    will be added in cached_state_diff_msgpack_message
+    """
+    return (
+        _message_to_msgpack_bytes_or_none(
+            {"type": "event", "event": _state_diff_event(event)}
+        )
+        or INVALID_MSGPACK_PARTIAL_MESSAGE
+    )
+
+
 @lru_cache(maxsize=128)
 def _partial_cached_state_diff_message(event: Event[EventStateChangedData]) -> bytes:
     """Cache and serialize the event to json.
@@ -177,6 +239,52 @@ def _partial_cached_state_diff_message(event: Event[EventStateChangedData]) -> b
     )
 
 
+def state_diff_message(
+    message_id_as_bytes: bytes,
+    entity_id: str,
+    old_state: State | None,
+    new_state: State | None,
+) -> bytes:
+    """Return an event message with the diff between two states of an entity.
+
+    Unlike cached_state_diff_message the message is not cached since
+    it is used to merge multiple state changes of an entity into a
+    single message for one connection.
+    """
+    return b"".join(
+        (
+            (
+                _message_to_json_bytes_or_none(
+                    {
+                        "type": "event",
+                        "event": _state_diff(entity_id, old_state, new_state),
+                    }
+                )
+                or INVALID_JSON_PARTIAL_MESSAGE
+            )[:-1],
+            b',"id":',
+            message_id_as_bytes,
+            b"}",
+        )
+    )
+
+
+def state_diff_msgpack_message(
+    message_id_as_bytes: bytes,
+    entity_id: str,
+    old_state: State | None,
+    new_state: State | None,
+) -> MsgpackBytes:
+    """Return a MessagePack encoded version of state_diff_message."""
+    return _add_msgpack_message_id(
+        _message_to_msgpack_bytes_or_none(
+            {"type": "event", "event": _state_diff(entity_id, old_state, new_state)}
+        )
+        or INVALID_MSGPACK_PARTIAL_MESSAGE,
+        message_id_as_bytes,
+    )
+
+
 def _state_diff_event(
     event: Event[EventStateChangedData],
 ) -> dict[
@@ -185,7 +293,20 @@ def _state_diff_event(
     | dict[str, CompressedState]
     | dict[str, dict[str, dict[str, str | list[str]]]],
 ]:
-    """Convert a state_changed event to the minimal version.
+    """Convert a state_changed event to the minimal version."""
+    data = event.data
+    return _state_diff(data["entity_id"], data["old_state"], data["new_state"])
+
+
+def _state_diff(
+    entity_id: str, old_state: State | None, new_state: State | None
+) -> dict[
+    str,
+    list[str]
+    | dict[str, CompressedState]
+    | dict[str, dict[str, dict[str, str | list[str]]]],
+]:
+    """Convert a state change to the minimal version.
 
     State update example
 
@@ -195,9 +316,9 @@ def _state_diff_event(
         "r": [entity_id,…]
     }
     """
-    if (new_state := event.data["new_state"]) is None:
-        return {ENTITY_EVENT_REMOVE: [event.data["entity_id"]]}
-    if (old_state := event.data["old_state"]) is None:
+    if new_state is None:
+        return {ENTITY_EVENT_REMOVE: [entity_id]}
+    if old_state is None:
         return {ENTITY_EVENT_ADD: {new_state.entity_id: new_state.as_compressed_state}}
     additions: dict[str, Any] = {}
     diff: dict[str, dict[str, Any]] = {STATE_DIFF_ADDITIONS: additions}
@@ -259,3 +380,147 @@ def message_to_json_bytes(message: dict[str, Any]) -> bytes:
             message["id"], const.ERR_UNKNOWN_ERROR, "Invalid JSON in response"
         )
     )
+
+
+def message_to_msgpack_bytes(message: dict[str, Any]) -> MsgpackBytes:
+    """Serialize a websocket message to MessagePack or return an error."""
+    return MsgpackBytes(
+        _message_to_msgpack_bytes_or_none(message)
+        or msgpack.packb(
+            error_message(
+                message["id"], const.ERR_UNKNOWN_ERROR, "Invalid JSON in response"
+            )
+        )
+    )
+
+
+def json_bytes_to_msgpack_bytes(message: bytes) -> MsgpackBytes:
+    """Convert a websocket message serialized to JSON to MessagePack."""
+    return MsgpackBytes(msgpack.packb(json_loads(message)))
+
+
+def construct_event_msgpack_message(
+    message_id_as_bytes: bytes, event: bytes
+) -> MsgpackBytes:
+    """Construct an event message around an event encoded with MessagePack."""
+    return _add_msgpack_message_id(
+        _MSGPACK_EVENT_MESSAGE_PREFIX + event, message_id_as_bytes
+    )
+
+
+def entities_init_msgpack_message(
+    message_id_as_bytes: bytes, states: bytes
+) -> MsgpackBytes:
+    """Construct the initial subscribe_entities message.
+
+    The states are a MessagePack map of the entity ids to their
+    compressed states.
+    """
+    return construct_event_msgpack_message(
+        message_id_as_bytes, _MSGPACK_ENTITY_EVENT_ADD_PREFIX + states
+    )
+
+
+def _msgpack_default(obj: Any) -> Any:
+    """Convert objects MessagePack can't serialize like the JSON encoder does."""
+    return json_loads(json_bytes(obj))
+
+
+def _message_to_msgpack_bytes_or_none(message: dict[str, Any]) -> bytes | None:
+    """Serialize a websocket message to MessagePack or return None."""
+    try:
+        return msgpack.packb(message, default=_msgpack_default)
+    except (ValueError, TypeError, OverflowError):
+        _LOGGER.error(
+            "Unable to serialize to MessagePack. Bad data found at %s",
+            format_unserializable_data(
+                find_paths_unserializable_data(message, dump=JSON_DUMP)
+            ),
+        )
+    return None
+
+
+@lru_cache(maxsize=128)
+def _msgpack_message_id(message_id_as_bytes: bytes) -> bytes:
+    """Return the MessagePack encoded id key and value of a message."""
+    return msgpack.packb("id") + msgpack.packb(int(message_id_as_bytes))
+
+
+def _add_msgpack_message_id(
+    partial_message: bytes, message_id_as_bytes: bytes
+) -> MsgpackBytes:
+    """Add the id to a MessagePack encoded map without the id.
+
+    The number of keys is in the header of the map, which grows
+    from a single byte to three bytes at 16 keys.
+    """
+    header = partial_message[0]
+    if 0x80 <= header < 0x8F:
+        # fixmap of less than 15 keys
+        return MsgpackBytes(
+            b"".join(
+                (
+                    bytes((header + 1,)),
+                    _msgpack_message_id(message_id_as_bytes),
+                    partial_message[1:],
+                )
+            )
+        )
+    if header == 0x8F:
+        count, body = 15, partial_message[1:]
+    elif header == 0xDE:
+        count, body = (
+            struct.unpack_from(">H", partial_message, 1)[0],
+            partial_message[3:],
+        )
+    elif header == 0xDF:
+        count, body = (
+            struct.unpack_from(">I", partial_message, 1)[0],
+            partial_message[5:],
+        )
+    else:
+        raise ValueError("The message is not a MessagePack map")
+    count += 1
+    return MsgpackBytes(
+        b"".join(
+            (
+                struct.pack(">BH", 0xDE, count)
+                if count < 0x10000
+                else struct.pack(">BI", 0xDF, count),
+                _msgpack_message_id(message_id_as_bytes),
+                body,
+            )
+        )
+    )
+
+
+def msgpack_array(messages: Collection[bytes]) -> MsgpackBytes:
+    """Join MessagePack encoded messages into a MessagePack array."""
+    if (count := len(messages)) < 16:
+        header = bytes((0x90 | count,))
+    elif count < 0x10000:
+        header = struct.pack(">BH", 0xDC, count)
+    else:
+        header = struct.pack(">BI", 0xDD, count)
+    return MsgpackBytes(header + b"".join(messages))
+
+
+def msgpack_map(items: Collection[bytes]) -> bytes:
+    """Join MessagePack encoded keys each followed by its value into a map."""
+    if (count := len(items)) < 16:
+        header = bytes((0x80 | count,))
+    elif count < 0x10000:
+        header = struct.pack(">BH", 0xDE, count)
+    else:
+        header = struct.pack(">BI", 0xDF, count)
+    return header + b"".join(items)
+
+
+def compressed_state_msgpack_item(state: State) -> bytes:
+    """Return the entity_id and the compressed state encoded with MessagePack.
+
+    Raises TypeError or ValueError if the state cannot be serialized.
+    """
+    return msgpack.packb(state.entity_id) + msgpack.packb(
+        state.as_compressed_state, default=_msgpack_default
+    )
@@ -12,13 +12,14 @@ from collections.abc import (
     Callable,
     Collection,
     Coroutine,
+    Generator,
     Iterable,
     KeysView,
     Mapping,
     ValuesView,
 )
 import concurrent.futures
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import datetime
 import enum
 import functools
@@ -39,6 +40,7 @@ from typing import (
     cast,
     overload,
 )
+import weakref
 
 from propcache import cached_property, under_cached_property
 from typing_extensions import TypeVar
@@ -46,10 +48,12 @@ import voluptuous as vol
 
 from . import util
 from .const import (
+    ATTR_DEVICE_CLASS,
     ATTR_DOMAIN,
     ATTR_FRIENDLY_NAME,
     ATTR_SERVICE,
     ATTR_SERVICE_DATA,
+    ATTR_UNIT_OF_MEASUREMENT,
     COMPRESSED_STATE_ATTRIBUTES,
     COMPRESSED_STATE_CONTEXT,
     COMPRESSED_STATE_LAST_CHANGED,
@@ -1455,6 +1459,99 @@ class _OneTimeListener(Generic[_DataT]):
         return f"<_OneTimeListener {self.listener_job.target}>"
 
 
+@dataclass(slots=True)
+class _BatchedListener(Generic[_DataT]):
+    """Collect events and deliver them to a listener once per loop iteration."""
+
+    hass: HomeAssistant
+    listener_job: HassJob[[list[Event[_DataT]]], Coroutine[Any, Any, None] | None]
+    pending: list[Event[_DataT]] = field(default_factory=list)
+    flush_handle: asyncio.Handle | None = None
+
+    @callback
+    def __call__(self, event: Event[_DataT]) -> None:
+        """Queue the event and schedule delivery of the batch."""
+        self.pending.append(event)
+        if self.flush_handle is None:
+            self.flush_handle = self.hass.loop.call_soon(self.flush)
+
+    @callback
+    def flush(self) -> None:
+        """Deliver all pending events to the listener."""
+        self.flush_handle = None
+        if not self.pending:
+            return
+        events = self.pending
+        self.pending = []
+        self.hass.async_run_hass_job(self.listener_job, events)
+
+    @callback
+    def cancel(self) -> None:
+        """Drop pending events and cancel the scheduled delivery."""
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        self.pending.clear()
+
+    def __repr__(self) -> str:
+        """Return the representation of the listener and source module."""
+        module = inspect.getmodule(self.listener_job.target)
+        if module:
+            return f"<_BatchedListener {module.__name__}:{self.listener_job.target}>"
+        return f"<_BatchedListener {self.listener_job.target}>"
+
+
+@dataclass(slots=True)
+class EventDispatchStats:
+    """Dispatch statistics for a single event type."""
+
+    fired: int = 0
+    dispatch_time: float = 0.0
+    listener_time: defaultdict[str, float] = field(
+        default_factory=lambda: defaultdict(float)
+    )
+
+
+def _job_target_name(job: HassJob[..., Any]) -> str:
+    """Return a name for the target of a listener job for statistics."""
+    target: Any = job.target
+    while True:
+        if isinstance(target, functools.partial):
+            target = target.func
+        elif isinstance(target, (_OneTimeListener, _BatchedListener)):
+            target = target.listener_job.target
+        else:
+            break
+    module = getattr(target, "__module__", None) or "unknown"
+    name = getattr(target, "__qualname__", None) or type(target).__qualname__
+    return f"{module}.{name}"
+
+
+# Event data key for indexed listeners that is derived from the entity_id
+# when the event data does not contain it
+INDEX_KEY_DOMAIN = "domain"
+
+_IndexedListenersType = dict[str, dict[str, list[_FilterableJobType[Any]]]]
+
+
+def _indexed_jobs(
+    indexed_listeners: _IndexedListenersType, event_data: Mapping[str, Any]
+) -> list[_FilterableJobType[Any]]:
+    """Return the indexed listener jobs matching the event data."""
+    jobs: list[_FilterableJobType[Any]] = []
+    for index_key, jobs_by_value in indexed_listeners.items():
+        value = event_data.get(index_key)
+        if (
+            value is None
+            and index_key == INDEX_KEY_DOMAIN
+            and type(entity_id := event_data.get("entity_id")) is str
+        ):
+            value = entity_id.partition(".")[0]
+        if type(value) is str and (matched := jobs_by_value.get(value)):
+            jobs.extend(matched)
+    return jobs
+
+
 # Empty list, used by EventBus.async_fire_internal
 EMPTY_LIST: list[Any] = []
 
@@ -1469,13 +1566,22 @@ def _verify_event_type_length_or_raise(event_type: EventType[_DataT] | str) -> N
 class EventBus:
     """Allow the firing of and listening for events."""
 
-    __slots__ = ("_debug", "_hass", "_listeners", "_match_all_listeners")
+    __slots__ = (
+        "_debug",
+        "_hass",
+        "_indexed_listeners",
+        "_listeners",
+        "_match_all_listeners",
+        "_stats",
+    )
 
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize a new event bus."""
         self._listeners: defaultdict[
             EventType[Any] | str, list[_FilterableJobType[Any]]
         ] = defaultdict(list)
+        self._indexed_listeners: dict[EventType[Any] | str, _IndexedListenersType] = {}
+        self._stats: dict[EventType[Any] | str, EventDispatchStats] | None = None
         self._match_all_listeners: list[_FilterableJobType[Any]] = []
         self._listeners[MATCH_ALL] = self._match_all_listeners
         self._hass = hass
@@ -1493,7 +1599,46 @@ class EventBus:
 
         This method must be run in the event loop.
         """
-        return {key: len(listeners) for key, listeners in self._listeners.items()}
+        listeners = {key: len(listeners) for key, listeners in self._listeners.items()}
+        for event_type, indexed_listeners in self._indexed_listeners.items():
+            # An indexed listener is stored once for each of its index values
+            listeners[event_type] = listeners.get(event_type, 0) + len(
+                {
+                    id(job)
+                    for jobs_by_value in indexed_listeners.values()
+                    for jobs in jobs_by_value.values()
+                    for job in jobs
+                }
+            )
+        return listeners
+
+    @callback
+    def async_set_dispatch_stats(self, enabled: bool) -> None:
+        """Enable or disable collecting dispatch statistics.
+
+        Collecting statistics adds overhead to every fired event,
+        so it should only be enabled while debugging.
+
+        Disabling discards the collected statistics.
+
+        This method must be run in the event loop.
+        """
+        if not enabled:
+            self._stats = None
+        elif self._stats is None:
+            self._stats = {}
+
+    @callback
+    def async_dispatch_stats(
+        self,
+    ) -> dict[EventType[Any] | str, EventDispatchStats]:
+        """Return the dispatch statistics per event type.
+
+        Returns an empty dict when statistics are not being collected.
+
+        This method must be run in the event loop.
+        """
+        return dict(self._stats) if self._stats is not None else {}
 
     @property
     def listeners(self) -> dict[EventType[Any] | str, int]:
@@ -1563,6 +1708,24 @@ class EventBus:
             match_all_listeners = self._match_all_listeners
         else:
             match_all_listeners = EMPTY_LIST
+        if (
+            event_data is not None
+            and (indexed_listeners := self._indexed_listeners.get(event_type))
+            and (indexed_jobs := _indexed_jobs(indexed_listeners, event_data))
+        ):
+            listeners = listeners + indexed_jobs
+
+        # Statistics are only collected while enabled with async_set_dispatch_stats
+        if self._stats is not None:
+            self._async_fire_with_stats(
+                listeners + match_all_listeners,
+                event_type,
+                event_data,
+                origin,
+                context,
+                time_fired,
+            )
+            return
 
         event: Event[_DataT] | None = None
         for job, event_filter in listeners + match_all_listeners:
@@ -1588,6 +1751,53 @@ class EventBus:
             except Exception:
                 _LOGGER.exception("Error running job: %s", job)
 
+    @callback
+    def _async_fire_with_stats(
+        self,
+        jobs: list[_FilterableJobType[_DataT]],
+        event_type: EventType[_DataT] | str,
+        event_data: _DataT | None,
+        origin: EventOrigin,
+        context: Context | None,
+        time_fired: float | None,
+    ) -> None:
+        """Fire an event while collecting dispatch statistics.
+
+        Coroutine listeners are only timed until they are scheduled.
+        """
+        if TYPE_CHECKING:
+            assert self._stats is not None
+        if (stats := self._stats.get(event_type)) is None:
+            stats = self._stats[event_type] = EventDispatchStats()
+        stats.fired += 1
+        dispatch_start = monotonic()
+        event: Event[_DataT] | None = None
+        for job, event_filter in jobs:
+            if event_filter is not None:
+                try:
+                    if event_data is None or not event_filter(event_data):
+                        continue
+                except Exception:
+                    _LOGGER.exception("Error in event filter")
+                    continue
+
+            if not event:
+                event = Event(
+                    event_type,
+                    event_data,
+                    origin,
+                    time_fired,
+                    context,
+                )
+
+            job_start = monotonic()
+            try:
+                self._hass.async_run_hass_job(job, event)
+            except Exception:
+                _LOGGER.exception("Error running job: %s", job)
+            stats.listener_time[_job_target_name(job)] += monotonic() - job_start
+        stats.dispatch_time += monotonic() - dispatch_start
+
     def listen(
         self,
         event_type: EventType[_DataT] | str,
@@ -1651,6 +1861,124 @@ class EventBus:
                 )
         return self._async_listen_filterable_job(event_type, filterable_job)
 
+    @callback
+    def async_listen_batched(
+        self,
+        event_type: EventType[_DataT] | str,
+        listener: Callable[[list[Event[_DataT]]], Coroutine[Any, Any, None] | None],
+        event_filter: Callable[[_DataT], bool] | None = None,
+    ) -> CALLBACK_TYPE:
+        """Listen for events of a specific type and receive them in batches.
+
+        Instead of being called once per event, the listener is called at most
+        once per event loop iteration with a list of all the matching events
+        that were fired since the previous call, in the order they were fired.
+
+        This is intended for listeners that handle bursts of events, such as
+        EVENT_STATE_CHANGED, where the per-call overhead dominates.
+
+        An optional event_filter, which must be a callable decorated with
+        @callback that returns a boolean value, determines if the event
+        should be added to the batch.
+
+        This method must be run in the event loop.
+        """
+        if event_filter is not None and not is_callback_check_partial(event_filter):
+            raise HomeAssistantError(f"Event filter {event_filter} is not a callback")
+        if event_type == EVENT_STATE_REPORTED and not event_filter:
+            raise HomeAssistantError(f"Event filter is required for event {event_type}")
+        batched_listener: _BatchedListener[_DataT] = _BatchedListener(
+            self._hass, HassJob(listener, f"listen batched {event_type}")
+        )
+        remove = self._async_listen_filterable_job(
+            event_type,
+            (
+                HassJob(
+                    batched_listener,
+                    f"batched listen {event_type} {listener}",
+                    job_type=HassJobType.Callback,
+                ),
+                event_filter,
+            ),
+        )
+
+        @callback
+        def _async_remove_batched_listener() -> None:
+            """Remove the listener and drop any undelivered events."""
+            batched_listener.cancel()
+            remove()
+
+        return _async_remove_batched_listener
+
+    @callback
+    def async_listen_indexed(
+        self,
+        event_type: EventType[_DataT] | str,
+        index_key: str,
+        index_values: Iterable[str],
+        listener: Callable[[Event[_DataT]], Coroutine[Any, Any, None] | None],
+    ) -> CALLBACK_TYPE:
+        """Listen for events of a specific type with a specific data value.
+
+        The listener is only called for events where the event data value
+        for index_key, for example entity_id, device_id or config_entry_id,
+        is one of index_values. Matching listeners are looked up in a
+        dict instead of calling an event filter for every listener.
+
+        The INDEX_KEY_DOMAIN index_key matches the domain of the entity_id
+        in the event data if the event data does not contain a domain.
+
+        This method must be run in the event loop.
+        """
+        # A listener is called once per event for repeated values
+        index_values = tuple(dict.fromkeys(index_values))
+        filterable_job: _FilterableJobType[_DataT] = (
+            HassJob(listener, f"listen indexed {event_type} {index_key}"),
+            None,
+        )
+        jobs_by_value = self._indexed_listeners.setdefault(event_type, {}).setdefault(
+            index_key, {}
+        )
+        for index_value in index_values:
+            jobs_by_value.setdefault(index_value, []).append(filterable_job)
+        return functools.partial(
+            self._async_remove_indexed_listener,
+            event_type,
+            index_key,
+            index_values,
+            filterable_job,
+        )
+
+    @callback
+    def _async_remove_indexed_listener(
+        self,
+        event_type: EventType[_DataT] | str,
+        index_key: str,
+        index_values: tuple[str, ...],
+        filterable_job: _FilterableJobType[_DataT],
+    ) -> None:
+        """Remove an indexed listener.
+
+        This method must be run in the event loop.
+        """
+        try:
+            indexed_listeners = self._indexed_listeners[event_type]
+            jobs_by_value = indexed_listeners[index_key]
+            for index_value in index_values:
+                jobs = jobs_by_value[index_value]
+                jobs.remove(filterable_job)
+                if not jobs:
+                    del jobs_by_value[index_value]
+        except (KeyError, ValueError):
+            _LOGGER.exception(
+                "Unable to remove unknown indexed job listener %s", filterable_job
+            )
+            return
+        if not jobs_by_value:
+            del indexed_listeners[index_key]
+        if not indexed_listeners:
+            del self._indexed_listeners[event_type]
+
     @callback
     def _async_listen_filterable_job(
         self,
@@ -2031,17 +2359,36 @@ class State:
         )
 
 
+type _ClassIndexKey = tuple[str, str | None, str | None]
+
+
+def _class_index_key(state: State) -> _ClassIndexKey:
+    """Return the domain, device class and unit of a state."""
+    attributes = state.attributes
+    device_class = attributes.get(ATTR_DEVICE_CLASS)
+    unit = attributes.get(ATTR_UNIT_OF_MEASUREMENT)
+    return (
+        state.domain,
+        device_class if isinstance(device_class, str) else None,
+        unit if isinstance(unit, str) else None,
+    )
+
+
 class States(UserDict[str, State]):
     """Container for states, maps entity_id -> State.
 
-    Maintains an additional index:
+    Maintains additional indexes:
     - domain -> dict[str, State]
+    - (domain, device_class, unit_of_measurement) -> dict[str, State]
     """
 
     def __init__(self) -> None:
         """Initialize the container."""
         super().__init__()
         self._domain_index: defaultdict[str, dict[str, State]] = defaultdict(dict)
+        self._class_index: defaultdict[_ClassIndexKey, dict[str, State]] = defaultdict(
+            dict
+        )
 
     def values(self) -> ValuesView[State]:
         """Return the underlying values to avoid __iter__ overhead."""
@@ -2049,15 +2396,55 @@ class States(UserDict[str, State]):
 
     def __setitem__(self, key: str, entry: State) -> None:
         """Add an item."""
+        if (old_entry := self.data.get(key)) is not None and (
+            old_entry.attributes is not entry.attributes
+        ):
+            self._remove_from_class_index(old_entry)
         self.data[key] = entry
         self._domain_index[entry.domain][entry.entity_id] = entry
+        self._class_index[_class_index_key(entry)][entry.entity_id] = entry
 
     def __delitem__(self, key: str) -> None:
         """Remove an item."""
         entry = self[key]
         del self._domain_index[entry.domain][entry.entity_id]
+        self._remove_from_class_index(entry)
         super().__delitem__(key)
 
+    def _remove_from_class_index(self, entry: State) -> None:
+        """Remove a state from the class index."""
+        class_key = _class_index_key(entry)
+        index = self._class_index[class_key]
+        del index[entry.entity_id]
+        if not index:
+            del self._class_index[class_key]
+
+    def class_states(
+        self,
+        domain: str,
+        device_class: str | None = None,
+        unit_of_measurement: str | None = None,
+    ) -> Generator[State]:
+        """Get the states of a domain with a device class and unit.
+
+        A device class or unit of None matches any value.
+        """
+        if device_class is not None and unit_of_measurement is not None:
+            if index := self._class_index.get(
+                (domain, device_class, unit_of_measurement)
+            ):
+                yield from index.values()
+            return
+        for (index_domain, index_device_class, index_unit), index in list(
+            self._class_index.items()
+        ):
+            if (
+                index_domain == domain
+                and (device_class is None or index_device_class == device_class)
+                and (unit_of_measurement is None or index_unit == unit_of_measurement)
+            ):
+                yield from index.values()
+
     def domain_entity_ids(self, key: str) -> KeysView[str] | tuple[()]:
         """Get all entity_ids for a domain."""
         # Avoid polluting _domain_index with non-existing domains
@@ -2073,10 +2460,74 @@ class States(UserDict[str, State]):
         return self._domain_index[key].values()
 
 
+_EMPTY_ATTRIBUTES: ReadOnlyDict[str, Any] = ReadOnlyDict()
+
+
+_SCALAR_ATTRIBUTE_TYPES = frozenset({str, int, bool, type(None)})
+
+
+def _attribute_key(value: Any) -> Any:
+    """Return a hashable key of an immutable attribute value with its type.
+
+    Raises TypeError for values which are not scalars or tuples of them.
+    """
+    value_type = type(value)
+    if value_type in _SCALAR_ATTRIBUTE_TYPES:
+        return (value_type, value)
+    if value_type is float:
+        # 0.0 and -0.0 are equal
+        return (float, value.hex())
+    if value_type is tuple:
+        return (tuple, tuple([_attribute_key(item) for item in value]))
+    raise TypeError
+
+
+def _intern_attributes(
+    interned: weakref.WeakValueDictionary[frozenset[Any], ReadOnlyDict[str, Any]],
+    attributes: Mapping[str, Any],
+) -> ReadOnlyDict[str, Any]:
+    """Return a shared ReadOnlyDict for the attributes.
+
+    States with equal attributes share a single ReadOnlyDict as long as
+    any of them is alive. The type of the values, and of the items of
+    tuple values, is part of the key so that equal values of different
+    types, such as 1 and True, are not shared.
+
+    ReadOnlyDict is shallow, so only attributes whose values are all
+    immutable scalars, or tuples of them, are shared. Attributes holding
+    lists, dicts or other mutable values are not shared because changing
+    such a value would change the attributes of every state sharing it.
+    """
+    if not attributes:
+        return _EMPTY_ATTRIBUTES
+    try:
+        key = frozenset(
+            [(name, _attribute_key(value)) for name, value in attributes.items()]
+        )
+    except TypeError:
+        return (
+            attributes if type(attributes) is ReadOnlyDict else ReadOnlyDict(attributes)
+        )
+    if (shared := interned.get(key)) is not None:
+        return shared
+    shared = (
+        attributes if type(attributes) is ReadOnlyDict else ReadOnlyDict(attributes)
+    )
+    interned[key] = shared
+    return shared
+
+
 class StateMachine:
     """Helper class that tracks the state of different entities."""
 
-    __slots__ = ("_states", "_states_data", "_reservations", "_bus", "_loop")
+    __slots__ = (
+        "_states",
+        "_states_data",
+        "_reservations",
+        "_bus",
+        "_loop",
+        "_interned_attributes",
+    )
 
     def __init__(self, bus: EventBus, loop: asyncio.events.AbstractEventLoop) -> None:
         """Initialize state machine."""
@@ -2087,6 +2538,10 @@ class StateMachine:
         self._reservations: set[str] = set()
         self._bus = bus
         self._loop = loop
+        # Attributes shared between states, see _intern_attributes
+        self._interned_attributes: weakref.WeakValueDictionary[
+            frozenset[Any], ReadOnlyDict[str, Any]
+        ] = weakref.WeakValueDictionary()
 
     def entity_ids(self, domain_filter: str | None = None) -> list[str]:
         """List of entity ids that are being tracked."""
@@ -2292,6 +2747,40 @@ class StateMachine:
             timestamp or time.time(),
         )
 
+    @callback
+    def async_set_many(
+        self,
+        entity_states: Iterable[tuple[str, str, Mapping[str, Any] | None]],
+        force_update: bool = False,
+        context: Context | None = None,
+        timestamp: float | None = None,
+    ) -> None:
+        """Set the state of multiple entities at once.
+
+        entity_states is an iterable of (entity_id, state, attributes) tuples.
+
+        All states share the same timestamp and context, which avoids
+        looking up the time and creating a context for every entity.
+        Listeners registered with async_listen_batched receive all the
+        resulting state_changed events in a single call.
+
+        This method must be run in the event loop.
+        """
+        timestamp = timestamp or time.time()
+        if context is None:
+            context = Context(id=ulid_at_time(timestamp))
+        set_internal = self.async_set_internal
+        for entity_id, new_state, attributes in entity_states:
+            set_internal(
+                entity_id.lower(),
+                str(new_state),
+                attributes or {},
+                force_update,
+                context,
+                None,
+                timestamp,
+            )
+
     @callback
     def async_set_internal(
         self,
@@ -2367,6 +2856,10 @@ class StateMachine:
             if TYPE_CHECKING:
                 assert old_state is not None
             attributes = old_state.attributes
+        else:
+            attributes = _intern_attributes(
+                self._interned_attributes, attributes or _EMPTY_ATTRIBUTES
+            )
 
         # This is intentionally called with positional only arguments for performance
         # reasons
@@ -10,10 +10,14 @@ from collections.abc import Callable, Generator, Iterable
 from contextlib import AbstractContextManager
 from contextvars import ContextVar
 from copy import deepcopy
+from dataclasses import dataclass
 from datetime import date, datetime, time, timedelta
 from functools import cache, lru_cache, partial, wraps
+import hashlib
+from importlib.util import MAGIC_NUMBER
 import json
 import logging
+import marshal
 import math
 from operator import contains
 import pathlib
@@ -29,7 +33,7 @@ import weakref
 
 from awesomeversion import AwesomeVersion
 import jinja2
-from jinja2 import pass_context, pass_environment, pass_eval_context
+from jinja2 import nodes, pass_context, pass_environment, pass_eval_context
 from jinja2.runtime import AsyncLoopContext, LoopContext
 from jinja2.sandbox import ImmutableSandboxedEnvironment
 from jinja2.utils import Namespace
@@ -49,6 +53,7 @@ from homeassistant.const import (
     STATE_UNAVAILABLE,
     STATE_UNKNOWN,
     UnitOfLength,
+    __version__,
 )
 from homeassistant.core import (
     Context,
@@ -85,6 +90,7 @@ from . import (
 )
 from .deprecation import deprecated_function
 from .singleton import singleton
+from .storage import Store
 from .translation import async_translate_state
 from .typing import TemplateVarsType
 
@@ -102,6 +108,12 @@ _ENVIRONMENT_STRICT: HassKey[TemplateEnvironment] = HassKey(
     "template.environment_strict"
 )
 _HASS_LOADER = "template.hass_loader"
+_TEMPLATE_CODE_CACHE: HassKey[TemplateCodeCache] = HassKey("template.code_cache")
+
+TEMPLATE_CODE_CACHE_STORAGE_KEY = "core.template_code_cache"
+TEMPLATE_CODE_CACHE_STORAGE_VERSION = 1
+TEMPLATE_CODE_CACHE_SAVE_DELAY = 60
+TEMPLATE_CODE_CACHE_MAX_SIZE = 10000
 
 # Match "simple" ints and floats. -1.0, 1, +5, 5.0
 _IS_NUMERIC = re.compile(r"^[+-]?(?!0\d)\d*(?:\.\d*)?$")
@@ -370,6 +382,191 @@ def _cached_parse_result(render_result: str) -> Any:
     return render_result
 
 
+# Functions, filters and tests that take an entity id as first argument
+_ENTITY_ID_FUNCTIONS = {
+    "expand",
+    "has_value",
+    "is_state",
+    "is_state_attr",
+    "state_attr",
+    "state_translated",
+    "states",
+}
+# Functions and filters that take a domain as first argument
+_DOMAIN_FUNCTIONS = {"states_count_by", "states_mean", "states_sum"}
+_SELECTATTR_EQUAL_TESTS = {"eq", "==", "equalto"}
+
+
+@dataclass(slots=True, frozen=True)
+class TemplateDependencies:
+    """Dependencies of a template derived from its source without rendering.
+
+    all_states is True if the template uses all states in a way that
+    can't be narrowed down to the entities and domains found.
+    """
+
+    entities: frozenset[str]
+    domains: frozenset[str]
+    areas: frozenset[str]
+    all_states: bool
+
+
+class _DependencyCollector:
+    """Collect the dependencies of a parsed template."""
+
+    def __init__(self) -> None:
+        """Initialize the collector."""
+        self.entities: set[str] = set()
+        self.domains: set[str] = set()
+        self.areas: set[str] = set()
+        self.all_states = False
+
+    def visit(self, node: nodes.Node) -> None:
+        """Visit a node and its children."""
+        if isinstance(node, (nodes.Getattr, nodes.Getitem)):
+            if (path := _states_path(node)) is not None:
+                self._add_states_path(path)
+                return
+        elif isinstance(node, nodes.Filter):
+            if node.name == "selectattr" and self._visit_selectattr(node):
+                return
+            if node.name in _ENTITY_ID_FUNCTIONS:
+                self._add_entity_ids(node.node)
+            elif node.name in _DOMAIN_FUNCTIONS:
+                self._add_domain(node.node)
+        elif isinstance(node, nodes.Test):
+            if node.name in _ENTITY_ID_FUNCTIONS:
+                self._add_entity_ids(node.node)
+        elif isinstance(node, nodes.Call) and isinstance(node.node, nodes.Name):
+            name = node.node.name
+            if name in _ENTITY_ID_FUNCTIONS and node.args:
+                for arg in node.args if name == "expand" else node.args[:1]:
+                    self._add_entity_ids(arg)
+            elif name in _DOMAIN_FUNCTIONS and node.args:
+                self._add_domain(node.args[0])
+            elif name == "area_entities" and node.args:
+                if isinstance(area := _const_value(node.args[0]), str):
+                    self.areas.add(area)
+            # The called name is not a reference to all states
+            for child in node.iter_child_nodes(exclude=("node",)):
+                self.visit(child)
+            return
+        elif isinstance(node, nodes.Name) and node.name == "states":
+            # Iterated, counted or passed on as a whole
+            self.all_states = True
+        elif isinstance(
+            node, (nodes.Extends, nodes.FromImport, nodes.Import, nodes.Include)
+        ):
+            # The states used by other templates are not known
+            self.all_states = True
+
+        for child in node.iter_child_nodes():
+            self.visit(child)
+
+    def _add_states_path(self, path: list[str]) -> None:
+        """Add the dependency of an attribute path of states."""
+        if not path:
+            self.all_states = True
+        elif "." in path[0]:
+            self.entities.add(path[0])
+        elif len(path) == 1:
+            self.domains.add(path[0])
+        else:
+            self.entities.add(f"{path[0]}.{path[1]}")
+
+    def _add_domain(self, node: nodes.Node | None) -> None:
+        """Add the domain of a constant argument."""
+        if isinstance(domain := _const_value(node), str) and valid_domain(domain):
+            self.domains.add(domain)
+
+    def _add_entity_ids(self, node: nodes.Node | None) -> None:
+        """Add the entity ids of a constant argument."""
+        value = _const_value(node)
+        for entity_id in value if isinstance(value, (list, tuple)) else (value,):
+            if isinstance(entity_id, str) and valid_entity_id(entity_id):
+                self.entities.add(entity_id)
+
+    def _visit_selectattr(self, node: nodes.Filter) -> bool:
+        """Visit selectattr filtering states by constant entity ids or domains.
+
+        Only the states that pass the filter can change the result,
+        so the template does not depend on all states.
+        """
+        if (
+            not isinstance(node.node, nodes.Name)
+            or node.node.name != "states"
+            or len(node.args) != 3
+        ):
+            return False
+        attr, test, value = (_const_value(arg) for arg in node.args)
+        if test in _SELECTATTR_EQUAL_TESTS:
+            values = [value]
+        elif test == "in" and isinstance(value, (list, tuple)):
+            values = list(value)
+        else:
+            return False
+        if not all(isinstance(value, str) for value in values):
+            return False
+        if attr == "entity_id":
+            self.entities.update(values)
+            return True
+        if attr == "domain":
+            self.domains.update(values)
+            return True
+        return False
+
+
+def _const_value(node: nodes.Node | None) -> Any:
+    """Return the value of a constant node or _SENTINEL."""
+    if isinstance(node, (nodes.Const, nodes.List, nodes.Tuple)):
+        try:
+            return node.as_const()
+        except nodes.Impossible:
+            pass
+    return _SENTINEL
+
+
+def _states_path(node: nodes.Node) -> list[str] | None:
+    """Return the constant attribute path of an attribute access on states."""
+    path: list[str] = []
+    while not isinstance(node, nodes.Name):
+        if isinstance(node, nodes.Getattr):
+            path.append(node.attr)
+        elif isinstance(node, nodes.Getitem) and isinstance(
+            key := _const_value(node.arg), str
+        ):
+            path.append(key)
+        else:
+            return None
+        node = node.node
+    if node.name != "states":
+        return None
+    path.reverse()
+    return path
+
+
+@lru_cache(maxsize=EVAL_CACHE_SIZE)
+def template_dependencies(template: str) -> TemplateDependencies:
+    """Return the dependencies of a template derived from its source.
+
+    The entity ids and domains are only those that can be determined
+    without rendering, like the arguments of states() or is_state() and
+    attribute access on states. Templates with syntax errors have no
+    dependencies.
+    """
+    collector = _DependencyCollector()
+    try:
+        collector.visit(_NO_HASS_ENV.parse(template))
+    except jinja2.TemplateSyntaxError:
+        return TemplateDependencies(frozenset(), frozenset(), frozenset(), False)
+    return TemplateDependencies(
+        frozenset(collector.entities),
+        frozenset(collector.domains),
+        frozenset(collector.areas),
+        collector.all_states,
+    )
+
+
 class RenderInfo:
     """Holds information about a template render."""
 
@@ -445,6 +642,29 @@ class RenderInfo:
         """
         return split_entity_id(entity_id)[0] in self.domains_lifecycle
 
+    def _add_dependencies(
+        self, hass: HomeAssistant, dependencies: TemplateDependencies
+    ) -> None:
+        """Add the dependencies found without rendering the template.
+
+        When all states are only iterated to select constant entity ids
+        or domains, the template does not need to track all states.
+
+        When the render failed, it may have stopped before collecting
+        all entities, so the template also tracks the ones it references.
+        """
+        if self.all_states and not dependencies.all_states:
+            self.all_states = False
+            self.entities.update(dependencies.entities)  # type: ignore[attr-defined]
+            self.domains.update(dependencies.domains)  # type: ignore[attr-defined]
+
+        if self.exception is None:
+            return
+        self.entities.update(dependencies.entities)  # type: ignore[attr-defined]
+        self.domains.update(dependencies.domains)  # type: ignore[attr-defined]
+        for area in dependencies.areas:
+            self.entities.update(area_entities(hass, area))  # type: ignore[attr-defined]
+
     def result(self) -> str:
         """Results of the template computation."""
         if self.exception is not None:
@@ -755,6 +975,10 @@ class Template:
         finally:
             _render_info.reset(token)
 
+        if render_info.all_states or render_info.exception:
+            render_info._add_dependencies(  # noqa: SLF001
+                self.hass, template_dependencies(self.template)
+            )
         render_info._freeze()  # noqa: SLF001
         return render_info
 
@@ -1889,6 +2113,88 @@ def has_value(hass: HomeAssistant, entity_id: str) -> bool:
     )
 
 
+def _class_states(
+    hass: HomeAssistant,
+    domain: str,
+    device_class: str | None,
+    unit_of_measurement: str | None,
+) -> Iterable[State]:
+    """Return the states of a domain with a device class and unit.
+
+    The raw states are returned without wrapping them in a TemplateState,
+    so the whole domain is collected as the dependency instead.
+    """
+    if not valid_domain(domain):
+        raise TemplateError(f"Invalid domain name '{domain}'")
+    if (render_info := _render_info.get()) is not None:
+        render_info.domains.add(domain)  # type: ignore[attr-defined]
+    return hass.states._states.class_states(  # noqa: SLF001
+        domain, device_class, unit_of_measurement
+    )
+
+
+def _numeric_states(states: Iterable[State]) -> Generator[float]:
+    """Return the numeric states, skipping states that are not finite numbers."""
+    for state in states:
+        try:
+            value = float(state.state)
+        except ValueError:
+            continue
+        if math.isfinite(value):
+            yield value
+
+
+def states_sum(
+    hass: HomeAssistant,
+    domain: str,
+    device_class: str | None = None,
+    unit_of_measurement: str | None = None,
+) -> float:
+    """Return the sum of the numeric states of a domain."""
+    return math.fsum(
+        _numeric_states(_class_states(hass, domain, device_class, unit_of_measurement))
+    )
+
+
+def states_mean(
+    hass: HomeAssistant,
+    domain: str,
+    device_class: str | None = None,
+    unit_of_measurement: str | None = None,
+    default: Any = _SENTINEL,
+) -> Any:
+    """Return the arithmetic mean of the numeric states of a domain."""
+    try:
+        return statistics.fmean(
+            _numeric_states(
+                _class_states(hass, domain, device_class, unit_of_measurement)
+            )
+        )
+    except statistics.StatisticsError:
+        if default is _SENTINEL:
+            raise_no_default("states_mean", domain)
+        return default
+
+
+def states_count_by(
+    hass: HomeAssistant,
+    domain: str,
+    attribute: str | None = None,
+    device_class: str | None = None,
+    unit_of_measurement: str | None = None,
+) -> dict[Any, int]:
+    """Count the states of a domain by state or by an attribute."""
+    counts: collections.Counter[Any] = collections.Counter()
+    for state in _class_states(hass, domain, device_class, unit_of_measurement):
+        value = state.state if attribute is None else state.attributes.get(attribute)
+        try:
+            counts[value] += 1
+        except TypeError:
+            # Unhashable attribute values can't be counted
+            continue
+    return dict(counts)
+
+
 def now(hass: HomeAssistant) -> datetime:
     """Record fetching now."""
     if (render_info := _render_info.get()) is not None:
@@ -2808,6 +3114,115 @@ def _load_custom_templates(hass: HomeAssistant) -> dict[str, str]:
     return result
 
 
+async def async_load_template_code_cache(hass: HomeAssistant) -> None:
+    """Load the compiled template code persisted by a previous run."""
+    code_cache = TemplateCodeCache(hass)
+    await code_cache.async_load()
+    hass.data[_TEMPLATE_CODE_CACHE] = code_cache
+
+
+class TemplateCodeCache:
+    """Cache of compiled template code that is persisted across restarts.
+
+    The code is keyed by the environment and a hash of the template source.
+    The whole cache is discarded when Home Assistant or Python is upgraded,
+    since both the code generated by jinja and the marshal format depend on
+    them. Only templates compiled during the current run are saved, so
+    templates that are no longer used are pruned on the next save.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the template code cache."""
+        self.hass = hass
+        self.hits = 0
+        self.misses = 0
+        self._store = Store[dict[str, Any]](
+            hass,
+            TEMPLATE_CODE_CACHE_STORAGE_VERSION,
+            TEMPLATE_CODE_CACHE_STORAGE_KEY,
+            private=True,
+            atomic_writes=True,
+        )
+        self._loaded: dict[str, bytes] = {}
+        self._used: dict[str, bytes] = {}
+        self._save_scheduled = False
+
+    async def async_load(self) -> None:
+        """Load the cache from storage."""
+        if (
+            not (data := await self._store.async_load())
+            or data.get("ha_version") != __version__
+            or data.get("python_magic") != MAGIC_NUMBER.hex()
+        ):
+            return
+        self._loaded = {
+            key: base64.b64decode(code) for key, code in data["code"].items()
+        }
+
+    def get(self, env_key: str, source: str) -> CodeType | None:
+        """Return the compiled code of a template or None if not cached.
+
+        May be called from any thread.
+        """
+        key = _template_code_cache_key(env_key, source)
+        if (code := self._used.get(key) or self._loaded.get(key)) is not None:
+            try:
+                compiled: CodeType = marshal.loads(code)
+            except (EOFError, ValueError, TypeError):
+                _LOGGER.debug("Discarding invalid cached code for %s", source)
+            else:
+                self.hits += 1
+                self._add(key, code)
+                return compiled
+        self.misses += 1
+        return None
+
+    def set(self, env_key: str, source: str, compiled: CodeType) -> None:
+        """Add the compiled code of a template to the cache.
+
+        May be called from any thread.
+        """
+        self._add(_template_code_cache_key(env_key, source), marshal.dumps(compiled))
+
+    def _add(self, key: str, code: bytes) -> None:
+        """Mark code as used and schedule saving the cache."""
+        if key in self._used or len(self._used) >= TEMPLATE_CODE_CACHE_MAX_SIZE:
+            return
+        self._used[key] = code
+        if not self._save_scheduled:
+            self._save_scheduled = True
+            self.hass.loop.call_soon_threadsafe(self._async_schedule_save)
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Schedule saving the cache."""
+        self._store.async_delay_save(self._data_to_save, TEMPLATE_CODE_CACHE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data of the cache to store."""
+        self._save_scheduled = False
+        _LOGGER.debug(
+            "Saving %s compiled templates (hits: %s, misses: %s)",
+            len(self._used),
+            self.hits,
+            self.misses,
+        )
+        return {
+            "ha_version": __version__,
+            "python_magic": MAGIC_NUMBER.hex(),
+            "code": {
+                key: base64.b64encode(code).decode()
+                for key, code in self._used.copy().items()
+            },
+        }
+
+
+def _template_code_cache_key(env_key: str, source: str) -> str:
+    """Return the key of a template in the template code cache."""
+    return f"{env_key}:{hashlib.sha256(source.encode()).hexdigest()}"
+
+
 @singleton(_HASS_LOADER)
 def _get_hass_loader(hass: HomeAssistant) -> HassLoader:
     return HassLoader({})
@@ -2854,6 +3269,16 @@ class TemplateEnvironment(ImmutableSandboxedEnvironment):
         """Initialise template environment."""
         super().__init__(undefined=make_logging_undefined(strict, log_fn))
         self.hass = hass
+        # Environments with a custom log function are short lived
+        # and do not use the persistent template code cache
+        self._code_cache_env_key: str | None = None
+        if hass is not None and log_fn is None:
+            if limited:
+                self._code_cache_env_key = "limited"
+            elif strict:
+                self._code_cache_env_key = "strict"
+            else:
+                self._code_cache_env_key = "default"
         self.template_cache: weakref.WeakValueDictionary[
             str | jinja2.nodes.Template, CodeType | None
         ] = weakref.WeakValueDictionary()
@@ -3068,6 +3493,9 @@ class TemplateEnvironment(ImmutableSandboxedEnvironment):
                 "is_state_attr",
                 "state_attr",
                 "states",
+                "states_count_by",
+                "states_mean",
+                "states_sum",
                 "state_translated",
                 "has_value",
                 "utcnow",
@@ -3097,6 +3525,9 @@ class TemplateEnvironment(ImmutableSandboxedEnvironment):
                 "has_value",
                 "label_id",
                 "label_name",
+                "states_count_by",
+                "states_mean",
+                "states_sum",
             ]
             hass_tests = [
                 "has_value",
@@ -3134,6 +3565,12 @@ class TemplateEnvironment(ImmutableSandboxedEnvironment):
         self.globals["has_value"] = hassfunction(has_value)
         self.filters["has_value"] = self.globals["has_value"]
         self.tests["has_value"] = hassfunction(has_value, pass_eval_context)
+        self.globals["states_sum"] = hassfunction(states_sum)
+        self.filters["states_sum"] = self.globals["states_sum"]
+        self.globals["states_mean"] = hassfunction(states_mean)
+        self.filters["states_mean"] = self.globals["states_mean"]
+        self.globals["states_count_by"] = hassfunction(states_count_by)
+        self.filters["states_count_by"] = self.globals["states_count_by"]
         self.globals["utcnow"] = hassfunction(utcnow)
         self.globals["now"] = hassfunction(now)
         self.globals["relative_time"] = hassfunction(relative_time)
@@ -3209,7 +3646,16 @@ class TemplateEnvironment(ImmutableSandboxedEnvironment):
                 defer_init,
             )
 
-        compiled = super().compile(source)
+        if (
+            isinstance(source, str)
+            and (env_key := self._code_cache_env_key) is not None
+            and (code_cache := self.hass.data.get(_TEMPLATE_CODE_CACHE)) is not None
+        ):
+            if (compiled := code_cache.get(env_key, source)) is None:
+                compiled = super().compile(source)
+                code_cache.set(env_key, source, compiled)
+        else:
+            compiled = super().compile(source)
         self.template_cache[source] = compiled
         return compiled
 
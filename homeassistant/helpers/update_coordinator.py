@@ -171,7 +171,12 @@ class DataUpdateCoordinator(BaseDataUpdateCoordinatorProtocol, Generic[_DataT]):
 
     @callback
     def async_update_listeners(self) -> None:
-        """Update all registered listeners."""
+        """Update all registered listeners.
+
+        The listeners are called in the same event loop iteration, so the
+        state changes they write are delivered as one batch to listeners
+        registered with async_listen_batched.
+        """
         for update_callback, _ in list(self._listeners.values()):
             update_callback()
 
@@ -8,6 +8,10 @@ from collections.abc import Callable
 from contextlib import suppress
 import logging
 from timeit import default_timer as timer
+import tracemalloc
+from unittest.mock import patch
+
+import msgpack
 
 from homeassistant import core
 from homeassistant.const import EVENT_STATE_CHANGED
@@ -16,7 +20,8 @@ from homeassistant.helpers.event import (
     async_track_state_change,
     async_track_state_change_event,
 )
-from homeassistant.helpers.json import JSON_DUMP
+from homeassistant.helpers.json import JSON_DUMP, json_bytes
+from homeassistant.util.read_only_dict import ReadOnlyDict
 
 # mypy: allow-untyped-calls, allow-untyped-defs, no-check-untyped-defs
 # mypy: no-warn-return-any
@@ -308,3 +313,239 @@ async def json_serialize_states(hass):
     start = timer()
     JSON_DUMP(states)
     return timer() - start
+
+
+@benchmark
+async def set_states_shared_attributes(hass):
+    """Set 9000 states with common attribute sets ten times.
+
+    The attributes change with every state so each one is shared
+    with the states before it. Also reports the time taken when the
+    attributes are not shared and, in separate untimed passes, the
+    memory used by the states with and without sharing.
+    """
+    entity_count = 9000
+    attribute_sets = [
+        {
+            "device_class": device_class,
+            "unit_of_measurement": unit,
+            "state_class": "measurement",
+        }
+        for device_class, unit in (
+            ("power", "W"),
+            ("energy", "kWh"),
+            ("temperature", "°C"),
+            ("humidity", "%"),
+        )
+    ]
+
+    def _set_states():
+        for generation in range(10):
+            for idx in range(entity_count):
+                hass.states.async_set(
+                    f"sensor.benchmark_{idx}",
+                    str(generation),
+                    dict(attribute_sets[(idx + generation) % len(attribute_sets)]),
+                )
+
+    def _unshared_attributes(interned, attributes):
+        return ReadOnlyDict(attributes)
+
+    def _states_size():
+        for idx in range(entity_count):
+            hass.states.async_remove(f"sensor.benchmark_{idx}")
+        tracemalloc.start()
+        _set_states()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return size
+
+    start = timer()
+    _set_states()
+    runtime = timer() - start
+    with patch.object(core, "_intern_attributes", _unshared_attributes):
+        start = timer()
+        _set_states()
+        unshared_runtime = timer() - start
+    await hass.async_block_till_done()
+
+    shared_size = _states_size()
+    with patch.object(core, "_intern_attributes", _unshared_attributes):
+        unshared_size = _states_size()
+    await hass.async_block_till_done()
+
+    print(
+        f"Setting {entity_count * 10} states: {runtime:.3f}s with shared"
+        f" attributes, {unshared_runtime:.3f}s without"
+    )
+    print(
+        f"Memory used by {entity_count} states: {shared_size / 1024:.0f} KiB"
+        f" with shared attributes, {unshared_size / 1024:.0f} KiB without"
+    )
+    return runtime
+
+
+@benchmark
+async def websocket_msgpack_state_diffs(hass):
+    """Encode 10k state diff messages with JSON and MessagePack.
+
+    Also reports the size of the state diffs and of the compressed
+    states sent by subscribe_entities in both encodings.
+    """
+    # pylint: disable-next=import-outside-toplevel
+    from homeassistant.components.websocket_api.messages import (
+        state_diff_message,
+        state_diff_msgpack_message,
+    )
+
+    entity_count = 10**4
+    attributes = {
+        "device_class": "power",
+        "unit_of_measurement": "W",
+        "state_class": "measurement",
+        "friendly_name": "Benchmark power",
+    }
+    old_states = [
+        core.State(f"sensor.benchmark_{idx}", "1", attributes)
+        for idx in range(entity_count)
+    ]
+    new_states = [
+        core.State(f"sensor.benchmark_{idx}", "2", attributes)
+        for idx in range(entity_count)
+    ]
+    pairs = list(zip(old_states, new_states, strict=True))
+
+    start = timer()
+    json_size = sum(
+        len(state_diff_message(b"1", old.entity_id, old, new)) for old, new in pairs
+    )
+    json_runtime = timer() - start
+
+    start = timer()
+    msgpack_size = sum(
+        len(state_diff_msgpack_message(b"1", old.entity_id, old, new))
+        for old, new in pairs
+    )
+    msgpack_runtime = timer() - start
+
+    compressed_states = {
+        state.entity_id: state.as_compressed_state for state in new_states
+    }
+    print(
+        f"State diffs: JSON {json_size / 1024:.0f} KiB in {json_runtime:.3f}s,"
+        f" MessagePack {msgpack_size / 1024:.0f} KiB in {msgpack_runtime:.3f}s"
+    )
+    print(
+        f"Compressed states: JSON {len(json_bytes(compressed_states)) / 1024:.0f}"
+        f" KiB, MessagePack {len(msgpack.packb(compressed_states)) / 1024:.0f} KiB"
+    )
+    return msgpack_runtime
+
+
+def _encode_json_and_msgpack(name, message, count):
+    """Print the time and size to encode a message with JSON and MessagePack."""
+    start = timer()
+    for _ in range(count):
+        json_size = len(json_bytes(message))
+    json_runtime = timer() - start
+
+    start = timer()
+    for _ in range(count):
+        msgpack_size = len(msgpack.packb(message))
+    msgpack_runtime = timer() - start
+
+    print(
+        f"{name}: JSON {json_size / 1024:.0f} KiB in {json_runtime:.3f}s,"
+        f" MessagePack {msgpack_size / 1024:.0f} KiB in {msgpack_runtime:.3f}s"
+    )
+    return msgpack_runtime
+
+
+@benchmark
+async def websocket_msgpack_initial_states(hass):
+    """Encode the subscribe_entities initial states of 10k entities 10 times."""
+    attributes = {
+        "device_class": "power",
+        "unit_of_measurement": "W",
+        "state_class": "measurement",
+        "friendly_name": "Benchmark power",
+    }
+    message = {
+        "id": 1,
+        "type": "event",
+        "event": {
+            "a": {
+                f"sensor.benchmark_{idx}": core.State(
+                    f"sensor.benchmark_{idx}", str(idx), attributes
+                ).as_compressed_state
+                for idx in range(10**4)
+            }
+        },
+    }
+    return _encode_json_and_msgpack("Initial states", message, 10)
+
+
+@benchmark
+async def websocket_msgpack_history(hass):
+    """Encode a history response of 10 entities with 10k states each 10 times."""
+    message = {
+        "id": 1,
+        "type": "event",
+        "event": {
+            "states": {
+                f"sensor.benchmark_{entity}": [
+                    {"s": str(idx), "lu": 1700000000.0 + idx * 60}
+                    for idx in range(10**4)
+                ]
+                for entity in range(10)
+            },
+            "start_time": 1700000000.0,
+            "end_time": 1700600000.0,
+        },
+    }
+    return _encode_json_and_msgpack("History", message, 10)
+
+
+@benchmark
+async def recorder_state_changes(hass):
+    """Record 50k state changes into an in-memory SQLite database.
+
+    Also reports the peak recorder backlog while the changes are written.
+    """
+    # pylint: disable=import-outside-toplevel
+    from homeassistant import loader
+    from homeassistant.components import recorder
+    from homeassistant.setup import async_setup_component
+
+    loader.async_setup(hass)
+    await async_setup_component(
+        hass,
+        recorder.DOMAIN,
+        {recorder.DOMAIN: {recorder.CONF_DB_URL: "sqlite://"}},
+    )
+    await hass.async_start()
+    instance = recorder.get_instance(hass)
+    await instance.async_db_ready
+
+    entity_count = 500
+    changes_per_entity = 100
+    attributes = {"device_class": "power", "unit_of_measurement": "W"}
+    peak_backlog = 0
+
+    start = timer()
+    for generation in range(changes_per_entity):
+        for idx in range(entity_count):
+            hass.states.async_set(
+                f"sensor.benchmark_{idx}", str(generation), attributes
+            )
+        # Yield so the recorder thread competes with the producer
+        # like it would with a busy event loop
+        await asyncio.sleep(0)
+        peak_backlog = max(peak_backlog, instance.backlog)
+    while instance.backlog:
+        await asyncio.sleep(0.01)
+    await instance.async_block_till_done()
+    runtime = timer() - start
+
+    print(f"Peak recorder backlog: {peak_backlog}")
+    return runtime
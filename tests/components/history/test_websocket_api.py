@@ -2,14 +2,19 @@
 
 import asyncio
 from datetime import timedelta
+from typing import Any
 from unittest.mock import ANY, patch
 
+from aiohttp import WSMsgType
 from freezegun import freeze_time
+import msgpack
 import pytest
 
 from homeassistant.components import history
 from homeassistant.components.history import websocket_api
 from homeassistant.components.recorder import Recorder
+from homeassistant.components.recorder.downsample import compile_downsampled_states
+from homeassistant.components.recorder.util import session_scope
 from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE, STATE_OFF, STATE_ON
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.event import async_track_state_change_event
@@ -173,6 +178,85 @@ async def test_history_during_period(
     assert sensor_test_history[2]["a"] == {"any": "attr"}
 
 
+@pytest.mark.parametrize(
+    ("resolution", "expected_power", "expected_door"),
+    [
+        (
+            "raw",
+            [("10", None, None), ("30", None, None), ("20", None, None)],
+            ["on", "off", "on"],
+        ),
+        (
+            "auto",
+            [("10", 10, 10), ("30", 30, 30), ("20", 20, 20)],
+            ["on", "off", "on"],
+        ),
+        (
+            "minute",
+            [("10", 10, 10), ("30", 30, 30), ("20", 20, 20)],
+            ["off", "on"],
+        ),
+    ],
+)
+async def test_history_during_period_downsampled(
+    hass: HomeAssistant,
+    recorder_mock: Recorder,
+    hass_ws_client: WebSocketGenerator,
+    resolution: str,
+    expected_power: list[tuple[str, float | None, float | None]],
+    expected_door: list[str],
+) -> None:
+    """Test history_during_period serves wide time ranges from downsampled states."""
+    start = dt_util.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(
+        days=3
+    )
+    recorder_mock.downsample_states = True
+    await async_setup_component(hass, "history", {})
+    await async_recorder_block_till_done(hass)
+    for offset, entity_id, state in (
+        (10, "sensor.power", "10"),
+        (20, "binary_sensor.door", "on"),
+        (40, "binary_sensor.door", "off"),
+        (70, "sensor.power", "30"),
+        (80, "binary_sensor.door", "on"),
+        (130, "sensor.power", "20"),
+    ):
+        with freeze_time(start + timedelta(seconds=offset)):
+            hass.states.async_set(entity_id, state)
+    await async_wait_recording_done(hass)
+
+    def _compile() -> None:
+        with session_scope(hass=hass) as session:
+            compile_downsampled_states(session, start, start + timedelta(minutes=5))
+
+    await recorder_mock.async_add_executor_job(_compile)
+
+    client = await hass_ws_client()
+    await client.send_json(
+        {
+            "id": 1,
+            "type": "history/history_during_period",
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(days=2)).isoformat(),
+            "entity_ids": ["sensor.power", "binary_sensor.door"],
+            "no_attributes": True,
+            "minimal_response": True,
+            "resolution": resolution,
+        }
+    )
+    response = await client.receive_json()
+    assert response["success"]
+    assert [
+        (state["s"], state.get("min"), state.get("max"))
+        for state in response["result"]["sensor.power"]
+    ] == expected_power
+    # Only the last state of each period is kept for states which are not
+    # numeric, so they are only downsampled when asked for explicitly
+    assert [
+        state["s"] for state in response["result"]["binary_sensor.door"]
+    ] == expected_door
+
+
 async def test_history_during_period_impossible_conditions(
     hass: HomeAssistant, recorder_mock: Recorder, hass_ws_client: WebSocketGenerator
 ) -> None:
@@ -543,6 +627,128 @@ async def test_history_stream_historical_only(
     }
 
 
+async def test_history_stream_historical_only_chunked(
+    hass: HomeAssistant, recorder_mock: Recorder, hass_ws_client: WebSocketGenerator
+) -> None:
+    """Test history stream sends the historical states in chunks."""
+    now = dt_util.utcnow()
+    await async_setup_component(hass, "history", {})
+    await async_recorder_block_till_done(hass)
+    for state in ("1", "2", "3"):
+        hass.states.async_set("sensor.one", state)
+        await async_recorder_block_till_done(hass)
+    hass.states.async_set("sensor.two", "on")
+    await async_wait_recording_done(hass)
+    end_time = dt_util.utcnow()
+
+    client = await hass_ws_client()
+    with (
+        patch.object(websocket_api, "HISTORY_STREAM_CHUNK_SIZE", 2),
+        # Reading waits for each chunk to be sent
+        patch.object(websocket_api, "HISTORY_STREAM_PENDING_CHUNKS", 1),
+    ):
+        await client.send_json(
+            {
+                "id": 1,
+                "type": "history/stream",
+                "entity_ids": ["sensor.one", "sensor.two"],
+                "start_time": now.isoformat(),
+                "end_time": end_time.isoformat(),
+                "include_start_time_state": True,
+                "significant_changes_only": False,
+                "no_attributes": True,
+                "minimal_response": True,
+                "chunked": True,
+            }
+        )
+        response = await client.receive_json()
+        assert response["success"]
+
+        chunks = []
+        for _ in range(3):
+            response = await client.receive_json()
+            chunks.append(
+                {
+                    entity_id: [state["s"] for state in states]
+                    for entity_id, states in response["event"]["states"].items()
+                }
+            )
+        response = await client.receive_json()
+
+    assert chunks == [
+        {"sensor.one": ["1", "2"]},
+        {"sensor.one": ["3"]},
+        {"sensor.two": ["on"]},
+    ]
+    assert response["event"] == {
+        "start_time": pytest.approx(now.timestamp()),
+        "end_time": pytest.approx(hass.states.get("sensor.two").last_updated_timestamp),
+        "states": {},
+    }
+
+
+async def test_history_msgpack(
+    hass: HomeAssistant, recorder_mock: Recorder, hass_ws_client: WebSocketGenerator
+) -> None:
+    """Test history results are encoded with MessagePack if requested."""
+    now = dt_util.utcnow()
+
+    await async_setup_component(hass, "history", {})
+    await async_recorder_block_till_done(hass)
+    hass.states.async_set("sensor.test", "on", attributes={"any": "attr"})
+    await async_recorder_block_till_done(hass)
+    hass.states.async_set("sensor.test", "off", attributes={"any": "changed"})
+    await async_wait_recording_done(hass)
+    end_time = dt_util.utcnow()
+
+    client = await hass_ws_client(encoding="msgpack")
+
+    async def receive_msgpack() -> Any:
+        """Receive the next message."""
+        async with asyncio.timeout(3):
+            msg = await client.receive()
+        assert msg.type == WSMsgType.BINARY
+        return msgpack.unpackb(msg.data)
+
+    await client.send_json(
+        {
+            "id": 1,
+            "type": "history/history_during_period",
+            "start_time": now.isoformat(),
+            "entity_ids": ["sensor.test"],
+            "significant_changes_only": False,
+        }
+    )
+    response = await receive_msgpack()
+    assert response["id"] == 1
+    assert response["success"]
+    assert [
+        (state["s"], state["a"]) for state in response["result"]["sensor.test"]
+    ] == [("on", {"any": "attr"}), ("off", {"any": "changed"})]
+
+    await client.send_json(
+        {
+            "id": 2,
+            "type": "history/stream",
+            "start_time": now.isoformat(),
+            "end_time": end_time.isoformat(),
+            "entity_ids": ["sensor.test"],
+            "significant_changes_only": False,
+            "no_attributes": True,
+        }
+    )
+    response = await receive_msgpack()
+    assert response["id"] == 2
+    assert response["success"]
+    response = await receive_msgpack()
+    assert response["id"] == 2
+    assert response["event"]["start_time"] == now.timestamp()
+    assert [state["s"] for state in response["event"]["states"]["sensor.test"]] == [
+        "on",
+        "off",
+    ]
+
+
 async def test_history_stream_significant_domain_historical_only(
     hass: HomeAssistant, recorder_mock: Recorder, hass_ws_client: WebSocketGenerator
 ) -> None:
@@ -82,7 +82,7 @@ async def load_integration(
     config_entry.add_to_hass(hass)
 
     with patch(
-        "homeassistant.components.recorder.history.state_changes_during_period",
+        "homeassistant.components.recorder.history.state_changes_during_period_for_entities",
         _fake_states,
     ):
         await hass.config_entries.async_setup(config_entry.entry_id)
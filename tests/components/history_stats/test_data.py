@@ -0,0 +1,83 @@
+"""Test the history_stats data."""
+
+import random
+
+import pytest
+
+from homeassistant.components.history_stats.data import StateTimeline
+
+ENTITY_STATES = {"on"}
+
+
+def _seconds_and_count(
+    history: list[tuple[float, str]], start: float, end: float, now: float
+) -> tuple[float, int]:
+    """Compute the stats of a period with a pass over the states of the period."""
+    states = [(timestamp, state) for timestamp, state in history if timestamp < start]
+    in_period = [
+        (timestamp, state)
+        for timestamp, state in history
+        if timestamp >= start and (end >= now or timestamp < end)
+    ]
+    if states:
+        # The state at the start of the period is reported at the start
+        in_period.insert(0, (start, states[-1][1]))
+    previous_matches = bool(in_period) and in_period[0][1] in ENTITY_STATES
+    last_timestamp = start
+    elapsed = 0.0
+    match_count = 1 if previous_matches else 0
+    for timestamp, state in in_period:
+        current_matches = state in ENTITY_STATES
+        if previous_matches:
+            elapsed += timestamp - last_timestamp
+        elif current_matches:
+            match_count += 1
+        previous_matches = current_matches
+        last_timestamp = timestamp
+    if previous_matches:
+        elapsed += min(end, now) - last_timestamp
+    return elapsed, match_count
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_timeline_matches_full_pass(seed: int) -> None:
+    """Test the stats of random periods match a pass over the states."""
+    rng = random.Random(seed)
+    history: list[tuple[float, str]] = []
+    timestamp = 1000.0
+    for _ in range(200):
+        timestamp += rng.randint(1, 100)
+        history.append((timestamp, rng.choice(["on", "off", "unavailable"])))
+
+    timeline = StateTimeline(ENTITY_STATES)
+    # Load the middle from the database and add the rest as events and
+    # from a database query for an earlier period
+    timeline.merge(history[50:150])
+    for row in history[150:]:
+        timeline.append(*row)
+    timeline.merge(history[:60])
+    assert len(timeline) == len(history)
+
+    for _ in range(200):
+        start = rng.uniform(900, timestamp + 100)
+        end = start + rng.uniform(0, 5000)
+        now = rng.uniform(start, timestamp + 200)
+        assert timeline.seconds_and_count(start, end, now) == pytest.approx(
+            _seconds_and_count(history, start, end, now)
+        )
+
+    timeline.remove_before(history[100][0])
+    start = history[100][0] + 1
+    assert timeline.seconds_and_count(start, timestamp, timestamp) == pytest.approx(
+        _seconds_and_count(history, start, timestamp, timestamp)
+    )
+    assert len(timeline) == len(history[100:])
+
+
+def test_timeline_ignores_earlier_events() -> None:
+    """Test a state older than the last change is not appended."""
+    timeline = StateTimeline(ENTITY_STATES)
+    timeline.append(10.0, "on")
+    timeline.append(5.0, "off")
+    assert timeline.seconds_and_count(10, 20, 20) == (10.0, 1)
+    assert StateTimeline(ENTITY_STATES).seconds_and_count(0, 20, 20) == (0.0, 0)
@@ -17,7 +17,7 @@ from homeassistant.components.history_stats.const import (
 from homeassistant.components.history_stats.sensor import (
     PLATFORM_SCHEMA as SENSOR_SCHEMA,
 )
-from homeassistant.components.recorder import Recorder
+from homeassistant.components.recorder import Recorder, history
 from homeassistant.const import (
     ATTR_DEVICE_CLASS,
     CONF_ENTITY_ID,
@@ -305,7 +305,7 @@ async def test_measure_multiple(recorder_mock: Recorder, hass: HomeAssistant) ->
         }
 
     with patch(
-        "homeassistant.components.recorder.history.state_changes_during_period",
+        "homeassistant.components.recorder.history.state_changes_during_period_for_entities",
         _fake_states,
     ):
         await async_setup_component(
@@ -384,7 +384,7 @@ async def test_measure(recorder_mock: Recorder, hass: HomeAssistant) -> None:
         }
 
     with patch(
-        "homeassistant.components.recorder.history.state_changes_during_period",
+        "homeassistant.components.recorder.history.state_changes_during_period_for_entities",
         _fake_states,
     ):
         await async_setup_component(
@@ -467,7 +467,7 @@ async def test_async_on_entire_period(
         }
 
     with patch(
-        "homeassistant.components.recorder.history.state_changes_during_period",
+        "homeassistant.components.recorder.history.state_changes_during_period_for_entities",
         _fake_states,
     ):
         await async_setup_component(
@@ -595,7 +595,7 @@ async def test_async_off_entire_period(
     await hass.async_block_till_done()
 
     with patch(
-        "homeassistant.components.recorder.history.state_changes_during_period",
+        "homeassistant.components.recorder.history.state_changes_during_period_for_entities",
         _fake_states,
     ):
         for i in range(1, 5):
@@ -635,7 +635,7 @@ async def test_async_start_from_history_and_switch_to_watching_state_changes_sin
 
     with (
         patch(
-            "homeassistant.components.recorder.history.state_changes_during_period",
+            "homeassistant.components.recorder.history.state_changes_during_period_for_entities",
             _fake_states,
         ),
         freeze_time(start_time),
@@ -736,7 +736,7 @@ async def test_async_start_from_history_and_switch_to_watching_state_changes_sin
 
     with (
         patch(
-            "homeassistant.components.recorder.history.state_changes_during_period",
+            "homeassistant.components.recorder.history.state_changes_during_period_for_entities",
             _fake_states,
         ),
         freeze_time(start_time),
@@ -853,7 +853,7 @@ async def test_async_start_from_history_and_switch_to_watching_state_changes_mul
 
     with (
         patch(
-            "homeassistant.components.recorder.history.state_changes_during_period",
+            "homeassistant.components.recorder.history.state_changes_during_period_for_entities",
             _fake_states,
         ),
         freeze_time(start_time),
@@ -993,7 +993,7 @@ async def test_does_not_work_into_the_future(
         }
 
     with patch(
-        "homeassistant.components.recorder.history.state_changes_during_period",
+        "homeassistant.components.recorder.history.state_changes_during_period_for_entities",
         _fake_states,
     ):
         with freeze_time(start_time):
@@ -1083,7 +1083,7 @@ async def test_does_not_work_into_the_future(
     past_the_window = start_time + timedelta(hours=25)
     with (
         patch(
-            "homeassistant.components.recorder.history.state_changes_during_period",
+            "homeassistant.components.recorder.history.state_changes_during_period_for_entities",
             return_value=[],
         ),
         freeze_time(past_the_window),
@@ -1108,7 +1108,7 @@ async def test_does_not_work_into_the_future(
     past_the_window_with_data = start_time + timedelta(hours=26)
     with (
         patch(
-            "homeassistant.components.recorder.history.state_changes_during_period",
+            "homeassistant.components.recorder.history.state_changes_during_period_for_entities",
             _fake_off_states,
         ),
         freeze_time(past_the_window_with_data),
@@ -1121,7 +1121,7 @@ async def test_does_not_work_into_the_future(
     at_the_next_window_with_data = start_time + timedelta(days=1, hours=23)
     with (
         patch(
-            "homeassistant.components.recorder.history.state_changes_during_period",
+            "homeassistant.components.recorder.history.state_changes_during_period_for_entities",
             _fake_off_states,
         ),
         freeze_time(at_the_next_window_with_data),
@@ -1199,7 +1199,7 @@ async def test_measure_sliding_window(
 
     with (
         patch(
-            "homeassistant.components.recorder.history.state_changes_during_period",
+            "homeassistant.components.recorder.history.state_changes_during_period_for_entities",
             _fake_states,
         ),
         freeze_time(start_time),
@@ -1262,7 +1262,7 @@ async def test_measure_sliding_window(
     past_next_update = start_time + timedelta(minutes=30)
     with (
         patch(
-            "homeassistant.components.recorder.history.state_changes_during_period",
+            "homeassistant.components.recorder.history.state_changes_during_period_for_entities",
             _fake_states,
         ),
         freeze_time(past_next_update),
@@ -1300,7 +1300,7 @@ async def test_measure_from_end_going_backwards(
 
     with (
         patch(
-            "homeassistant.components.recorder.history.state_changes_during_period",
+            "homeassistant.components.recorder.history.state_changes_during_period_for_entities",
             _fake_states,
         ),
         freeze_time(start_time),
@@ -1363,7 +1363,7 @@ async def test_measure_from_end_going_backwards(
     past_next_update = start_time + timedelta(minutes=30)
     with (
         patch(
-            "homeassistant.components.recorder.history.state_changes_during_period",
+            "homeassistant.components.recorder.history.state_changes_during_period_for_entities",
             _fake_states,
         ),
         freeze_time(past_next_update),
@@ -1377,6 +1377,67 @@ async def test_measure_from_end_going_backwards(
     assert hass.states.get("sensor.sensor4").state == "83.3"
 
 
+async def test_sliding_window_loads_only_new_history(
+    recorder_mock: Recorder, hass: HomeAssistant
+) -> None:
+    """Test a moving window loads the history it has not loaded before."""
+    now = dt_util.utcnow().replace(microsecond=0)
+    with freeze_time(now - timedelta(hours=2)) as freezer:
+        hass.states.async_set("binary_sensor.test_id", "off")
+        freezer.move_to(now - timedelta(minutes=50))
+        hass.states.async_set("binary_sensor.test_id", "on")
+        freezer.move_to(now - timedelta(minutes=20))
+        hass.states.async_set("binary_sensor.test_id", "off")
+        await async_wait_recording_done(hass)
+
+    real_state_changes = history.state_changes_during_period_for_entities
+    periods: list[tuple[datetime, datetime]] = []
+
+    def _state_changes(*args, **kwargs):
+        periods.append((args[1], args[2]))
+        return real_state_changes(*args, **kwargs)
+
+    with (
+        patch.object(
+            history, "state_changes_during_period_for_entities", _state_changes
+        ),
+        freeze_time(now) as freezer,
+    ):
+        await async_setup_component(
+            hass,
+            "sensor",
+            {
+                "sensor": [
+                    {
+                        "platform": "history_stats",
+                        "entity_id": "binary_sensor.test_id",
+                        "name": "sensor1",
+                        "state": "on",
+                        "start": "{{ as_timestamp(utcnow()) - 3600 }}",
+                        "end": "{{ utcnow() }}",
+                        "type": "time",
+                    },
+                ]
+            },
+        )
+        await hass.async_block_till_done()
+        await async_update_entity(hass, "sensor.sensor1")
+        await hass.async_block_till_done()
+
+        assert hass.states.get("sensor.sensor1").state == "0.5"
+        assert periods == [(now - timedelta(hours=1), now)]
+
+        freezer.move_to(now + timedelta(minutes=10))
+        async_fire_time_changed(hass, now + timedelta(minutes=10))
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert hass.states.get("sensor.sensor1").state == "0.5"
+    # Only the states recorded after the first load are loaded again
+    assert len(periods) == 2
+    assert now - timedelta(minutes=1) < periods[1][0] <= now
+    assert periods[1][1] == now + timedelta(minutes=10)
+
+
 async def test_measure_cet(recorder_mock: Recorder, hass: HomeAssistant) -> None:
     """Test the history statistics sensor measure with a non-UTC timezone."""
     await hass.config.async_set_time_zone("Europe/Berlin")
@@ -1400,7 +1461,7 @@ async def test_measure_cet(recorder_mock: Recorder, hass: HomeAssistant) -> None
 
     with (
         patch(
-            "homeassistant.components.recorder.history.state_changes_during_period",
+            "homeassistant.components.recorder.history.state_changes_during_period_for_entities",
             _fake_states,
         ),
         freeze_time(start_time),
@@ -1503,7 +1564,7 @@ async def test_end_time_with_microseconds_zeroed(
     with (
         freeze_time(time_200),
         patch(
-            "homeassistant.components.recorder.history.state_changes_during_period",
+            "homeassistant.components.recorder.history.state_changes_during_period_for_entities",
             _fake_states,
         ),
     ):
@@ -1696,7 +1757,7 @@ async def test_history_stats_handles_floored_timestamps(
 
     with (
         patch(
-            "homeassistant.components.recorder.history.state_changes_during_period",
+            "homeassistant.components.recorder.history.state_changes_during_period_for_entities",
             _fake_states,
         ),
         freeze_time(start_time),
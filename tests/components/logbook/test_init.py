@@ -516,6 +516,65 @@ async def test_logbook_describe_event(
     assert event["domain"] == "test_domain"
 
 
+async def test_logbook_reuses_described_context(
+    hass: HomeAssistant, hass_client: ClientSessionGenerator
+) -> None:
+    """Test the description of a context is reused by rows and requests."""
+    described: list[LazyEventPartialState] = []
+
+    def _describe(event):
+        """Describe an event."""
+        described.append(event)
+        return {"name": "Test Name", "message": "tested a message"}
+
+    hass.config.components.add("fake_integration")
+    mock_platform(
+        hass,
+        "fake_integration.logbook",
+        Mock(
+            async_describe_events=(
+                lambda hass, async_describe_event: async_describe_event(
+                    "test_domain",
+                    "some_event",
+                    _describe,
+                )
+            ),
+        ),
+    )
+
+    assert await async_setup_component(hass, "logbook", {})
+    context = ha.Context(id="01GTDGKBCH00GW0X476W5TVDDD")
+    with freeze_time(dt_util.utcnow() - timedelta(seconds=5)):
+        hass.bus.async_fire("some_event", context=context)
+        hass.states.async_set("switch.one", STATE_ON, context=context)
+        hass.states.async_set("switch.two", STATE_ON, context=context)
+        await async_wait_recording_done(hass)
+
+    client = await hass_client()
+    start = dt_util.utcnow().date()
+    start_date = datetime(start.year, start.month, start.day, tzinfo=dt_util.UTC)
+    end_time = start_date + timedelta(hours=24)
+
+    for calls in (2, 3):
+        response = await client.get(
+            f"/api/logbook/{start_date.isoformat()}",
+            params={"end_time": end_time.isoformat()},
+        )
+        results = await response.json()
+        assert [result.get("entity_id") for result in results] == [
+            None,
+            "switch.one",
+            "switch.two",
+        ]
+        for result in results[1:]:
+            assert result["context_domain"] == "test_domain"
+            assert result["context_name"] == "Test Name"
+            assert result["context_message"] == "tested a message"
+        # The event row is described for every request, the context
+        # is only described once
+        assert len(described) == calls
+
+
 @pytest.mark.usefixtures("recorder_mock")
 async def test_exclude_described_event(
     hass: HomeAssistant, hass_client: ClientSessionGenerator
@@ -1,8 +1,18 @@
 """The tests for the logbook component models."""
 
-from unittest.mock import Mock
+from datetime import timedelta
+from unittest.mock import Mock, patch
 
-from homeassistant.components.logbook.models import EventAsRow, LazyEventPartialState
+from freezegun import freeze_time
+
+from homeassistant.components.logbook.models import (
+    CONTEXT_INDEX_TTL,
+    ContextIndex,
+    EventAsRow,
+    LazyEventPartialState,
+    LogbookCursor,
+)
+import homeassistant.util.dt as dt_util
 
 
 def test_lazy_event_partial_state_context() -> None:
@@ -31,3 +41,65 @@ def test_lazy_event_partial_state_context() -> None:
     assert state.event_type == "event_type"
     assert state.entity_id == "entity_id"
     assert state.state == "state"
+
+
+def _context_row(
+    context_id_bin: bytes, row_id: int, time_fired_ts: float
+) -> EventAsRow:
+    """Return a row of a context."""
+    return EventAsRow(
+        row_id=row_id,
+        event_type="event_type",
+        event_data=None,
+        time_fired_ts=time_fired_ts,
+        context_id_bin=context_id_bin,
+        context_user_id_bin=None,
+        context_parent_id_bin=None,
+        state=None,
+        entity_id=None,
+        icon=None,
+        context_only=None,
+        data={},
+        context=Mock(),
+    )
+
+
+def test_context_index() -> None:
+    """Test the context index keeps the origin of a context until it expires."""
+    index = ContextIndex()
+    later = _context_row(b"1234123412341234", 2, 2)
+    origin = _context_row(b"1234123412341234", 1, 1)
+    with freeze_time(dt_util.utcnow()) as freezer:
+        index.add(later, {"context_domain": "later"})
+        assert index.get(later) == {"context_domain": "later"}
+        assert index.get(origin) is None
+
+        index.add(origin, {"context_domain": "origin"})
+        index.add(later, {"context_domain": "later"})
+        assert index.get(origin) == {"context_domain": "origin"}
+        assert index.get(later) is None
+
+        freezer.tick(timedelta(seconds=CONTEXT_INDEX_TTL + 1))
+        assert index.get(origin) is None
+
+        with patch("homeassistant.components.logbook.models.CONTEXT_INDEX_MAX_SIZE", 2):
+            rows = [_context_row(bytes([i] * 16), i, i) for i in range(3)]
+            for row in rows:
+                index.add(row, {"context_domain": str(row.row_id)})
+        assert index.get(rows[0]) is None
+        assert index.get(rows[1]) == {"context_domain": "1"}
+        assert index.get(rows[2]) == {"context_domain": "2"}
+
+        index.clear()
+        assert index.get(rows[2]) is None
+
+
+def test_logbook_cursor_token() -> None:
+    """Test a cursor is restored from its token."""
+    for cursor in (
+        LogbookCursor(1727827200.123456, True, 42),
+        LogbookCursor(1727827200.123456, False, 42),
+    ):
+        assert LogbookCursor.from_token(cursor.to_token()) == cursor
+    # A state and an event with the same time and id are different positions
+    assert LogbookCursor(10.5, True, 42) > LogbookCursor(10.5, False, 42)
@@ -1,18 +1,22 @@
 """The tests for the logbook component."""
 
 import asyncio
+import base64
 from collections.abc import Callable
 from datetime import timedelta
 from typing import Any
 from unittest.mock import ANY, patch
 
+from aiohttp import WSMsgType
 from freezegun import freeze_time
+import msgpack
 import pytest
 
 from homeassistant import core
 from homeassistant.components import logbook, recorder
 from homeassistant.components.automation import ATTR_SOURCE, EVENT_AUTOMATION_TRIGGERED
-from homeassistant.components.logbook import websocket_api
+from homeassistant.components.logbook import processor, websocket_api
+from homeassistant.components.logbook.models import LogbookCursor
 from homeassistant.components.recorder import Recorder
 from homeassistant.components.recorder.util import get_instance
 from homeassistant.components.script import EVENT_SCRIPT_STARTED
@@ -292,6 +296,88 @@ async def test_get_events(
     assert isinstance(results[0]["when"], float)
 
 
+async def test_get_events_msgpack(
+    recorder_mock: Recorder, hass: HomeAssistant, hass_ws_client: WebSocketGenerator
+) -> None:
+    """Test logbook results are encoded with MessagePack if requested."""
+    now = dt_util.utcnow()
+    await asyncio.gather(
+        *[
+            async_setup_component(hass, comp, {})
+            for comp in ("homeassistant", "logbook")
+        ]
+    )
+    await async_recorder_block_till_done(hass)
+
+    hass.states.async_set("light.kitchen", STATE_OFF)
+    await hass.async_block_till_done()
+    hass.states.async_set("light.kitchen", STATE_ON)
+    await hass.async_block_till_done()
+    hass.states.async_set("light.kitchen", STATE_OFF)
+    await async_wait_recording_done(hass)
+    end_time = dt_util.utcnow()
+
+    client = await hass_ws_client(encoding="msgpack")
+
+    async def receive_msgpack() -> Any:
+        """Receive the next message."""
+        async with asyncio.timeout(3):
+            msg = await client.receive()
+        assert msg.type == WSMsgType.BINARY
+        return msgpack.unpackb(msg.data)
+
+    await client.send_json(
+        {
+            "id": 1,
+            "type": "logbook/get_events",
+            "start_time": now.isoformat(),
+            "entity_ids": ["light.kitchen"],
+        }
+    )
+    response = await receive_msgpack()
+    assert response["id"] == 1
+    assert response["success"]
+    assert [(event["entity_id"], event["state"]) for event in response["result"]] == [
+        ("light.kitchen", "on"),
+        ("light.kitchen", "off"),
+    ]
+    assert isinstance(response["result"][0]["when"], float)
+
+    await client.send_json(
+        {
+            "id": 2,
+            "type": "logbook/get_events",
+            "start_time": now.isoformat(),
+            "entity_ids": ["light.kitchen"],
+            "limit": 1,
+        }
+    )
+    response = await receive_msgpack()
+    assert response["id"] == 2
+    assert response["success"]
+    assert [event["state"] for event in response["result"]["events"]] == ["off"]
+    assert isinstance(response["result"]["next_cursor"], str)
+
+    await client.send_json(
+        {
+            "id": 3,
+            "type": "logbook/event_stream",
+            "start_time": now.isoformat(),
+            "end_time": end_time.isoformat(),
+            "entity_ids": ["light.kitchen"],
+        }
+    )
+    response = await receive_msgpack()
+    assert response["id"] == 3
+    assert response["success"]
+    response = await receive_msgpack()
+    assert response["id"] == 3
+    assert [event["state"] for event in response["event"]["events"]] == [
+        "on",
+        "off",
+    ]
+
+
 async def test_get_events_entities_filtered_away(
     recorder_mock: Recorder, hass: HomeAssistant, hass_ws_client: WebSocketGenerator
 ) -> None:
@@ -453,6 +539,150 @@ async def test_get_events_invalid_filters(
     assert response["error"]["code"] == "invalid_format"
 
 
+@pytest.mark.parametrize("context_rows", [0, processor.PAGE_CONTEXT_ROWS])
+async def test_get_events_pages(
+    recorder_mock: Recorder,
+    hass: HomeAssistant,
+    hass_ws_client: WebSocketGenerator,
+    context_rows: int,
+) -> None:
+    """Test logbook get_events pages back through the events with a cursor."""
+    start = dt_util.utcnow() - timedelta(days=3)
+    await async_setup_component(hass, "logbook", {})
+    await async_recorder_block_till_done(hass)
+
+    with freeze_time(start) as freezer:
+        hass.states.async_set("light.kitchen", STATE_OFF)
+        hass.states.async_set("light.other", STATE_OFF)
+        await hass.async_block_till_done()
+        # Spread over windows of a growing size
+        for index, minutes in enumerate((1, 2, 30, 90, 600, 2000, 2001, 4000)):
+            freezer.move_to(start + timedelta(minutes=minutes))
+            state = STATE_OFF if index % 2 else STATE_ON
+            hass.states.async_set("light.kitchen", state)
+            hass.states.async_set("light.other", state)
+            # Events and states at the same time
+            logbook.async_log_entry(
+                hass, "Kitchen", f"entry {index}", "light", "light.kitchen"
+            )
+            await hass.async_block_till_done()
+        await async_wait_recording_done(hass)
+
+    client = await hass_ws_client()
+    for msg_id, entity_ids in ((1, ["light.kitchen"]), (10, None)):
+        base_msg: dict[str, Any] = {
+            "type": "logbook/get_events",
+            "start_time": start.isoformat(),
+        }
+        if entity_ids:
+            base_msg["entity_ids"] = entity_ids
+        await client.send_json({"id": msg_id, **base_msg})
+        response = await client.receive_json()
+        assert response["success"]
+        expected = response["result"]
+        assert len(expected) >= 8
+
+        pages: list[list[dict[str, Any]]] = []
+        cursor: str | None = None
+        while True:
+            msg_id += 1
+            with patch.object(processor, "PAGE_CONTEXT_ROWS", context_rows):
+                await client.send_json(
+                    {
+                        "id": msg_id,
+                        **base_msg,
+                        "limit": 3,
+                        **({"cursor": cursor} if cursor else {}),
+                    }
+                )
+                response = await client.receive_json()
+            assert response["success"]
+            pages.append(response["result"]["events"])
+            if not (cursor := response["result"]["next_cursor"]):
+                break
+
+        assert all(len(page) <= 3 for page in pages)
+        # Pages go back in time with the events of a page in time order
+        assert [event for page in reversed(pages) for event in page] == expected
+
+
+async def test_get_events_page_window_bounds(
+    recorder_mock: Recorder, hass: HomeAssistant, hass_ws_client: WebSocketGenerator
+) -> None:
+    """Test an event between the bounds of two windows is on the page once."""
+    end = dt_util.utcnow().replace(microsecond=0)
+    await async_setup_component(hass, "logbook", {})
+    await async_recorder_block_till_done(hass)
+
+    window_start = (end - processor.PAGE_WINDOW).timestamp()
+    hass.states.async_set("light.kitchen", STATE_OFF, timestamp=window_start - 3600)
+    hass.states.async_set("light.kitchen", STATE_ON, timestamp=window_start + 5e-7)
+    await async_wait_recording_done(hass)
+
+    client = await hass_ws_client()
+    await client.send_json(
+        {
+            "id": 1,
+            "type": "logbook/get_events",
+            "start_time": (end - timedelta(hours=4)).isoformat(),
+            "end_time": end.isoformat(),
+            "entity_ids": ["light.kitchen"],
+            "limit": 5,
+        }
+    )
+    response = await client.receive_json()
+    assert response["success"]
+    assert [event["state"] for event in response["result"]["events"]] == [STATE_ON]
+    assert response["result"]["next_cursor"] is None
+
+
+def _cursor_token(token: str) -> str:
+    """Return a cursor token with its content."""
+    return base64.urlsafe_b64encode(token.encode()).decode()
+
+
+async def test_get_events_invalid_cursor(
+    recorder_mock: Recorder, hass: HomeAssistant, hass_ws_client: WebSocketGenerator
+) -> None:
+    """Test get_events with an invalid cursor."""
+    now = dt_util.utcnow()
+    await async_setup_component(hass, "logbook", {})
+    await async_recorder_block_till_done(hass)
+
+    client = await hass_ws_client()
+    for msg_id, extra in enumerate(
+        (
+            {"cursor": "cats", "limit": 2},
+            {"cursor": LogbookCursor(10.5, False, 42).to_token()},
+            *(
+                {"cursor": _cursor_token(token), "limit": 2}
+                for token in (
+                    "10.5:42",
+                    "nan:0:42",
+                    "inf:1:42",
+                    "-inf:0:42",
+                    "1e20:0:42",
+                    "-1:0:42",
+                    "10.5:2:42",
+                    "10.5:0:-42",
+                )
+            ),
+        ),
+        1,
+    ):
+        await client.send_json(
+            {
+                "id": msg_id,
+                "type": "logbook/get_events",
+                "start_time": now.isoformat(),
+                **extra,
+            }
+        )
+        response = await client.receive_json()
+        assert not response["success"]
+        assert response["error"]["code"] == "invalid_cursor"
+
+
 async def test_get_events_with_device_ids(
     recorder_mock: Recorder,
     hass: HomeAssistant,
@@ -20,11 +20,13 @@ from homeassistant.components.profiler import (
     CONF_SECONDS,
     SERVICE_DUMP_LOG_OBJECTS,
     SERVICE_LOG_CURRENT_TASKS,
+    SERVICE_LOG_EVENT_BUS_STATS,
     SERVICE_LOG_EVENT_LOOP_SCHEDULED,
     SERVICE_LOG_THREAD_FRAMES,
     SERVICE_LRU_STATS,
     SERVICE_MEMORY,
     SERVICE_SET_ASYNCIO_DEBUG,
+    SERVICE_SET_EVENT_BUS_STATS,
     SERVICE_START,
     SERVICE_START_LOG_OBJECT_SOURCES,
     SERVICE_START_LOG_OBJECTS,
@@ -33,7 +35,7 @@ from homeassistant.components.profiler import (
 )
 from homeassistant.components.profiler.const import DOMAIN
 from homeassistant.const import CONF_SCAN_INTERVAL, CONF_TYPE
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 import homeassistant.util.dt as dt_util
 
@@ -468,3 +470,48 @@ async def test_set_asyncio_debug(
 
     assert await hass.config_entries.async_unload(entry.entry_id)
     await hass.async_block_till_done()
+
+
+async def test_event_bus_stats(
+    hass: HomeAssistant, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test collecting and logging event bus stats."""
+
+    entry = MockConfigEntry(domain=DOMAIN)
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert hass.services.has_service(DOMAIN, SERVICE_SET_EVENT_BUS_STATS)
+    assert hass.services.has_service(DOMAIN, SERVICE_LOG_EVENT_BUS_STATS)
+
+    @callback
+    def _expensive_listener(event):
+        """Listen for test events."""
+
+    hass.bus.async_listen("profiler_test_event", _expensive_listener)
+
+    await hass.services.async_call(
+        DOMAIN, SERVICE_SET_EVENT_BUS_STATS, {}, blocking=True
+    )
+    hass.bus.async_fire("profiler_test_event")
+    hass.bus.async_fire("profiler_test_event")
+    await hass.async_block_till_done()
+
+    stats = hass.bus.async_dispatch_stats()["profiler_test_event"]
+    assert stats.fired == 2
+
+    await hass.services.async_call(
+        DOMAIN, SERVICE_LOG_EVENT_BUS_STATS, {}, blocking=True
+    )
+    assert "Event profiler_test_event: 1 listeners, fired 2 times" in caplog.text
+    assert "_expensive_listener" in caplog.text
+
+    await hass.services.async_call(
+        DOMAIN, SERVICE_SET_EVENT_BUS_STATS, {CONF_ENABLED: False}, blocking=True
+    )
+    assert hass.bus.async_dispatch_stats() == {}
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
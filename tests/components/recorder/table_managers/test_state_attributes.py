@@ -0,0 +1,195 @@
+"""Test state attributes table manager."""
+
+import asyncio
+from concurrent.futures import Future
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.components.recorder import Recorder
+from homeassistant.components.recorder.db_schema import StateAttributes
+from homeassistant.components.recorder.table_managers.state_attributes import (
+    MIN_FILTER_CAPACITY,
+    HashFilter,
+)
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.core import HomeAssistant
+
+from ..common import async_wait_recording_done
+
+
+async def _async_wait_hash_filter_built(
+    hass: HomeAssistant, recorder_mock: Recorder, futures: list[Future[Any]]
+) -> None:
+    """Wait for the hash filter to be built and used by the recorder."""
+    for future in futures:
+        await asyncio.wrap_future(future)
+    await async_wait_recording_done(hass)
+
+
+def test_hash_filter() -> None:
+    """Test the hash filter tells which hashes are certainly not added."""
+    hash_filter = HashFilter(4)
+    for data_hash in (0, 1, 2**31, 2**32 - 1):
+        hash_filter.add(data_hash)
+    assert all(data_hash in hash_filter for data_hash in (0, 1, 2**31, 2**32 - 1))
+    assert sum(data_hash in hash_filter for data_hash in range(2, 1002)) < 50
+    assert not hash_filter.saturated
+    hash_filter.add(3)
+    assert hash_filter.saturated
+
+
+async def test_prefetch_and_skip_new_attributes(
+    hass: HomeAssistant, recorder_mock: Recorder
+) -> None:
+    """Test the cache is prefetched and new attributes skip the database lookup."""
+    hass.states.async_set("sensor.one", "on", {"attr": 1})
+    hass.states.async_set("sensor.two", "on", {"attr": 2})
+    await async_wait_recording_done(hass)
+    manager = recorder_mock.state_attributes_manager
+    new_shared_attrs = '{"attr":3}'
+    new_hash = StateAttributes.hash_shared_attrs_bytes(new_shared_attrs.encode())
+
+    def _prefetch() -> dict[str, int]:
+        manager.reset()
+        with session_scope(session=recorder_mock.get_session()) as session:
+            manager.prefetch(session)
+            known = {
+                row.shared_attrs: row.attributes_id
+                for row in session.query(StateAttributes)
+            }
+            assert {
+                shared_attrs: manager.get_from_cache(shared_attrs)
+                for shared_attrs in known
+            } == known
+            return known
+
+    def _get_new() -> dict[str, int | None]:
+        with session_scope(session=recorder_mock.get_session()) as session:
+            return manager.get_many(((new_shared_attrs, new_hash),), session)
+
+    add_executor_job = recorder_mock.add_executor_job
+    futures: list[Future[Any]] = []
+
+    def _add_executor_job(target: Any) -> Future[Any]:
+        futures.append(future := add_executor_job(target))
+        return future
+
+    with patch.object(recorder_mock, "add_executor_job", _add_executor_job):
+        known = await recorder_mock.async_add_executor_job(_prefetch)
+    assert len(known) == 2
+    # The hash filter is built in the executor and not used until it is done
+    assert len(futures) == 1
+    assert manager._hash_filter is None
+    await _async_wait_hash_filter_built(hass, recorder_mock, futures)
+    assert manager._hash_filter is not None
+    assert manager._hashes_added_while_building is None
+
+    stats_before = manager.cache_stats()
+    new = await recorder_mock.async_add_executor_job(_get_new)
+    assert new == {new_shared_attrs: None}
+    stats = manager.cache_stats()
+    assert stats.misses == stats_before.misses + 1
+    assert stats.skipped_lookups == stats_before.skipped_lookups + 1
+
+
+async def test_cache_grows_with_evictions_and_misses(
+    hass: HomeAssistant, recorder_mock: Recorder
+) -> None:
+    """Test the cache grows when attributes are evicted and lookups miss."""
+    await async_wait_recording_done(hass)
+    manager = recorder_mock.state_attributes_manager
+
+    def _evict_and_miss() -> int:
+        manager.reset()
+        evictions = manager.cache_stats().evictions
+        manager._id_map.set_size(2)
+        for attributes_id in range(3):
+            manager._id_map[f'{{"attr":{attributes_id}}}'] = attributes_id
+        with session_scope(session=recorder_mock.get_session()) as session:
+            manager.get_many((('{"attr":0}', 1), ('{"attr":4}', 2)), session)
+        return evictions
+
+    evictions = await recorder_mock.async_add_executor_job(_evict_and_miss)
+    assert manager.cache_stats().evictions == evictions + 1
+    manager.adjust_lru_size(1)
+    assert manager._id_map.get_size() == 4
+
+    # Without new evictions the cache does not grow
+    manager.adjust_lru_size(1)
+    assert manager._id_map.get_size() == 4
+
+
+async def test_prefetch_skips_corrupt_compressed_attributes(
+    hass: HomeAssistant, recorder_mock: Recorder, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test attributes which can not be decompressed are skipped and logged."""
+    hass.states.async_set("sensor.one", "on", {"attr": 1})
+    await async_wait_recording_done(hass)
+    manager = recorder_mock.state_attributes_manager
+
+    def _prefetch_with_corrupt_row() -> int:
+        with session_scope(session=recorder_mock.get_session()) as session:
+            corrupt = StateAttributes(
+                shared_attrs=None, shared_attrs_bin=b"corrupt", hash=1234
+            )
+            session.add(corrupt)
+            session.flush()
+            corrupt_id = corrupt.attributes_id
+        manager.reset()
+        with session_scope(session=recorder_mock.get_session()) as session:
+            manager.prefetch(session)
+            shared_attrs = '{"attr":1}'
+            data_hash = StateAttributes.hash_shared_attrs_bytes(shared_attrs.encode())
+            assert manager.get(shared_attrs, data_hash, session) is not None
+            assert manager.get_many((("{}", 1234),), session) == {"{}": None}
+        return corrupt_id
+
+    corrupt_id = await recorder_mock.async_add_executor_job(_prefetch_with_corrupt_row)
+    assert f"Skipping corrupt compressed state attributes {corrupt_id}" in caplog.text
+
+
+async def test_saturated_hash_filter_is_rebuilt(
+    hass: HomeAssistant, recorder_mock: Recorder
+) -> None:
+    """Test a saturated hash filter is rebuilt when the cache is adjusted."""
+    await async_wait_recording_done(hass)
+    manager = recorder_mock.state_attributes_manager
+    hash_filter = HashFilter(1)
+    manager._hash_filter = hash_filter
+    for data_hash in (1, 2):
+        shared_attrs = f'{{"attr":{data_hash}}}'
+        manager.add_pending(
+            StateAttributes(shared_attrs=shared_attrs, hash=data_hash), shared_attrs
+        )
+    assert hash_filter.saturated
+    manager.add_pending(
+        StateAttributes(shared_attrs='{"attr":3}', hash=3), '{"attr":3}'
+    )
+    assert manager._hash_filter is None
+
+    add_executor_job = recorder_mock.add_executor_job
+    futures: list[Future[Any]] = []
+
+    def _add_executor_job(target: Any) -> Future[Any]:
+        futures.append(future := add_executor_job(target))
+        return future
+
+    with patch.object(recorder_mock, "add_executor_job", _add_executor_job):
+        manager.adjust_lru_size(1)
+        # Hashes added while the filter is built are added to it
+        manager.add_pending(
+            StateAttributes(shared_attrs='{"attr":4}', hash=4), '{"attr":4}'
+        )
+    assert len(futures) == 1
+    await _async_wait_hash_filter_built(hass, recorder_mock, futures)
+    assert manager._hash_filter is not None
+    assert manager._hash_filter.capacity >= MIN_FILTER_CAPACITY
+    assert 4 in manager._hash_filter
+
+    # Without a saturated filter it is not rebuilt
+    with patch.object(recorder_mock, "add_executor_job", _add_executor_job):
+        manager.adjust_lru_size(1)
+    assert len(futures) == 1
+    manager.reset()
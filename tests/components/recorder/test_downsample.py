@@ -0,0 +1,332 @@
+"""Test downsampling states for long range history."""
+
+from datetime import datetime, timedelta
+
+from freezegun import freeze_time
+import pytest
+
+from homeassistant.components.recorder import Recorder, history
+from homeassistant.components.recorder.db_schema import StatesDownsampled
+from homeassistant.components.recorder.downsample import (
+    COMPILED_PERIOD,
+    FIFTEEN_MINUTE_PERIOD,
+    MINUTE_PERIOD,
+    compile_downsampled_states,
+    period_for_range,
+)
+from homeassistant.components.recorder.purge import purge_old_data
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt_util
+
+from .common import async_wait_recording_done, do_adhoc_statistics
+
+
+async def _async_record_states(hass: HomeAssistant, start: datetime) -> None:
+    """Record the states of a power sensor during fifteen minutes."""
+    for offset, state in (
+        (10, "10"),
+        (30, "30"),
+        (70, "5"),
+        (130, "unavailable"),
+        (660, "20"),
+    ):
+        with freeze_time(start + timedelta(seconds=offset)):
+            hass.states.async_set("sensor.power", state)
+    await async_wait_recording_done(hass)
+
+
+def _compile(
+    hass: HomeAssistant,
+    start: datetime,
+    minutes_after_start: tuple[int, ...] = (0, 5, 10),
+) -> None:
+    """Downsample the states of the periods following start."""
+    with session_scope(hass=hass) as session:
+        for minutes in minutes_after_start:
+            compile_downsampled_states(
+                session,
+                start + timedelta(minutes=minutes),
+                start + timedelta(minutes=minutes + 5),
+            )
+
+
+async def test_compile_downsampled_states(
+    hass: HomeAssistant, recorder_mock: Recorder
+) -> None:
+    """Test states are summarized in one and fifteen minute periods."""
+    start = dt_util.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(
+        hours=1
+    )
+    start_ts = start.timestamp()
+    await _async_record_states(hass, start)
+    await recorder_mock.async_add_executor_job(_compile, hass, start)
+
+    with session_scope(hass=hass, read_only=True) as session:
+        rows = [
+            (row.period, row.start_ts - start_ts, row.min, row.max, row.state)
+            for row in session.query(StatesDownsampled).order_by(
+                StatesDownsampled.period, StatesDownsampled.start_ts
+            )
+        ]
+    assert rows == [
+        (MINUTE_PERIOD, 0, 10, 30, "30"),
+        (MINUTE_PERIOD, 60, 5, 5, "5"),
+        (MINUTE_PERIOD, 120, None, None, "unavailable"),
+        (MINUTE_PERIOD, 660, 20, 20, "20"),
+        (COMPILED_PERIOD, 0, None, None, None),
+        (COMPILED_PERIOD, 300, None, None, None),
+        (COMPILED_PERIOD, 600, None, None, None),
+        (FIFTEEN_MINUTE_PERIOD, 0, 5, 30, "20"),
+    ]
+
+
+async def test_get_downsampled_states(
+    hass: HomeAssistant, recorder_mock: Recorder
+) -> None:
+    """Test history is served from the downsampled states."""
+    start = dt_util.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(
+        hours=1
+    )
+    start_ts = start.timestamp()
+    recorder_mock.downsample_states = True
+    await _async_record_states(hass, start)
+    await recorder_mock.async_add_executor_job(_compile, hass, start)
+    with freeze_time(start + timedelta(minutes=20)):
+        hass.states.async_set("sensor.power", "40")
+    await async_wait_recording_done(hass)
+
+    states = await recorder_mock.async_add_executor_job(
+        history.get_downsampled_states,
+        hass,
+        start - timedelta(seconds=30),
+        start + timedelta(minutes=25),
+        ["sensor.power"],
+        FIFTEEN_MINUTE_PERIOD,
+        True,
+        True,
+        False,
+        True,
+    )
+    assert states == {
+        "sensor.power": [
+            {"s": "20", "lu": start_ts + 660, "min": 5, "max": 30},
+            {"s": "40", "lu": start_ts + 1200},
+        ]
+    }
+
+    # The downsampled states do not cover the time range
+    assert (
+        await recorder_mock.async_add_executor_job(
+            history.get_downsampled_states,
+            hass,
+            start + timedelta(minutes=5),
+            start + timedelta(minutes=10),
+            ["sensor.power"],
+            FIFTEEN_MINUTE_PERIOD,
+        )
+        is None
+    )
+
+    # The downsampled states have no attributes
+    assert (
+        await recorder_mock.async_add_executor_job(
+            history.get_downsampled_states,
+            hass,
+            start - timedelta(seconds=30),
+            start + timedelta(minutes=25),
+            ["sensor.power"],
+            FIFTEEN_MINUTE_PERIOD,
+        )
+        is None
+    )
+
+    # The minimal response and attributes of the states which are not
+    # downsampled are the same as for the significant states
+    states = await recorder_mock.async_add_executor_job(
+        history.get_downsampled_states,
+        hass,
+        start - timedelta(seconds=30),
+        start + timedelta(minutes=25),
+        ["sensor.power"],
+        FIFTEEN_MINUTE_PERIOD,
+        True,
+        True,
+        True,
+        False,
+    )
+    assert states == {
+        "sensor.power": [
+            {"s": "20", "lu": start_ts + 660, "min": 5, "max": 30},
+            {"s": "40", "a": {}, "lu": start_ts + 1200},
+        ]
+    }
+
+    # Entities with states which are not numeric get all their states
+    # when only numeric states are downsampled
+    states = await recorder_mock.async_add_executor_job(
+        history.get_downsampled_states,
+        hass,
+        start - timedelta(seconds=30),
+        start + timedelta(minutes=25),
+        ["sensor.power"],
+        MINUTE_PERIOD,
+        True,
+        True,
+        True,
+        True,
+        True,
+    )
+    assert [state["s"] for state in states["sensor.power"]] == [
+        "10",
+        "30",
+        "5",
+        "unavailable",
+        "20",
+        "40",
+    ]
+
+    # Nothing is served from the downsampled states unless enabled
+    recorder_mock.downsample_states = False
+    assert (
+        await recorder_mock.async_add_executor_job(
+            history.get_downsampled_states,
+            hass,
+            start - timedelta(seconds=30),
+            start + timedelta(minutes=25),
+            ["sensor.power"],
+            FIFTEEN_MINUTE_PERIOD,
+            True,
+            True,
+            False,
+            True,
+        )
+        is None
+    )
+
+
+async def test_get_downsampled_states_compiled_periods(
+    hass: HomeAssistant, recorder_mock: Recorder
+) -> None:
+    """Test history is only served from the periods which were downsampled."""
+    start = dt_util.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(
+        hours=1
+    )
+    start_ts = start.timestamp()
+    recorder_mock.downsample_states = True
+    await _async_record_states(hass, start)
+    # The period between five and ten minutes after start is not downsampled
+    await recorder_mock.async_add_executor_job(_compile, hass, start, (0, 10))
+    with freeze_time(start + timedelta(minutes=20)):
+        hass.states.async_set("sensor.power", "40")
+    await async_wait_recording_done(hass)
+
+    states = await recorder_mock.async_add_executor_job(
+        history.get_downsampled_states,
+        hass,
+        start - timedelta(seconds=30),
+        start + timedelta(minutes=25),
+        ["sensor.power"],
+        MINUTE_PERIOD,
+        True,
+        True,
+        False,
+        True,
+    )
+    assert states == {
+        "sensor.power": [
+            {"s": "10", "lu": start_ts + 10},
+            {"s": "30", "lu": start_ts + 30},
+            {"s": "5", "lu": start_ts + 70},
+            {"s": "unavailable", "lu": start_ts + 130},
+            {"s": "20", "lu": start_ts + 660, "min": 20, "max": 20},
+            {"s": "40", "lu": start_ts + 1200},
+        ]
+    }
+
+    # No fifteen minute period was downsampled in whole
+    assert (
+        await recorder_mock.async_add_executor_job(
+            history.get_downsampled_states,
+            hass,
+            start - timedelta(seconds=30),
+            start + timedelta(minutes=25),
+            ["sensor.power"],
+            FIFTEEN_MINUTE_PERIOD,
+            True,
+            True,
+            False,
+            True,
+        )
+        is None
+    )
+
+
+async def test_compile_downsampled_states_enabled(
+    hass: HomeAssistant, recorder_mock: Recorder
+) -> None:
+    """Test states are only downsampled with the statistics when enabled."""
+    start = dt_util.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(
+        hours=1
+    )
+    await _async_record_states(hass, start)
+    do_adhoc_statistics(hass, start=start)
+    await async_wait_recording_done(hass)
+    recorder_mock.downsample_states = True
+    do_adhoc_statistics(hass, start=start + timedelta(minutes=10))
+    await async_wait_recording_done(hass)
+
+    with session_scope(hass=hass, read_only=True) as session:
+        assert [
+            (row.period, row.start_ts - start.timestamp(), row.state)
+            for row in session.query(StatesDownsampled).order_by(
+                StatesDownsampled.period, StatesDownsampled.start_ts
+            )
+        ] == [
+            (MINUTE_PERIOD, 660, "20"),
+            (COMPILED_PERIOD, 600, None),
+            (FIFTEEN_MINUTE_PERIOD, 0, "20"),
+        ]
+
+
+async def test_purge_downsampled_states(
+    hass: HomeAssistant, recorder_mock: Recorder
+) -> None:
+    """Test downsampled states are purged."""
+    start = dt_util.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(
+        hours=1
+    )
+    await _async_record_states(hass, start)
+    await recorder_mock.async_add_executor_job(_compile, hass, start)
+
+    purge_before = start + timedelta(minutes=5)
+    finished = purge_old_data(recorder_mock, purge_before, repack=False)
+    assert not finished
+    finished = purge_old_data(recorder_mock, purge_before, repack=False)
+    assert finished
+
+    with session_scope(hass=hass, read_only=True) as session:
+        assert [
+            (row.period, row.start_ts)
+            for row in session.query(StatesDownsampled).order_by(
+                StatesDownsampled.period, StatesDownsampled.start_ts
+            )
+        ] == [
+            (MINUTE_PERIOD, start.timestamp() + 660),
+            (COMPILED_PERIOD, start.timestamp() + 300),
+            (COMPILED_PERIOD, start.timestamp() + 600),
+        ]
+
+
+@pytest.mark.parametrize(
+    ("duration", "period"),
+    [
+        (timedelta(hours=24), None),
+        (timedelta(days=7), MINUTE_PERIOD),
+        (timedelta(days=30), FIFTEEN_MINUTE_PERIOD),
+    ],
+)
+def test_period_for_range(duration: timedelta, period: int | None) -> None:
+    """Test the downsampled period is picked by the length of the time range."""
+    start = dt_util.utcnow()
+    assert period_for_range(start, start + duration) == period
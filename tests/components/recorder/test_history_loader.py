@@ -0,0 +1,216 @@
+"""Test the shared history loader."""
+
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from freezegun import freeze_time
+
+from homeassistant.components.recorder import Recorder, history
+from homeassistant.components.recorder.history import loader as history_loader
+from homeassistant.components.recorder.history.loader import async_get_history_loader
+from homeassistant.core import HomeAssistant, State
+import homeassistant.util.dt as dt_util
+
+from .common import async_wait_recording_done
+
+ENTITY_IDS = ["sensor.one", "sensor.two", "binary_sensor.three"]
+
+
+async def _async_record_states(hass: HomeAssistant) -> tuple[datetime, datetime]:
+    """Record states of a few entities and return the start and end of the period."""
+    start = dt_util.utcnow()
+    with freeze_time(start) as freezer:
+        for entity_id in ENTITY_IDS:
+            hass.states.async_set(entity_id, "before")
+        for seconds in range(1, 6):
+            freezer.move_to(start + timedelta(seconds=seconds))
+            for entity_id in ENTITY_IDS:
+                hass.states.async_set(entity_id, str(seconds), {"attr": seconds})
+            # Attribute changes are not state changes
+            freezer.move_to(start + timedelta(seconds=seconds, milliseconds=250))
+            for entity_id in ENTITY_IDS:
+                hass.states.async_set(entity_id, str(seconds), {"attr": -seconds})
+    await async_wait_recording_done(hass)
+    return start + timedelta(milliseconds=500), start + timedelta(seconds=6)
+
+
+def _summary(states: list[State]) -> list[tuple[str, float]]:
+    """Return the state and time of states."""
+    return [(state.state, state.last_updated_timestamp) for state in states]
+
+
+async def test_state_changes_during_period_for_entities(
+    hass: HomeAssistant, recorder_mock: Recorder
+) -> None:
+    """Test the states of several entities match the single entity query."""
+    start, end = await _async_record_states(hass)
+
+    for no_attributes in (False, True):
+        for include_start_time_state in (False, True):
+            result = await recorder_mock.async_add_executor_job(
+                history.state_changes_during_period_for_entities,
+                hass,
+                start,
+                end,
+                [*ENTITY_IDS, "sensor.not_recorded"],
+                no_attributes,
+                include_start_time_state,
+            )
+            for entity_id in ENTITY_IDS:
+                expected = await recorder_mock.async_add_executor_job(
+                    history.state_changes_during_period,
+                    hass,
+                    start,
+                    end,
+                    entity_id,
+                    no_attributes,
+                    False,
+                    None,
+                    include_start_time_state,
+                )
+                assert _summary(result[entity_id]) == _summary(expected[entity_id])
+                assert [state.attributes for state in result[entity_id]] == [
+                    state.attributes for state in expected[entity_id]
+                ]
+            assert result["sensor.not_recorded"] == []
+
+
+async def test_history_loader_shares_queries(
+    hass: HomeAssistant, recorder_mock: Recorder
+) -> None:
+    """Test concurrent requests are loaded with one query and reused."""
+    start, end = await _async_record_states(hass)
+    loader = async_get_history_loader(hass)
+    real_state_changes = history.state_changes_during_period_for_entities
+    calls: list[list[str]] = []
+
+    def _state_changes(*args, **kwargs):
+        calls.append(args[3])
+        return real_state_changes(*args, **kwargs)
+
+    with (
+        patch.object(
+            history, "state_changes_during_period_for_entities", _state_changes
+        ),
+        freeze_time(end + timedelta(seconds=1)),
+    ):
+        results = await asyncio.gather(
+            *(
+                loader.async_state_changes_during_period(
+                    entity_id, start, end, no_attributes=True
+                )
+                for entity_id in ENTITY_IDS
+            )
+        )
+        assert calls == [sorted(ENTITY_IDS)]
+        for entity_id, states in zip(ENTITY_IDS, results, strict=True):
+            assert [state.state for state in states] == [
+                "before",
+                "1",
+                "2",
+                "3",
+                "4",
+                "5",
+            ]
+            assert all(state.entity_id == entity_id for state in states)
+
+        # A narrower period which has ended is served from the loaded states
+        narrow_start = start + timedelta(seconds=2)
+        states = await loader.async_state_changes_during_period(
+            "sensor.one",
+            narrow_start,
+            start + timedelta(seconds=4),
+            no_attributes=True,
+        )
+        assert len(calls) == 1
+        assert _summary(states) == [
+            ("2", narrow_start.timestamp()),
+            ("3", (start + timedelta(milliseconds=2500)).timestamp()),
+            ("4", (start + timedelta(milliseconds=3500)).timestamp()),
+        ]
+
+        # Other options are loaded with a new query
+        await loader.async_state_changes_during_period(
+            "sensor.one", narrow_start, end, include_start_time_state=False
+        )
+        assert calls == [sorted(ENTITY_IDS), ["sensor.one"]]
+
+
+async def test_history_loader_reuses_committed_states(
+    hass: HomeAssistant, recorder_mock: Recorder
+) -> None:
+    """Test only the states after the committed states are queried for open periods."""
+    start, end = await _async_record_states(hass)
+    loader = async_get_history_loader(hass)
+    real_state_changes = history.state_changes_during_period_for_entities
+    calls: list[tuple[datetime, list[str]]] = []
+
+    def _state_changes(*args, **kwargs):
+        calls.append((args[1], args[3]))
+        return real_state_changes(*args, **kwargs)
+
+    with (
+        patch.object(
+            history, "state_changes_during_period_for_entities", _state_changes
+        ),
+        freeze_time(end) as freezer,
+    ):
+        committed_until_ts = recorder_mock.committed_until_timestamp
+        assert committed_until_ts is not None
+        states = await loader.async_state_changes_during_period(
+            "sensor.one", start, no_attributes=True
+        )
+        assert [state.state for state in states] == ["before", "1", "2", "3", "4", "5"]
+        assert calls == [(start, ["sensor.one"])]
+
+        freezer.move_to(end + timedelta(seconds=1))
+        hass.states.async_set("sensor.one", "6")
+        await async_wait_recording_done(hass)
+        states = await loader.async_state_changes_during_period(
+            "sensor.one", start, no_attributes=True
+        )
+        assert [state.state for state in states] == [
+            "before",
+            "1",
+            "2",
+            "3",
+            "4",
+            "5",
+            "6",
+        ]
+        assert calls == [
+            (start, ["sensor.one"]),
+            (dt_util.utc_from_timestamp(committed_until_ts), ["sensor.one"]),
+        ]
+
+
+async def test_history_loader_evicts_cached_windows(
+    hass: HomeAssistant, recorder_mock: Recorder
+) -> None:
+    """Test the cached windows are bounded and expire."""
+    start, end = await _async_record_states(hass)
+    loader = async_get_history_loader(hass)
+
+    with (
+        patch.object(history_loader, "MAX_CACHED_WINDOWS", 2),
+        freeze_time(end + timedelta(seconds=1)) as freezer,
+    ):
+        # Each period ends after the previous one, so none is served from
+        # the states loaded before
+        for seconds in (2, 1, 0):
+            await loader.async_state_changes_during_period(
+                "sensor.one", start, end - timedelta(seconds=seconds)
+            )
+        assert [window.end_time for window in loader._cache] == [
+            end - timedelta(seconds=1),
+            end,
+        ]
+
+        freezer.tick(history_loader.CACHE_TTL + timedelta(seconds=1))
+        await loader.async_state_changes_during_period(
+            "sensor.one", start, end - timedelta(seconds=3)
+        )
+        assert [window.end_time for window in loader._cache] == [
+            end - timedelta(seconds=3)
+        ]
@@ -13,6 +13,7 @@ from unittest.mock import MagicMock, Mock, patch
 
 from freezegun.api import FrozenDateTimeFactory
 import pytest
+from sqlalchemy import text
 from sqlalchemy.exc import DatabaseError, OperationalError, SQLAlchemyError
 from sqlalchemy.pool import QueuePool
 
@@ -22,7 +23,9 @@ from homeassistant.components.recorder import (
     CONF_AUTO_PURGE,
     CONF_AUTO_REPACK,
     CONF_COMMIT_INTERVAL,
+    CONF_COMPRESS_ATTRIBUTES,
     CONF_DB_MAX_RETRIES,
+    CONF_DB_READ_POOL_SIZE,
     CONF_DB_RETRY_WAIT,
     CONF_DB_URL,
     CONFIG_SCHEMA,
@@ -30,10 +33,13 @@ from homeassistant.components.recorder import (
     Recorder,
     db_schema,
     get_instance,
+    history,
     migration,
     statistics,
 )
 from homeassistant.components.recorder.const import (
+    DB_READ_WORKER_PREFIX,
+    DB_WORKER_PREFIX,
     EVENT_RECORDER_5MIN_STATISTICS_GENERATED,
     EVENT_RECORDER_HOURLY_STATISTICS_GENERATED,
     KEEPALIVE_TIME,
@@ -60,6 +66,7 @@ from homeassistant.components.recorder.services import (
 )
 from homeassistant.components.recorder.table_managers import (
     state_attributes as state_attributes_table_manager,
+    states as states_table_manager,
     states_meta as states_meta_table_manager,
 )
 from homeassistant.components.recorder.util import session_scope
@@ -77,6 +84,7 @@ from homeassistant.helpers import (
     issue_registry as ir,
     recorder as recorder_helper,
 )
+from homeassistant.helpers.json import json_bytes
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.setup import async_setup_component
 from homeassistant.util import dt as dt_util
@@ -136,6 +144,14 @@ def _default_recorder(hass: HomeAssistant) -> Recorder:
         db_retry_wait=3,
         entity_filter=CONFIG_SCHEMA({DOMAIN: {}}),
         exclude_event_types=set(),
+        partition_by_day=False,
+        compile_statistics_in_executor=False,
+        aggregate_statistics_in_database=False,
+        db_read_pool_size=0,
+        compress_attributes=False,
+        purge_time_budget=5,
+        purge_row_budget=0,
+        downsample_states=False,
     )
 
 
@@ -1468,6 +1484,104 @@ async def test_saving_sets_old_state(hass: HomeAssistant, setup_recorder: None)
         assert states_by_state["s4"].old_state_id == states_by_state["s2"].state_id
 
 
+@pytest.mark.parametrize("insert_returning", [True, False])
+async def test_saving_links_old_states_in_same_commit(
+    hass: HomeAssistant, setup_recorder: None, insert_returning: bool
+) -> None:
+    """Test chains of states written in one commit link their old states.
+
+    Without ordered RETURNING support the states are inserted by the ORM.
+    """
+    instance = recorder.get_instance(hass)
+    with patch.object(
+        instance.engine.dialect,
+        "insert_executemany_returning_sort_by_parameter_order",
+        insert_returning,
+    ):
+        for idx in range(5):
+            hass.states.async_set("test.one", f"one_{idx}", {"idx": idx % 2})
+            hass.states.async_set("test.two", f"two_{idx}", {"idx": idx % 2})
+        await async_wait_recording_done(hass)
+        hass.states.async_set("test.one", "one_5", {"idx": 1})
+        hass.states.async_remove("test.two")
+        await async_wait_recording_done(hass)
+
+    with session_scope(hass=hass, read_only=True) as session:
+        states = list(
+            session.query(
+                StatesMeta.entity_id,
+                States.state_id,
+                States.old_state_id,
+                States.state,
+                StateAttributes.shared_attrs,
+            )
+            .outerjoin(StatesMeta, States.metadata_id == StatesMeta.metadata_id)
+            .outerjoin(
+                StateAttributes, States.attributes_id == StateAttributes.attributes_id
+            )
+        )
+    assert len(states) == 12
+    states_by_state = {state.state: state for state in states}
+    assert len(states_by_state) == 12
+    removed = states_by_state.pop(None)
+    assert removed.entity_id == "test.two"
+    assert removed.old_state_id == states_by_state["two_4"].state_id
+
+    for prefix, count in (("one", 6), ("two", 5)):
+        assert states_by_state[f"{prefix}_0"].old_state_id is None
+        for idx in range(count):
+            state = states_by_state[f"{prefix}_{idx}"]
+            assert state.entity_id == f"test.{prefix}"
+            assert state.shared_attrs == f'{{"idx":{idx % 2}}}'
+            if idx:
+                previous = states_by_state[f"{prefix}_{idx - 1}"]
+                assert state.old_state_id == previous.state_id
+
+
+@pytest.mark.skip_on_db_engine(["sqlite", "postgresql"])
+@pytest.mark.usefixtures("skip_by_db_engine")
+async def test_saving_states_with_multi_row_inserts_mysql(
+    hass: HomeAssistant, setup_recorder: None
+) -> None:
+    """Test states are written with multi-row INSERTs on MySQL."""
+    instance = recorder.get_instance(hass)
+    insert_mysql = instance.states_manager._insert_mysql
+    with (
+        patch.object(states_table_manager, "MYSQL_INSERT_ROWS", 3),
+        patch.object(
+            instance.states_manager, "_insert_mysql", wraps=insert_mysql
+        ) as insert_mysql_mock,
+    ):
+        for idx in range(4):
+            hass.states.async_set("test.one", f"one_{idx}")
+            hass.states.async_set("test.two", f"two_{idx}")
+        await async_wait_recording_done(hass)
+    assert insert_mysql_mock.called
+
+    with session_scope(hass=hass, read_only=True) as session:
+        states = list(
+            session.query(
+                StatesMeta.entity_id,
+                States.state_id,
+                States.old_state_id,
+                States.state,
+            ).outerjoin(StatesMeta, States.metadata_id == StatesMeta.metadata_id)
+        )
+    states_by_state = {state.state: state for state in states}
+    assert len(states_by_state) == 8
+    for prefix in ("one", "two"):
+        assert states_by_state[f"{prefix}_0"].old_state_id is None
+        for idx in range(1, 4):
+            previous = states_by_state[f"{prefix}_{idx - 1}"]
+            assert states_by_state[f"{prefix}_{idx}"].old_state_id == (
+                previous.state_id
+            )
+    # The state_ids derived from LAST_INSERT_ID() are the ones in the database
+    assert sorted(instance.states_manager.committed_state_ids()) == sorted(
+        (states_by_state["one_3"].state_id, states_by_state["two_3"].state_id)
+    )
+
+
 async def test_saving_state_with_serializable_data(
     hass: HomeAssistant, caplog: pytest.LogCaptureFixture, setup_recorder: None
 ) -> None:
@@ -2746,3 +2860,108 @@ async def test_empty_entity_id(
     hass.bus.async_fire("hello", {"entity_id": ""})
     await async_wait_recording_done(hass)
     assert "Invalid entity ID" not in caplog.text
+
+
+@pytest.mark.skip_on_db_engine(["mysql", "postgresql"])
+@pytest.mark.usefixtures("skip_by_db_engine")
+@pytest.mark.parametrize("persistent_database", [True])
+@pytest.mark.parametrize("recorder_config", [{CONF_DB_READ_POOL_SIZE: 2}])
+async def test_read_pool(hass: HomeAssistant, recorder_mock: Recorder) -> None:
+    """Test read only sessions use the read pool in the read executor."""
+    hass.states.async_set("test.read", "on")
+    await async_wait_recording_done(hass)
+
+    def _read() -> tuple[str, int, list[str], bool]:
+        with session_scope(hass=hass, read_only=True) as session:
+            return (
+                threading.current_thread().name,
+                session.execute(text("PRAGMA query_only")).scalar(),
+                [state.state for state in session.query(States)],
+                session.get_bind() is recorder_mock.read_engine,
+            )
+
+    (
+        thread_name,
+        query_only,
+        states,
+        uses_read_engine,
+    ) = await recorder_mock.async_add_read_executor_job(_read)
+    assert thread_name.startswith(DB_READ_WORKER_PREFIX)
+    assert query_only == 1
+    assert states == ["on"]
+    assert uses_read_engine
+
+    def _write() -> None:
+        with session_scope(hass=hass, read_only=True) as session:
+            session.execute(text("DELETE FROM states"))
+
+    with pytest.raises(OperationalError):
+        await recorder_mock.async_add_read_executor_job(_write)
+    assert recorder_mock._db_read_executor.jobs == 2
+
+
+async def test_read_executor_job_without_read_pool(
+    hass: HomeAssistant, recorder_mock: Recorder
+) -> None:
+    """Test read executor jobs run in the database executor without a read pool."""
+
+    def _read() -> tuple[str, bool]:
+        with session_scope(hass=hass, read_only=True) as session:
+            return (
+                threading.current_thread().name,
+                session.get_bind() is recorder_mock.engine,
+            )
+
+    thread_name, uses_engine = await recorder_mock.async_add_read_executor_job(_read)
+    assert thread_name.startswith(DB_WORKER_PREFIX)
+    assert uses_engine
+    assert recorder_mock.read_engine is None
+
+
+@pytest.mark.parametrize("recorder_config", [{CONF_COMPRESS_ATTRIBUTES: True}])
+async def test_compress_attributes(
+    hass: HomeAssistant, recorder_mock: Recorder
+) -> None:
+    """Test large state attributes are stored compressed."""
+    forecast = [
+        {"datetime": f"2024-10-{day:02d}T00:00:00+00:00", "temperature": day}
+        for day in range(1, 31)
+    ]
+    attributes = {"icon": "mdi:weather-sunny", "forecast": forecast}
+    start = dt_util.utcnow()
+    hass.states.async_set("weather.home", "sunny", attributes)
+    hass.states.async_set("weather.home", "rainy", attributes)
+    hass.states.async_set("weather.small", "sunny", {"icon": "mdi:weather-sunny"})
+    await async_wait_recording_done(hass)
+
+    with session_scope(hass=hass, read_only=True) as session:
+        assert sorted(
+            (row.shared_attrs, row.shared_attrs_bin is not None)
+            for row in session.query(StateAttributes)
+        ) == [
+            ('{"icon":"mdi:weather-sunny"}', False),
+            ('{"icon":"mdi:weather-sunny"}', True),
+        ]
+
+    # The compressed attributes are found when they are not cached
+    shared_attrs_bytes = json_bytes(attributes)
+    manager = recorder_mock.state_attributes_manager
+
+    def _get_attributes_id() -> int | None:
+        manager.reset()
+        with session_scope(session=recorder_mock.get_session()) as session:
+            return manager.get(
+                shared_attrs_bytes.decode(),
+                StateAttributes.hash_shared_attrs_bytes(shared_attrs_bytes),
+                session,
+            )
+
+    assert await recorder_mock.async_add_executor_job(_get_attributes_id)
+
+    states = await recorder_mock.async_add_executor_job(
+        history.get_significant_states, hass, start, None, ["weather.home"]
+    )
+    assert [(state.state, state.attributes) for state in states["weather.home"]] == [
+        ("sunny", attributes),
+        ("rainy", attributes),
+    ]
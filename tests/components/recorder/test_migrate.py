@@ -659,6 +659,26 @@ def test_invalid_update(hass: HomeAssistant) -> None:
         migration._apply_update(Mock(), hass, Mock(), Mock(), -1, 0)
 
 
+def test_update_to_schema_49_creates_states_downsampled(
+    hass: HomeAssistant, recorder_db_url: str
+) -> None:
+    """Test migrating to schema version 49 creates the states_downsampled table."""
+    engine = create_engine(recorder_db_url)
+    db_schema.Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE states_downsampled"))
+    assert "states_downsampled" not in inspect(engine).get_table_names()
+
+    with Session(engine) as session:
+        session_maker = Mock(return_value=session)
+        migration._apply_update(Mock(), hass, engine, session_maker, 49, 48)
+        # Running the update again does not fail
+        migration._apply_update(Mock(), hass, engine, session_maker, 49, 48)
+
+    assert "states_downsampled" in inspect(engine).get_table_names()
+    engine.dispose()
+
+
 @pytest.mark.parametrize(
     ("engine_type", "substr"),
     [
@@ -14,12 +14,15 @@ from homeassistant.components.recorder.db_schema import (
 )
 from homeassistant.components.recorder.models import (
     LazyState,
+    compress_shared_attrs,
+    decompress_shared_attrs,
     process_timestamp,
     process_timestamp_to_utc_isoformat,
 )
 from homeassistant.const import EVENT_STATE_CHANGED
 import homeassistant.core as ha
 from homeassistant.exceptions import InvalidEntityFormatError
+from homeassistant.helpers.json import json_bytes
 from homeassistant.util import dt as dt_util
 from homeassistant.util.json import json_loads
 
@@ -297,6 +300,7 @@ async def test_lazy_state_handles_include_json(
     row = PropertyMock(
         entity_id="sensor.invalid",
         shared_attrs="{INVALID_JSON}",
+        attributes_bin=None,
     )
     assert LazyState(row, {}, None, row.entity_id, "", 1, False).attributes == {}
     assert "Error converting row to state attributes" in caplog.text
@@ -309,12 +313,54 @@ async def test_lazy_state_can_decode_attributes(
     row = PropertyMock(
         entity_id="sensor.invalid",
         attributes='{"shared":true}',
+        attributes_bin=None,
     )
     assert LazyState(row, {}, None, row.entity_id, "", 1, False).attributes == {
         "shared": True
     }
 
 
+def test_compress_shared_attrs() -> None:
+    """Test large shared attributes are compressed and small ones are not."""
+    forecast = [
+        {"datetime": f"2024-10-{day:02d}T00:00:00+00:00", "temperature": day}
+        for day in range(1, 31)
+    ]
+    shared_attrs_bytes = json_bytes(
+        {"icon": "mdi:weather", "friendly_name": "Home", "forecast": forecast}
+    )
+    indexed, compressed = compress_shared_attrs(shared_attrs_bytes, "weather")
+    assert indexed == '{"icon":"mdi:weather"}'
+    assert len(compressed) < len(shared_attrs_bytes) / 4
+    assert decompress_shared_attrs(compressed) == shared_attrs_bytes.decode()
+    assert compress_shared_attrs(b'{"friendly_name":"Home"}', "weather") is None
+
+
+async def test_lazy_state_decompresses_attributes(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test that the LazyState decompresses attributes."""
+    shared_attrs_bytes = json_bytes({"shared": True, "pad": "x" * 2048})
+    indexed, compressed = compress_shared_attrs(shared_attrs_bytes, "sensor")
+    row = PropertyMock(
+        entity_id="sensor.valid",
+        attributes=indexed,
+        attributes_bin=compressed,
+    )
+    assert LazyState(row, {}, None, row.entity_id, "", 1, False).attributes == {
+        "shared": True,
+        "pad": "x" * 2048,
+    }
+
+    row = PropertyMock(
+        entity_id="sensor.invalid",
+        attributes=indexed,
+        attributes_bin=b"\xff" + compressed[1:],
+    )
+    assert LazyState(row, {}, None, row.entity_id, "", 1, False).attributes == {}
+    assert "Error decompressing row state attributes" in caplog.text
+
+
 async def test_lazy_state_handles_different_last_updated_and_last_changed(
     caplog: pytest.LogCaptureFixture,
 ) -> None:
@@ -324,6 +370,7 @@ async def test_lazy_state_handles_different_last_updated_and_last_changed(
         entity_id="sensor.valid",
         state="off",
         attributes='{"shared":true}',
+        attributes_bin=None,
         last_updated_ts=now.timestamp(),
         last_changed_ts=(now - timedelta(seconds=60)).timestamp(),
     )
@@ -357,6 +404,7 @@ async def test_lazy_state_handles_same_last_updated_and_last_changed(
         entity_id="sensor.valid",
         state="off",
         attributes='{"shared":true}',
+        attributes_bin=None,
         last_updated_ts=now.timestamp(),
         last_changed_ts=now.timestamp(),
     )
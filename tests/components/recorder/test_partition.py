@@ -0,0 +1,344 @@
+"""Test partitioning tables by day."""
+
+from concurrent.futures import Future
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from homeassistant.components.recorder import Recorder, migration
+from homeassistant.components.recorder.db_schema import (
+    PARTITIONED_TABLE_COLUMNS,
+    SCHEMA_VERSION,
+    Events,
+    EventTypes,
+    States,
+    StatesMeta,
+    StatisticsShortTerm,
+)
+from homeassistant.components.recorder.partition import (
+    DAY_SECONDS,
+    DEFAULT_PARTITION_SUFFIX,
+    LEGACY_PARTITION_SUFFIX,
+    Partition,
+    create_daily_partitions,
+    get_partitions,
+    partition_cutoff,
+)
+from homeassistant.components.recorder.purge import purge_old_data
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .common import async_wait_recording_done
+
+from tests.common import async_test_home_assistant
+from tests.typing import RecorderInstanceGenerator
+
+# 2024-10-02 00:00:00 UTC
+DAY = 1727827200
+
+
+def test_get_partitions() -> None:
+    """Test the partition bounds are parsed."""
+    connection = MagicMock()
+    connection.execute.return_value = [
+        ("states_p20241002", "FOR VALUES FROM ('1727827200') TO ('1727913600')"),
+        ("states_default", "DEFAULT"),
+        ("states_legacy", "FOR VALUES FROM (MINVALUE) TO ('1727827200')"),
+    ]
+    assert get_partitions(connection, "states") == [
+        Partition("states_default", None, None),
+        Partition("states_legacy", None, DAY),
+        Partition("states_p20241002", DAY, DAY + DAY_SECONDS),
+    ]
+
+
+def test_partition_cutoff() -> None:
+    """Test the legacy partition ends two days after the day of the conversion."""
+    assert partition_cutoff(DAY) == DAY + 2 * DAY_SECONDS
+    assert partition_cutoff(DAY + DAY_SECONDS - 1) == DAY + 2 * DAY_SECONDS
+
+
+def test_create_daily_partitions() -> None:
+    """Test daily partitions are created and rows are moved out of the default."""
+    connection = MagicMock()
+    # The default partition holds rows for the second day
+    connection.execute.return_value.first.side_effect = [None, (1,)] + [None] * 6
+    with patch(
+        "homeassistant.components.recorder.partition.get_partitions",
+        return_value=[
+            Partition("states_default", None, None),
+            Partition("states_legacy", None, DAY),
+        ],
+    ):
+        create_daily_partitions(connection, "states", DAY + 3600)
+
+    statements = [
+        " ".join(str(args[0].compile(compile_kwargs={"literal_binds": True})).split())
+        for args, _ in connection.execute.call_args_list
+    ]
+    assert (
+        "CREATE TABLE states_p20241002 PARTITION OF states"
+        " FOR VALUES FROM (1727827200) TO (1727913600)"
+    ) in statements
+    in_day = (
+        " WHERE states_default.last_updated_ts >= 1727913600"
+        " AND states_default.last_updated_ts < 1728000000"
+    )
+    assert any(
+        statement.startswith("INSERT INTO states_p20241003 (state_id,")
+        and statement.endswith("FROM states_default" + in_day)
+        for statement in statements
+    )
+    assert (
+        "DELETE FROM states_default"
+        " WHERE states_default.last_updated_ts >= 1727913600"
+        " AND states_default.last_updated_ts < 1728000000"
+    ) in statements
+    assert (
+        "ALTER TABLE states ATTACH PARTITION states_p20241003"
+        " FOR VALUES FROM (1727913600) TO (1728000000)"
+    ) in statements
+    assert (
+        "CREATE TABLE states_p20241009 PARTITION OF states"
+        " FOR VALUES FROM (1728432000) TO (1728518400)"
+    ) in statements
+    assert not any("states_p20241010" in statement for statement in statements)
+
+
+async def test_purge_drops_expired_partitions(
+    hass: HomeAssistant, recorder_mock: Recorder
+) -> None:
+    """Test purging drops expired partitions and keeps rows of the others."""
+    purge_before = dt_util.utcnow()
+    partial_start = int(purge_before.timestamp()) - 3600
+    expired = Partition(
+        "statistics_short_term_p1", partial_start - DAY_SECONDS, partial_start
+    )
+    legacy = Partition(
+        "statistics_short_term_legacy", None, partial_start - DAY_SECONDS
+    )
+    partial = Partition(
+        "statistics_short_term_p2", partial_start, partial_start + DAY_SECONDS
+    )
+    with session_scope(hass=hass) as session:
+        for start in (partial_start - 2 * DAY_SECONDS, partial_start + 60):
+            session.add(StatisticsShortTerm(start_ts=start, state=1))
+    await async_wait_recording_done(hass)
+
+    recorder_mock.partitioned_tables = {"statistics_short_term"}
+    with (
+        patch(
+            "homeassistant.components.recorder.purge.get_partitions",
+            return_value=[
+                legacy,
+                Partition("statistics_short_term_default", None, None),
+                expired,
+                partial,
+            ],
+        ),
+        patch(
+            "homeassistant.components.recorder.purge.drop_partition"
+        ) as drop_partition_mock,
+    ):
+        finished = purge_old_data(recorder_mock, purge_before, repack=False)
+    assert finished
+
+    assert [
+        partition for _, partition in (c.args for c in drop_partition_mock.mock_calls)
+    ] == [legacy, expired]
+    # The row in the partial partition is kept until the partition expires
+    with session_scope(hass=hass) as session:
+        assert [row.start_ts for row in session.query(StatisticsShortTerm)] == [
+            partial_start + 60
+        ]
+
+
+@pytest.mark.parametrize("recorder_config", [{"partition_by_day": True}])
+async def test_partition_by_day_not_supported(
+    hass: HomeAssistant, recorder_mock: Recorder, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test partitioning by day is only supported with PostgreSQL."""
+    await async_wait_recording_done(hass)
+    assert recorder_mock.partition_by_day is True
+    assert recorder_mock.partitioned_tables == set()
+    assert "only supported with PostgreSQL" in caplog.text
+
+
+def test_partition_migration_queued_when_table_prepared() -> None:
+    """Test the migration is queued again once the table is prepared."""
+    instance = MagicMock(partitioned_tables=set(), use_legacy_events_index=False)
+    prepared: Future[None] = Future()
+    instance.add_executor_job.return_value = prepared
+    migrator = migration.PartitionTablesMigration(SCHEMA_VERSION, {})
+    with (
+        patch.object(migration, "get_partitioned_tables", return_value=set()),
+        patch.object(migration, "partition_table") as partition_table_mock,
+    ):
+        # The migration task is not queued again while the table is prepared
+        migration.MigrationTask(migrator).run(instance)
+        instance.add_executor_job.assert_called_once()
+        instance.queue_task.assert_not_called()
+        partition_table_mock.assert_not_called()
+
+        prepared.set_result(None)
+        instance.queue_task.assert_called_once_with(
+            migration.CommitBeforeMigrationTask(migrator)
+        )
+        instance.queue_task.reset_mock()
+
+        # The prepared table is swapped and the next table is prepared next
+        migration.CommitBeforeMigrationTask(migrator).run(instance)
+        partition_table_mock.assert_called_once()
+        assert instance.partitioned_tables == {"states"}
+        instance.queue_task.assert_called_once_with(migration.MigrationTask(migrator))
+
+
+def _add_rows(hass: HomeAssistant, timestamps: list[float]) -> None:
+    """Add a state, an event and a short term statistic at each timestamp."""
+    with session_scope(hass=hass) as session:
+        states_meta = session.query(StatesMeta).filter_by(
+            entity_id="sensor.partition"
+        ).first() or StatesMeta(entity_id="sensor.partition")
+        event_type = session.query(EventTypes).filter_by(
+            event_type="partition_event"
+        ).first() or EventTypes(event_type="partition_event")
+        for timestamp in timestamps:
+            session.add_all(
+                (
+                    States(
+                        states_meta_rel=states_meta,
+                        state="on",
+                        last_updated_ts=timestamp,
+                        last_changed_ts=timestamp,
+                    ),
+                    Events(
+                        event_type_rel=event_type,
+                        origin_idx=0,
+                        time_fired_ts=timestamp,
+                    ),
+                    StatisticsShortTerm(start_ts=timestamp, state=1),
+                )
+            )
+
+
+def _get_rows(hass: HomeAssistant) -> dict[str, list[tuple[int, float]]]:
+    """Return the ids and timestamps of the rows added by _add_rows."""
+    with session_scope(hass=hass, read_only=True) as session:
+        return {
+            "states": sorted(
+                (row.state_id, row.last_updated_ts)
+                for row in session.query(States)
+                .join(StatesMeta)
+                .filter(StatesMeta.entity_id == "sensor.partition")
+            ),
+            "events": sorted(
+                (row.event_id, row.time_fired_ts)
+                for row in session.query(Events)
+                .join(EventTypes)
+                .filter(EventTypes.event_type == "partition_event")
+            ),
+            "statistics_short_term": sorted(
+                (row.id, row.start_ts) for row in session.query(StatisticsShortTerm)
+            ),
+        }
+
+
+async def _async_wait_partitioned(hass: HomeAssistant, instance: Recorder) -> None:
+    """Wait until the migration has partitioned all tables."""
+    for _ in range(100):
+        await async_wait_recording_done(hass)
+        if len(instance.partitioned_tables) == len(PARTITIONED_TABLE_COLUMNS):
+            return
+    pytest.fail("The tables were not partitioned")
+
+
+@pytest.mark.skip_on_db_engine(["mysql", "sqlite"])
+@pytest.mark.usefixtures("skip_by_db_engine")
+@pytest.mark.parametrize("persistent_database", [True])
+@pytest.mark.usefixtures("hass_storage")  # Prevent test hass from writing to storage
+async def test_partition_populated_database(
+    async_test_recorder: RecorderInstanceGenerator,
+) -> None:
+    """Test converting a populated database and purging by dropping partitions."""
+    now = dt_util.utcnow().timestamp()
+    async with (
+        async_test_home_assistant() as hass,
+        async_test_recorder(hass) as instance,
+    ):
+        await instance.async_add_executor_job(
+            _add_rows, hass, [now - 20 * DAY_SECONDS, now - 3600]
+        )
+        await async_wait_recording_done(hass)
+        rows_before = await instance.async_add_executor_job(_get_rows, hass)
+        assert instance.partitioned_tables == set()
+        await hass.async_stop()
+
+    async with (
+        async_test_home_assistant() as hass,
+        async_test_recorder(hass, {"partition_by_day": True}) as instance,
+    ):
+        await _async_wait_partitioned(hass, instance)
+        # The existing rows are kept in the legacy partition
+        assert await instance.async_add_executor_job(_get_rows, hass) == rows_before
+
+        with session_scope(hass=hass, read_only=True) as session:
+            partitions = {
+                table: {
+                    partition.name: partition
+                    for partition in get_partitions(session.connection(), table)
+                }
+                for table in PARTITIONED_TABLE_COLUMNS
+            }
+        cutoff = partitions["states"][f"states{LEGACY_PARTITION_SUFFIX}"].end
+        assert cutoff is not None
+        for table, table_partitions in partitions.items():
+            assert table_partitions.pop(f"{table}{LEGACY_PARTITION_SUFFIX}") == (
+                Partition(f"{table}{LEGACY_PARTITION_SUFFIX}", None, cutoff)
+            )
+            assert f"{table}{DEFAULT_PARTITION_SUFFIX}" in table_partitions
+            assert sorted(
+                partition.start
+                for partition in table_partitions.values()
+                if partition.start is not None
+            ) == list(range(cutoff, cutoff + 6 * DAY_SECONDS, DAY_SECONDS))
+
+        # New rows go to the daily partitions and their ids follow the old ids
+        await instance.async_add_executor_job(
+            _add_rows, hass, [cutoff + 60, cutoff + DAY_SECONDS + 60]
+        )
+        await async_wait_recording_done(hass)
+        rows = await instance.async_add_executor_job(_get_rows, hass)
+        for table, table_rows in rows.items():
+            assert table_rows[:2] == rows_before[table]
+            assert [timestamp for _, timestamp in table_rows[2:]] == [
+                cutoff + 60,
+                cutoff + DAY_SECONDS + 60,
+            ]
+            assert table_rows[2][0] > table_rows[1][0]
+
+        # The legacy partition and the first daily partition are dropped
+        # as a whole, the rows of the other partitions are kept
+        finished = purge_old_data(
+            instance,
+            dt_util.utc_from_timestamp(cutoff + DAY_SECONDS),
+            repack=False,
+        )
+        assert finished
+        rows = await instance.async_add_executor_job(_get_rows, hass)
+        for table_rows in rows.values():
+            assert [timestamp for _, timestamp in table_rows] == [
+                cutoff + DAY_SECONDS + 60
+            ]
+        with session_scope(hass=hass, read_only=True) as session:
+            for table in PARTITIONED_TABLE_COLUMNS:
+                starts = [
+                    partition.start
+                    for partition in get_partitions(session.connection(), table)
+                ]
+                assert None in starts
+                assert cutoff not in starts
+                assert min(start for start in starts if start is not None) == (
+                    cutoff + DAY_SECONDS
+                )
+        await hass.async_stop()
@@ -4,10 +4,12 @@ from collections.abc import Generator
 from datetime import datetime, timedelta
 import json
 import sqlite3
-from unittest.mock import patch
+from typing import Any
+from unittest.mock import ANY, PropertyMock, call, patch
 
 from freezegun import freeze_time
 import pytest
+from sqlalchemy import text
 from sqlalchemy.exc import DatabaseError, OperationalError
 from sqlalchemy.orm.session import Session
 from voluptuous.error import MultipleInvalid
@@ -25,13 +27,25 @@ from homeassistant.components.recorder.db_schema import (
     StatisticsShortTerm,
 )
 from homeassistant.components.recorder.history import get_significant_states
-from homeassistant.components.recorder.purge import purge_old_data
+from homeassistant.components.recorder.purge import (
+    MIN_BATCH_SIZE,
+    PURGE_MAX_BACKLOG,
+    TARGET_BATCH_SECONDS,
+    PurgeBudget,
+    purge_old_data,
+)
+from homeassistant.components.recorder.purge_progress import (
+    STORAGE_KEY,
+    STORAGE_VERSION,
+    PurgeProgress,
+    PurgeTarget,
+)
 from homeassistant.components.recorder.queries import select_event_type_ids
 from homeassistant.components.recorder.services import (
     SERVICE_PURGE,
     SERVICE_PURGE_ENTITIES,
 )
-from homeassistant.components.recorder.tasks import PurgeTask
+from homeassistant.components.recorder.tasks import IncrementalVacuumTask, PurgeTask
 from homeassistant.components.recorder.util import session_scope
 from homeassistant.const import EVENT_STATE_CHANGED, EVENT_THEMES_UPDATED, STATE_ON
 from homeassistant.core import HomeAssistant
@@ -45,6 +59,7 @@ from .common import (
     convert_pending_states_to_meta,
 )
 
+from tests.common import async_fire_time_changed
 from tests.typing import RecorderInstanceGenerator
 
 TEST_EVENT_TYPES = (
@@ -2065,3 +2080,148 @@ async def test_purge_entities_keep_days(
     )
     assert len(states["sensor.keep"]) == 2
     assert "sensor.purge" not in states
+
+
+def test_purge_budget() -> None:
+    """Test the purge batch size adapts to the latency of the batches."""
+    budget = PurgeBudget(max_duration=5, max_rows=0)
+    budget.start_cycle()
+    assert budget.batch_size(1000) == 1000
+
+    budget.record_batch(1000, 1000, TARGET_BATCH_SECONDS * 2)
+    assert budget.batch_size(1000) == 500
+    # Batches which are not full do not grow the batch size
+    budget.record_batch(500, 10, 0)
+    assert budget.batch_size(1000) == 500
+    budget.record_batch(500, 500, 0)
+    assert budget.batch_size(1000) == 1000
+    # The batch size never exceeds max_bind_vars
+    budget.record_batch(1000, 1000, 0)
+    assert budget.batch_size(1000) == 1000
+    assert budget.batch_size(998) == 998
+
+    for _ in range(10):
+        budget.record_batch(budget.batch_size(1000), 1000, TARGET_BATCH_SECONDS * 2)
+    assert budget.batch_size(1000) == MIN_BATCH_SIZE
+
+    assert not budget.exhausted(PURGE_MAX_BACKLOG)
+    assert budget.exhausted(PURGE_MAX_BACKLOG + 1)
+
+    budget = PurgeBudget(max_duration=5, max_rows=100)
+    budget.start_cycle()
+    budget.record_batch(1000, 99, 0)
+    assert not budget.exhausted(0)
+    budget.record_batch(1000, 1, 0)
+    assert budget.exhausted(0)
+    budget.start_cycle()
+    assert not budget.exhausted(0)
+
+    budget = PurgeBudget(max_duration=-1, max_rows=0)
+    budget.start_cycle()
+    assert budget.exhausted(0)
+
+
+async def test_purge_yields_when_budget_is_exhausted(
+    hass: HomeAssistant, recorder_mock: Recorder
+) -> None:
+    """Test a purge cycle yields once the rows of its budget are purged."""
+    await _add_test_states(hass)
+    purge_before = dt_util.utcnow() - timedelta(days=4)
+
+    with (
+        patch.object(recorder_mock, "max_bind_vars", 2),
+        patch.object(recorder_mock.purge_budget, "max_rows", 2),
+    ):
+        for remaining in (4, 2):
+            assert not purge_old_data(recorder_mock, purge_before, repack=False)
+            with session_scope(hass=hass) as session:
+                assert session.query(States).count() == remaining
+
+        assert purge_old_data(recorder_mock, purge_before, repack=False)
+
+
+async def test_purge_progress(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Test the purge in progress is persisted until it finishes."""
+    target = PurgeTarget(dt_util.utcnow() - timedelta(days=4), True, False)
+    progress = PurgeProgress(hass)
+    progress.start(target)
+    await hass.async_block_till_done()
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    progress = PurgeProgress(hass)
+    await progress.async_load()
+    assert progress.pending == target
+
+    progress.finish()
+    await hass.async_block_till_done()
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    progress = PurgeProgress(hass)
+    await progress.async_load()
+    assert progress.pending is None
+
+
+async def test_purge_resumes_after_restart(
+    hass: HomeAssistant,
+    async_test_recorder: RecorderInstanceGenerator,
+    hass_storage: dict[str, Any],
+) -> None:
+    """Test an unfinished purge is queued again when the recorder starts."""
+    purge_before = dt_util.utcnow() - timedelta(days=4)
+    hass_storage[STORAGE_KEY] = {
+        "version": STORAGE_VERSION,
+        "key": STORAGE_KEY,
+        "data": {
+            "purge_before": purge_before.isoformat(),
+            "repack": False,
+            "apply_filter": True,
+        },
+    }
+
+    with patch(
+        "homeassistant.components.recorder.purge.purge_old_data", return_value=True
+    ) as purge_old_data_mock:
+        async with async_test_recorder(hass) as instance:
+            await async_wait_recording_done(hass)
+            assert instance.purge_progress.pending is None
+
+    assert purge_old_data_mock.mock_calls == [call(ANY, purge_before, False, True)]
+
+
+@pytest.mark.skip_on_db_engine(["mysql", "postgresql"])
+@pytest.mark.usefixtures("skip_by_db_engine")
+async def test_incremental_vacuum(hass: HomeAssistant, recorder_mock: Recorder) -> None:
+    """Test unused pages are freed in slices while the recorder is idle."""
+
+    def _free_pages() -> int:
+        with session_scope(hass=hass, read_only=True) as session:
+            return session.execute(text("PRAGMA freelist_count")).scalar()
+
+    with session_scope(hass=hass) as session:
+        assert session.execute(text("PRAGMA auto_vacuum")).scalar() == 2
+        session.execute(text("CREATE TABLE vacuum_test (data TEXT)"))
+        for _ in range(100):
+            session.execute(
+                text("INSERT INTO vacuum_test VALUES (:data)"), {"data": "x" * 4096}
+            )
+    with session_scope(hass=hass) as session:
+        session.execute(text("DROP TABLE vacuum_test"))
+    free_pages = _free_pages()
+    assert free_pages > 20
+
+    # Only a single slice is freed when the recorder is busy
+    with (
+        patch("homeassistant.components.recorder.repack.INCREMENTAL_VACUUM_PAGES", 10),
+        patch.object(Recorder, "backlog", new_callable=PropertyMock, return_value=1),
+    ):
+        recorder_mock.queue_task(IncrementalVacuumTask())
+        await async_recorder_block_till_done(hass)
+    assert _free_pages() == free_pages - 10
+
+    recorder_mock.queue_task(IncrementalVacuumTask())
+    await async_recorder_block_till_done(hass)
+    assert _free_pages() == 0
@@ -1,6 +1,8 @@
 """The tests for sensor recorder platform."""
 
-from datetime import timedelta
+import asyncio
+from datetime import datetime, timedelta
+import threading
 from typing import Any
 from unittest.mock import ANY, Mock, patch
 
@@ -394,6 +396,90 @@ async def test_compile_periodic_statistics_exception(
     }
 
 
+@pytest.mark.parametrize("recorder_config", [{"compile_statistics_in_executor": True}])
+async def test_compile_periodic_statistics_in_executor(
+    hass: HomeAssistant, setup_recorder: None
+) -> None:
+    """Test statistics are collected in the executor and inserted in order."""
+    await async_setup_component(hass, "sensor", {})
+    instance = recorder.get_instance(hass)
+    compile_threads: list[int] = []
+
+    def get_fake_stats(_hass, session, start, _end):
+        compile_threads.append(threading.get_ident())
+        return statistics.PlatformCompiledStatistics(
+            [
+                {
+                    "meta": {
+                        "has_mean": True,
+                        "has_sum": False,
+                        "name": None,
+                        "source": "recorder",
+                        "statistic_id": "sensor.test1",
+                        "unit_of_measurement": "dogs",
+                    },
+                    "stat": {"start": start, "mean": 1.0, "min": 0.0, "max": 2.0},
+                }
+            ],
+            {},
+        )
+
+    now = get_start_time(dt_util.utcnow())
+    with patch(
+        "homeassistant.components.sensor.recorder.compile_statistics",
+        side_effect=get_fake_stats,
+    ):
+        do_adhoc_statistics(hass, start=now)
+        do_adhoc_statistics(hass, start=now + timedelta(minutes=5))
+        await async_wait_recording_done(hass)
+        while (pending := instance.statistics_compile) is not None:
+            await asyncio.wrap_future(pending)
+            await async_wait_recording_done(hass)
+
+    assert len(compile_threads) == 2
+    assert instance.thread_id not in compile_threads
+    stats = statistics_during_period(hass, now, period="5minute")
+    assert [stat["start"] for stat in stats["sensor.test1"]] == [
+        now.timestamp(),
+        (now + timedelta(minutes=5)).timestamp(),
+    ]
+
+
+@pytest.mark.parametrize("recorder_config", [{"compile_statistics_in_executor": True}])
+async def test_compile_periodic_statistics_in_executor_retry_in_order(
+    hass: HomeAssistant, setup_recorder: None
+) -> None:
+    """Test a failed insert is retried before the following periods are inserted."""
+    await async_setup_component(hass, "sensor", {})
+    instance = recorder.get_instance(hass)
+    compile_statistics = statistics.compile_statistics
+    inserted: list[datetime] = []
+
+    def _compile_statistics(*args: Any) -> bool:
+        inserted.append(args[1])
+        if len(inserted) == 1:
+            # Fail the first insert as a retryable database error would
+            return False
+        return compile_statistics(*args)
+
+    now = get_start_time(dt_util.utcnow())
+    with patch.object(statistics, "compile_statistics", _compile_statistics):
+        do_adhoc_statistics(hass, start=now)
+        do_adhoc_statistics(hass, start=now + timedelta(minutes=5))
+        do_adhoc_statistics(hass, start=now + timedelta(minutes=10))
+        await async_wait_recording_done(hass)
+        while (pending := instance.statistics_compile) is not None:
+            await asyncio.wrap_future(pending)
+            await async_wait_recording_done(hass)
+
+    assert inserted == [
+        now,
+        now,
+        now + timedelta(minutes=5),
+        now + timedelta(minutes=10),
+    ]
+
+
 async def test_rename_entity(
     hass: HomeAssistant, entity_registry: er.EntityRegistry, setup_recorder: None
 ) -> None:
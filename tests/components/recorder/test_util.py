@@ -265,12 +265,13 @@ def test_setup_connection_for_dialect_sqlite(sqlite_version: str) -> None:
         is not None
     )
 
-    assert len(execute_args) == 5
-    assert execute_args[0] == "PRAGMA journal_mode=WAL"
-    assert execute_args[1] == "SELECT sqlite_version()"
-    assert execute_args[2] == "PRAGMA cache_size = -16384"
-    assert execute_args[3] == "PRAGMA synchronous=NORMAL"
-    assert execute_args[4] == "PRAGMA foreign_keys=ON"
+    assert len(execute_args) == 6
+    assert execute_args[0] == "PRAGMA auto_vacuum=INCREMENTAL"
+    assert execute_args[1] == "PRAGMA journal_mode=WAL"
+    assert execute_args[2] == "SELECT sqlite_version()"
+    assert execute_args[3] == "PRAGMA cache_size = -16384"
+    assert execute_args[4] == "PRAGMA synchronous=NORMAL"
+    assert execute_args[5] == "PRAGMA foreign_keys=ON"
 
     execute_args = []
     assert (
@@ -320,12 +321,13 @@ def test_setup_connection_for_dialect_sqlite_zero_commit_interval(
         is not None
     )
 
-    assert len(execute_args) == 5
-    assert execute_args[0] == "PRAGMA journal_mode=WAL"
-    assert execute_args[1] == "SELECT sqlite_version()"
-    assert execute_args[2] == "PRAGMA cache_size = -16384"
-    assert execute_args[3] == "PRAGMA synchronous=FULL"
-    assert execute_args[4] == "PRAGMA foreign_keys=ON"
+    assert len(execute_args) == 6
+    assert execute_args[0] == "PRAGMA auto_vacuum=INCREMENTAL"
+    assert execute_args[1] == "PRAGMA journal_mode=WAL"
+    assert execute_args[2] == "SELECT sqlite_version()"
+    assert execute_args[3] == "PRAGMA cache_size = -16384"
+    assert execute_args[4] == "PRAGMA synchronous=FULL"
+    assert execute_args[5] == "PRAGMA foreign_keys=ON"
 
     execute_args = []
     assert (
@@ -1052,6 +1054,57 @@ async def test_execute_stmt_lambda_element(
             assert rows == ["mock_row"]
 
 
+async def test_stream_stmt_lambda_element(
+    hass: HomeAssistant, setup_recorder: None
+) -> None:
+    """Test streaming the rows of a lambda statement."""
+    hass.states.async_set("sensor.on", "on")
+    new_state = hass.states.get("sensor.on")
+    await async_wait_recording_done(hass)
+
+    def _failing_fetch():
+        yield "row_1"
+        raise SQLAlchemyError
+
+    with session_scope(hass=hass) as session:
+        metadata_id = recorder.get_instance(hass).states_meta_manager.get(
+            "sensor.on", session, True
+        )
+        start_time_ts = dt_util.utcnow().timestamp()
+        stmt = lambda_stmt(
+            lambda: _get_single_entity_start_time_stmt(
+                start_time_ts, metadata_id, False, False, False
+            )
+        )
+        rows = util.stream_stmt_lambda_element(session, stmt, yield_per=1)
+        row = next(rows)
+        assert row.state == new_state.state
+        assert row.metadata_id == metadata_id
+
+        # A failed fetch goes on after the rows already yielded
+        connection = MagicMock(
+            execute=MagicMock(
+                side_effect=[SQLAlchemyError, _failing_fetch(), ["row_1", "row_2"]]
+            )
+        )
+        with (
+            patch.object(session, "connection", return_value=connection),
+            patch.object(util, "QUERY_RETRY_WAIT", 0),
+        ):
+            assert list(util.stream_stmt_lambda_element(session, stmt)) == [
+                "row_1",
+                "row_2",
+            ]
+
+        connection.execute.side_effect = SQLAlchemyError
+        with (
+            patch.object(session, "connection", return_value=connection),
+            patch.object(util, "QUERY_RETRY_WAIT", 0),
+            pytest.raises(SQLAlchemyError),
+        ):
+            list(util.stream_stmt_lambda_element(session, stmt))
+
+
 @pytest.mark.freeze_time(datetime(2022, 10, 21, 7, 25, tzinfo=UTC))
 async def test_resolve_period(hass: HomeAssistant) -> None:
     """Test statistic_during_period."""
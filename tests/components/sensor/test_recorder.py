@@ -17,6 +17,7 @@ from homeassistant.components.recorder import (
     DOMAIN as RECORDER_DOMAIN,
     Recorder,
     history,
+    statistics,
 )
 from homeassistant.components.recorder.db_schema import (
     StateAttributes,
@@ -27,6 +28,7 @@ from homeassistant.components.recorder.db_schema import (
 from homeassistant.components.recorder.models import (
     StatisticData,
     StatisticMetaData,
+    StatisticResult,
     process_timestamp,
 )
 from homeassistant.components.recorder.statistics import (
@@ -35,7 +37,12 @@ from homeassistant.components.recorder.statistics import (
     list_statistic_ids,
 )
 from homeassistant.components.recorder.util import get_instance, session_scope
-from homeassistant.components.sensor import ATTR_OPTIONS, DOMAIN, SensorDeviceClass
+from homeassistant.components.sensor import (
+    ATTR_OPTIONS,
+    DOMAIN,
+    SensorDeviceClass,
+    recorder as sensor_recorder,
+)
 from homeassistant.const import ATTR_FRIENDLY_NAME, STATE_UNAVAILABLE
 from homeassistant.core import HomeAssistant, State
 from homeassistant.helpers import issue_registry as ir
@@ -313,6 +320,98 @@ async def test_compile_hourly_statistics(
     assert "Error while processing event StatisticsTask" not in caplog.text
 
 
+async def test_compile_statistics_aggregated_in_database(
+    hass: HomeAssistant, recorder_mock: Recorder
+) -> None:
+    """Test the aggregates calculated by the database match the Python ones."""
+    zero = get_start_time(dt_util.utcnow())
+    five = zero + timedelta(minutes=5)
+    ten = zero + timedelta(minutes=10)
+    await async_setup_component(hass, "sensor", {})
+    # Wait for the sensor recorder platform to be added
+    await async_recorder_block_till_done(hass)
+    with freeze_time(zero) as freezer:
+        for offset, state in (
+            (5, "10"),
+            (60, STATE_UNAVAILABLE),
+            (100, "20"),
+            (200, "-5.5"),
+            (330, "1e1"),
+            (420, "not a number"),
+            # Out of the range of a double, ignored like other non-finite states
+            (440, "1e400"),
+            (460, "-" + "9" * 400),
+            (500, "30"),
+        ):
+            freezer.move_to(zero + timedelta(seconds=offset))
+            hass.states.async_set("sensor.test1", state, POWER_SENSOR_ATTRIBUTES)
+    await async_wait_recording_done(hass)
+
+    # Compile the statistics with the Python implementation
+    do_adhoc_statistics(hass, start=zero)
+    do_adhoc_statistics(hass, start=five)
+    await async_wait_recording_done(hass)
+    stats = statistics_during_period(hass, zero, period="5minute")["sensor.test1"]
+    assert [(stat["mean"], stat["min"], stat["max"]) for stat in stats] == [
+        (pytest.approx(2400 / 295), -5.5, 20),
+        (pytest.approx(4535 / 300), -5.5, 30),
+    ]
+
+    def _get_aggregates(
+        start: datetime, end: datetime
+    ) -> dict[str, statistics.TimeWeightedAggregates]:
+        with session_scope(hass=hass, read_only=True) as session:
+            return statistics.get_time_weighted_aggregates_with_session(
+                hass, session, ["sensor.test1", "sensor.unknown"], start, end
+            )
+
+    for stat, start, end in ((stats[0], zero, five), (stats[1], five, ten)):
+        aggregates = await recorder_mock.async_add_executor_job(
+            _get_aggregates, start, end
+        )
+        assert aggregates == {
+            "sensor.test1": statistics.TimeWeightedAggregates(
+                pytest.approx(stat["mean"]), stat["min"], stat["max"], ANY, "kW"
+            )
+        }
+    assert aggregates["sensor.test1"].last == 30
+
+    def _compile(start: datetime, end: datetime) -> list[StatisticResult]:
+        with session_scope(hass=hass, read_only=True) as session:
+            return sensor_recorder.compile_statistics(
+                hass, session, start, end
+            ).platform_stats
+
+    # The statistics are only aggregated in the database once they have
+    # been compiled before with the same unit
+    recorder_mock.aggregate_statistics_in_database = True
+    with patch.object(
+        statistics,
+        "get_time_weighted_aggregates_with_session",
+        wraps=statistics.get_time_weighted_aggregates_with_session,
+    ) as get_aggregates_mock:
+        compiled = await recorder_mock.async_add_executor_job(_compile, five, ten)
+    assert get_aggregates_mock.call_count == 1
+    assert compiled == [
+        {
+            "meta": {
+                "has_mean": True,
+                "has_sum": False,
+                "name": None,
+                "source": "recorder",
+                "statistic_id": "sensor.test1",
+                "unit_of_measurement": "kW",
+            },
+            "stat": {
+                "start": five,
+                "mean": pytest.approx(stats[1]["mean"]),
+                "min": -5.5,
+                "max": 30,
+            },
+        }
+    ]
+
+
 @pytest.mark.parametrize(
     (
         "device_class",
@@ -0,0 +1,86 @@
+"""Test the rolling window of the statistics sensor."""
+
+from datetime import datetime, timedelta
+import math
+import random
+import statistics
+
+import pytest
+
+from homeassistant.components.statistics.window import SampleWindow
+from homeassistant.util import dt as dt_util
+
+
+def _assert_matches_samples(window: SampleWindow) -> None:
+    """Assert the statistics of the window match a full pass over its samples."""
+    states = list(window.states)
+    ages = list(window.ages)
+    assert window.sum == pytest.approx(sum(states), abs=1e-6)
+    assert window.mean == pytest.approx(statistics.mean(states), abs=1e-9)
+    assert window.median == statistics.median(states)
+    assert window.value_max == max(states)
+    assert window.value_min == min(states)
+    if len(states) < 2:
+        return
+    assert window.variance == pytest.approx(statistics.variance(states), abs=1e-6)
+    percentiles = statistics.quantiles(states, n=100, method="exclusive")
+    for percentile in (1, 10, 50, 90, 99):
+        assert window.percentile(percentile) == pytest.approx(
+            percentiles[percentile - 1]
+        )
+    pairs = list(zip(states, states[1:], strict=False))
+    assert window.sum_differences == pytest.approx(
+        sum(abs(j - i) for i, j in pairs), abs=1e-6
+    )
+    assert window.sum_differences_nonnegative == pytest.approx(
+        sum(j - i if j >= i else j for i, j in pairs), abs=1e-6
+    )
+    seconds = [
+        (age - previous).total_seconds()
+        for previous, age in zip(ages, ages[1:], strict=False)
+    ]
+    assert window.step_area == pytest.approx(
+        sum(i * dt for (i, _), dt in zip(pairs, seconds, strict=True)), abs=1e-3
+    )
+    assert window.linear_area == pytest.approx(
+        sum(0.5 * (i + j) * dt for (i, j), dt in zip(pairs, seconds, strict=True)),
+        abs=1e-3,
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("maxlen", [1, 2, 7, 100, None])
+def test_window_matches_full_pass(seed: int, maxlen: int | None) -> None:
+    """Test the incremental statistics match a full pass over random samples."""
+    rng = random.Random(seed)
+    window = SampleWindow(maxlen)
+    age = dt_util.utcnow()
+    for _ in range(500):
+        # Repeated values test removing duplicates from the sorted values
+        if rng.random() < 0.2:
+            value = float(rng.randint(-2, 2))
+        else:
+            value = round(rng.uniform(-1000, 1000), rng.randint(0, 3))
+        age += timedelta(seconds=rng.randint(0, 60))
+        window.append(value, age)
+        if len(window) > 1 and rng.random() < 0.3:
+            window.popleft()
+        if maxlen is not None:
+            assert len(window) <= maxlen
+        _assert_matches_samples(window)
+
+
+def test_window_non_finite_values() -> None:
+    """Test the running totals recover once non finite values are removed."""
+    window = SampleWindow(3)
+    age = datetime(2024, 1, 1, tzinfo=dt_util.UTC)
+    for value in (1.0, math.inf, math.nan):
+        window.append(value, age)
+    assert math.isnan(window.sum)
+    assert math.isnan(window.mean_circular)
+
+    for value in (2.0, 3.0, 4.0):
+        age += timedelta(seconds=10)
+        window.append(value, age)
+    _assert_matches_samples(window)
+    assert window.mean_circular == pytest.approx(3)
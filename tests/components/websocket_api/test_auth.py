@@ -1,9 +1,11 @@
 """Test auth of websocket API."""
 
+from typing import Any
 from unittest.mock import patch
 
 import aiohttp
 from aiohttp import WSMsgType
+import msgpack
 import pytest
 
 from homeassistant.auth.providers.homeassistant import HassAuthProvider
@@ -14,6 +16,7 @@ from homeassistant.components.websocket_api.auth import (
     TYPE_AUTH_REQUIRED,
 )
 from homeassistant.components.websocket_api.const import (
+    ENCODING_MSGPACK,
     SIGNAL_WEBSOCKET_CONNECTED,
     SIGNAL_WEBSOCKET_DISCONNECTED,
     URL,
@@ -127,6 +130,66 @@ async def test_auth_active_with_token(
     assert auth_msg["type"] == TYPE_AUTH_OK
 
 
+async def test_auth_with_msgpack_encoding(
+    hass: HomeAssistant, no_auth_websocket_client, hass_access_token: str
+) -> None:
+    """Test requesting MessagePack encoding in the auth message."""
+    await no_auth_websocket_client.send_json(
+        {
+            "type": TYPE_AUTH,
+            "access_token": hass_access_token,
+            "encoding": ENCODING_MSGPACK,
+        }
+    )
+    auth_msg = await no_auth_websocket_client.receive_json()
+
+    assert auth_msg["type"] == TYPE_AUTH_OK
+    assert auth_msg["encoding"] == ENCODING_MSGPACK
+
+    # All messages after the auth phase are MessagePack binary frames
+    async def receive_msgpack() -> Any:
+        """Receive the next message."""
+        msg = await no_auth_websocket_client.receive()
+        assert msg.type == WSMsgType.BINARY
+        return msgpack.unpackb(msg.data)
+
+    await no_auth_websocket_client.send_json({"id": 1, "type": "ping"})
+    assert await receive_msgpack() == {"id": 1, "type": "pong"}
+
+    await no_auth_websocket_client.send_json({"id": 2, "type": "get_states"})
+    assert await receive_msgpack() == {
+        "id": 2,
+        "type": "result",
+        "success": True,
+        "result": [],
+    }
+
+    await no_auth_websocket_client.send_json({"id": 3, "type": "subscribe_entities"})
+    assert (await receive_msgpack())["success"]
+    assert await receive_msgpack() == {"id": 3, "type": "event", "event": {"a": {}}}
+
+    hass.states.async_set("light.kitchen", "on")
+    assert (await receive_msgpack())["event"]["a"]["light.kitchen"]["s"] == "on"
+
+    await no_auth_websocket_client.send_json({"id": 4, "type": "unknown_command"})
+    msg = await receive_msgpack()
+    assert msg["id"] == 4
+    assert msg["error"]["code"] == "unknown_command"
+
+
+async def test_auth_with_invalid_encoding(
+    no_auth_websocket_client, hass_access_token: str
+) -> None:
+    """Test requesting an unknown encoding in the auth message."""
+    await no_auth_websocket_client.send_json(
+        {"type": TYPE_AUTH, "access_token": hass_access_token, "encoding": "cbor"}
+    )
+    msg = await no_auth_websocket_client.receive_json()
+
+    assert msg["type"] == TYPE_AUTH_INVALID
+    assert msg["message"].startswith("Auth message incorrectly formatted")
+
+
 async def test_auth_active_user_inactive(
     hass: HomeAssistant,
     hass_client_no_auth: ClientSessionGenerator,
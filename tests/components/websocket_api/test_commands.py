@@ -1310,6 +1310,55 @@ async def test_subscribe_unsubscribe_entities_with_filter(
     }
 
 
+async def test_subscribe_entities_shared_snapshot(
+    hass: HomeAssistant,
+    websocket_client: MockHAClientWebSocket,
+    hass_admin_user: MockUser,
+) -> None:
+    """Test the initial subscribe entities response follows state changes."""
+    hass.states.async_set("light.kitchen", "off", {"color": "red"})
+    hass.states.async_set("light.removed", "off")
+    await websocket_client.send_json({"id": 7, "type": "subscribe_entities"})
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 7
+    assert msg["type"] == const.TYPE_RESULT
+    assert msg["success"]
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 7
+    assert msg["type"] == "event"
+    assert set(msg["event"]["a"]) == {"light.kitchen", "light.removed"}
+
+    hass.states.async_set("light.kitchen", "on", {"color": "blue"})
+    hass.states.async_remove("light.removed")
+    hass.states.async_set("light.added", "on")
+
+    await websocket_client.send_json(
+        {"id": 8, "type": "subscribe_entities", "include": {"domains": ["light"]}}
+    )
+    await websocket_client.send_json({"id": 9, "type": "subscribe_entities"})
+
+    init_events = {}
+    while len(init_events) < 2:
+        msg = await websocket_client.receive_json()
+        if msg["id"] in (8, 9) and msg["type"] == "event":
+            init_events[msg["id"]] = msg["event"]
+
+    for event in init_events.values():
+        assert event == {
+            "a": {
+                "light.kitchen": {
+                    "a": {"color": "blue"},
+                    "c": ANY,
+                    "lc": ANY,
+                    "s": "on",
+                },
+                "light.added": {"a": {}, "c": ANY, "lc": ANY, "s": "on"},
+            }
+        }
+
+
 async def test_render_template_renders_template(
     hass: HomeAssistant, websocket_client
 ) -> None:
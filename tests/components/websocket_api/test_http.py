@@ -3,9 +3,10 @@
 import asyncio
 from datetime import timedelta
 from typing import Any, cast
-from unittest.mock import patch
+from unittest.mock import ANY, patch
 
 from aiohttp import ServerDisconnectedError, WSMsgType, web
+import msgpack
 import pytest
 
 from homeassistant.components.websocket_api import (
@@ -345,6 +346,149 @@ async def test_pending_msg_peak_but_does_not_overflow(
     assert "Client unable to keep up with pending messages" not in caplog.text
 
 
+async def test_merge_state_diffs(
+    hass: HomeAssistant, hass_ws_client: WebSocketGenerator
+) -> None:
+    """Test state changes of an entity are merged when the queue backs up."""
+    hass.states.async_set("light.kitchen", "off", {"color": "red"})
+    with patch(
+        "homeassistant.components.websocket_api.http.PENDING_MSG_MERGE_STATE_DIFFS",
+        0,
+    ):
+        websocket_client = await hass_ws_client()
+        await websocket_client.send_json({"id": 5, "type": "subscribe_entities"})
+        msg = await websocket_client.receive_json()
+        assert msg["success"]
+        msg = await websocket_client.receive_json()
+        assert "light.kitchen" in msg["event"]["a"]
+
+        hass.states.async_set("light.kitchen", "on", {"color": "yellow", "fx": "x"})
+        hass.states.async_set("light.kitchen", "on", {"color": "blue"})
+        hass.states.async_set("light.other", "on")
+
+        msg = await websocket_client.receive_json()
+        assert msg["id"] == 5
+        assert msg["event"] == {
+            "c": {
+                "light.kitchen": {
+                    "+": {
+                        "a": {"color": "blue"},
+                        "c": ANY,
+                        "lc": ANY,
+                        "s": "on",
+                    }
+                }
+            }
+        }
+        msg = await websocket_client.receive_json()
+        assert msg["id"] == 5
+        assert msg["event"] == {
+            "a": {"light.other": {"a": {}, "c": ANY, "lc": ANY, "s": "on"}}
+        }
+
+        hass.states.async_remove("light.other")
+        msg = await websocket_client.receive_json()
+        assert msg["event"] == {"r": ["light.other"]}
+
+        await websocket_client.send_json({"id": 6, "type": "connection_stats"})
+        msg = await websocket_client.receive_json()
+        assert msg["success"]
+        assert msg["result"] == [
+            {
+                "description": ANY,
+                "queue_depth": ANY,
+                "pending_state_diffs": 0,
+                "merged_state_diffs": 1,
+            }
+        ]
+
+
+async def test_msgpack_state_diffs(
+    hass: HomeAssistant, no_auth_websocket_client, hass_access_token: str
+) -> None:
+    """Test all messages are sent as coalesced MessagePack binary frames."""
+    hass.states.async_set("light.kitchen", "off", {"color": "red"})
+    websocket_client = no_auth_websocket_client
+    await websocket_client.send_json(
+        {
+            "type": "auth",
+            "access_token": hass_access_token,
+            "encoding": const.ENCODING_MSGPACK,
+        }
+    )
+    auth_msg = await websocket_client.receive_json()
+    assert auth_msg["type"] == "auth_ok"
+
+    received: list[dict[str, Any]] = []
+
+    async def receive_msgpack() -> dict[str, Any]:
+        """Receive the next message, unpacking coalesced messages."""
+        if not received:
+            msg = await websocket_client.receive()
+            assert msg.type == WSMsgType.BINARY
+            data = msgpack.unpackb(msg.data)
+            received.extend(data if isinstance(data, list) else [data])
+        return received.pop(0)
+
+    await websocket_client.send_json(
+        {
+            "id": 1,
+            "type": "supported_features",
+            "features": {const.FEATURE_COALESCE_MESSAGES: 1},
+        }
+    )
+    msg = await receive_msgpack()
+    assert msg["id"] == 1
+    assert msg["success"]
+
+    with patch(
+        "homeassistant.components.websocket_api.http.PENDING_MSG_MERGE_STATE_DIFFS",
+        0,
+    ):
+        await websocket_client.send_json({"id": 5, "type": "subscribe_entities"})
+        msg = await receive_msgpack()
+        assert msg["id"] == 5
+        assert msg["success"]
+        msg = await receive_msgpack()
+        assert msg["event"]["a"]["light.kitchen"]["s"] == "off"
+
+        hass.states.async_set("light.kitchen", "on", {"color": "yellow"})
+        hass.states.async_set("light.kitchen", "on", {"color": "blue"})
+        hass.states.async_set("light.other", "on")
+
+        msg = await receive_msgpack()
+        assert msg["id"] == 5
+        assert msg["event"] == {
+            "c": {
+                "light.kitchen": {
+                    "+": {"a": {"color": "blue"}, "c": ANY, "lc": ANY, "s": "on"}
+                }
+            }
+        }
+        msg = await receive_msgpack()
+        assert msg["id"] == 5
+        assert msg["event"] == {
+            "a": {"light.other": {"a": {}, "c": ANY, "lc": ANY, "s": "on"}}
+        }
+
+    hass.states.async_remove("light.other")
+    msg = await receive_msgpack()
+    assert msg == {"id": 5, "type": "event", "event": {"r": ["light.other"]}}
+
+    # The initial states of a filtered subscription
+    await websocket_client.send_json(
+        {"id": 6, "type": "subscribe_entities", "entity_ids": ["light.kitchen"]}
+    )
+    msg = await receive_msgpack()
+    assert msg["id"] == 6
+    assert msg["success"]
+    msg = await receive_msgpack()
+    assert msg["id"] == 6
+    assert list(msg["event"]["a"]) == ["light.kitchen"]
+    assert msg["event"]["a"]["light.kitchen"]["s"] == "on"
+    assert msg["event"]["a"]["light.kitchen"]["a"] == {"color": "blue"}
+
+
 async def test_non_json_message(
     hass: HomeAssistant, websocket_client, caplog: pytest.LogCaptureFixture
 ) -> None:
@@ -1,15 +1,28 @@
 """Test Websocket API messages module."""
 
+import msgpack
 import pytest
 
 from homeassistant.components.websocket_api.messages import (
+    _add_msgpack_message_id,
     _partial_cached_event_message as lru_event_cache,
     _state_diff_event,
     cached_event_message,
+    cached_state_diff_message,
+    cached_state_diff_msgpack_message,
+    compressed_state_msgpack_item,
+    entities_init_msgpack_message,
+    json_bytes_to_msgpack_bytes,
     message_to_json_bytes,
+    message_to_msgpack_bytes,
+    msgpack_array,
+    msgpack_map,
+    state_diff_message,
+    state_diff_msgpack_message,
 )
 from homeassistant.const import EVENT_STATE_CHANGED
 from homeassistant.core import Context, Event, HomeAssistant, State, callback
+from homeassistant.util.json import json_loads
 
 from tests.common import async_capture_events
 
@@ -297,5 +310,103 @@ async def test_message_to_json_bytes(caplog: pytest.LogCaptureFixture) -> None:
     assert "Unable to serialize to JSON" in caplog.text
 
 
+async def test_message_to_msgpack_bytes(caplog: pytest.LogCaptureFixture) -> None:
+    """Test we can serialize websocket messages to MessagePack."""
+    message = message_to_msgpack_bytes({"id": 1, "message": "xyz"})
+
+    assert msgpack.unpackb(message) == {"id": 1, "message": "xyz"}
+    assert json_bytes_to_msgpack_bytes(b'{"id":1,"message":"xyz"}') == message
+
+    message2 = message_to_msgpack_bytes({"id": 1, "message": _Unserializeable()})
+
+    assert msgpack.unpackb(message2) == {
+        "id": 1,
+        "type": "result",
+        "success": False,
+        "error": {"code": "unknown_error", "message": "Invalid JSON in response"},
+    }
+    assert "Unable to serialize to MessagePack" in caplog.text
+
+
+@pytest.mark.parametrize("count", [0, 1, 15, 16, 65536])
+def test_entities_init_msgpack_message(count: int) -> None:
+    """Test the initial subscribe_entities message frames the encoded states."""
+    states = [State(f"light.light_{idx}", "on", {"idx": idx}) for idx in range(count)]
+
+    assert msgpack.unpackb(
+        entities_init_msgpack_message(
+            b"5",
+            msgpack_map([compressed_state_msgpack_item(state) for state in states]),
+        )
+    ) == {
+        "id": 5,
+        "type": "event",
+        "event": {
+            "a": {
+                state.entity_id: json_loads(
+                    b"{" + state.as_compressed_state_json + b"}"
+                )[state.entity_id]
+                for state in states
+            }
+        },
+    }
+
+
+async def test_state_diff_msgpack_message(hass: HomeAssistant) -> None:
+    """Test MessagePack state diff messages match the JSON messages."""
+    state_change_events = async_capture_events(hass, EVENT_STATE_CHANGED)
+    hass.states.async_set("light.window", "on", {"color": "red"})
+    hass.states.async_set("light.window", "off", {"color": "blue"})
+    await hass.async_block_till_done()
+    event = state_change_events[-1]
+
+    for message_id in (b"5", b"1234", b"123456789"):
+        assert msgpack.unpackb(
+            cached_state_diff_msgpack_message(message_id, event)
+        ) == json_loads(cached_state_diff_message(message_id, event))
+        assert msgpack.unpackb(
+            state_diff_msgpack_message(
+                message_id,
+                "light.window",
+                event.data["old_state"],
+                event.data["new_state"],
+            )
+        ) == json_loads(
+            state_diff_message(
+                message_id,
+                "light.window",
+                event.data["old_state"],
+                event.data["new_state"],
+            )
+        )
+
+
+@pytest.mark.parametrize("count", [0, 1, 15, 16, 65535, 65536])
+def test_msgpack_array(count: int) -> None:
+    """Test joining MessagePack messages into an array."""
+    messages = [msgpack.packb({"id": idx}) for idx in range(count)]
+
+    assert msgpack.unpackb(msgpack_array(messages)) == [
+        {"id": idx} for idx in range(count)
+    ]
+
+
+@pytest.mark.parametrize("count", [0, 1, 14, 15, 16, 65535, 70000])
+def test_add_msgpack_message_id(count: int) -> None:
+    """Test adding the id to MessagePack maps of any size."""
+    partial_message = msgpack.packb({f"key{idx}": idx for idx in range(count)})
+
+    assert msgpack.unpackb(_add_msgpack_message_id(partial_message, b"1234")) == {
+        "id": 1234,
+        **{f"key{idx}": idx for idx in range(count)},
+    }
+
+
+def test_add_msgpack_message_id_not_a_map() -> None:
+    """Test adding the id to a MessagePack value which is not a map."""
+    with pytest.raises(ValueError, match="not a MessagePack map"):
+        _add_msgpack_message_id(msgpack.packb([1, 2]), b"1")
+
+
 class _Unserializeable:
     """A class that cannot be serialized."""
@@ -858,19 +858,27 @@ def hass_ws_client(
     """Websocket client fixture connected to websocket server."""
 
     async def create_client(
-        hass: HomeAssistant = hass, access_token: str | None = hass_access_token
+        hass: HomeAssistant = hass,
+        access_token: str | None = hass_access_token,
+        encoding: str | None = None,
     ) -> MockHAClientWebSocket:
-        """Create a websocket client."""
+        """Create a websocket client.
+
+        Pass an encoding to request it in the auth message.
+        """
         assert await async_setup_component(hass, "websocket_api", {})
         client = await aiohttp_client(hass.http.app)
         websocket = await client.ws_connect(URL)
         auth_resp = await websocket.receive_json()
         assert auth_resp["type"] == TYPE_AUTH_REQUIRED
 
-        if access_token is None:
-            await websocket.send_json({"type": TYPE_AUTH, "access_token": "incorrect"})
-        else:
-            await websocket.send_json({"type": TYPE_AUTH, "access_token": access_token})
+        auth_msg = {
+            "type": TYPE_AUTH,
+            "access_token": "incorrect" if access_token is None else access_token,
+        }
+        if encoding is not None:
+            auth_msg["encoding"] = encoding
+        await websocket.send_json(auth_msg)
 
         auth_ok = await websocket.receive_json()
         assert auth_ok["type"] == TYPE_AUTH_OK
@@ -2395,6 +2395,44 @@ async def test_track_template_result_transient_errors(
     assert "ValueError" not in repr(info)
 
 
+async def test_track_template_result_selected_states(hass: HomeAssistant) -> None:
+    """Test selecting constant entities from all states only tracks those entities."""
+    hass.states.async_set("light.one", "on")
+    template_selected = Template(
+        "{{ states | selectattr('entity_id', 'in', ['light.one', 'light.two'])"
+        " | selectattr('state', 'eq', 'on') | list | count }}",
+        hass,
+    )
+    runs = []
+
+    @ha.callback
+    def selected_listener(
+        event: Event[EventStateChangedData] | None,
+        updates: list[TrackTemplateResult],
+    ) -> None:
+        runs.append(updates.pop().result)
+
+    info = async_track_template_result(
+        hass, [TrackTemplate(template_selected, None)], selected_listener
+    )
+    await hass.async_block_till_done()
+
+    assert info.listeners == {
+        "all": False,
+        "domains": set(),
+        "entities": {"light.one", "light.two"},
+        "time": False,
+    }
+
+    hass.states.async_set("light.three", "on")
+    await hass.async_block_till_done()
+    assert runs == []
+
+    hass.states.async_set("light.two", "on")
+    await hass.async_block_till_done()
+    assert runs == [2]
+
+
 async def test_static_string(hass: HomeAssistant) -> None:
     """Test a static string."""
     template_refresh = Template("{{ 'static' }}", hass)
@@ -31,6 +31,7 @@ from homeassistant.const import (
     UnitOfSpeed,
     UnitOfTemperature,
     UnitOfVolume,
+    __version__,
 )
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import TemplateError
@@ -342,6 +343,51 @@ async def test_import_change(hass: HomeAssistant) -> None:
     assert to_test.async_render() == "macro2 variable2"
 
 
+async def test_template_code_cache(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Test compiled template code is persisted across restarts."""
+    await template.async_load_template_code_cache(hass)
+    code_cache = hass.data[template._TEMPLATE_CODE_CACHE]
+
+    tpl = template.Template("{{ 1 + 1 }}", hass)
+    assert tpl.async_render() == 2
+    limited_tpl = template.Template("{{ 1 + 1 }}", hass)
+    assert limited_tpl.async_render(limited=True) == 2
+    assert code_cache.hits == 0
+    assert code_cache.misses == 2
+
+    async_fire_time_changed(
+        hass,
+        dt_util.utcnow() + timedelta(seconds=template.TEMPLATE_CODE_CACHE_SAVE_DELAY),
+    )
+    await hass.async_block_till_done()
+    data = hass_storage[template.TEMPLATE_CODE_CACHE_STORAGE_KEY]["data"]
+    assert data["ha_version"] == __version__
+    assert len(data["code"]) == 2
+
+    # Simulate a restart
+    for key in (template._ENVIRONMENT, template._ENVIRONMENT_LIMITED):
+        hass.data.pop(key)
+    await template.async_load_template_code_cache(hass)
+    code_cache = hass.data[template._TEMPLATE_CODE_CACHE]
+
+    assert template.Template("{{ 1 + 1 }}", hass).async_render() == 2
+    assert template.Template("{{ 1 + 2 }}", hass).async_render() == 3
+    assert code_cache.hits == 1
+    assert code_cache.misses == 1
+
+    # The cache is discarded after an upgrade
+    hass.data.pop(template._ENVIRONMENT)
+    data["ha_version"] = "0.1.0"
+    await template.async_load_template_code_cache(hass)
+    code_cache = hass.data[template._TEMPLATE_CODE_CACHE]
+
+    assert template.Template("{{ 1 + 1 }}", hass).async_render() == 2
+    assert code_cache.hits == 0
+    assert code_cache.misses == 1
+
+
 def test_loop_controls(hass: HomeAssistant) -> None:
     """Test that loop controls are enabled."""
     assert (
@@ -2212,6 +2258,49 @@ def test_has_value(hass: HomeAssistant) -> None:
     assert tpl.async_render() == "yes"
 
 
+async def test_states_aggregates(hass: HomeAssistant) -> None:
+    """Test the states_sum, states_mean and states_count_by functions."""
+    hass.states.async_set(
+        "sensor.one", "100", {"device_class": "power", "unit_of_measurement": "W"}
+    )
+    hass.states.async_set(
+        "sensor.two", "50.5", {"device_class": "power", "unit_of_measurement": "W"}
+    )
+    hass.states.async_set(
+        "sensor.three", "2", {"device_class": "power", "unit_of_measurement": "kW"}
+    )
+    hass.states.async_set("sensor.four", STATE_UNAVAILABLE, {"device_class": "power"})
+    hass.states.async_set("sensor.five", "nan", {"device_class": "power"})
+    hass.states.async_set("sensor.energy", "7", {"device_class": "energy"})
+    hass.states.async_set("light.one", "on", {"color_mode": "hs"})
+    hass.states.async_set("light.two", "on", {"color_mode": "xy"})
+    hass.states.async_set("light.three", "off", {"color_mode": "hs"})
+
+    info = render_to_info(hass, "{{ states_sum('sensor', 'power', 'W') }}")
+    assert_result_info(info, 150.5, domains=["sensor"])
+    assert info.rate_limit == template.DOMAIN_STATES_RATE_LIMIT
+
+    assert render(hass, "{{ 'sensor' | states_sum(device_class='power') }}") == 152.5
+    assert render(hass, "{{ states_sum('sensor') }}") == 159.5
+    assert render(hass, "{{ states_sum('switch') }}") == 0
+    assert render(hass, "{{ states_mean('sensor', unit_of_measurement='W') }}") == (
+        75.25
+    )
+    assert render(hass, "{{ states_mean('switch', default='none') }}") == "none"
+    with pytest.raises(TemplateError, match="no default was specified"):
+        render(hass, "{{ states_mean('switch') }}")
+
+    info = render_to_info(hass, "{{ states_count_by('light') }}")
+    assert_result_info(info, {"on": 2, "off": 1}, domains=["light"])
+    assert render(hass, "{{ 'light' | states_count_by('color_mode') }}") == {
+        "hs": 2,
+        "xy": 1,
+    }
+
+    with pytest.raises(TemplateError, match="Invalid domain name"):
+        render(hass, "{{ states_sum('Invalid Domain') }}")
+
+
 @patch(
     "homeassistant.helpers.template.TemplateEnvironment.is_safe_callable",
     return_value=True,
@@ -5605,6 +5694,161 @@ async def test_render_to_info_with_exception(hass: HomeAssistant) -> None:
     assert info.entities == {"test_domain.object"}
 
 
+@pytest.mark.parametrize(
+    ("template_str", "entities", "domains", "areas", "all_states"),
+    [
+        ("{{ 1 + 1 }}", set(), set(), set(), False),
+        (
+            "{{ states('sensor.a') | float + states.sensor.b.state | float }}",
+            {"sensor.a", "sensor.b"},
+            set(),
+            set(),
+            False,
+        ),
+        (
+            "{{ is_state('light.a', 'on') and state_attr('light.b', 'x') }}"
+            "{{ states['light.c'].state }}{{ 'light.d' | has_value }}"
+            "{{ 'light.e' is is_state('on') }}",
+            {"light.a", "light.b", "light.c", "light.d", "light.e"},
+            set(),
+            set(),
+            False,
+        ),
+        ("{{ states.light | count }}", set(), {"light"}, set(), False),
+        (
+            "{{ expand('group.a', ['light.a']) | map(attribute='state') | list }}",
+            {"group.a", "light.a"},
+            set(),
+            set(),
+            False,
+        ),
+        (
+            "{{ area_entities('kitchen') | map('states') | list }}",
+            set(),
+            set(),
+            {"kitchen"},
+            False,
+        ),
+        (
+            "{{ states | selectattr('entity_id', 'in', ['light.a', 'light.b'])"
+            " | list | count }}",
+            {"light.a", "light.b"},
+            set(),
+            set(),
+            False,
+        ),
+        (
+            "{{ states | selectattr('domain', 'eq', 'light') | list | count }}",
+            set(),
+            {"light"},
+            set(),
+            False,
+        ),
+        (
+            "{{ states_sum('sensor', 'power') + 'light' | states_count_by }}",
+            set(),
+            {"sensor", "light"},
+            set(),
+            False,
+        ),
+        ("{{ states | count }}", set(), set(), set(), True),
+        (
+            "{{ states | selectattr('state', 'eq', 'on') | list }}",
+            set(),
+            set(),
+            set(),
+            True,
+        ),
+        ("{{ states(entity_id) }}{{ states[entity_id] }}", set(), set(), set(), True),
+        ("{{ states.switch", set(), set(), set(), False),
+        (
+            "{% import 'test.jinja' as t %}{{ t.test_macro() }}",
+            set(),
+            set(),
+            set(),
+            True,
+        ),
+        (
+            "{% from 'test.jinja' import test_macro %}{{ states('light.a') }}",
+            {"light.a"},
+            set(),
+            set(),
+            True,
+        ),
+        ("{% include 'test.jinja' %}", set(), set(), set(), True),
+        ("{% extends 'test.jinja' %}", set(), set(), set(), True),
+    ],
+)
+def test_template_dependencies(
+    template_str: str,
+    entities: set[str],
+    domains: set[str],
+    areas: set[str],
+    all_states: bool,
+) -> None:
+    """Test finding the dependencies of a template without rendering."""
+    dependencies = template.template_dependencies(template_str)
+    assert dependencies.entities == entities
+    assert dependencies.domains == domains
+    assert dependencies.areas == areas
+    assert dependencies.all_states is all_states
+
+
+async def test_render_to_info_selected_states(hass: HomeAssistant) -> None:
+    """Test selecting constant entities from all states does not track all states."""
+    hass.states.async_set("light.a", "on")
+    hass.states.async_set("light.c", "on")
+    info = render_to_info(
+        hass,
+        "{{ states | selectattr('entity_id', 'in', ['light.a', 'light.b'])"
+        " | map(attribute='entity_id') | list }}",
+    )
+    assert_result_info(info, ["light.a"], entities=["light.a", "light.b"])
+    assert info.rate_limit is None
+
+    info = render_to_info(
+        hass, "{{ states | selectattr('domain', 'eq', 'light') | list | count }}"
+    )
+    assert_result_info(info, 2, domains=["light"])
+    assert info.rate_limit == template.DOMAIN_STATES_RATE_LIMIT
+
+
+async def test_render_to_info_selected_states_with_import(hass: HomeAssistant) -> None:
+    """Test a template importing a macro which iterates states tracks all states."""
+    await template.async_load_custom_templates(hass)
+    template._get_hass_loader(hass).sources = {
+        "on_lights.jinja": """
+            {% macro on_lights() -%}
+            {{ states | selectattr('state', 'eq', 'on') | list | count }}
+            {%- endmacro %}
+        """
+    }
+    hass.states.async_set("light.a", "on")
+    info = render_to_info(
+        hass,
+        "{% from 'on_lights.jinja' import on_lights %}"
+        "{{ states | selectattr('entity_id', 'in', ['light.a']) | list | count }}"
+        " {{ on_lights() }}",
+    )
+    assert info.result() == "1 1"
+    assert info.all_states is True
+    assert info.rate_limit == template.ALL_STATES_RATE_LIMIT
+
+
+async def test_render_to_info_with_exception_dependencies(
+    hass: HomeAssistant,
+) -> None:
+    """Test entities after the failing part of a template are still tracked."""
+    info = render_to_info(
+        hass, "{{ states('sensor.a') | float + states('sensor.b') | float }}"
+    )
+    with pytest.raises(TemplateError, match="no default was specified"):
+        info.result()
+
+    assert info.all_states is False
+    assert info.entities == {"sensor.a", "sensor.b"}
+
+
 async def test_lru_increases_with_many_entities(hass: HomeAssistant) -> None:
     """Test that the template internal LRU cache increases with many entities."""
     # We do not actually want to record 4096 entities so we mock the entity count
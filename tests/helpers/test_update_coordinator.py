@@ -11,8 +11,8 @@ import pytest
 import requests
 
 from homeassistant import config_entries
-from homeassistant.const import EVENT_HOMEASSISTANT_STOP
-from homeassistant.core import CoreState, HomeAssistant, callback
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, EVENT_STATE_CHANGED
+from homeassistant.core import CoreState, Event, HomeAssistant, callback
 from homeassistant.exceptions import (
     ConfigEntryAuthFailed,
     ConfigEntryError,
@@ -492,6 +492,53 @@ async def test_async_set_updated_data(
     remove_callbacks()
 
 
+async def test_async_set_updated_data_batched_delivery(
+    hass: HomeAssistant, crd: update_coordinator.DataUpdateCoordinator[int]
+) -> None:
+    """Test the states written for a coordinator update are delivered in one batch."""
+
+    class DataEntity(
+        update_coordinator.CoordinatorEntity[update_coordinator.DataUpdateCoordinator]
+    ):
+        @property
+        def state(self) -> int:
+            return self.coordinator.data
+
+    remove_callbacks = []
+    for index in range(3):
+        entity = DataEntity(crd)
+        entity.hass = hass
+        entity.entity_id = f"sensor.data_{index}"
+        remove_callbacks.append(
+            crd.async_add_listener(entity._handle_coordinator_update)
+        )
+
+    batches: list[list[str]] = []
+
+    @callback
+    def _batched_listener(events: list[Event]) -> None:
+        batches.append([event.data["entity_id"] for event in events])
+
+    remove_listener = hass.bus.async_listen_batched(
+        EVENT_STATE_CHANGED, _batched_listener
+    )
+    crd.async_set_updated_data(100)
+    crd.async_set_updated_data(200)
+    await hass.async_block_till_done()
+
+    entity_ids = ["sensor.data_0", "sensor.data_1", "sensor.data_2"]
+    assert batches == [entity_ids * 2]
+    assert hass.states.get("sensor.data_0").state == "200"
+
+    crd.async_set_updated_data(300)
+    await hass.async_block_till_done()
+    assert batches == [entity_ids * 2, entity_ids]
+
+    remove_listener()
+    for remove_callback in remove_callbacks:
+        remove_callback()
+
+
 async def test_stop_refresh_on_ha_stop(
     hass: HomeAssistant, crd: update_coordinator.DataUpdateCoordinator[int]
 ) -> None:
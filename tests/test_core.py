@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import array
 import asyncio
+import copy
 from datetime import datetime, timedelta
 import functools
 import gc
@@ -1166,6 +1167,193 @@ async def test_eventbus_filtered_listener(hass: HomeAssistant) -> None:
     unsub()
 
 
+async def test_eventbus_batched_listener(hass: HomeAssistant) -> None:
+    """Test batched listeners receive all events of a loop iteration at once."""
+    batches: list[list[ha.Event]] = []
+
+    @ha.callback
+    def listener(events: list[ha.Event]) -> None:
+        """Mock batched listener."""
+        batches.append(events)
+
+    @ha.callback
+    def mock_filter(event_data):
+        """Mock filter."""
+        return not event_data["filtered"]
+
+    unsub = hass.bus.async_listen_batched("test", listener, event_filter=mock_filter)
+
+    hass.bus.async_fire("test", {"filtered": False, "idx": 1})
+    hass.bus.async_fire("test", {"filtered": True, "idx": 2})
+    hass.bus.async_fire("test", {"filtered": False, "idx": 3})
+    assert batches == []
+    await hass.async_block_till_done()
+
+    assert len(batches) == 1
+    assert [event.data["idx"] for event in batches[0]] == [1, 3]
+
+    hass.bus.async_fire("test", {"filtered": False, "idx": 4})
+    await hass.async_block_till_done()
+    assert len(batches) == 2
+    assert [event.data["idx"] for event in batches[1]] == [4]
+
+    hass.bus.async_fire("test", {"filtered": False, "idx": 5})
+    unsub()
+    await hass.async_block_till_done()
+    assert len(batches) == 2
+    assert hass.bus.async_listeners().get("test") is None
+
+
+async def test_eventbus_batched_listener_coroutine(hass: HomeAssistant) -> None:
+    """Test batched listeners can be coroutine functions."""
+    batches: list[list[ha.Event]] = []
+
+    async def listener(events: list[ha.Event]) -> None:
+        """Mock batched listener."""
+        batches.append(events)
+
+    unsub = hass.bus.async_listen_batched("test", listener)
+    hass.bus.async_fire("test", {"idx": 1})
+    hass.bus.async_fire("test", {"idx": 2})
+    await hass.async_block_till_done()
+
+    assert len(batches) == 1
+    assert [event.data["idx"] for event in batches[0]] == [1, 2]
+    unsub()
+
+
+async def test_eventbus_batched_listener_restrictions(hass: HomeAssistant) -> None:
+    """Test batched listener filter restrictions."""
+
+    def not_a_callback(event_data):
+        return True
+
+    with pytest.raises(HomeAssistantError, match="is not a callback"):
+        hass.bus.async_listen_batched(
+            "test", ha.callback(lambda events: None), event_filter=not_a_callback
+        )
+    with pytest.raises(HomeAssistantError, match="Event filter is required"):
+        hass.bus.async_listen_batched(
+            EVENT_STATE_REPORTED, ha.callback(lambda events: None)
+        )
+
+
+async def test_eventbus_indexed_listener(hass: HomeAssistant) -> None:
+    """Test indexed listeners only receive events for their index values."""
+    entity_calls: list[ha.Event] = []
+    domain_calls: list[ha.Event] = []
+    device_calls: list[ha.Event] = []
+
+    @ha.callback
+    def entity_listener(event: ha.Event) -> None:
+        entity_calls.append(event)
+
+    @ha.callback
+    def domain_listener(event: ha.Event) -> None:
+        domain_calls.append(event)
+
+    @ha.callback
+    def device_listener(event: ha.Event) -> None:
+        device_calls.append(event)
+
+    listeners_before = hass.bus.async_listeners()
+    unsub_entity = hass.bus.async_listen_indexed(
+        EVENT_STATE_CHANGED,
+        "entity_id",
+        ["light.bowl", "light.kitchen"],
+        entity_listener,
+    )
+    unsub_domain = hass.bus.async_listen_indexed(
+        EVENT_STATE_CHANGED, ha.INDEX_KEY_DOMAIN, ["sensor"], domain_listener
+    )
+    unsub_device = hass.bus.async_listen_indexed(
+        "device_event", "device_id", ["abc"], device_listener
+    )
+    assert (
+        hass.bus.async_listeners()[EVENT_STATE_CHANGED]
+        == listeners_before.get(EVENT_STATE_CHANGED, 0) + 2
+    )
+    assert hass.bus.async_listeners()["device_event"] == 1
+
+    hass.states.async_set("light.bowl", "on")
+    hass.states.async_set("light.other", "on")
+    hass.states.async_set("sensor.power", "1")
+    hass.bus.async_fire("device_event", {"device_id": "abc"})
+    hass.bus.async_fire("device_event", {"device_id": "def"})
+    hass.bus.async_fire("device_event", {"device_id": ["abc"]})
+    hass.bus.async_fire("device_event")
+    await hass.async_block_till_done()
+
+    assert [event.data["entity_id"] for event in entity_calls] == ["light.bowl"]
+    assert [event.data["entity_id"] for event in domain_calls] == ["sensor.power"]
+    assert len(device_calls) == 1
+
+    hass.bus.async_fire("device_event", {"device_id": "abc", "domain": "light"})
+    await hass.async_block_till_done()
+    assert len(device_calls) == 2
+
+    unsub_entity()
+    unsub_domain()
+    unsub_device()
+    hass.states.async_set("light.kitchen", "on")
+    hass.states.async_set("sensor.power", "2")
+    await hass.async_block_till_done()
+    assert len(entity_calls) == 1
+    assert len(domain_calls) == 1
+    assert hass.bus.async_listeners() == listeners_before
+
+
+async def test_eventbus_indexed_listener_repeated_values(hass: HomeAssistant) -> None:
+    """Test an indexed listener is called once for repeated index values."""
+    calls: list[ha.Event] = []
+
+    @ha.callback
+    def listener(event: ha.Event) -> None:
+        calls.append(event)
+
+    listeners_before = hass.bus.async_listeners()
+    unsub = hass.bus.async_listen_indexed(
+        EVENT_STATE_CHANGED, "entity_id", ["light.bowl", "light.bowl"], listener
+    )
+    assert (
+        hass.bus.async_listeners()[EVENT_STATE_CHANGED]
+        == listeners_before.get(EVENT_STATE_CHANGED, 0) + 1
+    )
+    hass.states.async_set("light.bowl", "on")
+    await hass.async_block_till_done()
+    assert len(calls) == 1
+
+    unsub()
+    assert hass.bus.async_listeners() == listeners_before
+
+
+async def test_eventbus_dispatch_stats(hass: HomeAssistant) -> None:
+    """Test collecting dispatch statistics."""
+
+    @ha.callback
+    def listener(event: ha.Event) -> None:
+        """Mock listener."""
+
+    hass.bus.async_listen("test", listener)
+    hass.bus.async_fire("test")
+    assert hass.bus.async_dispatch_stats() == {}
+
+    hass.bus.async_set_dispatch_stats(True)
+    hass.bus.async_fire("test")
+    hass.bus.async_fire("test")
+    await hass.async_block_till_done()
+
+    stats = hass.bus.async_dispatch_stats()["test"]
+    assert stats.fired == 2
+    assert stats.dispatch_time > 0
+    assert list(stats.listener_time) == [
+        "tests.test_core.test_eventbus_dispatch_stats.<locals>.listener"
+    ]
+
+    hass.bus.async_set_dispatch_stats(False)
+    assert hass.bus.async_dispatch_stats() == {}
+
+
 async def test_eventbus_run_immediately_callback(hass: HomeAssistant) -> None:
     """Test we can call events immediately with a callback."""
     calls = []
@@ -1541,6 +1729,57 @@ async def test_statemachine_force_update(hass: HomeAssistant) -> None:
     assert len(events) == 1
 
 
+async def test_statemachine_set_many(hass: HomeAssistant) -> None:
+    """Test setting multiple states at once."""
+    hass.states.async_set("light.bowl", "on", {"brightness": 100})
+    batches: list[list[ha.Event[ha.EventStateChangedData]]] = []
+
+    @ha.callback
+    def listener(events: list[ha.Event[ha.EventStateChangedData]]) -> None:
+        """Mock batched listener."""
+        batches.append(events)
+
+    hass.bus.async_listen_batched(EVENT_STATE_CHANGED, listener)
+    context = ha.Context()
+    hass.states.async_set_many(
+        [
+            ("light.Bowl", "off", {"brightness": 100}),
+            ("light.kitchen", "on", None),
+            ("sensor.power", 42, {"unit_of_measurement": "W"}),
+        ],
+        context=context,
+        timestamp=1700000000.0,
+    )
+    await hass.async_block_till_done()
+
+    assert len(batches) == 1
+    events = batches[0]
+    assert [event.data["entity_id"] for event in events] == [
+        "light.bowl",
+        "light.kitchen",
+        "sensor.power",
+    ]
+    assert all(event.context is context for event in events)
+    assert all(event.time_fired_timestamp == 1700000000.0 for event in events)
+    assert events[0].data["old_state"].state == "on"
+    assert events[1].data["old_state"] is None
+
+    sensor = hass.states.get("sensor.power")
+    assert sensor.state == "42"
+    assert sensor.attributes == {"unit_of_measurement": "W"}
+    assert sensor.last_updated_timestamp == 1700000000.0
+    assert hass.states.get("light.kitchen").attributes == {}
+
+    # Unchanged states do not fire state_changed
+    hass.states.async_set_many([("light.kitchen", "on", None)])
+    await hass.async_block_till_done()
+    assert len(batches) == 1
+
+    hass.states.async_set_many([("light.kitchen", "on", None)], force_update=True)
+    await hass.async_block_till_done()
+    assert len(batches) == 2
+
+
 async def test_statemachine_avoids_updating_attributes(hass: HomeAssistant) -> None:
     """Test async_set avoids recreating ReadOnly dicts when possible."""
     attrs = {"some_attr": "attr_value"}
@@ -1561,6 +1800,140 @@ async def test_statemachine_avoids_updating_attributes(hass: HomeAssistant) -> N
     assert isinstance(new_state.attributes, ReadOnlyDict)
 
 
+async def test_statemachine_shares_equal_attributes(hass: HomeAssistant) -> None:
+    """Test states with equal attributes share a single ReadOnlyDict."""
+    hass.states.async_set(
+        "sensor.one", "1", {"device_class": "power", "unit_of_measurement": "W"}
+    )
+    hass.states.async_set(
+        "sensor.two", "2", {"unit_of_measurement": "W", "device_class": "power"}
+    )
+    hass.states.async_set("sensor.three", "3", {"device_class": "energy"})
+    hass.states.async_set("sensor.flag", "4", {"value": True})
+    hass.states.async_set("sensor.number", "5", {"value": 1})
+    hass.states.async_set("sensor.list", "6", {"options": ["a", "b"]})
+    hass.states.async_set("sensor.list_2", "7", {"options": ["a", "b"]})
+    hass.states.async_set("sensor.tuple", "8", {"options": ("a", "b")})
+    hass.states.async_set("sensor.dict", "9", {"nested": {"a": 1}})
+    hass.states.async_set("sensor.dict_2", "10", {"nested": {"a": 1}})
+    hass.states.async_set("sensor.empty", "11")
+    hass.states.async_set("sensor.empty_2", "12", {})
+
+    def _attributes(entity_id: str) -> ReadOnlyDict:
+        return hass.states.get(entity_id).attributes
+
+    assert _attributes("sensor.one") is _attributes("sensor.two")
+    assert _attributes("sensor.one") is not _attributes("sensor.three")
+    assert _attributes("sensor.flag") is not _attributes("sensor.number")
+    assert _attributes("sensor.flag")["value"] is True
+    assert _attributes("sensor.number")["value"] == 1
+    assert _attributes("sensor.list") is not _attributes("sensor.list_2")
+    assert _attributes("sensor.list") == _attributes("sensor.list_2")
+    assert _attributes("sensor.list") is not _attributes("sensor.tuple")
+    assert _attributes("sensor.dict") is not _attributes("sensor.dict_2")
+    assert _attributes("sensor.dict") == _attributes("sensor.dict_2")
+    assert _attributes("sensor.empty") is _attributes("sensor.empty_2")
+    assert isinstance(_attributes("sensor.one"), ReadOnlyDict)
+    assert isinstance(_attributes("sensor.dict"), ReadOnlyDict)
+
+    # Changing only the state keeps the attributes of the previous state
+    one_attributes = _attributes("sensor.one")
+    hass.states.async_set(
+        "sensor.one", "13", {"device_class": "power", "unit_of_measurement": "W"}
+    )
+    assert _attributes("sensor.one") is one_attributes
+
+
+@pytest.mark.parametrize(
+    ("value", "other_value"),
+    [
+        ((30, 100), (30.0, 100.0)),
+        ((1, 0), (True, False)),
+        (((1,),), ((True,),)),
+        (0.0, -0.0),
+        ("1", 1),
+        (frozenset({1}), frozenset({True})),
+    ],
+)
+async def test_statemachine_shares_attributes_of_equal_types(
+    hass: HomeAssistant, value: Any, other_value: Any
+) -> None:
+    """Test attributes with equal values of different types are not shared."""
+    hass.states.async_set("sensor.one", "1", {"value": value})
+    hass.states.async_set("sensor.two", "2", {"value": other_value})
+    hass.states.async_set("sensor.three", "3", {"value": copy.deepcopy(value)})
+
+    one_attributes = hass.states.get("sensor.one").attributes
+    two_attributes = hass.states.get("sensor.two").attributes
+    assert one_attributes is not two_attributes
+    assert repr(two_attributes["value"]) == repr(other_value)
+    if not isinstance(value, frozenset):
+        assert hass.states.get("sensor.three").attributes is one_attributes
+
+
+async def test_statemachine_does_not_share_mutable_attributes(
+    hass: HomeAssistant,
+) -> None:
+    """Test changing a nested list does not change attributes of other states."""
+    options = ["a", "b"]
+    hass.states.async_set("sensor.one", "1", {"options": options, "unit": "W"})
+    hass.states.async_set("sensor.two", "2", {"options": ["a", "b"], "unit": "W"})
+
+    options.append("c")
+    hass.states.get("sensor.one").attributes["options"].append("d")
+
+    assert hass.states.get("sensor.two").attributes["options"] == ["a", "b"]
+
+
+async def test_states_class_index(hass: HomeAssistant) -> None:
+    """Test states are indexed by domain, device class and unit."""
+    hass.states.async_set(
+        "sensor.one", "1", {"device_class": "power", "unit_of_measurement": "W"}
+    )
+    hass.states.async_set(
+        "sensor.two", "2", {"device_class": "power", "unit_of_measurement": "kW"}
+    )
+    hass.states.async_set("sensor.three", "3", {"device_class": "energy"})
+    hass.states.async_set("light.one", "on", {"device_class": ["unhashable"]})
+
+    def _entity_ids(*args: str | None) -> set[str]:
+        return {
+            state.entity_id
+            for state in hass.states._states.class_states(*args)  # noqa: SLF001
+        }
+
+    assert _entity_ids("sensor") == {"sensor.one", "sensor.two", "sensor.three"}
+    assert _entity_ids("sensor", "power") == {"sensor.one", "sensor.two"}
+    assert _entity_ids("sensor", "power", "W") == {"sensor.one"}
+    assert _entity_ids("sensor", None, "kW") == {"sensor.two"}
+    assert _entity_ids("sensor", "energy", "W") == set()
+    assert _entity_ids("light") == {"light.one"}
+    assert _entity_ids("switch") == set()
+
+    # Changing the attributes moves the state to another index
+    hass.states.async_set(
+        "sensor.two", "2", {"device_class": "power", "unit_of_measurement": "W"}
+    )
+    assert _entity_ids("sensor", "power", "W") == {"sensor.one", "sensor.two"}
+    assert _entity_ids("sensor", None, "kW") == set()
+
+    # Changing only the state updates the indexed state
+    hass.states.async_set(
+        "sensor.one", "5", {"device_class": "power", "unit_of_measurement": "W"}
+    )
+    assert {
+        state.state
+        for state in hass.states._states.class_states(  # noqa: SLF001
+            "sensor", "power", "W"
+        )
+    } == {"5", "2"}
+
+    hass.states.async_remove("sensor.one")
+    hass.states.async_remove("sensor.two")
+    assert _entity_ids("sensor", "power") == set()
+    assert ("sensor", "power", "W") not in hass.states._states._class_index  # noqa: SLF001
+
+
 def test_service_call_repr() -> None:
     """Test ServiceCall repr."""
     call = ha.ServiceCall("homeassistant", "start")